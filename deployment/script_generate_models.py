@@ -11,7 +11,7 @@ import sys
 import traceback
 from os.path import abspath, dirname, join
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 # This script generates a variety of different data model files for the
 # Vehicle Signal Specification (VSS) https://github.com/COVESA/vehicle_signal_specification.
@@ -23,6 +23,11 @@ from typing import Any, Dict
 # python ./deployment/generate_models.py [--review=<forked_vss_repo>]
 
 OUTPUT_PATH = join(dirname(dirname(abspath(__file__))), "generated_models")
+# Registry of integer field ids used by the compact payload encoding, new versions are appended to it
+FIELD_REGISTRY_PATH = join(
+    dirname(dirname(abspath(__file__))),
+    "source/lib/cms_common/serialization/assets/vss_field_ids.json",
+)
 
 
 class GlueTranslator:
@@ -213,6 +218,36 @@ def process_sim(vss_object: Dict[str, Any], key: str = "") -> Dict[str, Any]:
     return field
 
 
+def process_field_ids(vss_object: Dict[str, Any], key: str = "") -> List[str]:
+    if vss_object.get("type") == "branch":
+        return [
+            path
+            for child_key, child in vss_object["children"].items()
+            for path in process_field_ids(
+                child, f"{key}.{child_key.lower()}" if key else child_key.lower()
+            )
+        ]
+
+    return [key]
+
+
+def update_field_registry(
+    registry: Dict[str, Any], paths: List[str], release: str
+) -> Dict[str, Any]:
+    # The id of a path is its index, so a new version keeps every path of the
+    # latest one, even removed signals, and appends the new paths after them.
+    latest = registry[max(registry, key=int)]["fields"] if registry else []
+    known_paths = set(latest)
+    new_paths = [path for path in paths if path not in known_paths]
+    if new_paths:
+        registry[str(len(registry) + 1)] = {
+            "release": release,
+            "fields": latest + new_paths,
+        }
+
+    return registry
+
+
 def process_schema(vss_schema_raw: str) -> str:
     replacements = [
         (
@@ -372,6 +407,21 @@ if __name__ == "__main__":
             }
             sim_file.write(json.dumps(sim_payload, indent=2))
 
+        with open(FIELD_REGISTRY_PATH, "r", encoding="utf-8") as registry_file:
+            field_registry = json.loads(registry_file.read())
+
+        with open(
+            join(OUTPUT_PATH, "vss_field_ids.json"), "w", encoding="utf-8"
+        ) as field_ids_file:
+            field_ids_file.write(
+                json.dumps(
+                    update_field_registry(
+                        field_registry, process_field_ids(vss["Vehicle"]), tag
+                    ),
+                    indent=2,
+                )
+            )
+
         # Generate graphql files
         with open(
             join(OUTPUT_PATH, "vss_types.graphql"), "r", encoding="utf-8"
@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# Standard Library
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple
+
+# AWS Libraries
+from aws_lambda_powertools import Logger
+
+# Connected Mobility Solution on AWS
+from .item_codec import deserialize_item, serialize_item
+
+logger = Logger()
+
+# Request limits of BatchGetItem and BatchWriteItem. Items are at most 400 KB, so a full chunk of either
+# stays under the 16 MB request limit, larger responses come back as unprocessed keys and are retried
+MAX_KEYS_PER_BATCH_GET = 100
+MAX_ITEMS_PER_BATCH_WRITE = 25
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_MAX_ATTEMPTS = 8
+BASE_DELAY_SECONDS = 0.05
+MAX_DELAY_SECONDS = 20.0
+
+
+class BatchStats(NamedTuple):
+    chunks: int
+    requests: int
+    retries: int
+    items: int
+    unprocessed: int
+    consumed_capacity: float
+    elapsed_seconds: float
+
+    @property
+    def items_per_second(self) -> float:
+        return self.items / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+
+class BatchGetResult(NamedTuple):
+    items: Dict[str, List[Dict[str, Any]]]
+    unprocessed_keys: Dict[str, Any]
+    stats: BatchStats
+
+
+class BatchWriteResult(NamedTuple):
+    unprocessed_items: Dict[str, List[Dict[str, Any]]]
+    stats: BatchStats
+
+
+class UnprocessedItemsError(Exception):
+    def __init__(self, unprocessed_items: Dict[str, List[Dict[str, Any]]]) -> None:
+        super().__init__(
+            f"{sum(len(requests) for requests in unprocessed_items.values())} "
+            "items were still unprocessed after the last attempt"
+        )
+        self.unprocessed_items = unprocessed_items
+
+
+class _ChunkResult(NamedTuple):
+    responses: Dict[str, List[Dict[str, Any]]]
+    unprocessed: Dict[str, Any]
+    requests: int
+    consumed_capacity: float
+
+
+def decorrelated_jitter(
+    previous_delay: float,
+    base_delay: float = BASE_DELAY_SECONDS,
+    max_delay: float = MAX_DELAY_SECONDS,
+) -> float:
+    # Each delay is drawn from base_delay to three times the last one, so retries of concurrent chunks spread out
+    return min(max_delay, random.uniform(base_delay, previous_delay * 3))
+
+
+def chunk(values: List[Any], size: int) -> List[List[Any]]:
+    return [values[start : start + size] for start in range(0, len(values), size)]
+
+
+# Retries unprocessed keys with jittered backoff, returning those left once max_attempts run out
+def batch_get_items(
+    client: Any,
+    request_items: Dict[str, Any],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+) -> BatchGetResult:
+    requests = [
+        {table_name: {**request, "Keys": [serialize_item(key) for key in keys]}}
+        for table_name, request in request_items.items()
+        for keys in chunk(request["Keys"], MAX_KEYS_PER_BATCH_GET)
+    ]
+    start = time.perf_counter()
+    results = _send_chunks(
+        lambda request: client.batch_get_item(
+            RequestItems=request, ReturnConsumedCapacity="TOTAL"
+        ),
+        requests,
+        "UnprocessedKeys",
+        max_workers,
+        max_attempts,
+    )
+
+    items: Dict[str, List[Dict[str, Any]]] = {
+        table_name: [] for table_name in request_items
+    }
+    unprocessed_keys: Dict[str, Any] = {}
+    for result in results:
+        for table_name, table_items in result.responses.items():
+            items.setdefault(table_name, []).extend(
+                deserialize_item(item) for item in table_items
+            )
+        for table_name, request in result.unprocessed.items():
+            unprocessed_keys.setdefault(table_name, {**request, "Keys": []})
+            unprocessed_keys[table_name]["Keys"] += [
+                deserialize_item(key) for key in request["Keys"]
+            ]
+
+    stats = _get_stats(
+        results,
+        items=sum(len(table_items) for table_items in items.values()),
+        unprocessed=sum(len(request["Keys"]) for request in unprocessed_keys.values()),
+        elapsed_seconds=time.perf_counter() - start,
+    )
+    _log_stats("Batch get", request_items, stats)
+    return BatchGetResult(items, unprocessed_keys, stats)
+
+
+# Retries unprocessed items with jittered backoff, returning those left once max_attempts run out
+def batch_write_items(
+    client: Any,
+    table_name: str,
+    write_requests: List[Dict[str, Any]],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+) -> BatchWriteResult:
+    start = time.perf_counter()
+    results = _send_chunks(
+        lambda request: client.batch_write_item(
+            RequestItems=request, ReturnConsumedCapacity="TOTAL"
+        ),
+        [
+            {
+                table_name: [
+                    _map_write_request(request, serialize_item) for request in requests
+                ]
+            }
+            for requests in chunk(write_requests, MAX_ITEMS_PER_BATCH_WRITE)
+        ],
+        "UnprocessedItems",
+        max_workers,
+        max_attempts,
+    )
+
+    unprocessed_items: Dict[str, List[Dict[str, Any]]] = {}
+    for result in results:
+        for unprocessed_table, requests in result.unprocessed.items():
+            unprocessed_items.setdefault(unprocessed_table, []).extend(
+                _map_write_request(request, deserialize_item) for request in requests
+            )
+
+    unprocessed = sum(len(requests) for requests in unprocessed_items.values())
+    stats = _get_stats(
+        results,
+        items=len(write_requests) - unprocessed,
+        unprocessed=unprocessed,
+        elapsed_seconds=time.perf_counter() - start,
+    )
+    _log_stats("Batch write", [table_name], stats)
+    return BatchWriteResult(unprocessed_items, stats)
+
+
+def _map_write_request(
+    request: Dict[str, Any], convert: Callable[[Dict[str, Any]], Dict[str, Any]]
+) -> Dict[str, Any]:
+    # Converts the Item of a PutRequest or the Key of a DeleteRequest
+    return {
+        operation: {field: convert(value) for field, value in body.items()}
+        for operation, body in request.items()
+    }
+
+
+def _send_chunks(
+    send: Callable[[Dict[str, Any]], Dict[str, Any]],
+    requests: List[Dict[str, Any]],
+    unprocessed_field: str,
+    max_workers: int,
+    max_attempts: int,
+) -> List[_ChunkResult]:
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+    if len(requests) <= 1:
+        return [
+            _send_chunk(send, request, unprocessed_field, max_attempts)
+            for request in requests
+        ]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(requests))) as executor:
+        return list(
+            executor.map(
+                lambda request: _send_chunk(
+                    send, request, unprocessed_field, max_attempts
+                ),
+                requests,
+            )
+        )
+
+
+def _send_chunk(
+    send: Callable[[Dict[str, Any]], Dict[str, Any]],
+    request: Dict[str, Any],
+    unprocessed_field: str,
+    max_attempts: int,
+) -> _ChunkResult:
+    responses: Dict[str, List[Dict[str, Any]]] = {}
+    requests = 0
+    consumed_capacity = 0.0
+    delay = BASE_DELAY_SECONDS
+    while True:
+        response = send(request)
+        requests += 1
+        for table_name, items in response.get("Responses", {}).items():
+            responses.setdefault(table_name, []).extend(items)
+        consumed_capacity += sum(
+            capacity.get("CapacityUnits", 0.0)
+            for capacity in response.get("ConsumedCapacity", [])
+        )
+
+        request = response.get(unprocessed_field) or {}
+        if not request or requests >= max_attempts:
+            return _ChunkResult(responses, request, requests, consumed_capacity)
+
+        delay = decorrelated_jitter(delay)
+        logger.debug(
+            "%s returned, retrying in %.3f seconds",
+            unprocessed_field,
+            delay,
+            extra={"tables": list(request)},
+        )
+        time.sleep(delay)
+
+
+def _get_stats(
+    results: List[_ChunkResult], items: int, unprocessed: int, elapsed_seconds: float
+) -> BatchStats:
+    requests = sum(result.requests for result in results)
+    return BatchStats(
+        chunks=len(results),
+        requests=requests,
+        retries=requests - len(results),
+        items=items,
+        unprocessed=unprocessed,
+        consumed_capacity=sum(result.consumed_capacity for result in results),
+        elapsed_seconds=elapsed_seconds,
+    )
+
+
+def _log_stats(operation: str, table_names: Any, stats: BatchStats) -> None:
+    log = logger.warning if stats.unprocessed else logger.debug
+    log(
+        "%s of %s finished",
+        operation,
+        ", ".join(table_names),
+        extra={
+            **stats._asdict(),
+            "items_per_second": round(stats.items_per_second, 2),
+        },
+    )
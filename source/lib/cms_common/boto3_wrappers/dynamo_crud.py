@@ -5,7 +5,7 @@
 # Standard Library
 import os
 import time
-from typing import Any, Dict, Generator, List, Optional
+from typing import Any, Dict, Generator, List, Optional, Tuple
 
 # AWS Libraries
 import boto3
@@ -13,13 +13,33 @@ from aws_lambda_powertools import Logger, Tracer
 from botocore.config import Config
 from botocore.exceptions import ClientError
 
+# Connected Mobility Solution on AWS
+from .batch import (
+    DEFAULT_MAX_WORKERS,
+    MAX_ITEMS_PER_BATCH_WRITE,
+    BatchGetResult,
+    BatchStats,
+    BatchWriteResult,
+    UnprocessedItemsError,
+    batch_get_items,
+    batch_write_items,
+)
+from .instrumentation import CallRecorder, MetricsSink, record_call
+from .item_cache import ItemCache
+from .parallel_scan import ParallelScan
+
 tracer = Tracer()
 logger = Logger()
 
 
 class DynHelpers:
     dynamo_object = None
-    MAX_ITEM_PER_BATCH_IN_BATCH_WRITE = 25
+    dynamo_client = None
+    # Opt-in per table, with DynHelpers.item_cache.enable(table_name, ttl_seconds)
+    item_cache = ItemCache()
+    # Receives the metrics of every call once set, for example to a PowertoolsMetricsSink
+    metrics_sink: Optional[MetricsSink] = None
+    MAX_ITEM_PER_BATCH_IN_BATCH_WRITE = MAX_ITEMS_PER_BATCH_WRITE
 
     @staticmethod
     def dyn_resource() -> Any:
@@ -33,6 +53,44 @@ class DynHelpers:
         )
         return DynHelpers.dynamo_object
 
+    @staticmethod
+    def dyn_client() -> Any:
+        # The batch workers share the client, which unlike resources is thread-safe
+        if getattr(DynHelpers, "dynamo_client"):
+            return DynHelpers.dynamo_client
+
+        DynHelpers.dynamo_client = boto3.client(
+            "dynamodb",
+            region_name=os.environ.get("REGION_NAME"),
+            config=Config(user_agent_extra=os.environ["USER_AGENT_STRING"]),
+        )
+        return DynHelpers.dynamo_client
+
+    @staticmethod
+    def new_dyn_table(table_name: str) -> Any:
+        # Resources aren't thread-safe, so every worker thread creates its own, from its own session
+        return (
+            boto3.session.Session()
+            .resource(
+                "dynamodb",
+                region_name=os.environ.get("REGION_NAME"),
+                config=Config(user_agent_extra=os.environ["USER_AGENT_STRING"]),
+            )
+            .Table(table_name)
+        )
+
+    @staticmethod
+    def _get_capacity_kwargs() -> Dict[str, str]:
+        # Consumed capacity is only returned, and counted, when a metrics sink is set
+        return {"ReturnConsumedCapacity": "TOTAL"} if DynHelpers.metrics_sink else {}
+
+    @staticmethod
+    def _add_batch_stats(call: CallRecorder, stats: BatchStats) -> None:
+        call.requests += stats.requests
+        call.items += stats.items
+        call.consumed_capacity += stats.consumed_capacity
+        call.retries += stats.retries
+
     @staticmethod
     def get_all(*args: Any, **kwargs: Any) -> List[Dict[str, Any]]:
         return [
@@ -44,42 +102,65 @@ class DynHelpers:
         if not item.get("timestamp"):
             item["timestamp"] = str(time.time())
 
-        try:
-            DynHelpers.dyn_resource().Table(table_name).put_item(Item=item)
-        except ClientError as err:
-            logger.error(
-                "Couldn't update item %s to table %s. Here's why: %s: %s",
-                item,
-                table_name,
-                err.response["Error"]["Code"],
-                err.response["Error"]["Message"],
-            )
-            raise
+        with record_call(DynHelpers.metrics_sink, "PutItem", table_name) as call:
+            try:
+                call.add_response(
+                    DynHelpers.dyn_resource()
+                    .Table(table_name)
+                    .put_item(Item=item, **DynHelpers._get_capacity_kwargs())
+                )
+            except ClientError as err:
+                logger.error(
+                    "Couldn't update item %s to table %s. Here's why: %s: %s",
+                    item,
+                    table_name,
+                    err.response["Error"]["Code"],
+                    err.response["Error"]["Message"],
+                )
+                raise
+        DynHelpers.item_cache.invalidate(table_name, item)
 
     @staticmethod
     def get_item(table_name: str, get_criteria: Dict[str, Any]) -> Any:
-        try:
-            response = (
-                DynHelpers.dyn_resource().Table(table_name).get_item(Key=get_criteria)
-            )
-            return response["Item"]
-        except ClientError as err:
-            logger.error(
-                "Couldn't get item %s from table %s. Here's why: %s: %s",
-                get_criteria,
-                table_name,
-                err.response["Error"]["Code"],
-                err.response["Error"]["Message"],
-            )
-            raise
-        except KeyError:
-            logger.error(
-                "Item %s not found in table %s.",
-                get_criteria,
-                table_name,
-                exc_info=True,
-            )
-            raise
+        use_cache = DynHelpers.item_cache.is_enabled(table_name)
+        with record_call(DynHelpers.metrics_sink, "GetItem", table_name) as call:
+            try:
+                if use_cache:
+                    cached, item = DynHelpers.item_cache.get(table_name, get_criteria)
+                    if cached:
+                        if item is None:
+                            raise KeyError("Item")
+                        call.items += 1
+                        return item
+
+                response = (
+                    DynHelpers.dyn_resource()
+                    .Table(table_name)
+                    .get_item(Key=get_criteria, **DynHelpers._get_capacity_kwargs())
+                )
+                call.add_response(response)
+                if use_cache:
+                    DynHelpers.item_cache.put(
+                        table_name, get_criteria, response.get("Item")
+                    )
+                return response["Item"]
+            except ClientError as err:
+                logger.error(
+                    "Couldn't get item %s from table %s. Here's why: %s: %s",
+                    get_criteria,
+                    table_name,
+                    err.response["Error"]["Code"],
+                    err.response["Error"]["Message"],
+                )
+                raise
+            except KeyError:
+                logger.error(
+                    "Item %s not found in table %s.",
+                    get_criteria,
+                    table_name,
+                    exc_info=True,
+                )
+                raise
 
     @staticmethod
     def update_item(
@@ -88,83 +169,148 @@ class DynHelpers:
         update_expression: Optional[str] = None,
         expression_attr: Optional[Dict[str, Any]] = None,
         return_values: str = "UPDATED_NEW",
+        expression_attribute_names: Optional[Dict[str, str]] = None,
     ) -> Any:
-        try:
-            response = (
-                DynHelpers.dyn_resource()
-                .Table(table_name)
-                .update_item(
-                    Key=item,
-                    UpdateExpression=update_expression,
-                    ExpressionAttributeValues=expression_attr,
-                    ReturnValues=return_values,
+        function_kwargs: Dict[str, Any] = DynHelpers._get_capacity_kwargs()
+        if expression_attribute_names:
+            function_kwargs["ExpressionAttributeNames"] = expression_attribute_names
+
+        with record_call(DynHelpers.metrics_sink, "UpdateItem", table_name) as call:
+            try:
+                response = (
+                    DynHelpers.dyn_resource()
+                    .Table(table_name)
+                    .update_item(
+                        Key=item,
+                        UpdateExpression=update_expression,
+                        ExpressionAttributeValues=expression_attr,
+                        ReturnValues=return_values,
+                        **function_kwargs,
+                    )
                 )
-            )
-        except ClientError as err:
-            logger.error(
-                "Couldn't update item %s to table %s. Here's why: %s: %s",
-                item,
-                table_name,
-                err.response["Error"]["Code"],
-                err.response["Error"]["Message"],
-            )
-            raise
+                call.add_response(response, items=1)
+            except ClientError as err:
+                logger.error(
+                    "Couldn't update item %s to table %s. Here's why: %s: %s",
+                    item,
+                    table_name,
+                    err.response["Error"]["Code"],
+                    err.response["Error"]["Message"],
+                )
+                raise
 
+        DynHelpers.item_cache.invalidate(table_name, item)
         return response["Attributes"]
 
     @staticmethod
     def delete_item(table_name: str, delete_keys: dict[str, Any]) -> None:
-        try:
-            DynHelpers.dyn_resource().Table(table_name).delete_item(Key=delete_keys)
-
-        except ClientError as err:
-            logger.error(
-                "Couldn't delete item %s from table %s. Here's why: %s: %s",
-                id,
-                table_name,
-                err.response["Error"]["Code"],
-                err.response["Error"]["Message"],
-            )
-            raise
+        with record_call(DynHelpers.metrics_sink, "DeleteItem", table_name) as call:
+            try:
+                call.add_response(
+                    DynHelpers.dyn_resource()
+                    .Table(table_name)
+                    .delete_item(Key=delete_keys, **DynHelpers._get_capacity_kwargs()),
+                    items=1,
+                )
+            except ClientError as err:
+                logger.error(
+                    "Couldn't delete item %s from table %s. Here's why: %s: %s",
+                    id,
+                    table_name,
+                    err.response["Error"]["Code"],
+                    err.response["Error"]["Message"],
+                )
+                raise
+        DynHelpers.item_cache.invalidate(table_name, delete_keys)
 
     @staticmethod
-    def dyn_batch_get(batch_keys: Dict[str, Any]) -> Dict[str, List[Any]]:
-        remaining_tries = 5
-        sleepy_time = 1  # Start with 1 second of sleep, then exponentially increase.
-        retrieved: Dict[str, List[Any]] = {key: [] for key in batch_keys}
-        while batch_keys and remaining_tries:
-            response = DynHelpers.dyn_resource().batch_get_item(RequestItems=batch_keys)
-            # Collect any retrieved items and retry unprocessed keys.
-            for key in response.get("Responses", []):
-                retrieved[key] += response["Responses"][key]
+    def dyn_batch_get(
+        batch_keys: Dict[str, Any], max_workers: int = DEFAULT_MAX_WORKERS
+    ) -> Dict[str, List[Any]]:
+        return DynHelpers.dyn_batch_get_with_stats(batch_keys, max_workers).items
 
-            batch_keys = response["UnprocessedKeys"]
+    # Reads any number of keys in concurrent chunks of at most 100, serving keys of tables with the item cache
+    # enabled from it unless the request has a projection or other options
+    @staticmethod
+    def dyn_batch_get_with_stats(
+        batch_keys: Dict[str, Any], max_workers: int = DEFAULT_MAX_WORKERS
+    ) -> BatchGetResult:
+        cache = DynHelpers.item_cache
+        cached_items: Dict[str, List[Any]] = {}
+        cached_keys: Dict[str, List[Any]] = {}
+        request_items = {}
+        for table_name, request in batch_keys.items():
+            if not cache.is_enabled(table_name) or set(request) != {"Keys"}:
+                request_items[table_name] = request
+                continue
+            cached_items[table_name], cached_keys[table_name] = cache.get_many(
+                table_name, request["Keys"]
+            )
+            if cached_keys[table_name]:
+                request_items[table_name] = {"Keys": cached_keys[table_name]}
 
-            logger.info(
-                "%s unprocessed keys returned. Sleep, then retry.",
-                len(batch_keys),
+        with record_call(
+            DynHelpers.metrics_sink, "BatchGetItem", ",".join(batch_keys)
+        ) as call:
+            result = batch_get_items(
+                DynHelpers.dyn_client(), request_items, max_workers=max_workers
             )
-            remaining_tries -= 1
-            if batch_keys and remaining_tries:
-                logger.info("Sleeping for %s seconds.", sleepy_time)
-                time.sleep(sleepy_time)
-                sleepy_time = min(sleepy_time * 2, 32)
+            DynHelpers._add_batch_stats(call, result.stats)
+        if not cached_items:
+            return result
 
-        return retrieved
+        for table_name, keys in cached_keys.items():
+            cache.put_many(
+                table_name,
+                keys,
+                result.items.get(table_name, []),
+                result.unprocessed_keys.get(table_name, {}).get("Keys", []),
+            )
+        return result._replace(
+            items={
+                table_name: cached_items.get(table_name, [])
+                + result.items.get(table_name, [])
+                for table_name in batch_keys
+            }
+        )
 
+    # Raises UnprocessedItemsError if some items are still unprocessed once the retries run out
     @staticmethod
-    def dyn_batch_write(table_name: str, batch_items: List[Dict[str, Any]]) -> None:
-        try:
-            with DynHelpers.dyn_resource().Table(table_name).batch_writer() as batch:
-                for batch_item in batch_items:
-                    if batch_item["operation"] == "DELETE":
-                        batch.delete_item(Key=batch_item["key"])
-                    elif batch_item["operation"] == "PUT":
-                        batch.put_item(Item=batch_item["item"])
+    def dyn_batch_write(
+        table_name: str,
+        batch_items: List[Dict[str, Any]],
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> BatchWriteResult:
+        write_requests = []
+        for batch_item in batch_items:
+            if batch_item["operation"] == "DELETE":
+                write_requests.append({"DeleteRequest": {"Key": batch_item["key"]}})
+            elif batch_item["operation"] == "PUT":
+                write_requests.append({"PutRequest": {"Item": batch_item["item"]}})
 
+        try:
+            with record_call(
+                DynHelpers.metrics_sink, "BatchWriteItem", table_name
+            ) as call:
+                result = batch_write_items(
+                    DynHelpers.dyn_client(),
+                    table_name,
+                    write_requests,
+                    max_workers=max_workers,
+                )
+                DynHelpers._add_batch_stats(call, result.stats)
+            if result.unprocessed_items:
+                raise UnprocessedItemsError(result.unprocessed_items)
         except Exception as err:
             logger.error(msg=f"Error while batch writing: {err}")
             raise
+        finally:
+            for batch_item in batch_items:
+                DynHelpers.item_cache.invalidate(
+                    table_name, batch_item.get("key") or batch_item.get("item") or {}
+                )
+
+        return result
 
     @staticmethod
     def dyn_scan(
@@ -172,27 +318,81 @@ class DynHelpers:
     ) -> Generator[List[Dict[str, Any]], None, None]:
         scan_kwargs = {k: v for k, v in kwargs.items() if v}
 
-        logger.info("Running dynamo scan on %s", table, extra={"kwargs": scan_kwargs})
+        logger.debug("Running dynamo scan on %s", table, extra={"kwargs": scan_kwargs})
+        scan_kwargs.update(DynHelpers._get_capacity_kwargs())
 
         while scan_kwargs.get("LastEvaluatedKey", "start"):
             if scan_kwargs.get("LastEvaluatedKey", None):
                 scan_kwargs["ExclusiveStartKey"] = scan_kwargs.pop("LastEvaluatedKey")
 
-            try:
-                response = DynHelpers.dyn_resource().Table(table).scan(**scan_kwargs)
-                logger.info("Scan response %s", table, extra={"response": response})
-                scan_kwargs["LastEvaluatedKey"] = response.get("LastEvaluatedKey")
+            # Each page is recorded as its own call, without the time the caller spends on it
+            with record_call(DynHelpers.metrics_sink, "Scan", str(table)) as call:
+                try:
+                    response = (
+                        DynHelpers.dyn_resource().Table(table).scan(**scan_kwargs)
+                    )
+                    call.add_response(response)
+                except ClientError as err:
+                    logger.error(
+                        "Couldn't scan %s. Here's why: %s: %s",
+                        table,
+                        err.response["Error"]["Code"],
+                        err.response["Error"]["Message"],
+                    )
+                    raise
+            logger.debug("Scan response %s", table, extra={"response": response})
+            scan_kwargs["LastEvaluatedKey"] = response.get("LastEvaluatedKey")
+
+            yield response.get("Items")
+
+    # Scan parameters such as Limit, the page size of each worker, are passed through
+    @staticmethod
+    def dyn_parallel_scan(
+        table_name: str,
+        total_segments: int = 4,
+        max_buffered_pages: Optional[int] = None,
+        **kwargs: Any,
+    ) -> ParallelScan:
+        scan_kwargs = {k: v for k, v in kwargs.items() if v}
+        return ParallelScan(
+            table_name,
+            DynHelpers.new_dyn_table,
+            total_segments=total_segments,
+            max_buffered_pages=max_buffered_pages,
+            **scan_kwargs,
+        )
 
-                yield response.get("Items")
+    # Returns a page and the key to resume from, None once the table has been read to the end
+    @staticmethod
+    def dyn_scan_page(
+        table_name: str,
+        limit: int,
+        exclusive_start_key: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        scan_kwargs = {k: v for k, v in kwargs.items() if v}
+        scan_kwargs["Limit"] = limit
+        scan_kwargs.update(DynHelpers._get_capacity_kwargs())
+        if exclusive_start_key:
+            scan_kwargs["ExclusiveStartKey"] = exclusive_start_key
+
+        with record_call(DynHelpers.metrics_sink, "Scan", table_name) as call:
+            try:
+                response = (
+                    DynHelpers.dyn_resource().Table(table_name).scan(**scan_kwargs)
+                )
+                call.add_response(response)
             except ClientError as err:
                 logger.error(
                     "Couldn't scan %s. Here's why: %s: %s",
-                    table,
+                    table_name,
                     err.response["Error"]["Code"],
                     err.response["Error"]["Message"],
                 )
                 raise
 
+        return response.get("Items", []), response.get("LastEvaluatedKey")
+
     @staticmethod
     def dyn_query(
         table_name: str,
@@ -201,32 +401,45 @@ class DynHelpers:
         projection_expression: Optional[str] = None,
         expression_attribute_names: Optional[Dict[str, str]] = None,
         expression_attribute_values: Optional[Dict[str, str]] = None,
+        index_name: Optional[str] = None,
     ) -> Any:
         function_kwargs: Dict[str, Any] = {
             "KeyConditionExpression": key_condition_expression
         }
-        try:
-            if projection_expression and selection == "SPECIFIC_ATTRIBUTES":
+        if projection_expression:
+            function_kwargs["ProjectionExpression"] = projection_expression
+            if selection == "SPECIFIC_ATTRIBUTES":
                 function_kwargs["Select"] = selection
-            elif projection_expression:
-                function_kwargs["ProjectionExpression"] = projection_expression
-            if expression_attribute_names:
-                function_kwargs["ExpressionAttributeNames"] = expression_attribute_names
-            if expression_attribute_values:
-                function_kwargs[
-                    "ExpressionAttributeValues"
-                ] = expression_attribute_values
-            response = (
-                DynHelpers.dyn_resource().Table(table_name).query(**function_kwargs)
-            )
-        except ClientError as err:
-            logger.error(
-                "Couldn't query item %s from table %s. Here's why: %s: %s",
-                key_condition_expression,
-                table_name,
-                err.response["Error"]["Code"],
-                err.response["Error"]["Message"],
-            )
-            raise
+        if expression_attribute_names:
+            function_kwargs["ExpressionAttributeNames"] = expression_attribute_names
+        if expression_attribute_values:
+            function_kwargs["ExpressionAttributeValues"] = expression_attribute_values
+        if index_name:
+            function_kwargs["IndexName"] = index_name
+        function_kwargs.update(DynHelpers._get_capacity_kwargs())
+
+        items: List[Dict[str, Any]] = []
+        with record_call(DynHelpers.metrics_sink, "Query", table_name) as call:
+            try:
+                while True:
+                    response = (
+                        DynHelpers.dyn_resource()
+                        .Table(table_name)
+                        .query(**function_kwargs)
+                    )
+                    call.add_response(response)
+                    items += response["Items"]
+                    if not response.get("LastEvaluatedKey"):
+                        break
+                    function_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+            except ClientError as err:
+                logger.error(
+                    "Couldn't query item %s from table %s. Here's why: %s: %s",
+                    key_condition_expression,
+                    table_name,
+                    err.response["Error"]["Code"],
+                    err.response["Error"]["Message"],
+                )
+                raise
 
-        return response["Items"]
+        return items
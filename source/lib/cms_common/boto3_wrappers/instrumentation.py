@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# Standard Library
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, NamedTuple, Optional
+
+# AWS Libraries
+from aws_lambda_powertools import Logger, Metrics
+from aws_lambda_powertools.metrics import EphemeralMetrics, MetricUnit
+from botocore.exceptions import ClientError
+
+# Connected Mobility Solution on AWS
+from .rate_limiter import is_throttling_error
+
+logger = Logger()
+
+
+class DynamoCallMetrics(NamedTuple):
+    operation: str
+    table_name: str
+    latency_ms: float
+    requests: int
+    items: int
+    consumed_capacity: float
+    # Retries of botocore and of unprocessed batch keys or items
+    retries: int
+    throttles: int
+    error_code: Optional[str]
+
+
+MetricsSink = Callable[[DynamoCallMetrics], None]
+
+
+# Flushes every call as its own record in the namespace and dimensions of the handler's Metrics, with the table
+# as a TableName dimension and metrics named after the operation, such as DynamoDBQueryLatency
+class PowertoolsMetricsSink:
+    METRICS = (
+        ("Latency", "latency_ms", MetricUnit.Milliseconds),
+        ("Requests", "requests", MetricUnit.Count),
+        ("Items", "items", MetricUnit.Count),
+        ("ConsumedCapacity", "consumed_capacity", MetricUnit.Count),
+        ("Retries", "retries", MetricUnit.Count),
+        ("Throttles", "throttles", MetricUnit.Count),
+        ("Errors", "errors", MetricUnit.Count),
+    )
+
+    def __init__(self, metrics: Metrics) -> None:
+        self.metrics = metrics
+
+    def __call__(self, call_metrics: DynamoCallMetrics) -> None:
+        values = {
+            **call_metrics._asdict(),
+            "errors": int(call_metrics.error_code is not None),
+        }
+        # Kept apart from the handler's metric set, which takes a single set of dimensions for the whole invocation
+        table_metrics = EphemeralMetrics(
+            namespace=self.metrics.namespace, service=self.metrics.service
+        )
+        dimensions = {
+            **self.metrics.default_dimensions,
+            "TableName": call_metrics.table_name,
+        }
+        for name, value in dimensions.items():
+            table_metrics.add_dimension(name=name, value=value)
+        for name, value_name, unit in self.METRICS:
+            table_metrics.add_metric(
+                name=f"DynamoDB{call_metrics.operation}{name}",
+                unit=unit,
+                value=values[value_name],
+            )
+        table_metrics.flush_metrics()
+
+
+# Adds up the responses of one DynHelpers call, which can send several requests
+class CallRecorder:
+    def __init__(self, operation: str, table_name: str) -> None:
+        self.operation = operation
+        self.table_name = table_name
+        self.requests = 0
+        self.items = 0
+        self.consumed_capacity = 0.0
+        self.retries = 0
+        self.throttles = 0
+        self.error_code: Optional[str] = None
+
+    # Counts the items of Items, or 1 if there is an Item, unless items is given
+    def add_response(
+        self, response: Dict[str, Any], items: Optional[int] = None
+    ) -> None:
+        self.requests += 1
+        if items is None:
+            items = (
+                len(response["Items"])
+                if "Items" in response
+                else int("Item" in response)
+            )
+        self.items += items
+        capacities = response.get("ConsumedCapacity") or []
+        for capacity in capacities if isinstance(capacities, list) else [capacities]:
+            self.consumed_capacity += capacity.get("CapacityUnits", 0.0)
+        self.retries += response.get("ResponseMetadata", {}).get("RetryAttempts", 0)
+
+    def add_error(self, err: ClientError) -> None:
+        self.requests += 1
+        self.error_code = err.response["Error"]["Code"]
+        self.throttles += int(is_throttling_error(err))
+        self.retries += err.response.get("ResponseMetadata", {}).get("RetryAttempts", 0)
+
+    def get_metrics(self, latency_ms: float) -> DynamoCallMetrics:
+        return DynamoCallMetrics(
+            operation=self.operation,
+            table_name=self.table_name,
+            latency_ms=round(latency_ms, 3),
+            requests=self.requests,
+            items=self.items,
+            consumed_capacity=self.consumed_capacity,
+            retries=self.retries,
+            throttles=self.throttles,
+            error_code=self.error_code,
+        )
+
+
+# A ClientError raised in the block is recorded as the error of the call, a failing sink is ignored
+@contextmanager
+def record_call(
+    sink: Optional[MetricsSink], operation: str, table_name: str
+) -> Iterator[CallRecorder]:
+    recorder = CallRecorder(operation, table_name)
+    start = time.perf_counter()
+    try:
+        yield recorder
+    except ClientError as err:
+        recorder.add_error(err)
+        raise
+    finally:
+        if sink is not None:
+            try:
+                sink(recorder.get_metrics((time.perf_counter() - start) * 1000))
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.warning(
+                    "Couldn't send the metrics of %s on %s",
+                    operation,
+                    table_name,
+                    exc_info=True,
+                )
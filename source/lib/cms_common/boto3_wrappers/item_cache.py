@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# Standard Library
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional, Set, Tuple
+
+CacheKey = Tuple[str, Tuple[Tuple[str, Any], ...]]
+
+
+class ItemCacheStats(NamedTuple):
+    hits: int
+    misses: int
+    negative_hits: int
+    evictions: int
+    expirations: int
+    invalidations: int
+    size: int
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class _TableConfig(NamedTuple):
+    ttl_seconds: float
+    negative_ttl_seconds: float
+
+
+class _CacheEntry(NamedTuple):
+    item: Optional[Dict[str, Any]]
+    expires_at: float
+
+
+# Process-local LRU of the items read from the tables it is enabled for, with a key that wasn't found kept as missing.
+# Writes through DynHelpers in the same process invalidate their items, other writes are only seen once they expire.
+class ItemCache:
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        self._tables: Dict[str, _TableConfig] = {}
+        # Key attribute names seen for each table, so a written item can be matched to its cached key
+        self._key_names: Dict[str, Set[FrozenSet[str]]] = {}
+        self._entries: "OrderedDict[CacheKey, _CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._negative_hits = 0
+        self._evictions = self._expirations = self._invalidations = 0
+
+    def enable(
+        self,
+        table_name: str,
+        ttl_seconds: float,
+        negative_ttl_seconds: Optional[float] = None,
+    ) -> None:
+        self._tables[table_name] = _TableConfig(
+            ttl_seconds,
+            ttl_seconds if negative_ttl_seconds is None else negative_ttl_seconds,
+        )
+
+    def disable(self, table_name: str) -> None:
+        self._tables.pop(table_name, None)
+        self.invalidate_table(table_name)
+
+    def is_enabled(self, table_name: str) -> bool:
+        return table_name in self._tables
+
+    # Returns whether the key is cached, and a copy of its item, which is None for a key cached as missing
+    def get(self, table_name: str, key: Dict[str, Any]) -> Tuple[bool, Any]:
+        cache_key = self._get_cache_key(table_name, key)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                del self._entries[cache_key]
+                self._expirations += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return False, None
+
+            self._entries.move_to_end(cache_key)
+            self._hits += 1
+            if entry.item is None:
+                self._negative_hits += 1
+                return True, None
+        return True, copy.deepcopy(entry.item)
+
+    # Caches the item read for key, or None when the key wasn't found
+    def put(
+        self, table_name: str, key: Dict[str, Any], item: Optional[Dict[str, Any]]
+    ) -> None:
+        config = self._tables.get(table_name)
+        if config is None:
+            return
+        ttl_seconds = (
+            config.ttl_seconds if item is not None else config.negative_ttl_seconds
+        )
+        if ttl_seconds <= 0:
+            return
+
+        cache_key = self._get_cache_key(table_name, key)
+        with self._lock:
+            self._key_names.setdefault(table_name, set()).add(frozenset(key))
+            self._entries[cache_key] = _CacheEntry(
+                copy.deepcopy(item), time.monotonic() + ttl_seconds
+            )
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    # Returns the cached items of keys, and the keys that have to be read
+    def get_many(
+        self, table_name: str, keys: List[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        items = []
+        misses = []
+        for key in keys:
+            cached, item = self.get(table_name, key)
+            if not cached:
+                misses.append(key)
+            elif item is not None:
+                items.append(item)
+        return items, misses
+
+    # Caches the items read for keys, and the keys without an item as missing, except the unprocessed ones
+    def put_many(
+        self,
+        table_name: str,
+        keys: List[Dict[str, Any]],
+        items: List[Dict[str, Any]],
+        unprocessed_keys: List[Dict[str, Any]],
+    ) -> None:
+        if not keys:
+            return
+        key_names = list(keys[0])
+        items_by_key = {
+            self._get_cache_key(
+                table_name, {name: item[name] for name in key_names}
+            ): item
+            for item in items
+        }
+        unprocessed = {self._get_cache_key(table_name, key) for key in unprocessed_keys}
+        for key in keys:
+            cache_key = self._get_cache_key(table_name, key)
+            if cache_key not in unprocessed:
+                self.put(table_name, key, items_by_key.get(cache_key))
+
+    # Drops the cached item with the key attributes of item, which can be a key or a whole item
+    def invalidate(self, table_name: str, item: Dict[str, Any]) -> None:
+        with self._lock:
+            for key_names in self._key_names.get(table_name, ()):
+                if not key_names.issubset(item):
+                    continue
+                cache_key = self._get_cache_key(
+                    table_name, {name: item[name] for name in key_names}
+                )
+                if self._entries.pop(cache_key, None) is not None:
+                    self._invalidations += 1
+
+    def invalidate_table(self, table_name: str) -> None:
+        with self._lock:
+            for cache_key in [key for key in self._entries if key[0] == table_name]:
+                del self._entries[cache_key]
+                self._invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def stats(self) -> ItemCacheStats:
+        return ItemCacheStats(
+            hits=self._hits,
+            misses=self._misses,
+            negative_hits=self._negative_hits,
+            evictions=self._evictions,
+            expirations=self._expirations,
+            invalidations=self._invalidations,
+            size=len(self._entries),
+        )
+
+    @staticmethod
+    def _get_cache_key(table_name: str, key: Dict[str, Any]) -> CacheKey:
+        return table_name, tuple(sorted(key.items()))
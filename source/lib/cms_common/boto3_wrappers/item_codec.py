@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# Standard Library
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    List,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    get_args,
+    get_origin,
+)
+
+# Third Party Libraries
+import attrs
+
+# AWS Libraries
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+Model = TypeVar("Model")
+AttributeValue = Dict[str, Any]
+Encoder = Callable[[Any], AttributeValue]
+Decoder = Callable[[AttributeValue], Any]
+
+# Shared by every field the codecs can't specialize, instead of one per item
+_SERIALIZER = TypeSerializer()
+_DESERIALIZER = TypeDeserializer()
+_NULL: AttributeValue = {"NULL": True}
+
+
+def serialize_item(item: Dict[str, Any]) -> Dict[str, AttributeValue]:
+    return {key: _SERIALIZER.serialize(value) for key, value in item.items()}
+
+
+def deserialize_item(item: Dict[str, AttributeValue]) -> Dict[str, Any]:
+    return {key: _DESERIALIZER.deserialize(value) for key, value in item.items()}
+
+
+# Picks the converter of every field once, from its type, instead of dispatching on each value
+class ItemCodec(Generic[Model]):
+    def __init__(self, cls: Type[Model]) -> None:
+        attrs.resolve_types(cls)
+        self.cls = cls
+        self._encoders: List[Tuple[str, Encoder]] = []
+        self._decoders: List[Tuple[str, str, Decoder, bool]] = []
+        for model_field in attrs.fields(cls):
+            self._encoders.append((model_field.name, _get_encoder(model_field.type)))
+            if model_field.init:
+                self._decoders.append(
+                    (
+                        model_field.name,
+                        model_field.alias,
+                        _get_decoder(model_field.type),
+                        model_field.default is attrs.NOTHING,
+                    )
+                )
+
+    def encode(self, obj: Model) -> Dict[str, AttributeValue]:
+        return {name: encode(getattr(obj, name)) for name, encode in self._encoders}
+
+    def decode(self, item: Dict[str, AttributeValue]) -> Model:
+        kwargs = {}
+        for name, alias, decode, required in self._decoders:
+            value = item.get(name)
+            if value is None:
+                if required:
+                    raise TypeError(f"{self.cls.__name__} item has no {name} attribute")
+                continue
+            kwargs[alias] = decode(value)
+        return self.cls(**kwargs)
+
+
+@lru_cache(maxsize=None)
+def get_item_codec(cls: Type[Model]) -> ItemCodec[Model]:
+    return ItemCodec(cls)
+
+
+def _get_encoder(field_type: Any) -> Encoder:
+    origin = get_origin(field_type)
+    if origin is Union:
+        value_type = _get_optional_type(field_type)
+        if value_type is None:
+            return _SERIALIZER.serialize
+        # Optional fields encode None the way TypeSerializer does
+        encode = _get_encoder(value_type)
+        return lambda value: _NULL if value is None else encode(value)
+    if field_type is str:
+        return lambda value: {"S": value}
+    if field_type is bool:
+        return lambda value: {"BOOL": value}
+    if field_type in (int, float):
+        return lambda value: {"N": str(value)}
+    if origin is list and _is_model(*get_args(field_type)):
+        encode = _get_encoder(get_args(field_type)[0])
+        return lambda value: {"L": [encode(element) for element in value]}
+    if _is_model(field_type):
+        # Looked up when called, so a class can contain itself
+        return lambda value: {"M": get_item_codec(field_type).encode(value)}
+    return _SERIALIZER.serialize
+
+
+def _get_decoder(field_type: Any) -> Decoder:
+    origin = get_origin(field_type)
+    if origin is Union:
+        value_type = _get_optional_type(field_type)
+        if value_type is None:
+            return _DESERIALIZER.deserialize
+        decode = _get_decoder(value_type)
+        return lambda value: None if "NULL" in value else decode(value)
+    # Values stored as another type are converted the way cattrs.structure converts them
+    if field_type is str:
+        return (
+            lambda value: value["S"]
+            if "S" in value
+            else str(_DESERIALIZER.deserialize(value))
+        )
+    if field_type is bool:
+        return lambda value: (
+            value["BOOL"] if "BOOL" in value else bool(_DESERIALIZER.deserialize(value))
+        )
+    if field_type in (int, float):
+        return lambda value: field_type(_DESERIALIZER.deserialize(value))
+    if origin is list and _is_model(*get_args(field_type)):
+        decode = _get_decoder(get_args(field_type)[0])
+        return lambda value: [decode(element) for element in value["L"]]
+    if _is_model(field_type):
+        return lambda value: get_item_codec(field_type).decode(value["M"])
+    return _DESERIALIZER.deserialize
+
+
+def _get_optional_type(field_type: Any) -> Any:
+    # The type of an Optional field, or None for a union of several types
+    value_types = [arg for arg in get_args(field_type) if arg is not type(None)]
+    return value_types[0] if len(value_types) == 1 else None
+
+
+def _is_model(field_type: Any = None) -> bool:
+    return isinstance(field_type, type) and attrs.has(field_type)
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# Standard Library
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Generator, List, NamedTuple, Optional, Union
+
+# AWS Libraries
+from aws_lambda_powertools import Logger
+
+logger = Logger()
+
+# Seconds a blocked worker waits before checking whether the reader has stopped
+_PUT_TIMEOUT_SECONDS = 0.1
+
+
+class SegmentStats(NamedTuple):
+    segment: int
+    items: int
+    pages: int
+    consumed_capacity: float
+    elapsed_seconds: float
+
+    @property
+    def items_per_second(self) -> float:
+        return self.items / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+
+class _SegmentDone(NamedTuple):
+    stats: SegmentStats
+
+
+class _SegmentFailed(NamedTuple):
+    error: BaseException
+
+
+# What a worker hands the reader: a page of items, or the outcome of its segment
+_QueuedPage = Union[List[Dict[str, Any]], _SegmentDone, _SegmentFailed]
+
+
+# Each segment is read by a worker with its own Table, blocking once max_buffered_pages wait to be read
+class ParallelScan:
+    def __init__(
+        self,
+        table_name: str,
+        new_table: Callable[[str], Any],
+        total_segments: int = 4,
+        max_buffered_pages: Optional[int] = None,
+        **scan_kwargs: Any,
+    ) -> None:
+        if total_segments < 1:
+            raise ValueError("total_segments must be at least 1")
+        self.table_name = table_name
+        self.new_table = new_table
+        self.total_segments = total_segments
+        self.max_buffered_pages = max_buffered_pages or total_segments * 2
+        self.scan_kwargs = {"ReturnConsumedCapacity": "TOTAL", **scan_kwargs}
+        self.segment_stats: List[SegmentStats] = []
+        self.elapsed_seconds = 0.0
+
+    @property
+    def items(self) -> int:
+        return sum(stats.items for stats in self.segment_stats)
+
+    @property
+    def consumed_capacity(self) -> float:
+        return sum(stats.consumed_capacity for stats in self.segment_stats)
+
+    @property
+    def items_per_second(self) -> float:
+        return self.items / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    def __iter__(self) -> Generator[Dict[str, Any], None, None]:
+        pages: "queue.Queue[_QueuedPage]" = queue.Queue(maxsize=self.max_buffered_pages)
+        stopped = threading.Event()
+        self.segment_stats = []
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.total_segments) as executor:
+            for segment in range(self.total_segments):
+                executor.submit(self._scan_segment, segment, pages, stopped)
+            try:
+                running = self.total_segments
+                while running:
+                    page = pages.get()
+                    if isinstance(page, _SegmentDone):
+                        self.segment_stats.append(page.stats)
+                        running -= 1
+                    elif isinstance(page, _SegmentFailed):
+                        raise page.error
+                    else:
+                        yield from page
+            finally:
+                # Unblocks the workers when the reader stops early or a segment failed
+                stopped.set()
+
+        self.elapsed_seconds = time.perf_counter() - start
+        self.segment_stats.sort(key=lambda stats: stats.segment)
+        logger.info(
+            "Parallel scan of %s finished",
+            self.table_name,
+            extra={
+                "items": self.items,
+                "items_per_second": round(self.items_per_second, 2),
+                "consumed_capacity": self.consumed_capacity,
+                "segments": [
+                    {
+                        **stats._asdict(),
+                        "items_per_second": round(stats.items_per_second, 2),
+                    }
+                    for stats in self.segment_stats
+                ],
+            },
+        )
+
+    def _scan_segment(
+        self, segment: int, pages: "queue.Queue[_QueuedPage]", stopped: threading.Event
+    ) -> None:
+        start = time.perf_counter()
+        scan_kwargs = {
+            **self.scan_kwargs,
+            "Segment": segment,
+            "TotalSegments": self.total_segments,
+        }
+        items = page_count = 0
+        consumed_capacity = 0.0
+        try:
+            table = self.new_table(self.table_name)
+            while not stopped.is_set():
+                response = table.scan(**scan_kwargs)
+                items += len(response.get("Items", []))
+                page_count += 1
+                consumed_capacity += response.get("ConsumedCapacity", {}).get(
+                    "CapacityUnits", 0.0
+                )
+                if response.get("Items") and not self._put(
+                    pages, response["Items"], stopped
+                ):
+                    return
+                if not response.get("LastEvaluatedKey"):
+                    break
+                scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+        except Exception as err:  # pylint: disable=broad-exception-caught
+            self._put(pages, _SegmentFailed(err), stopped)
+            return
+
+        self._put(
+            pages,
+            _SegmentDone(
+                SegmentStats(
+                    segment,
+                    items,
+                    page_count,
+                    consumed_capacity,
+                    time.perf_counter() - start,
+                )
+            ),
+            stopped,
+        )
+
+    @staticmethod
+    def _put(
+        pages: "queue.Queue[_QueuedPage]", page: _QueuedPage, stopped: threading.Event
+    ) -> bool:
+        while not stopped.is_set():
+            try:
+                pages.put(page, timeout=_PUT_TIMEOUT_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
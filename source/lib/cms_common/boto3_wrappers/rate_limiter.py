@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# Standard Library
+import threading
+import time
+from typing import Any, Callable, Optional, TypeVar
+
+# AWS Libraries
+from aws_lambda_powertools import Logger
+from botocore.exceptions import ClientError
+
+logger = Logger()
+
+T = TypeVar("T")
+
+THROTTLING_ERROR_CODES = frozenset(
+    {
+        "LimitExceededException",
+        "ProvisionedThroughputExceededException",
+        "RequestLimitExceeded",
+        "Throttling",
+        "ThrottlingException",
+        "TooManyRequestsException",
+    }
+)
+
+
+def is_throttling_error(err: ClientError) -> bool:
+    return err.response["Error"]["Code"] in THROTTLING_ERROR_CODES
+
+
+# Shared by every worker calling the same API, its rate is halved on throttling and climbs back after
+class AdaptiveTokenBucket:
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        min_rate: float = 1.0,
+        increase_step: Optional[float] = None,
+    ) -> None:
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.increase_step = (
+            increase_step if increase_step is not None else max(1.0, rate / 10)
+        )
+        self.capacity = burst if burst is not None else max(1.0, rate / 10)
+        self.tokens = self.capacity
+        self.throttles = 0
+        self._last_refill = time.monotonic()
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self._last_refill) * self.rate
+        )
+        self._last_refill = now
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def on_success(self) -> None:
+        with self._lock:
+            # A rate's worth of successes per second adds up to increase_step per second
+            self.rate = min(self.max_rate, self.rate + self.increase_step / self.rate)
+
+    def on_throttle(self) -> None:
+        with self._lock:
+            self.throttles += 1
+            now = time.monotonic()
+            # Concurrent workers see the same burst of throttles, so back off once per refill interval
+            if now - self._last_decrease < 1:
+                return
+            self._last_decrease = now
+            self.rate = max(self.min_rate, self.rate / 2)
+            # Drop any saved up burst so the reduced rate takes effect immediately
+            self.tokens = min(self.tokens, 0.0)
+
+    # Calls function once a token is available, backing off and retrying while it is throttled
+    def call(
+        self,
+        function: Callable[..., T],
+        *args: Any,
+        max_attempts: int = 8,
+        **kwargs: Any,
+    ) -> T:
+        for attempt in range(1, max_attempts + 1):
+            self.acquire()
+            try:
+                result = function(*args, **kwargs)
+            except ClientError as err:
+                if not is_throttling_error(err) or attempt == max_attempts:
+                    raise
+                self.on_throttle()
+                logger.info(
+                    "Throttled calling %s, retrying at %s requests per second",
+                    getattr(function, "__name__", function),
+                    round(self.rate, 2),
+                )
+                continue
+
+            self.on_success()
+            return result
+
+        raise RuntimeError("max_attempts must be at least 1")
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# Standard Library
+import threading
+from typing import Any, Dict, List
+from unittest.mock import MagicMock
+
+# Third Party Libraries
+import pytest
+
+# Connected Mobility Solution on AWS
+from .. import batch
+from ..batch import BatchStats, batch_get_items, batch_write_items, chunk
+
+
+# Leaves the last unprocessed_per_request keys or items of every request unprocessed
+class FakeClient:
+    def __init__(self, unprocessed_per_request: int = 0) -> None:
+        self.unprocessed_per_request = unprocessed_per_request
+        self.requests: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def batch_get_item(self, RequestItems: Dict[str, Any], **_: Any) -> Dict[str, Any]:
+        with self._lock:
+            self.requests.append(RequestItems)
+        ((table_name, request),) = RequestItems.items()
+        processed, unprocessed = self._split(request["Keys"])
+        return {
+            "Responses": {
+                table_name: [{**key, "val": {"S": "x"}} for key in processed]
+            },
+            "UnprocessedKeys": (
+                {table_name: {**request, "Keys": unprocessed}} if unprocessed else {}
+            ),
+            "ConsumedCapacity": [{"TableName": table_name, "CapacityUnits": 1.0}],
+        }
+
+    def batch_write_item(
+        self, RequestItems: Dict[str, Any], **_: Any
+    ) -> Dict[str, Any]:
+        with self._lock:
+            self.requests.append(RequestItems)
+        ((table_name, requests),) = RequestItems.items()
+        _, unprocessed = self._split(requests)
+        return {
+            "UnprocessedItems": {table_name: unprocessed} if unprocessed else {},
+            "ConsumedCapacity": [{"TableName": table_name, "CapacityUnits": 2.0}],
+        }
+
+    def _split(self, values: List[Any]) -> Any:
+        index = max(len(values) - self.unprocessed_per_request, 0)
+        return values[:index], values[index:]
+
+
+@pytest.fixture(name="sleep")
+def fixture_sleep(mocker: MagicMock) -> Any:
+    return mocker.patch("time.sleep")
+
+
+def test_chunk() -> None:
+    assert chunk(list(range(5)), 2) == [[0, 1], [2, 3], [4]]
+    assert not chunk([], 2)
+
+
+def test_decorrelated_jitter() -> None:
+    delays = [batch.decorrelated_jitter(1.0) for _ in range(100)]
+    assert all(batch.BASE_DELAY_SECONDS <= delay <= 3.0 for delay in delays)
+    assert batch.decorrelated_jitter(100.0) <= batch.MAX_DELAY_SECONDS
+
+
+def test_batch_get_items_chunks(sleep: MagicMock) -> None:
+    client = FakeClient()
+    keys = [{"id": str(index)} for index in range(250)]
+
+    result = batch_get_items(
+        client, {"table": {"Keys": keys, "ConsistentRead": True}}, max_workers=3
+    )
+
+    assert sorted(len(request["table"]["Keys"]) for request in client.requests) == [
+        50,
+        100,
+        100,
+    ]
+    assert all(request["table"]["ConsistentRead"] for request in client.requests)
+    assert [item["id"] for item in result.items["table"]] == [key["id"] for key in keys]
+    assert not result.unprocessed_keys
+    assert result.stats == BatchStats(
+        3, 3, 0, 250, 0, 3.0, result.stats.elapsed_seconds
+    )
+    sleep.assert_not_called()
+
+
+def test_batch_get_items_retries_unprocessed_keys(sleep: MagicMock) -> None:
+    client = FakeClient(unprocessed_per_request=40)
+    keys = [{"id": str(index)} for index in range(100)]
+
+    result = batch_get_items(client, {"table": {"Keys": keys}})
+
+    # The last 40 keys come back unprocessed from every attempt
+    assert len(result.items["table"]) == 60
+    assert len(result.unprocessed_keys["table"]["Keys"]) == 40
+    assert result.stats.requests == batch.DEFAULT_MAX_ATTEMPTS
+    assert result.stats.retries == batch.DEFAULT_MAX_ATTEMPTS - 1
+    assert result.stats.unprocessed == 40
+    assert sleep.call_count == batch.DEFAULT_MAX_ATTEMPTS - 1
+
+
+def test_batch_write_items(sleep: MagicMock) -> None:
+    client = FakeClient(unprocessed_per_request=5)
+    requests = [{"PutRequest": {"Item": {"id": str(index)}}} for index in range(60)]
+
+    result = batch_write_items(client, "table", requests, max_workers=2)
+
+    # The last 5 items of every chunk come back unprocessed from every attempt
+    assert len(client.requests) == 3 * batch.DEFAULT_MAX_ATTEMPTS
+    assert all(len(request["table"]) <= 25 for request in client.requests)
+    assert result.unprocessed_items == {
+        "table": requests[20:25] + requests[45:50] + requests[55:60]
+    }
+    assert result.stats.chunks == 3
+    assert result.stats.items == 45
+    assert result.stats.unprocessed == 15
+    assert result.stats.consumed_capacity == 2.0 * len(client.requests)
+    assert sleep.called
+
+
+def test_batch_write_items_max_workers() -> None:
+    with pytest.raises(ValueError):
+        batch_write_items(FakeClient(), "table", [{}] * 30, max_workers=0)
@@ -3,7 +3,8 @@
 # SPDX-License-Identifier: Apache-2.0
 
 # Standard Library
-from typing import Any, Dict
+from typing import Any, Dict, List
+from unittest.mock import MagicMock
 
 # Third Party Libraries
 import pytest
@@ -11,9 +12,15 @@ from moto import mock_aws
 
 # AWS Libraries
 import boto3
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
 
 # Connected Mobility Solution on AWS
+from .. import dynamo_crud
+from ..batch import BatchStats, BatchWriteResult, UnprocessedItemsError
 from ..dynamo_crud import DynHelpers
+from ..instrumentation import DynamoCallMetrics
+from ..item_cache import ItemCache
 
 
 @mock_aws
@@ -61,6 +68,20 @@ def test_update_item(dynamodb_table: str) -> None:
     assert item["Item"]["test_val"] == updated_test_val
 
 
+def test_update_item_attribute_names(dynamodb_table: str) -> None:
+    DynHelpers.update_item(
+        dynamodb_table,
+        {"id": "test_id_1"},
+        "SET #name = :name",
+        {":name": "test-name"},
+        expression_attribute_names={"#name": "name"},
+    )
+
+    assert DynHelpers.get_item(dynamodb_table, {"id": "test_id_1"})["name"] == (
+        "test-name"
+    )
+
+
 def test_delete_item(dynamodb_table: str) -> None:
     DynHelpers.get_item(dynamodb_table, {"id": "test_id_1"})
     DynHelpers.delete_item(dynamodb_table, {"id": "test_id_1"})
@@ -80,6 +101,29 @@ def test_dyn_scan(dynamodb_table: str) -> None:
     assert len(list(items)) == 2
 
 
+def test_dyn_parallel_scan(dynamodb_table: str) -> None:
+    scan = DynHelpers.dyn_parallel_scan(
+        dynamodb_table, total_segments=3, ProjectionExpression="id", Limit=1
+    )
+    items = list(scan)
+    assert sorted(item["id"] for item in items) == ["test_id_1", "test_id_2"]
+    assert all(set(item) == {"id"} for item in items)
+    assert [stats.segment for stats in scan.segment_stats] == [0, 1, 2]
+    assert scan.items == 2
+
+
+def test_dyn_scan_page(dynamodb_table: str) -> None:
+    items, last_key = DynHelpers.dyn_scan_page(dynamodb_table, 1)
+    assert len(items) == 1 and last_key == {"id": items[0]["id"]}
+
+    next_items, next_key = DynHelpers.dyn_scan_page(
+        dynamodb_table, 1, last_key, ProjectionExpression="id"
+    )
+    assert next_items[0] == {"id": next_items[0]["id"]}
+    assert next_items[0]["id"] != items[0]["id"]
+    assert next_key is None
+
+
 def test_dyn_batch_write(dynamodb_table: str) -> None:
     items = [
         {
@@ -127,6 +171,160 @@ def test_dyn_batch_delete(dynamodb_table: str) -> None:
     assert len(response[dynamodb_table]) == 0
 
 
+def test_dyn_batch_write_and_get_many(dynamodb_table: str) -> None:
+    ids = [f"bulk_id_{index}" for index in range(130)]
+    result = DynHelpers.dyn_batch_write(
+        dynamodb_table,
+        [{"operation": "PUT", "item": {"id": id_, "test_val": id_}} for id_ in ids],
+        max_workers=3,
+    )
+    assert result.stats.chunks == 6
+    assert result.stats.items == 130
+    assert not result.unprocessed_items
+
+    get_result = DynHelpers.dyn_batch_get_with_stats(
+        {dynamodb_table: {"Keys": [{"id": id_} for id_ in ids + ["test_id_1"]]}}
+    )
+    assert sorted(item["id"] for item in get_result.items[dynamodb_table]) == sorted(
+        ids + ["test_id_1"]
+    )
+    assert get_result.stats.chunks == 2
+    assert get_result.stats.items == 131
+
+    DynHelpers.dyn_batch_write(
+        dynamodb_table, [{"operation": "DELETE", "key": {"id": id_}} for id_ in ids]
+    )
+    assert not DynHelpers.dyn_batch_get(
+        {dynamodb_table: {"Keys": [{"id": id_} for id_ in ids]}}
+    )[dynamodb_table]
+
+
+def test_dyn_batch_write_unprocessed_items(
+    dynamodb_table: str, mocker: MagicMock
+) -> None:
+    unprocessed_items = {dynamodb_table: [{"PutRequest": {"Item": {"id": "test"}}}]}
+    mocker.patch.object(
+        dynamo_crud,
+        "batch_write_items",
+        return_value=BatchWriteResult(
+            unprocessed_items, BatchStats(1, 8, 7, 0, 1, 0.0, 1.0)
+        ),
+    )
+    with pytest.raises(UnprocessedItemsError) as error:
+        DynHelpers.dyn_batch_write(
+            dynamodb_table, [{"operation": "PUT", "item": {"id": "test"}}]
+        )
+    assert error.value.unprocessed_items == unprocessed_items
+
+
+@pytest.fixture(name="item_cache")
+def fixture_item_cache(dynamodb_table: str, mocker: MagicMock) -> ItemCache:
+    item_cache = ItemCache()
+    item_cache.enable(dynamodb_table, ttl_seconds=60)
+    mocker.patch.object(DynHelpers, "item_cache", item_cache)
+    return item_cache
+
+
+def test_get_item_cached(
+    dynamodb_table: str, item_cache: ItemCache, mocker: MagicMock
+) -> None:
+    assert DynHelpers.get_item(dynamodb_table, {"id": "test_id_1"})["test_val"] == (
+        "test_val_1"
+    )
+    with pytest.raises(KeyError):
+        DynHelpers.get_item(dynamodb_table, {"id": "missing"})
+
+    resource_get_item = mocker.spy(DynHelpers.dyn_resource().meta.client, "get_item")
+    assert DynHelpers.get_item(dynamodb_table, {"id": "test_id_1"})["test_val"] == (
+        "test_val_1"
+    )
+    with pytest.raises(KeyError):
+        DynHelpers.get_item(dynamodb_table, {"id": "missing"})
+    resource_get_item.assert_not_called()
+    assert item_cache.stats.hits == 2
+
+    DynHelpers.put_item(dynamodb_table, {"id": "missing", "test_val": "found"})
+    DynHelpers.update_item(
+        dynamodb_table,
+        {"id": "test_id_1"},
+        update_expression="SET test_val = :val",
+        expression_attr={":val": "updated"},
+    )
+    assert DynHelpers.get_item(dynamodb_table, {"id": "missing"})["test_val"] == (
+        "found"
+    )
+    assert DynHelpers.get_item(dynamodb_table, {"id": "test_id_1"})["test_val"] == (
+        "updated"
+    )
+
+    DynHelpers.delete_item(dynamodb_table, {"id": "missing"})
+    with pytest.raises(KeyError):
+        DynHelpers.get_item(dynamodb_table, {"id": "missing"})
+
+
+def test_dyn_batch_get_cached(
+    dynamodb_table: str, item_cache: ItemCache, mocker: MagicMock
+) -> None:
+    keys = [{"id": "test_id_1"}, {"id": "test_id_2"}, {"id": "missing"}]
+    DynHelpers.get_item(dynamodb_table, {"id": "test_id_1"})
+    batch_get_items = mocker.spy(dynamo_crud, "batch_get_items")
+
+    result = DynHelpers.dyn_batch_get_with_stats({dynamodb_table: {"Keys": keys}})
+
+    assert sorted(item["id"] for item in result.items[dynamodb_table]) == [
+        "test_id_1",
+        "test_id_2",
+    ]
+    assert batch_get_items.call_args.args[1] == {
+        dynamodb_table: {"Keys": [{"id": "test_id_2"}, {"id": "missing"}]}
+    }
+    assert result.stats.items == 1
+
+    DynHelpers.dyn_batch_write(
+        dynamodb_table,
+        [{"operation": "PUT", "item": {"id": "missing", "test_val": "found"}}],
+    )
+    assert (
+        len(DynHelpers.dyn_batch_get({dynamodb_table: {"Keys": keys}})[dynamodb_table])
+        == 3
+    )
+    assert batch_get_items.call_args.args[1] == {
+        dynamodb_table: {"Keys": [{"id": "missing"}]}
+    }
+
+    # Projections are always read from the table
+    DynHelpers.dyn_batch_get(
+        {dynamodb_table: {"Keys": keys, "ProjectionExpression": "id"}}
+    )
+    assert len(batch_get_items.call_args.args[1][dynamodb_table]["Keys"]) == 3
+
+
+def test_metrics_sink(dynamodb_table: str, mocker: MagicMock) -> None:
+    records: List[DynamoCallMetrics] = []
+    mocker.patch.object(DynHelpers, "metrics_sink", records.append)
+
+    DynHelpers.put_item(dynamodb_table, {"id": "test_id_3", "test_val": "test_val_3"})
+    DynHelpers.get_item(dynamodb_table, {"id": "test_id_3"})
+    DynHelpers.dyn_query(dynamodb_table, Key("id").eq("test_id_3"))
+    assert len(DynHelpers.get_all(table=dynamodb_table)) == 3
+    DynHelpers.dyn_batch_get({dynamodb_table: {"Keys": [{"id": "test_id_1"}]}})
+    with pytest.raises(ClientError):
+        DynHelpers.get_item("missing_table", {"id": "test_id_1"})
+
+    assert [(record.operation, record.table_name) for record in records] == [
+        ("PutItem", dynamodb_table),
+        ("GetItem", dynamodb_table),
+        ("Query", dynamodb_table),
+        ("Scan", dynamodb_table),
+        ("BatchGetItem", dynamodb_table),
+        ("GetItem", "missing_table"),
+    ]
+    assert [record.items for record in records] == [0, 1, 1, 3, 1, 0]
+    assert all(record.requests == 1 for record in records)
+    assert all(record.consumed_capacity > 0 for record in records[:5])
+    assert records[-1].error_code == "ResourceNotFoundException"
+
+
 def test_dyn_query(dynamodb_table: str) -> None:
     response = DynHelpers.dyn_query(
         table_name=dynamodb_table,
@@ -141,3 +339,36 @@ def test_dyn_query(dynamodb_table: str) -> None:
     assert len(response) == 1
     assert response[0]["id"] == "test_id_1"
     assert response[0]["test_val"] == "test_val_1"
+
+
+@mock_aws
+def test_dyn_query_index() -> None:
+    dynamodb = boto3.resource("dynamodb")
+    table = dynamodb.create_table(
+        AttributeDefinitions=[
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "running", "AttributeType": "S"},
+        ],
+        TableName="test_index_table",
+        KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+        GlobalSecondaryIndexes=[
+            {
+                "IndexName": "running-index",
+                "KeySchema": [{"AttributeName": "running", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            }
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    table.put_item(Item={"id": "test_id_1", "running": "running"})
+    table.put_item(Item={"id": "test_id_2"})
+
+    response = DynHelpers.dyn_query(
+        table_name="test_index_table",
+        key_condition_expression="#R = :running",
+        projection_expression="id",
+        expression_attribute_names={"#R": "running"},
+        expression_attribute_values={":running": "running"},
+        index_name="running-index",
+    )
+    assert response == [{"id": "test_id_1"}]
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# Standard Library
+import json
+from typing import List
+
+# Third Party Libraries
+import pytest
+
+# AWS Libraries
+from aws_lambda_powertools import Metrics
+from botocore.exceptions import ClientError
+
+# Connected Mobility Solution on AWS
+from ..instrumentation import DynamoCallMetrics, PowertoolsMetricsSink, record_call
+
+METRICS = DynamoCallMetrics(
+    operation="Query",
+    table_name="test_table",
+    latency_ms=12.5,
+    requests=2,
+    items=150,
+    consumed_capacity=4.5,
+    retries=1,
+    throttles=0,
+    error_code=None,
+)
+
+
+def test_record_call() -> None:
+    records: List[DynamoCallMetrics] = []
+    with record_call(records.append, "Query", "test_table") as call:
+        call.add_response(
+            {
+                "Items": [{}, {}],
+                "ConsumedCapacity": {"TableName": "test_table", "CapacityUnits": 1.5},
+                "ResponseMetadata": {"RetryAttempts": 2},
+            }
+        )
+        call.add_response({"Item": {}, "ConsumedCapacity": {"CapacityUnits": 0.5}})
+
+    assert records[0]._replace(latency_ms=0) == DynamoCallMetrics(
+        "Query", "test_table", 0, 2, 3, 2.0, 2, 0, None
+    )
+    assert records[0].latency_ms >= 0
+
+
+def test_record_call_error() -> None:
+    records: List[DynamoCallMetrics] = []
+    error = ClientError(
+        {
+            "Error": {"Code": "ProvisionedThroughputExceededException"},
+            "ResponseMetadata": {"RetryAttempts": 9},
+        },
+        "GetItem",
+    )
+    with pytest.raises(ClientError):
+        with record_call(records.append, "GetItem", "test_table"):
+            raise error
+
+    assert records[0].error_code == "ProvisionedThroughputExceededException"
+    assert (records[0].requests, records[0].retries, records[0].throttles) == (1, 9, 1)
+
+
+def test_record_call_sink_errors_are_ignored() -> None:
+    def sink(_: DynamoCallMetrics) -> None:
+        raise ValueError("sink")
+
+    with record_call(sink, "GetItem", "test_table") as call:
+        call.add_response({"Item": {}})
+
+
+def test_powertools_metrics_sink(capsys: pytest.CaptureFixture[str]) -> None:
+    metrics = Metrics(namespace="cms/dynamodb", service="test")
+    metrics.set_default_dimensions(environment="test")
+    PowertoolsMetricsSink(metrics)(METRICS._replace(error_code="ThrottlingException"))
+    PowertoolsMetricsSink(metrics)(METRICS._replace(table_name="other_table"))
+
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    metrics.clear_default_dimensions()
+    # Nothing is left for the handler's log_metrics to flush
+    assert not metrics.metric_set
+    directive = records[0]["_aws"]["CloudWatchMetrics"][0]
+    assert directive["Namespace"] == "cms/dynamodb"
+    assert sorted(directive["Dimensions"][0]) == ["TableName", "environment", "service"]
+    assert {"Name": "DynamoDBQueryLatency", "Unit": "Milliseconds"} in directive[
+        "Metrics"
+    ]
+    assert [record["TableName"] for record in records] == [
+        "test_table",
+        "other_table",
+    ]
+    assert records[0]["service"] == "test"
+    assert records[0]["environment"] == "test"
+    assert records[0]["DynamoDBQueryLatency"] == [12.5]
+    assert records[0]["DynamoDBQueryItems"] == [150.0]
+    assert [record["DynamoDBQueryErrors"] for record in records] == [[1.0], [0.0]]
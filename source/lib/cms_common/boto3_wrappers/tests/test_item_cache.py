@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# Standard Library
+from unittest.mock import MagicMock
+
+# Connected Mobility Solution on AWS
+from ..item_cache import ItemCache, ItemCacheStats
+
+ITEM = {"id": "test_id", "value": {"nested": ["a"]}}
+
+
+def test_get_and_put() -> None:
+    cache = ItemCache()
+    cache.enable("table", ttl_seconds=60)
+
+    assert cache.get("table", {"id": "test_id"}) == (False, None)
+    cache.put("table", {"id": "test_id"}, ITEM)
+    cached, item = cache.get("table", {"id": "test_id"})
+
+    assert cached and item == ITEM
+    # Callers get a copy they can modify
+    item["value"]["nested"].append("b")
+    assert cache.get("table", {"id": "test_id"})[1] == ITEM
+    assert cache.stats == ItemCacheStats(2, 1, 0, 0, 0, 0, 1)
+    assert cache.stats.hit_ratio == 2 / 3
+
+
+def test_put_ignores_tables_not_enabled() -> None:
+    cache = ItemCache()
+    cache.put("table", {"id": "test_id"}, ITEM)
+    assert not cache.is_enabled("table")
+    assert cache.stats.size == 0
+
+
+def test_negative_caching() -> None:
+    cache = ItemCache()
+    cache.enable("table", ttl_seconds=60)
+    cache.enable("no_negative", ttl_seconds=60, negative_ttl_seconds=0)
+
+    cache.put("table", {"id": "missing"}, None)
+    cache.put("no_negative", {"id": "missing"}, None)
+
+    assert cache.get("table", {"id": "missing"}) == (True, None)
+    assert cache.get("no_negative", {"id": "missing"}) == (False, None)
+    assert cache.stats.negative_hits == 1
+
+
+def test_expiry(mocker: MagicMock) -> None:
+    monotonic = mocker.patch("time.monotonic", return_value=100.0)
+    cache = ItemCache()
+    cache.enable("table", ttl_seconds=10, negative_ttl_seconds=1)
+    cache.put("table", {"id": "test_id"}, ITEM)
+    cache.put("table", {"id": "missing"}, None)
+
+    monotonic.return_value = 105.0
+    assert cache.get("table", {"id": "test_id"})[0]
+    assert not cache.get("table", {"id": "missing"})[0]
+
+    monotonic.return_value = 110.0
+    assert not cache.get("table", {"id": "test_id"})[0]
+    assert cache.stats.expirations == 2
+    assert cache.stats.size == 0
+
+
+def test_evicts_least_recently_used() -> None:
+    cache = ItemCache(maxsize=2)
+    cache.enable("table", ttl_seconds=60)
+    for index in range(2):
+        cache.put("table", {"id": str(index)}, {"id": str(index)})
+    cache.get("table", {"id": "0"})
+    cache.put("table", {"id": "2"}, {"id": "2"})
+
+    assert cache.get("table", {"id": "0"})[0]
+    assert not cache.get("table", {"id": "1"})[0]
+    assert cache.stats.evictions == 1
+
+
+def test_get_many_and_put_many() -> None:
+    cache = ItemCache()
+    cache.enable("table", ttl_seconds=60)
+    keys = [{"id": "a"}, {"id": "b"}, {"id": "c"}]
+
+    cache.put_many("table", keys, [{"id": "a", "val": 1}], [{"id": "c"}])
+
+    assert cache.get_many("table", keys) == ([{"id": "a", "val": 1}], [{"id": "c"}])
+
+
+def test_invalidate() -> None:
+    cache = ItemCache()
+    cache.enable("table", ttl_seconds=60)
+    cache.enable("other", ttl_seconds=60)
+    cache.put("table", {"pk": "a", "sk": "1"}, {"pk": "a", "sk": "1", "val": 1})
+    cache.put("table", {"pk": "a", "sk": "2"}, None)
+    cache.put("other", {"pk": "a", "sk": "1"}, {"pk": "a", "sk": "1"})
+
+    # A whole item, or just its key
+    cache.invalidate("table", {"pk": "a", "sk": "1", "val": 2})
+    cache.invalidate("table", {"pk": "a", "sk": "2"})
+    cache.invalidate("table", {"pk": "a"})
+
+    assert not cache.get("table", {"pk": "a", "sk": "1"})[0]
+    assert not cache.get("table", {"pk": "a", "sk": "2"})[0]
+    assert cache.get("other", {"pk": "a", "sk": "1"})[0]
+    assert cache.stats.invalidations == 2
+
+    cache.disable("other")
+    assert not cache.is_enabled("other")
+    assert cache.stats.size == 0
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# Standard Library
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+# Third Party Libraries
+import cattrs
+import pytest
+from attrs import define, field
+from attrs.validators import instance_of
+
+# AWS Libraries
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+# Connected Mobility Solution on AWS
+from ..item_codec import ItemCodec, deserialize_item, get_item_codec, serialize_item
+
+
+@define(frozen=True, auto_attribs=True)
+class Signal:
+    name: str = field(validator=[instance_of(str)])
+    period: Optional[int] = field(default=None)
+    threshold: Optional[float] = field(default=None)
+    signals: "Optional[List[Signal]]" = field(default=None)
+
+
+@define(frozen=True, auto_attribs=True)
+class Vehicle:
+    vin: str = field(converter=str.upper, validator=[instance_of(str)])
+    connected: bool = field(validator=[instance_of(bool)])
+    mileage: int
+    signal: Signal
+    attributes: Dict[str, Any] = field(factory=dict)
+
+
+VEHICLE = Vehicle(
+    vin="vin1",
+    connected=True,
+    mileage=1200,
+    signal=Signal(
+        name="speed",
+        period=5,
+        signals=[Signal(name="gear", threshold=0.5)],
+    ),
+    attributes={"color": "blue", "seats": Decimal(5)},
+)
+
+
+def test_encode_matches_type_serializer() -> None:
+    item = ItemCodec(Vehicle).encode(VEHICLE)
+
+    assert item["vin"] == {"S": "VIN1"}
+    assert item["connected"] == {"BOOL": True}
+    assert item["mileage"] == {"N": "1200"}
+    assert item["signal"]["M"]["threshold"] == {"NULL": True}
+    assert item["signal"]["M"]["signals"]["L"][0]["M"]["threshold"] == {"N": "0.5"}
+    assert item["attributes"] == TypeSerializer().serialize(VEHICLE.attributes)
+
+
+def test_decode_round_trip() -> None:
+    codec = ItemCodec(Vehicle)
+    assert codec.decode(codec.encode(VEHICLE)) == VEHICLE
+
+
+def test_decode_matches_cattrs() -> None:
+    item = serialize_item(
+        {"vin": "vin1", "connected": True, "mileage": 12, "signal": {"name": "speed"}}
+    )
+    deserializer = TypeDeserializer()
+    expected = cattrs.structure(
+        {key: deserializer.deserialize(value) for key, value in item.items()}, Vehicle
+    )
+
+    vehicle = ItemCodec(Vehicle).decode(item)
+
+    assert vehicle == expected
+    assert vehicle.vin == "VIN1"
+    assert isinstance(vehicle.mileage, int)
+
+
+def test_decode_converts_stored_types() -> None:
+    vehicle = ItemCodec(Signal).decode(
+        {"name": {"N": "1"}, "period": {"N": "5"}, "threshold": {"N": "2"}}
+    )
+    assert vehicle == Signal(name="1", period=5, threshold=2.0)
+    assert isinstance(vehicle.threshold, float)
+
+
+def test_decode_missing_attribute() -> None:
+    with pytest.raises(TypeError):
+        ItemCodec(Vehicle).decode({"vin": {"S": "vin1"}})
+
+
+def test_get_item_codec_is_cached() -> None:
+    assert get_item_codec(Vehicle) is get_item_codec(Vehicle)
+
+
+def test_serialize_and_deserialize_item() -> None:
+    item = {"id": "test", "count": Decimal(3), "tags": ["a"]}
+    assert serialize_item(item) == {
+        "id": {"S": "test"},
+        "count": {"N": "3"},
+        "tags": {"L": [{"S": "a"}]},
+    }
+    assert deserialize_item(serialize_item(item)) == item
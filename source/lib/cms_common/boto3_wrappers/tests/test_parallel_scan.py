@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# Standard Library
+import threading
+import time
+from typing import Any, Dict, List
+from unittest.mock import MagicMock
+
+# Third Party Libraries
+import pytest
+
+# AWS Libraries
+from botocore.exceptions import ClientError
+
+# Connected Mobility Solution on AWS
+from ..parallel_scan import ParallelScan, SegmentStats
+
+
+# Serves pages_per_segment pages of page_size items to every segment
+class FakeTable:
+    def __init__(self, pages_per_segment: int = 3, page_size: int = 2) -> None:
+        self.pages_per_segment = pages_per_segment
+        self.page_size = page_size
+        self.calls: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def scan(self, **kwargs: Any) -> Dict[str, Any]:
+        with self._lock:
+            self.calls.append(kwargs)
+        page = kwargs.get("ExclusiveStartKey", {}).get("page", 0)
+        response: Dict[str, Any] = {
+            "Items": [
+                {"id": f"{kwargs['Segment']}-{page}-{index}"}
+                for index in range(self.page_size)
+            ],
+            "ConsumedCapacity": {"CapacityUnits": 0.5},
+        }
+        if page + 1 < self.pages_per_segment:
+            response["LastEvaluatedKey"] = {"page": page + 1}
+        return response
+
+
+def test_parallel_scan() -> None:
+    table = FakeTable()
+    new_table = MagicMock(return_value=table)
+    scan = ParallelScan(
+        "fake_table", new_table, total_segments=4, ProjectionExpression="id"
+    )
+
+    items = list(scan)
+
+    # Every worker reads through a Table of its own
+    assert new_table.call_count == 4
+    new_table.assert_called_with("fake_table")
+    assert len(items) == len({item["id"] for item in items}) == 4 * 3 * 2
+    assert all(call["ProjectionExpression"] == "id" for call in table.calls)
+    assert {call["TotalSegments"] for call in table.calls} == {4}
+    assert scan.segment_stats == [
+        SegmentStats(segment, 6, 3, 1.5, stats.elapsed_seconds)
+        for segment, stats in enumerate(scan.segment_stats)
+    ]
+    assert scan.items == 24
+    assert scan.consumed_capacity == 6.0
+    assert scan.items_per_second > 0
+
+
+def test_parallel_scan_is_bounded() -> None:
+    table = FakeTable(pages_per_segment=50)
+    scan = iter(
+        ParallelScan(
+            "fake_table", lambda _: table, total_segments=2, max_buffered_pages=2
+        )
+    )
+
+    next(scan)
+    time.sleep(0.2)
+    # One page is being read, a full buffer waits and each worker holds the page it could not queue
+    assert len(table.calls) <= 1 + 2 + 2
+
+    # Closing the scan early stops the workers
+    scan.close()  # type: ignore[attr-defined]
+    served = len(table.calls)
+    time.sleep(0.2)
+    assert len(table.calls) == served
+
+
+def test_parallel_scan_error() -> None:
+    table = FakeTable()
+    error = ClientError(
+        {"Error": {"Code": "ResourceNotFoundException", "Message": "missing"}}, "Scan"
+    )
+
+    def scan(**kwargs: Any) -> Dict[str, Any]:
+        raise error
+
+    table.scan = scan  # type: ignore[method-assign]
+
+    with pytest.raises(ClientError, match="missing"):
+        list(ParallelScan("fake_table", lambda _: table, total_segments=2))
+
+
+def test_parallel_scan_invalid_segments() -> None:
+    with pytest.raises(ValueError, match="total_segments"):
+        ParallelScan("fake_table", lambda _: FakeTable(), total_segments=0)
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# Standard Library
+import time
+from unittest.mock import MagicMock
+
+# Third Party Libraries
+import pytest
+
+# AWS Libraries
+from botocore.exceptions import ClientError
+
+# Connected Mobility Solution on AWS
+from ..rate_limiter import AdaptiveTokenBucket, is_throttling_error
+
+
+def get_client_error(code: str) -> ClientError:
+    return ClientError({"Error": {"Code": code, "Message": "test"}}, "TestOperation")
+
+
+def test_is_throttling_error() -> None:
+    assert is_throttling_error(get_client_error("ThrottlingException"))
+    assert not is_throttling_error(get_client_error("ResourceNotFoundException"))
+
+
+def test_acquire_limits_rate() -> None:
+    bucket = AdaptiveTokenBucket(rate=50, burst=1)
+
+    start = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+
+    assert time.monotonic() - start >= 0.09
+
+
+def test_on_throttle_and_on_success(mocker: MagicMock) -> None:
+    mocked_monotonic: MagicMock = mocker.patch(
+        "cms_common.boto3_wrappers.rate_limiter.time.monotonic", return_value=10.0
+    )
+    bucket = AdaptiveTokenBucket(rate=10, min_rate=4, increase_step=1)
+
+    bucket.on_throttle()
+    assert bucket.rate == 5
+    # Throttles within the same second only back off once
+    bucket.on_throttle()
+    assert bucket.rate == 5
+    mocked_monotonic.return_value = 11.0
+    bucket.on_throttle()
+    assert bucket.rate == 4
+    assert bucket.throttles == 3
+
+    for _ in range(100):
+        bucket.on_success()
+    assert bucket.rate == 10
+
+
+def test_call_retries_throttled_calls() -> None:
+    bucket = AdaptiveTokenBucket(rate=1000)
+    function = MagicMock(
+        side_effect=[get_client_error("ThrottlingException"), "result"]
+    )
+
+    assert bucket.call(function, "arg", key="value") == "result"
+    assert function.call_count == 2
+    assert bucket.throttles == 1
+
+
+def test_call_raises_other_errors() -> None:
+    bucket = AdaptiveTokenBucket(rate=1000)
+    function = MagicMock(side_effect=get_client_error("ResourceNotFoundException"))
+
+    with pytest.raises(ClientError):
+        bucket.call(function)
+    function.assert_called_once()
+
+
+def test_call_gives_up_after_max_attempts() -> None:
+    bucket = AdaptiveTokenBucket(rate=1000)
+    function = MagicMock(side_effect=get_client_error("ThrottlingException"))
+
+    with pytest.raises(ClientError):
+        bucket.call(function, max_attempts=3)
+    assert function.call_count == 3
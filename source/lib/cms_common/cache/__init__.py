@@ -3,4 +3,9 @@
 # SPDX-License-Identifier: Apache-2.0
 
 # Connected Mobility Solution on AWS
-from .ttl_cache import get_ttl_cache_check
+from .ttl_cache import (
+    TEN_MINUTES_IN_SECONDS,
+    TTLCachedFunction,
+    TTLCacheInfo,
+    ttl_lru_cache,
+)
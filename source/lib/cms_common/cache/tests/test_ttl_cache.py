@@ -3,20 +3,165 @@
 # SPDX-License-Identifier: Apache-2.0
 
 # Standard Library
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from time import sleep
+from unittest.mock import MagicMock
+
+# Third Party Libraries
+import pytest
 
 # Connected Mobility Solution on AWS
-from ..ttl_cache import get_ttl_cache_check
+from ..ttl_cache import TTLCacheInfo, ttl_lru_cache
+
+
+def test_ttl_lru_cache_hit_and_expiry(mocker: MagicMock) -> None:
+    monotonic = mocker.patch("time.monotonic", return_value=100.0)
+    loader = MagicMock(side_effect=lambda value: value * 2)
+    cached = ttl_lru_cache(ttl_seconds=10, jitter=0)(loader)
+
+    assert cached(1) == cached(1) == 2
+    monotonic.return_value = 109.9
+    assert cached(1) == 2
+    assert loader.call_count == 1
+
+    monotonic.return_value = 110.0
+    assert cached(1) == 2
+    assert loader.call_count == 2
+    assert cached.cache_info() == TTLCacheInfo(
+        hits=2,
+        misses=2,
+        stale_hits=0,
+        loads=2,
+        load_errors=0,
+        evictions=0,
+        maxsize=128,
+        currsize=1,
+    )
+
+
+def test_ttl_lru_cache_jitter(mocker: MagicMock) -> None:
+    mocker.patch("random.uniform", return_value=0.5)
+    monotonic = mocker.patch("time.monotonic", return_value=0.0)
+    loader = MagicMock(return_value="value")
+    cached = ttl_lru_cache(ttl_seconds=10, jitter=0.5)(loader)
+
+    cached()
+    monotonic.return_value = 5.0
+    cached()
+
+    assert loader.call_count == 2
+
+
+def test_ttl_lru_cache_evicts_least_recently_used() -> None:
+    loader = MagicMock(side_effect=lambda value: value)
+    cached = ttl_lru_cache(maxsize=2)(loader)
+
+    cached(1)
+    cached(2)
+    cached(1)
+    cached(3)
+    cached(1)
+    cached(2)
+
+    assert loader.call_count == 4
+    assert cached.cache_info().evictions == 2
+
+
+def test_ttl_lru_cache_does_not_cache_errors() -> None:
+    loader = MagicMock(side_effect=[ValueError("load"), "value"])
+    cached = ttl_lru_cache()(loader)
+
+    with pytest.raises(ValueError):
+        cached()
+
+    assert cached() == "value"
+    assert cached.cache_info().load_errors == 1
+
+
+def test_ttl_lru_cache_stale_while_revalidate(mocker: MagicMock) -> None:
+    monotonic = mocker.patch("time.monotonic", return_value=0.0)
+    started = threading.Event()
+    release = threading.Event()
+    values = iter(["first", "second"])
+
+    def load() -> str:
+        value = next(values)
+        if value == "second":
+            started.set()
+            release.wait(timeout=5)
+        return value
+
+    cached = ttl_lru_cache(ttl_seconds=10, jitter=0, stale_seconds=5)(load)
+    assert cached() == "first"
+
+    monotonic.return_value = 12.0
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        # The caller that finds the result expired loads it again itself
+        refresh = executor.submit(cached)
+        started.wait(timeout=5)
+        # While the others get the stale one without waiting
+        assert cached() == "first"
+        release.set()
+        assert refresh.result() == "second"
+
+    assert cached() == "second"
+    assert cached.cache_info().stale_hits == 2
+    assert cached.cache_info().loads == 2
+
+
+def test_ttl_lru_cache_keeps_stale_result_when_refresh_fails(
+    mocker: MagicMock,
+) -> None:
+    monotonic = mocker.patch("time.monotonic", return_value=0.0)
+    loader = MagicMock(side_effect=["first", ValueError("load"), "second"])
+    cached = ttl_lru_cache(ttl_seconds=10, jitter=0, stale_seconds=5)(loader)
+    cached()
+
+    monotonic.return_value = 12.0
+    assert cached() == "first"
+    assert cached.cache_info().load_errors == 1
+    assert cached() == "second"
+
+    # Past stale_seconds, the error is raised
+    loader.side_effect = ValueError("load")
+    monotonic.return_value = 30.0
+    with pytest.raises(ValueError):
+        cached()
+
+
+def test_ttl_lru_cache_single_flight() -> None:
+    started = threading.Event()
+    release = threading.Event()
+    loader = MagicMock()
+
+    def load(value: int) -> int:
+        loader(value)
+        started.set()
+        release.wait(timeout=5)
+        return value
+
+    cached = ttl_lru_cache()(load)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        first = executor.submit(cached, 1)
+        started.wait(timeout=5)
+        others = [executor.submit(cached, 1) for _ in range(3)]
+        sleep(0.05)
+        release.set()
+        results = [future.result() for future in [first, *others]]
+
+    assert results == [1, 1, 1, 1]
+    loader.assert_called_once_with(1)
 
 
-def test_get_ttl_cache_check_hit() -> None:
-    ttl_cache_check_one = get_ttl_cache_check(ttl_in_seconds=5)
-    ttl_cache_check_two = get_ttl_cache_check(ttl_in_seconds=5)
-    assert ttl_cache_check_two - ttl_cache_check_one == 0
+def test_ttl_lru_cache_clear() -> None:
+    loader = MagicMock(return_value="value")
+    cached = ttl_lru_cache()(loader)
+    cached()
 
+    cached.cache_clear()
+    cached()
 
-def test_get_ttl_cache_check_miss() -> None:
-    ttl_cache_check_one = get_ttl_cache_check(ttl_in_seconds=2)
-    sleep(2)
-    ttl_cache_check_two = get_ttl_cache_check(ttl_in_seconds=2)
-    assert ttl_cache_check_two - ttl_cache_check_one == 1
+    assert loader.call_count == 2
+    assert cached.cache_info().misses == 1
+    assert cached.__wrapped__ is loader
@@ -3,10 +3,181 @@
 # SPDX-License-Identifier: Apache-2.0
 
 # Standard Library
+import random
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from functools import update_wrapper
+from typing import Any, Callable, Dict, Generic, NamedTuple, Tuple, TypeVar
+
+# AWS Libraries
+from aws_lambda_powertools import Logger
+
+logger = Logger()
+
+T = TypeVar("T")
 
 TEN_MINUTES_IN_SECONDS = 600
+DEFAULT_MAX_SIZE = 128
+DEFAULT_JITTER = 0.1
+
+
+class TTLCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    stale_hits: int
+    loads: int
+    load_errors: int
+    evictions: int
+    maxsize: int
+    currsize: int
+
+
+class _CacheEntry(NamedTuple):
+    value: Any
+    fresh_until: float
+    stale_until: float
+
+
+# Like lru_cache, with results expiring after a jittered ttl_seconds and kept as a fallback for stale_seconds
+class TTLCachedFunction(Generic[T]):
+    def __init__(
+        self,
+        function: Callable[..., T],
+        ttl_seconds: float,
+        maxsize: int,
+        jitter: float,
+        stale_seconds: float,
+    ) -> None:
+        if ttl_seconds <= 0 or maxsize < 1 or not 0 <= jitter < 1:
+            raise ValueError(
+                "ttl_seconds and maxsize must be positive, and jitter at least 0 and below 1"
+            )
+        update_wrapper(self, function)
+        self.function = function
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self.jitter = jitter
+        self.stale_seconds = stale_seconds
+        self._entries: "OrderedDict[Any, _CacheEntry]" = OrderedDict()
+        self._loading: Dict[Any, "Future[T]"] = {}
+        self._lock = threading.Lock()
+        self._reset_stats()
+
+    def __call__(self, *args: Any, **kwargs: Any) -> T:
+        key = _make_key(args, kwargs)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now >= entry.stale_until:
+                entry = None
+            if entry is None:
+                self._misses += 1
+            else:
+                self._entries.move_to_end(key)
+                if now < entry.fresh_until:
+                    self._hits += 1
+                    return entry.value  # type: ignore[no-any-return]
+                self._stale_hits += 1
+
+            loading = self._loading.get(key)
+            if loading is None:
+                future = self._loading[key] = Future()
+            elif entry is not None:
+                return entry.value  # type: ignore[no-any-return]
+        if loading is not None:
+            return loading.result()
+        if entry is None:
+            return self._load(key, future, args, kwargs)
+
+        # Refreshed in the caller's thread, inside its trace segment, where the Lambda can't freeze it halfway
+        try:
+            return self._load(key, future, args, kwargs)
+        except Exception:  # pylint: disable=broad-exception-caught
+            logger.warning(
+                "Couldn't refresh the cached result of %s, keeping the stale one",
+                getattr(self.function, "__qualname__", self.function),
+                exc_info=True,
+            )
+            return entry.value  # type: ignore[no-any-return]
+
+    def cache_info(self) -> TTLCacheInfo:
+        with self._lock:
+            return TTLCacheInfo(
+                hits=self._hits,
+                misses=self._misses,
+                stale_hits=self._stale_hits,
+                loads=self._loads,
+                load_errors=self._load_errors,
+                evictions=self._evictions,
+                maxsize=self.maxsize,
+                currsize=len(self._entries),
+            )
+
+    def cache_clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._reset_stats()
+
+    def _load(
+        self,
+        key: Any,
+        future: "Future[T]",
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+    ) -> T:
+        try:
+            value = self.function(*args, **kwargs)
+            with self._lock:
+                self._loads += 1
+                self._store(key, value)
+            future.set_result(value)
+            return value
+        except BaseException as err:
+            with self._lock:
+                self._load_errors += 1
+            future.set_exception(err)
+            raise
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+
+    def _store(self, key: Any, value: T) -> None:
+        now = time.monotonic()
+        ttl_seconds = self.ttl_seconds * (1 - random.uniform(0, self.jitter))
+        self._entries[key] = _CacheEntry(
+            value, now + ttl_seconds, now + ttl_seconds + self.stale_seconds
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def _reset_stats(self) -> None:
+        self._hits = self._misses = self._stale_hits = 0
+        self._loads = self._load_errors = self._evictions = 0
+
+
+# For values such as SSM parameters or secrets that can change while a container is warm
+def ttl_lru_cache(
+    ttl_seconds: float = TEN_MINUTES_IN_SECONDS,
+    maxsize: int = DEFAULT_MAX_SIZE,
+    jitter: float = DEFAULT_JITTER,
+    stale_seconds: float = 0,
+) -> Callable[[Callable[..., T]], TTLCachedFunction[T]]:
+    def decorator(function: Callable[..., T]) -> TTLCachedFunction[T]:
+        return TTLCachedFunction(
+            function,
+            ttl_seconds=ttl_seconds,
+            maxsize=maxsize,
+            jitter=jitter,
+            stale_seconds=stale_seconds,
+        )
+
+    return decorator
 
 
-def get_ttl_cache_check(ttl_in_seconds: int = TEN_MINUTES_IN_SECONDS) -> int:
-    return round(time.time() / ttl_in_seconds)
+def _make_key(args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Any:
+    # Like lru_cache, f(1, b=2) and f(a=1, b=2) are cached separately
+    return args, tuple(sorted(kwargs.items()))
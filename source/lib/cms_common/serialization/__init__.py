@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# Connected Mobility Solution on AWS
+from .compact_codec import (
+    COMPACT_ENCODING,
+    CompactDecodeError,
+    FieldSchema,
+    decode_compact,
+    encode_compact,
+    get_field_schema,
+    is_compact,
+)
+from .json_serializer import (
+    JsonSerializer,
+    OrjsonSerializer,
+    StdlibJsonSerializer,
+    decimal_default,
+    dumps,
+    get_serializer,
+    loads,
+    serializer,
+)
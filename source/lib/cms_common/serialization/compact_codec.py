@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# Standard Library
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+try:
+    # Third Party Libraries
+    import cbor2
+except ImportError:  # pragma: no cover
+    cbor2 = None
+
+# Registry of the integer ids of VSS signal paths, generated by deployment/script_generate_models.py
+FIELD_REGISTRY_PATH = Path(__file__).parent / "assets" / "vss_field_ids.json"
+
+# Payload encoding of devices that publish CBOR with integer field ids instead of JSON
+COMPACT_ENCODING = "cbor"
+
+# Leading byte of the CBOR encoding of a two item array, which no JSON document starts with
+_ENVELOPE_HEADER = b"\x82"
+
+FieldKey = Union[int, str]
+
+
+class CompactDecodeError(ValueError):
+    ...
+
+
+# One version of the field registry, paths missing from it are sent as dot separated strings
+class FieldSchema:
+    def __init__(self, version: int, paths: List[str]) -> None:
+        self.version = version
+        self.paths = paths
+        self.ids = {path: field_id for field_id, path in enumerate(paths)}
+        self._keys = [path.split(".") for path in paths]
+
+    def flatten(self, payload: Dict[str, Any]) -> Dict[FieldKey, Any]:
+        fields: Dict[FieldKey, Any] = {}
+        self._flatten_into(fields, payload, "")
+        return fields
+
+    def _flatten_into(
+        self, fields: Dict[FieldKey, Any], payload: Dict[str, Any], prefix: str
+    ) -> None:
+        for key, value in payload.items():
+            path = f"{prefix}{key}"
+            if isinstance(value, dict):
+                self._flatten_into(fields, value, f"{path}.")
+            else:
+                fields[self.ids.get(path, path)] = value
+
+    def expand(self, fields: Dict[FieldKey, Any]) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {}
+        for field_key, value in fields.items():
+            if isinstance(field_key, int) and 0 <= field_key < len(self._keys):
+                keys = self._keys[field_key]
+            elif isinstance(field_key, str):
+                keys = field_key.split(".")
+            else:
+                raise CompactDecodeError(
+                    f"Unknown field {field_key!r} in schema version {self.version}"
+                )
+            parent = payload
+            try:
+                for key in keys[:-1]:
+                    parent = parent.setdefault(key, {})
+                parent[keys[-1]] = value
+            except (AttributeError, TypeError) as e:
+                raise CompactDecodeError(
+                    f"Field {field_key!r} is nested in the value of another field"
+                ) from e
+        return payload
+
+
+@lru_cache(maxsize=1)
+def load_field_registry(
+    path: Path = FIELD_REGISTRY_PATH,
+) -> Dict[int, FieldSchema]:
+    with open(path, encoding="utf-8") as registry_file:
+        registry = json.load(registry_file)
+    return {
+        int(version): FieldSchema(int(version), entry["fields"])
+        for version, entry in registry.items()
+    }
+
+
+def get_field_schema(version: Optional[int] = None) -> FieldSchema:
+    registry = load_field_registry()
+    try:
+        return registry[max(registry) if version is None else version]
+    except KeyError as e:
+        raise CompactDecodeError(f"Unknown schema version {version}") from e
+
+
+# A CBOR array of the schema version and the payload's flattened fields
+def encode_compact(
+    payload: Dict[str, Any], schema: Optional[FieldSchema] = None
+) -> bytes:
+    if cbor2 is None:
+        raise ImportError("cbor2 is not installed")
+    schema = schema or get_field_schema()
+    return bytes(cbor2.dumps([schema.version, schema.flatten(payload)]))
+
+
+def is_compact(data: bytes) -> bool:
+    return data[:1] == _ENVELOPE_HEADER
+
+
+def decode_compact(data: bytes) -> Dict[str, Any]:
+    if cbor2 is None:
+        raise ImportError("cbor2 is not installed")
+    try:
+        envelope: Tuple[Any, ...] = tuple(cbor2.loads(data))
+        version, fields = envelope
+    except (cbor2.CBORDecodeError, TypeError, ValueError) as e:
+        raise CompactDecodeError(f"Invalid compact payload: {e}") from e
+    if not isinstance(version, int) or not isinstance(fields, dict):
+        raise CompactDecodeError("Invalid compact payload envelope")
+    return get_field_schema(version).expand(fields)
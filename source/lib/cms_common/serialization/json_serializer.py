@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# Standard Library
+import json
+import os
+from decimal import Decimal
+from typing import Any, Callable, Optional, Protocol, Union
+
+try:
+    # Third Party Libraries
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+Default = Optional[Callable[[Any], Any]]
+
+# Name of the serializer to use, the fastest one installed when unset
+SERIALIZER_ENV_VAR = "JSON_SERIALIZER"
+
+
+class JsonSerializer(Protocol):
+    name: str
+
+    def dumps(self, obj: Any, default: Default = None) -> str:
+        ...
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        ...
+
+
+class StdlibJsonSerializer:
+    name = "json"
+
+    def dumps(self, obj: Any, default: Default = None) -> str:
+        return json.dumps(obj, default=default, separators=(",", ":"))
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return json.loads(data)
+
+
+# Falls back to json for the few values orjson rejects, such as integers wider than 64 bits
+class OrjsonSerializer:
+    name = "orjson"
+
+    def __init__(self) -> None:
+        if orjson is None:
+            raise ImportError("orjson is not installed")
+        self._fallback = StdlibJsonSerializer()
+
+    def dumps(self, obj: Any, default: Default = None) -> str:
+        try:
+            return str(
+                orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS),
+                "utf-8",
+            )
+        except orjson.JSONEncodeError:
+            return self._fallback.dumps(obj, default=default)
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return orjson.loads(data)
+
+
+def get_serializer(name: Optional[str] = None) -> JsonSerializer:
+    name = name or os.environ.get(SERIALIZER_ENV_VAR)
+    if name == StdlibJsonSerializer.name or (name is None and orjson is None):
+        return StdlibJsonSerializer()
+    return OrjsonSerializer()
+
+
+# Encodes the Decimal numbers of DynamoDB items as JSON numbers instead of failing on them
+def decimal_default(obj: Any) -> Any:
+    if isinstance(obj, Decimal):
+        return (
+            int(obj)
+            if obj.is_finite() and obj == obj.to_integral_value()
+            else float(obj)
+        )
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+serializer = get_serializer()
+
+
+# Compact JSON from the process wide serializer
+def dumps(obj: Any, default: Default = None) -> str:
+    return serializer.dumps(obj, default=default)
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    return serializer.loads(data)
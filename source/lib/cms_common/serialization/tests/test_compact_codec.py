@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# Standard Library
+import json
+from unittest.mock import patch
+
+# Third Party Libraries
+import cbor2
+import pytest
+
+# Connected Mobility Solution on AWS
+from .. import compact_codec
+from ..compact_codec import (
+    CompactDecodeError,
+    FieldSchema,
+    decode_compact,
+    encode_compact,
+    get_field_schema,
+    is_compact,
+    load_field_registry,
+)
+
+PAYLOAD = {
+    "vehicleidentification": {"vin": "test-vin", "brand": "test-brand"},
+    "speed": 42.5,
+    "cabin": {"door": {"row1": {"driverside": {"isopen": True}}}},
+    "custom": {"signal": [1, 2]},
+}
+
+
+def test_field_registry() -> None:
+    schema = get_field_schema()
+    assert schema.version == max(load_field_registry())
+    assert schema.ids["vehicleidentification.vin"] == schema.paths.index(
+        "vehicleidentification.vin"
+    )
+    assert get_field_schema(1).version == 1
+    with pytest.raises(CompactDecodeError, match="Unknown schema version"):
+        get_field_schema(0)
+
+
+def test_compact_round_trip() -> None:
+    encoded = encode_compact(PAYLOAD)
+    assert is_compact(encoded)
+    assert decode_compact(encoded) == PAYLOAD
+    assert len(encoded) < len(json.dumps(PAYLOAD, separators=(",", ":"))) / 2
+
+    version, fields = cbor2.loads(encoded)
+    assert version == get_field_schema().version
+    # Registered signals are sent by id, others keep their path
+    assert fields[get_field_schema().ids["vehicleidentification.vin"]] == "test-vin"
+    assert fields["custom.signal"] == [1, 2]
+
+
+def test_is_compact() -> None:
+    assert not is_compact(json.dumps(PAYLOAD).encode("utf-8"))
+    assert not is_compact(b"")
+
+
+@pytest.mark.parametrize(
+    "data, message",
+    [
+        (b"\x82\xff", "Invalid compact payload"),
+        (cbor2.dumps([1, 2, 3]), "Invalid compact payload"),
+        (cbor2.dumps(["1", {}]), "envelope"),
+        (cbor2.dumps([1, {10**6: True}]), "Unknown field"),
+        (cbor2.dumps([1, {-1: True}]), "Unknown field"),
+        (cbor2.dumps([1, {"a": 1, "a.b": 2}]), "nested"),
+        (cbor2.dumps([0, {}]), "Unknown schema version"),
+    ],
+)
+def test_decode_compact_invalid(data: bytes, message: str) -> None:
+    with pytest.raises(CompactDecodeError, match=message):
+        decode_compact(data)
+
+
+def test_field_schema_versions() -> None:
+    # A later version appends paths, so the ids of an earlier version keep their meaning
+    schema = FieldSchema(2, ["a.b", "a.c", "d"])
+    assert schema.flatten({"a": {"b": 1, "c": 2}, "d": 3}) == {0: 1, 1: 2, 2: 3}
+    assert schema.expand({0: 1, 2: 3}) == {"a": {"b": 1}, "d": 3}
+
+
+def test_cbor2_missing() -> None:
+    with patch.object(compact_codec, "cbor2", None):
+        with pytest.raises(ImportError):
+            encode_compact(PAYLOAD)
+        with pytest.raises(ImportError):
+            decode_compact(b"\x82")
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# Standard Library
+import json
+import os
+from decimal import Decimal
+from unittest.mock import patch
+
+# Third Party Libraries
+import pytest
+
+# Connected Mobility Solution on AWS
+from .. import json_serializer
+from ..json_serializer import (
+    SERIALIZER_ENV_VAR,
+    JsonSerializer,
+    OrjsonSerializer,
+    StdlibJsonSerializer,
+    decimal_default,
+    dumps,
+    get_serializer,
+    loads,
+)
+
+PAYLOAD = {
+    "vin": "test-vin",
+    "speed": 42,
+    "location": {"latitude": 47.6, "longitude": -122.3},
+    "doors": [True, False],
+    "trip": None,
+}
+
+
+@pytest.mark.parametrize(
+    "serializer", [StdlibJsonSerializer(), OrjsonSerializer()], ids=lambda s: s.name
+)
+def test_serializers_round_trip(serializer: JsonSerializer) -> None:
+    encoded = serializer.dumps(PAYLOAD)
+    assert json.loads(encoded) == PAYLOAD
+    assert serializer.loads(encoded) == PAYLOAD
+    # Compact, like the payloads both serializers publish
+    assert ": " not in encoded and ", " not in encoded
+
+
+@pytest.mark.parametrize(
+    "serializer", [StdlibJsonSerializer(), OrjsonSerializer()], ids=lambda s: s.name
+)
+def test_serializers_default(serializer: JsonSerializer) -> None:
+    item = {"amount": Decimal("3"), "ratio": Decimal("0.5")}
+    assert json.loads(serializer.dumps(item, default=str)) == {
+        "amount": "3",
+        "ratio": "0.5",
+    }
+    assert json.loads(serializer.dumps(item, default=decimal_default)) == {
+        "amount": 3,
+        "ratio": 0.5,
+    }
+    with pytest.raises(TypeError):
+        serializer.dumps(item)
+
+
+def test_orjson_serializer_falls_back() -> None:
+    serializer = OrjsonSerializer()
+    # Wider than orjson's 64 bit integers, and keys json turns into strings
+    assert json.loads(serializer.dumps({"big": 2**70, 1: "one"})) == {
+        "big": 2**70,
+        "1": "one",
+    }
+
+
+def test_get_serializer() -> None:
+    assert get_serializer("json").name == "json"
+    assert get_serializer("orjson").name == "orjson"
+    with patch.dict(os.environ, {SERIALIZER_ENV_VAR: "json"}):
+        assert get_serializer().name == "json"
+    with patch.object(json_serializer, "orjson", None):
+        assert get_serializer().name == "json"
+        with pytest.raises(ImportError):
+            OrjsonSerializer()
+
+
+def test_decimal_default() -> None:
+    assert decimal_default(Decimal("10")) == 10
+    assert decimal_default(Decimal("1.25")) == 1.25
+    assert decimal_default(Decimal("Infinity")) == float("inf")
+    with pytest.raises(TypeError, match="set is not JSON serializable"):
+        decimal_default({1})
+
+
+def test_module_functions() -> None:
+    assert loads(dumps(PAYLOAD)) == PAYLOAD
@@ -61,7 +61,7 @@ setup(
         ],
     ),
     cmdclass={"egg_info": CustomDirEggInfo, "build": CustomDirBuild},
-    package_data={"cms_common": ["py.typed"]},
+    package_data={"cms_common": ["py.typed", "serialization/assets/*.json"]},
     author="AWS Industrial Solutions Team",
     python_requires=">=3.12",
     classifiers=[
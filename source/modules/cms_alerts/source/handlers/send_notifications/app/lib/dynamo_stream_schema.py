@@ -10,8 +10,8 @@ from typing import Any, Dict, TypeVar
 from attrs import define, field
 from attrs.validators import instance_of
 
-# AWS Libraries
-from boto3.dynamodb.types import TypeDeserializer
+# CMS Common Library
+from cms_common.boto3_wrappers.item_codec import deserialize_item
 
 
 @define
@@ -33,17 +33,10 @@ class StreamRecord(IDynamoDBItem):
 
 
 def from_ddb_stream_record(record_dict: Dict[str, Any]) -> StreamRecord:
-    deserializer = TypeDeserializer()
     dynamodb_details = record_dict.get("dynamodb", {})
 
-    # Deserialize NewImage
-    new_image = dynamodb_details.get("NewImage")
-    deserialized_new_image = {}
-    for key, value in new_image.items():
-        deserialized_new_image[key] = deserializer.deserialize(value)
-
     return StreamRecord(
         dynamodb=DynamoDBDetails(
-            new_image=deserialized_new_image,
+            new_image=deserialize_item(dynamodb_details.get("NewImage")),
         ),
     )
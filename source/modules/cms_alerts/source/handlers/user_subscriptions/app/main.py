@@ -83,7 +83,7 @@ def update_user_subscriptions(arguments: Dict[str, Any]) -> bool:
     }
 
     # empty updated items list
-    update_batches: List[List[Dict[str, Any]]] = [[]]
+    update_items: List[Dict[str, Any]] = []
 
     for topic_name in new_subscriptions:
         new_subscription = new_subscriptions[topic_name]
@@ -99,22 +99,15 @@ def update_user_subscriptions(arguments: Dict[str, Any]) -> bool:
             email, new_subscription, old_subscription, topic_arn
         )
 
-        # add item to update_batches if item is not None
+        # add item to update_items if item is not None
         if item:
-            # if the last list in update_batche is not at max capacity then
-            if len(update_batches[-1]) < DynHelpers.MAX_ITEM_PER_BATCH_IN_BATCH_WRITE:
-                # append the new item to the last list
-                update_batches[-1].append(item)
-            else:
-                # create a new list and add this item
-                update_batches.append([item])
-
-    # for each list in updated_items we batch write them to dynamodb
-    for batch in update_batches:
-        if len(batch) > 0:
-            DynHelpers.dyn_batch_write(
-                os.environ["USER_EMAIL_SUBSCRIPTIONS_TABLE"], batch
-            )
+            update_items.append(item)
+
+    # dyn_batch_write splits the items into batches and writes them concurrently
+    if update_items:
+        DynHelpers.dyn_batch_write(
+            os.environ["USER_EMAIL_SUBSCRIPTIONS_TABLE"], update_items
+        )
 
     return True
 
@@ -4,7 +4,6 @@
 
 # Standard Library
 import os
-from functools import lru_cache
 from typing import Any, Dict
 
 # Third Party Libraries
@@ -22,7 +21,7 @@ from cms_common.auth.auth_configs import (
     get_idp_config,
     get_user_client_config,
 )
-from cms_common.cache.ttl_cache import get_ttl_cache_check
+from cms_common.cache.ttl_cache import ttl_lru_cache
 
 # Connected Mobility Solution on AWS
 from .lib.custom_exceptions import AuthorizationCodeExchangeError
@@ -31,6 +30,8 @@ tracer = Tracer()
 logger = Logger()
 
 MAX_CACHE_SIZE_CONFIG = 1
+# Configs past their TTL are still used while they reload, for at most this long
+CONFIG_CACHE_STALE_SECONDS = 60
 
 # Usage:
 #   This function exchanged an authorization code for an access token via a user specified /token endpoint, as defined in OAuth standards. It requires
@@ -118,12 +119,11 @@ def handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
 
 
 # ========= GETTERS =========
-@lru_cache(maxsize=MAX_CACHE_SIZE_CONFIG)
+@ttl_lru_cache(maxsize=MAX_CACHE_SIZE_CONFIG, stale_seconds=CONFIG_CACHE_STALE_SECONDS)
 @tracer.capture_method
 def get_cached_user_client_config(
     user_agent_string: str,
     identity_provider_id: str,
-    ttl_cache_check: int = get_ttl_cache_check(),
 ) -> CMSClientConfig:
     return get_user_client_config(
         user_agent_string=user_agent_string,
@@ -131,12 +131,11 @@ def get_cached_user_client_config(
     )
 
 
-@lru_cache(maxsize=MAX_CACHE_SIZE_CONFIG)
+@ttl_lru_cache(maxsize=MAX_CACHE_SIZE_CONFIG, stale_seconds=CONFIG_CACHE_STALE_SECONDS)
 @tracer.capture_method
 def get_cached_idp_config(
     user_agent_string: str,
     identity_provider_id: str,
-    ttl_cache_check: int = get_ttl_cache_check(),
 ) -> CMSIdPConfig:
     return get_idp_config(
         user_agent_string=user_agent_string,
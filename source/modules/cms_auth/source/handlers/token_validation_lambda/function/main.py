@@ -7,7 +7,7 @@ import json
 import os
 import time
 from functools import _lru_cache_wrapper, lru_cache
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Union
 
 # Third Party Libraries
 import jwt
@@ -19,7 +19,7 @@ from aws_lambda_powertools.utilities.typing import LambdaContext
 
 # CMS Common Library
 from cms_common.auth.auth_configs import AuthConfigError, CMSIdPConfig, get_idp_config
-from cms_common.cache.ttl_cache import get_ttl_cache_check
+from cms_common.cache.ttl_cache import TTLCachedFunction, ttl_lru_cache
 
 # Connected Mobility Solution on AWS
 from .lib.custom_exceptions import (
@@ -37,6 +37,8 @@ logger = Logger()
 
 MAX_CACHE_SIZE_CONFIG = 1
 MAX_CACHE_SIZE_TOKENS = 1024
+# Configs past their TTL are still used while they reload, for at most this long
+CONFIG_CACHE_STALE_SECONDS = 60
 
 # Usage:
 #   This function is designed to work with any OAuth 2.0 compliant IdP, and can validate both CMS user and service access tokens.
@@ -139,7 +141,7 @@ def handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
 
 
 def clear_caches() -> None:
-    cached_functions: List[_lru_cache_wrapper[Any]] = [
+    cached_functions: List[Union[_lru_cache_wrapper[Any], TTLCachedFunction[Any]]] = [
         get_cached_idp_config,
         get_cached_token_claims,
         get_cached_issuer_jwks,
@@ -150,12 +152,11 @@ def clear_caches() -> None:
 
 
 # ========= GETTERS =========
-@lru_cache(maxsize=MAX_CACHE_SIZE_CONFIG)
+@ttl_lru_cache(maxsize=MAX_CACHE_SIZE_CONFIG, stale_seconds=CONFIG_CACHE_STALE_SECONDS)
 @tracer.capture_method
 def get_cached_idp_config(
     user_agent_string: str,
     identity_provider_id: str,
-    ttl_cache_check: int = get_ttl_cache_check(),  # Add a TTL to cache in case of SSM or Secrets Manager value changes.
 ) -> CMSIdPConfig:
     return get_idp_config(
         user_agent_string=user_agent_string,
@@ -6,7 +6,7 @@
 import json
 import os
 from functools import _lru_cache_wrapper
-from typing import Any, Dict, Generator, List
+from typing import Any, Dict, Generator, List, Union
 from unittest.mock import patch
 
 # Third Party Libraries
@@ -20,6 +20,7 @@ import boto3
 
 # CMS Common Library
 from cms_common.auth.auth_configs import CMSClientConfig, CMSIdPConfig
+from cms_common.cache.ttl_cache import TTLCachedFunction
 
 # Connected Mobility Solution on AWS
 from ....handlers.authorization_code_exchange_lambda.function import main
@@ -55,7 +56,7 @@ EXPECTED_REQUEST_BODY = {
 # =============== AUTOUSE ===============
 @pytest.fixture(autouse=True)
 def fixture_authorization_code_exchange_clear_lru_caches() -> None:
-    cached_functions: List[_lru_cache_wrapper[Any]] = [
+    cached_functions: List[Union[_lru_cache_wrapper[Any], TTLCachedFunction[Any]]] = [
         main.get_cached_user_client_config,
     ]
     for function in cached_functions:
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# Standard Library
+import base64
+from typing import Any, Dict
+
+# AWS Libraries
+from aws_lambda_powertools import Logger, Tracer
+from aws_lambda_powertools.utilities.typing import LambdaContext
+
+# CMS Common Library
+from cms_common.serialization import (
+    CompactDecodeError,
+    decimal_default,
+    decode_compact,
+    dumps,
+    is_compact,
+)
+
+tracer = Tracer()
+logger = Logger()
+
+
+# Expands compact CBOR payloads back to the JSON documents of the Glue schema
+@logger.inject_lambda_context
+@tracer.capture_lambda_handler
+def handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
+    records = [decode_record(record) for record in event["records"]]
+    logger.info(
+        "decoded records",
+        extra={
+            "records": len(records),
+            "failed": sum(record["result"] != "Ok" for record in records),
+        },
+    )
+    return {"records": records}
+
+
+def decode_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    data = base64.b64decode(record["data"])
+    if not is_compact(data):
+        return {"recordId": record["recordId"], "result": "Ok", "data": record["data"]}
+
+    try:
+        payload = decode_compact(data)
+    except CompactDecodeError:
+        logger.exception("failed to decode record %s", record["recordId"])
+        # Firehose delivers failed records to the error output prefix
+        return {
+            "recordId": record["recordId"],
+            "result": "ProcessingFailed",
+            "data": record["data"],
+        }
+
+    return {
+        "recordId": record["recordId"],
+        "result": "Ok",
+        "data": base64.b64encode(
+            dumps(payload, default=decimal_default).encode("utf-8")
+        ).decode("utf-8"),
+    }
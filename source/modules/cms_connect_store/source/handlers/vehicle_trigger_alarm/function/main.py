@@ -23,7 +23,7 @@ from cms_common.auth.auth_configs import (
     get_idp_config,
     get_service_client_config,
 )
-from cms_common.cache.ttl_cache import get_ttl_cache_check
+from cms_common.cache.ttl_cache import ttl_lru_cache
 
 # Connected Mobility Solution on AWS
 from .lib.custom_exceptions import ClientAuthenticationError, VehicleTriggerAlarmError
@@ -40,6 +40,8 @@ logger = Logger()
 MAX_CACHE_SIZE_CLIENT_AUTH = 1
 MAX_CACHE_SIZE_BOTO_CLIENT = 10
 MAX_CACHE_SIZE_SSM_PARAMETERS = 128
+# Configs past their TTL are still used while they reload, for at most this long
+CONFIG_CACHE_STALE_SECONDS = 60
 
 
 @lru_cache(maxsize=MAX_CACHE_SIZE_BOTO_CLIENT)
@@ -84,12 +86,13 @@ def handler(event: Dict[str, Any], context: LambdaContext) -> None:
     )
 
 
-@lru_cache(maxsize=MAX_CACHE_SIZE_CLIENT_AUTH)
+@ttl_lru_cache(
+    maxsize=MAX_CACHE_SIZE_CLIENT_AUTH, stale_seconds=CONFIG_CACHE_STALE_SECONDS
+)
 @tracer.capture_method
 def get_service_client_config_from_common(
     user_agent_string: str,
     identity_provider_id: str,
-    ttl_cache_check: int = get_ttl_cache_check(),  # Add a TTL to cache in case of SSM or Secrets Manager value changes.
 ) -> CMSClientConfig:
     return get_service_client_config(
         user_agent_string=user_agent_string,
@@ -97,12 +100,13 @@ def get_service_client_config_from_common(
     )
 
 
-@lru_cache(maxsize=MAX_CACHE_SIZE_CLIENT_AUTH)
+@ttl_lru_cache(
+    maxsize=MAX_CACHE_SIZE_CLIENT_AUTH, stale_seconds=CONFIG_CACHE_STALE_SECONDS
+)
 @tracer.capture_method
 def get_idp_config_from_common(
     user_agent_string: str,
     identity_provider_id: str,
-    ttl_cache_check: int = get_ttl_cache_check(),  # Add a TTL to cache in case of SSM or Secrets Manager value changes.
 ) -> CMSIdPConfig:
     return get_idp_config(
         user_agent_string=user_agent_string,
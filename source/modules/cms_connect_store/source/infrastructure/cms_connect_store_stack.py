@@ -26,6 +26,7 @@ from cms_common.constructs.vpc_construct import VpcConstruct
 
 # Connected Mobility Solution on AWS
 from .constructs.alerts_construct import AlertsConstruct
+from .constructs.compact_payload_decoder import CompactPayloadDecoderConstruct
 from .constructs.iot_core_to_s3_json import IoTCoreToS3JsonConstruct
 from .constructs.iot_core_to_s3_parquet import IoTCoreToS3ParquetConstruct
 from .constructs.module_integration import ModuleInputsConstruct, ModuleOutputsConstruct
@@ -157,6 +158,14 @@ class CmsConnectStoreConstruct(Construct):
             solution_config_inputs=solution_config_inputs,
         )
 
+        compact_payload_decoder = CompactPayloadDecoderConstruct(
+            self,
+            "compact-payload-decoder-construct",
+            app_unique_id=module_inputs_construct.app_unique_id,
+            solution_config_inputs=solution_config_inputs,
+            dependency_layer=dependency_layer_construct.dependency_layer,
+        )
+
         iot_core_to_s3_parquet = IoTCoreToS3ParquetConstruct(
             self,
             "iot-core-to-s3-parquet-construct",
@@ -164,6 +173,7 @@ class CmsConnectStoreConstruct(Construct):
             iot_core_query=self.IOT_CORE_DATA_QUERY,
             root_s3_bucket=root_s3.bucket,
             glue_resources=s3_to_glue.glue_resources,
+            payload_decoder_function=compact_payload_decoder.function,
             solution_config_inputs=solution_config_inputs,
         )
         iot_core_to_s3_parquet.node.add_dependency(s3_to_glue)
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# AWS Libraries
+from aws_cdk import Duration, aws_iam, aws_lambda, aws_logs
+from constructs import Construct
+
+# CMS Common Library
+from cms_common.config.resource_names import ResourceName, ResourcePrefix
+from cms_common.config.stack_inputs import SolutionConfigInputs
+from cms_common.policy_generators.cloudwatch import (
+    generate_lambda_cloudwatch_logs_policy_document,
+)
+
+
+class CompactPayloadDecoderConstruct(Construct):
+    def __init__(
+        self,
+        scope: Construct,
+        construct_id: str,
+        app_unique_id: str,
+        solution_config_inputs: SolutionConfigInputs,
+        dependency_layer: aws_lambda.LayerVersion,
+    ) -> None:
+        super().__init__(scope, construct_id)
+
+        compact_payload_decoder_lambda_name = ResourceName.hyphen_separated(
+            prefix=ResourcePrefix.hyphen_separated(
+                app_unique_id=app_unique_id,
+                module_name=solution_config_inputs.module_short_name,
+            ),
+            name="compact-payload-decoder",
+        )
+
+        compact_payload_decoder_lambda_role = aws_iam.Role(
+            self,
+            "lambda-role",
+            assumed_by=aws_iam.ServicePrincipal("lambda.amazonaws.com"),  # NOSONAR
+            path="/",
+            inline_policies={
+                "cloudwatch-logs-policy": generate_lambda_cloudwatch_logs_policy_document(
+                    self, lambda_function_name=compact_payload_decoder_lambda_name
+                ),
+            },
+        )
+
+        # Expands the compact CBOR payloads of devices back to JSON before Firehose converts them to Parquet
+        self.function = aws_lambda.Function(
+            self,
+            "lambda-function",
+            function_name=compact_payload_decoder_lambda_name,
+            code=aws_lambda.Code.from_asset(
+                "deployment/dist/lambda/compact_payload_decoder.zip"
+            ),
+            description="Compact Payload Decoder Function",
+            handler="function.main.handler",
+            runtime=aws_lambda.Runtime.PYTHON_3_12,
+            role=compact_payload_decoder_lambda_role,
+            layers=[dependency_layer],
+            timeout=Duration.minutes(1),
+            environment={
+                "USER_AGENT_STRING": solution_config_inputs.get_user_agent_string(),
+            },
+            log_retention=aws_logs.RetentionDays.THREE_MONTHS,
+        )
@@ -10,6 +10,7 @@ from aws_cdk import (
     aws_iot,
     aws_kinesisfirehose,
     aws_kms,
+    aws_lambda,
     aws_logs,
     aws_s3,
 )
@@ -33,6 +34,7 @@ class IoTCoreToS3ParquetConstruct(Construct):
         iot_core_query: str,
         root_s3_bucket: aws_s3.Bucket,
         glue_resources: GlueResources,
+        payload_decoder_function: aws_lambda.IFunction,
         solution_config_inputs: SolutionConfigInputs,
     ) -> None:
         super().__init__(scope, construct_id)
@@ -123,6 +125,18 @@ class IoTCoreToS3ParquetConstruct(Construct):
                         ),
                     ],
                 ),
+                "lambda-policy": aws_iam.PolicyDocument(
+                    statements=[
+                        aws_iam.PolicyStatement(
+                            effect=aws_iam.Effect.ALLOW,
+                            actions=[
+                                "lambda:InvokeFunction",
+                                "lambda:GetFunctionConfiguration",
+                            ],
+                            resources=[payload_decoder_function.function_arn],
+                        )
+                    ],
+                ),
                 "s3-policy": aws_iam.PolicyDocument(
                     statements=[
                         aws_iam.PolicyStatement(
@@ -215,6 +229,16 @@ class IoTCoreToS3ParquetConstruct(Construct):
                 processing_configuration=aws_kinesisfirehose.CfnDeliveryStream.ProcessingConfigurationProperty(
                     enabled=True,
                     processors=[
+                        # Expand compact payloads to JSON before the partition key is extracted from them.
+                        aws_kinesisfirehose.CfnDeliveryStream.ProcessorProperty(
+                            type="Lambda",
+                            parameters=[
+                                aws_kinesisfirehose.CfnDeliveryStream.ProcessorParameterProperty(
+                                    parameter_name="LambdaArn",
+                                    parameter_value=payload_decoder_function.function_arn,
+                                ),
+                            ],
+                        ),
                         aws_kinesisfirehose.CfnDeliveryStream.ProcessorProperty(
                             type="MetadataExtraction",
                             parameters=[
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+# Standard Library
+import base64
+import json
+from decimal import Decimal
+from typing import Any, Dict
+
+# AWS Libraries
+from aws_lambda_powertools.utilities.typing import LambdaContext
+
+# CMS Common Library
+from cms_common.serialization import encode_compact
+
+# Connected Mobility Solution on AWS
+from ....handlers.compact_payload_decoder.function.main import handler
+
+PAYLOAD = {
+    "vehicleidentification": {"vin": "test-vin"},
+    "speed": 42.5,
+    "powertrain": {"range": Decimal("350")},
+}
+
+
+def get_record(record_id: str, data: bytes) -> Dict[str, Any]:
+    return {"recordId": record_id, "data": base64.b64encode(data).decode("utf-8")}
+
+
+def test_compact_payload_decoder_handler(context: LambdaContext) -> None:
+    json_payload = json.dumps({"vehicleidentification": {"vin": "json-vin"}}).encode()
+    event = {
+        "records": [
+            get_record("compact", encode_compact(PAYLOAD)),
+            get_record("json", json_payload),
+            get_record("invalid", b"\x82\xff"),
+        ]
+    }
+
+    records = {
+        record["recordId"]: record for record in handler(event, context)["records"]
+    }
+
+    assert records["compact"]["result"] == "Ok"
+    assert json.loads(base64.b64decode(records["compact"]["data"])) == {
+        "vehicleidentification": {"vin": "test-vin"},
+        "speed": 42.5,
+        "powertrain": {"range": 350},
+    }
+    assert records["json"] == {**event["records"][1], "result": "Ok"}
+    assert records["invalid"]["result"] == "ProcessingFailed"
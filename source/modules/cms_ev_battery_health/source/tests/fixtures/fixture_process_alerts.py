@@ -6,7 +6,7 @@
 import json
 import os
 from functools import _lru_cache_wrapper
-from typing import Any, Dict, Generator, List
+from typing import Any, Dict, Generator, List, Union
 from unittest.mock import patch
 
 # Third Party Libraries
@@ -18,6 +18,7 @@ import boto3
 
 # CMS Common Library
 from cms_common.auth.auth_configs import CMSClientConfig, CMSIdPConfig
+from cms_common.cache.ttl_cache import TTLCachedFunction
 from cms_common.resource_names.auth import AuthSetupResourceNames
 
 # Connected Mobility Solution on AWS
@@ -32,7 +33,7 @@ TEST_AUTH_SETUP_RESOURCE_NAMES_CLASS = AuthSetupResourceNames.from_identity_prov
 
 @pytest.fixture(autouse=True)
 def fixture_process_alerts_clear_lru_caches() -> None:
-    cached_functions: List[_lru_cache_wrapper[Any]] = [
+    cached_functions: List[Union[_lru_cache_wrapper[Any], TTLCachedFunction[Any]]] = [
         main.get_service_client_config_from_common,
         main.get_idp_config_from_common,
         main.get_access_token,
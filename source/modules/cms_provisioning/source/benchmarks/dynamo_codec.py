@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# Standard Library
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+)
+
+# Third Party Libraries
+import cattrs
+from attrs import asdict, fields
+
+# AWS Libraries
+import boto3
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from botocore.awsrequest import AWSResponse
+
+# Connected Mobility Solution on AWS
+from ..handlers.provisioning.function.lib.dynamo_schema import (
+    ProvisionedVehicle,
+    from_ddb_item,
+    to_ddb_item,
+)
+
+TABLE_NAME = "benchmark-provisioned-vehicles"
+REGION_NAME = "us-east-1"
+# Requests are signed before the stubbed response replaces them
+STUB_CREDENTIALS = {"aws_access_key_id": "testing", "aws_secret_access_key": "testing"}
+# What each path runs in a new interpreter, from imports to a ready client or resource
+COLD_START_SNIPPETS = {
+    "client": "from cms_common.boto3_wrappers.dynamo_crud import DynHelpers; DynHelpers.dyn_client()",
+    "resource": "from cms_common.boto3_wrappers.dynamo_crud import DynHelpers; DynHelpers.dyn_resource()",
+}
+
+
+class BenchmarkConfig(NamedTuple):
+    items: int = 5000
+    page_size: int = 100
+    pages: int = 20
+    cold_starts: int = 5
+    repeats: int = 3
+
+
+def get_provisioned_vehicle(index: int) -> ProvisionedVehicle:
+    return ProvisionedVehicle(
+        vin=f"VIN{index:014d}",
+        certificate_id=f"{index:064x}",
+        make="Amazon",
+        model="Model",
+        year="2024",
+        region=REGION_NAME,
+        thing_name=f"Vehicle_VIN{index:014d}",
+        certificate_status="ACTIVE",
+        has_vehicle_connected_once=bool(index % 2),
+    )
+
+
+def legacy_from_ddb_item(ddb_item: Dict[str, Any]) -> ProvisionedVehicle:
+    deserializer = TypeDeserializer()
+    return cattrs.structure(
+        {
+            data_field.name: deserializer.deserialize(ddb_item.get(data_field.name))
+            for data_field in fields(ProvisionedVehicle)
+        },
+        ProvisionedVehicle,
+    )
+
+
+def legacy_to_ddb_item(obj: ProvisionedVehicle) -> Dict[str, Any]:
+    ddb_item: Dict[str, Any] = TypeSerializer().serialize(asdict(obj))["M"]
+    return ddb_item
+
+
+# Returns the median units/sec of repeats runs of operation, which returns its unit count
+def measure_rate(operation: Callable[[], float], repeats: int) -> float:
+    rates = []
+    for _ in range(max(1, repeats)):
+        start = time.perf_counter()
+        units = operation()
+        rates.append(units / (time.perf_counter() - start))
+    return statistics.median(rates)
+
+
+def get_record(
+    name: str, params: Dict[str, Any], metric: str, value: float
+) -> Dict[str, Any]:
+    return {"name": name, "params": params, "metric": metric, "value": round(value, 4)}
+
+
+def benchmark_decode(config: BenchmarkConfig) -> List[Dict[str, Any]]:
+    ddb_items = [to_ddb_item(get_provisioned_vehicle(i)) for i in range(config.items)]
+    decoders: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+        "codec": lambda ddb_item: from_ddb_item(ProvisionedVehicle, ddb_item),
+        "legacy": legacy_from_ddb_item,
+    }
+
+    def decode_all(decode: Callable[[Dict[str, Any]], Any]) -> float:
+        for ddb_item in ddb_items:
+            decode(ddb_item)
+        return len(ddb_items)
+
+    return [
+        get_record(
+            "decode",
+            {"path": path},
+            "items_per_second",
+            measure_rate(lambda: decode_all(decode), config.repeats),
+        )
+        for path, decode in decoders.items()
+    ]
+
+
+def benchmark_encode(config: BenchmarkConfig) -> List[Dict[str, Any]]:
+    vehicles = [get_provisioned_vehicle(index) for index in range(config.items)]
+    encoders: Dict[str, Callable[[ProvisionedVehicle], Any]] = {
+        "codec": to_ddb_item,
+        "legacy": legacy_to_ddb_item,
+    }
+
+    def encode_all(encode: Callable[[ProvisionedVehicle], Any]) -> float:
+        for vehicle in vehicles:
+            encode(vehicle)
+        return len(vehicles)
+
+    return [
+        get_record(
+            "encode",
+            {"path": path},
+            "items_per_second",
+            measure_rate(lambda: encode_all(encode), config.repeats),
+        )
+        for path, encode in encoders.items()
+    ]
+
+
+class StubRawResponse:
+    def __init__(self, body: bytes) -> None:
+        self.body = body
+
+    def stream(self, **_: Any) -> Iterator[bytes]:
+        yield self.body
+
+
+# Answers every Query after signing, so botocore still parses the JSON body
+def stub_query_responses(client: Any, page: Dict[str, Any]) -> None:
+    body = json.dumps(page).encode("utf-8")
+    client.meta.events.register(
+        "before-send.dynamodb.Query",
+        lambda request, **_: AWSResponse(request.url, 200, {}, StubRawResponse(body)),
+    )
+
+
+# Both paths parse the same stubbed page, so the rate is botocore parsing plus each path's conversion
+def benchmark_query(config: BenchmarkConfig) -> List[Dict[str, Any]]:
+    page = {
+        "Items": [
+            to_ddb_item(get_provisioned_vehicle(index))
+            for index in range(config.page_size)
+        ],
+        "Count": config.page_size,
+        "ScannedCount": config.page_size,
+    }
+    client = boto3.client("dynamodb", region_name=REGION_NAME, **STUB_CREDENTIALS)
+    stub_query_responses(client, page)
+    table = boto3.resource(
+        "dynamodb", region_name=REGION_NAME, **STUB_CREDENTIALS
+    ).Table(TABLE_NAME)
+    stub_query_responses(table.meta.client, page)
+
+    def query_client() -> float:
+        items = 0
+        for _ in range(config.pages):
+            response = client.query(
+                TableName=TABLE_NAME,
+                KeyConditionExpression="vin = :vin",
+                ExpressionAttributeValues={":vin": {"S": "VIN"}},
+            )
+            items += len(
+                [from_ddb_item(ProvisionedVehicle, item) for item in response["Items"]]
+            )
+        return items
+
+    def query_resource() -> float:
+        items = 0
+        for _ in range(config.pages):
+            response = table.query(
+                KeyConditionExpression="vin = :vin",
+                ExpressionAttributeValues={":vin": "VIN"},
+            )
+            items += len(
+                [
+                    cattrs.structure(item, ProvisionedVehicle)
+                    for item in response["Items"]
+                ]
+            )
+        return items
+
+    return [
+        get_record(
+            "query",
+            {"path": "client", "page_size": config.page_size},
+            "items_per_second",
+            measure_rate(query_client, config.repeats),
+        ),
+        get_record(
+            "query",
+            {"path": "resource", "page_size": config.page_size},
+            "items_per_second",
+            measure_rate(query_resource, config.repeats),
+        ),
+    ]
+
+
+def benchmark_cold_start(config: BenchmarkConfig) -> List[Dict[str, Any]]:
+    env = {
+        **os.environ,
+        "REGION_NAME": REGION_NAME,
+        "USER_AGENT_STRING": "benchmark",
+        "AWS_DEFAULT_REGION": REGION_NAME,
+    }
+    records = []
+    for path, snippet in COLD_START_SNIPPETS.items():
+        durations = []
+        for _ in range(max(1, config.cold_starts)):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-c", snippet], check=True, env=env)
+            durations.append(time.perf_counter() - start)
+        records.append(
+            get_record(
+                "cold_start", {"path": path}, "seconds", statistics.median(durations)
+            )
+        )
+    return records
+
+
+def run_benchmarks(config: BenchmarkConfig) -> Dict[str, Any]:
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": config._asdict(),
+        "results": [
+            *benchmark_decode(config),
+            *benchmark_encode(config),
+            *benchmark_query(config),
+            *benchmark_cold_start(config),
+        ],
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmarks the ItemCodec and low-level client path against the boto3 resource path"
+    )
+    parser.add_argument("--output", help="File to write the results to")
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--cold-starts", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(
+        BenchmarkConfig(
+            items=args.items,
+            page_size=args.page_size,
+            pages=args.pages,
+            cold_starts=args.cold_starts,
+            repeats=args.repeats,
+        )
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(results, output_file, indent=2)
+    print(json.dumps({"results": results["results"]}, indent=2))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,12 +7,11 @@ from abc import ABCMeta
 from typing import Any, Dict, Mapping, Type, TypeVar
 
 # Third Party Libraries
-import cattrs
-from attrs import asdict, define, field, fields
+from attrs import define, field
 from attrs.validators import instance_of
 
-# AWS Libraries
-from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+# CMS Common Library
+from cms_common.boto3_wrappers.item_codec import get_item_codec
 
 # Connected Mobility Solution on AWS
 from .validators import sanitize_vin, validate_certificate_status
@@ -51,20 +50,8 @@ class ProvisionedVehicle(IDynamoDBItem):
 
 
 def from_ddb_item(cls: Type[DynamoDBItem], ddb_item: Dict[str, Any]) -> DynamoDBItem:
-    deserializer = TypeDeserializer()
-    dataclass_as_dict = {}
-
-    # The following ignore is necessary due to issues caused by mypy v1.6
-    for data_field in fields(cls):
-        dataclass_as_dict[data_field.name] = deserializer.deserialize(
-            ddb_item.get(data_field.name, None)
-        )
-    return cattrs.structure(dataclass_as_dict, cls)
+    return get_item_codec(cls).decode(ddb_item)
 
 
 def to_ddb_item(obj: DynamoDBItem) -> Mapping[str, Any]:
-    serializer = TypeSerializer()
-
-    dataclass_as_dict = asdict(obj)
-    ddb_item = serializer.serialize(dataclass_as_dict)["M"]
-    return ddb_item
+    return get_item_codec(type(obj)).encode(obj)
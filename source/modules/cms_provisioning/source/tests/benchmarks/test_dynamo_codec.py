@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# Standard Library
+import json
+from pathlib import Path
+
+# Connected Mobility Solution on AWS
+from ...benchmarks.dynamo_codec import (
+    BenchmarkConfig,
+    get_provisioned_vehicle,
+    legacy_from_ddb_item,
+    legacy_to_ddb_item,
+    main,
+    run_benchmarks,
+)
+from ...handlers.provisioning.function.lib.dynamo_schema import (
+    ProvisionedVehicle,
+    from_ddb_item,
+    to_ddb_item,
+)
+
+SMALL_CONFIG = BenchmarkConfig(items=10, page_size=5, pages=2, cold_starts=1, repeats=1)
+
+
+def test_codec_matches_legacy_conversion() -> None:
+    vehicle = get_provisioned_vehicle(1)
+    assert to_ddb_item(vehicle) == legacy_to_ddb_item(vehicle)
+    assert (
+        from_ddb_item(ProvisionedVehicle, to_ddb_item(vehicle))
+        == legacy_from_ddb_item(legacy_to_ddb_item(vehicle))
+        == vehicle
+    )
+
+
+def test_run_benchmarks() -> None:
+    results = run_benchmarks(SMALL_CONFIG)
+
+    records = {
+        (record["name"], record["params"]["path"]): record
+        for record in results["results"]
+    }
+    assert set(records) == {
+        (name, path)
+        for name, paths in [
+            ("decode", ["codec", "legacy"]),
+            ("encode", ["codec", "legacy"]),
+            ("query", ["client", "resource"]),
+            ("cold_start", ["client", "resource"]),
+        ]
+        for path in paths
+    }
+    assert all(record["value"] > 0 for record in results["results"])
+    assert results["config"]["items"] == 10
+
+
+def test_main(tmp_path: Path) -> None:
+    output = tmp_path / "results.json"
+
+    assert (
+        main(
+            [
+                "--output",
+                str(output),
+                "--items",
+                "5",
+                "--page-size",
+                "2",
+                "--pages",
+                "1",
+                "--cold-starts",
+                "1",
+                "--repeats",
+                "1",
+            ]
+        )
+        == 0
+    )
+    assert len(json.loads(output.read_text(encoding="utf-8"))["results"]) == 8
@@ -3,9 +3,9 @@
 # SPDX-License-Identifier: Apache-2.0
 
 # Standard Library
-import functools
 import os
-from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 from typing import Any, Dict, List
 from uuid import uuid4
 
@@ -16,13 +16,19 @@ from cattrs import ClassValidationError, structure, unstructure
 # AWS Libraries
 from aws_lambda_powertools import Logger, Tracer
 from chalice import Chalice, CORSConfig, Response  # type: ignore[attr-defined]
-from chalice.app import BadRequestError, CognitoUserPoolAuthorizer, Request
+from chalice.app import (
+    BadRequestError,
+    ChaliceViewError,
+    CognitoUserPoolAuthorizer,
+    Request,
+)
 
 # CMS Common Library
 from cms_common.boto3_wrappers.dynamo_crud import DynHelpers
 
 try:
     # Connected Mobility Solution on AWS
+    from .chalicelib.device_types import device_type_cache
     from .chalicelib.dynamo_schema import (
         DeviceType,
         DeviceTypeTemplate,
@@ -30,20 +36,56 @@ try:
         UpdateSimulationsRequest,
     )
     from .chalicelib.iot_core_cleanup import IotCoreCleanup
+    from .chalicelib.pagination import get_page
     from .chalicelib.stepfunctions import StepFunctionsStateMachine
+    from .chalicelib.validation import validation_cache
 except ImportError:
     # Third Party Libraries
+    from chalicelib.device_types import device_type_cache  # type: ignore
     from chalicelib.dynamo_schema import DeviceType  # type: ignore
     from chalicelib.dynamo_schema import DeviceTypeTemplate  # type: ignore
     from chalicelib.dynamo_schema import Simulation  # type: ignore
     from chalicelib.dynamo_schema import UpdateSimulationsRequest  # type: ignore
     from chalicelib.iot_core_cleanup import IotCoreCleanup  # type: ignore
+    from chalicelib.pagination import get_page  # type: ignore
     from chalicelib.stepfunctions import StepFunctionsStateMachine  # type: ignore
+    from chalicelib.validation import validation_cache  # type: ignore
 
 tracer = Tracer()
 logger = Logger()
 app = Chalice(app_name="VSApi")
 
+# How long a cleanup job may go without reporting progress before a simulation can be started again
+CLEANUP_JOB_TIMEOUT_SECONDS = 900
+
+# Simulations a bulk update starts or stops at the same time
+MAX_UPDATE_WORKERS = 10
+
+# Attributes list endpoints return unless asked for the full view, leaving out payload templates and cleanup jobs
+TEMPLATE_SUMMARY_ATTRIBUTES = ["template_id", "created_datetime", "updated_datetime"]
+DEVICE_TYPE_SUMMARY_ATTRIBUTES = [
+    "type_id",
+    "name",
+    "topic",
+    "created_datetime",
+    "updated_datetime",
+]
+SIMULATION_SUMMARY_ATTRIBUTES = [
+    "sim_id",
+    "name",
+    "stage",
+    "duration",
+    "interval",
+    "devices",
+    "runs",
+    "last_run",
+    "created_datetime",
+    "updated_datetime",
+    "publish_only",
+    "snapshot_interval",
+    "payload_encoding",
+]
+
 # This may apply it to every endpoint
 app.api.cors = CORSConfig(
     allow_origin=os.environ.get("CROSS_ORIGIN_DOMAIN", ""),
@@ -76,6 +118,23 @@ def get_current_request() -> Request:
     return app.current_request
 
 
+# Resolved once per container
+@lru_cache(maxsize=1)
+def get_simulator_state_machine() -> StepFunctionsStateMachine:
+    state_machine = StepFunctionsStateMachine()
+    state_machine_name = os.environ["SIMULATOR_STATE_MACHINE_NAME"]
+    state_machine_arn = os.environ.get("SIMULATOR_STATE_MACHINE_ARN")
+
+    if state_machine_arn:
+        state_machine.state_machine_name = state_machine_name
+        state_machine.state_machine_arn = state_machine_arn
+    # Raising keeps a failed lookup out of the cache so the next request tries again
+    elif state_machine.find(state_machine_name) is None:
+        raise ChaliceViewError(f"State machine {state_machine_name} not found")
+
+    return state_machine
+
+
 @app.route("/template/{template_id}", methods=["GET"], authorizer=authorizer)
 @tracer.capture_method
 def get_template_by_template_id(template_id: str) -> Response:
@@ -91,12 +150,10 @@ def get_template_by_template_id(template_id: str) -> Response:
 @tracer.capture_method
 def get_all_template_names() -> Response:
     return success_response(
-        body=next(
-            DynHelpers.dyn_scan(
-                os.environ["DYN_TEMPLATES_TABLE"],
-                Select="SPECIFIC_ATTRIBUTES",
-                ProjectionExpression="type, version",
-            )
+        body=get_page(
+            os.environ["DYN_TEMPLATES_TABLE"],
+            get_current_request().query_params,
+            TEMPLATE_SUMMARY_ATTRIBUTES,
         )
     )
 
@@ -106,8 +163,8 @@ def get_all_template_names() -> Response:
 def create_new_template() -> Response:
     try:
         json_body = get_current_request().json_body
-        template = structure(json_body, DeviceTypeTemplate)
-        DynHelpers.put_item(os.environ["DYN_TEMPLATES_TABLE"], unstructure(template))
+        _, item = validation_cache.structure(json_body, DeviceTypeTemplate)
+        DynHelpers.put_item(os.environ["DYN_TEMPLATES_TABLE"], item)
     except ClassValidationError as exc:
         logger.error(
             "Error validating request body",
@@ -124,8 +181,9 @@ def create_new_template() -> Response:
 def update_template() -> Response:
     try:
         json_body = get_current_request().json_body
-        template = structure(json_body, DeviceTypeTemplate)
-        DynHelpers.update_item(os.environ["DYN_TEMPLATES_TABLE"], unstructure(template))
+        json_body["updated_datetime"] = arrow.utcnow().isoformat()
+        _, item = validation_cache.structure(json_body, DeviceTypeTemplate)
+        DynHelpers.put_item(os.environ["DYN_TEMPLATES_TABLE"], item)
     except ClassValidationError as exc:
         logger.error(
             "Error validating request body",
@@ -151,7 +209,11 @@ def delete_template(template_id: str) -> Response:
 @tracer.capture_method
 def get_devices() -> Response:
     return success_response(
-        body=next(DynHelpers.dyn_scan(table=os.environ["DYN_DEVICE_TYPES_TABLE"]))
+        body=get_page(
+            os.environ["DYN_DEVICE_TYPES_TABLE"],
+            get_current_request().query_params,
+            DEVICE_TYPE_SUMMARY_ATTRIBUTES,
+        )
     )
 
 
@@ -159,7 +221,11 @@ def get_devices() -> Response:
 @tracer.capture_method
 def get_device_types() -> Response:
     return success_response(
-        body=next(DynHelpers.dyn_scan(table=os.environ["DYN_DEVICE_TYPES_TABLE"]))
+        body=get_page(
+            os.environ["DYN_DEVICE_TYPES_TABLE"],
+            get_current_request().query_params,
+            DEVICE_TYPE_SUMMARY_ATTRIBUTES,
+        )
     )
 
 
@@ -170,8 +236,11 @@ def create_device_type() -> Response:
         json_body = get_current_request().json_body
         if not json_body["type_id"]:
             json_body["type_id"] = str(uuid4())
-        device = structure(json_body, DeviceType)
-        DynHelpers.put_item(os.environ["DYN_DEVICE_TYPES_TABLE"], unstructure(device))
+        json_body["created_datetime"] = json_body[
+            "updated_datetime"
+        ] = arrow.utcnow().isoformat()
+        _, item = validation_cache.structure(json_body, DeviceType)
+        DynHelpers.put_item(os.environ["DYN_DEVICE_TYPES_TABLE"], item)
     except ClassValidationError as exc:
         logger.error(
             "Error validating request body",
@@ -198,10 +267,11 @@ def get_device_type_by_id(device_type_id: str) -> Response:
 def update_device_type_by_id() -> Response:
     try:
         json_body = get_current_request().json_body
-        device = structure(json_body, DeviceType)
-        DynHelpers.update_item(
-            os.environ["DYN_DEVICE_TYPES_TABLE"], unstructure(device)
-        )
+        json_body["updated_datetime"] = arrow.utcnow().isoformat()
+        device, item = validation_cache.structure(json_body, DeviceType)
+        # DeviceType has no timestamp, so put_item stamps a new one and the simulator reloads the template
+        DynHelpers.put_item(os.environ["DYN_DEVICE_TYPES_TABLE"], item)
+        device_type_cache.invalidate(device.type_id)
     except ClassValidationError as exc:
         logger.error(
             "Error validating request body",
@@ -216,6 +286,7 @@ def update_device_type_by_id() -> Response:
 @app.route("/device/type/{device_type_id}", methods=["DELETE"], authorizer=authorizer)
 @tracer.capture_method
 def delete_device_type_by_id(device_type_id: str) -> Response:
+    device_type_cache.invalidate(device_type_id)
     return success_response(
         body=DynHelpers.delete_item(
             os.environ["DYN_DEVICE_TYPES_TABLE"], {"type_id": device_type_id}
@@ -226,40 +297,39 @@ def delete_device_type_by_id(device_type_id: str) -> Response:
 @app.route("/simulation", methods=["GET"], authorizer=authorizer)
 @tracer.capture_method
 def get_simulations() -> Response:
-    request_object = get_current_request()
-    if request_object:
-        request = request_object.to_dict()
-        if (
-            request["query_params"]
-            and request["query_params"].get("op") == "getRunningStat"
-        ):
-            stat_data = DynHelpers.get_all(
-                table=os.environ["DYN_SIMULATIONS_TABLE"],
-                FilterExpression="stage = :stage",
-                ExpressionAttributeValues={":stage": "running"},
-                ProjectionExpression="devices",
-            )
-            logger.info("stat data", extra={"stat_data": stat_data})
+    query_params = get_current_request().query_params
+    if query_params and query_params.get("op") == "getRunningStat":
+        return success_response(body=get_running_stats())
 
-            def device_reduce(total: int, current: Dict[str, List[Any]]) -> int:
-                if isinstance(total, dict):
-                    return len(total["devices"]) + len(current["devices"])
-                return total + len(current["devices"])
-
-            if not stat_data:
-                return_stats = {"devices": 0, "sims": 0}
-            else:
-                return_stats = {
-                    "devices": functools.reduce(device_reduce, stat_data, 0),
-                    "sims": len(stat_data),
-                }
+    return success_response(
+        body=get_page(
+            os.environ["DYN_SIMULATIONS_TABLE"],
+            query_params,
+            SIMULATION_SUMMARY_ATTRIBUTES,
+        )
+    )
 
-            return success_response(body=return_stats)
 
-    return success_response(
-        body=next(DynHelpers.dyn_scan(table=os.environ["DYN_SIMULATIONS_TABLE"]))
+# Reads the sparse index of running simulations, so the cost follows how many run, not how many exist
+def get_running_stats() -> Dict[str, int]:
+    running_simulations = DynHelpers.dyn_query(
+        table_name=os.environ["DYN_SIMULATIONS_TABLE"],
+        key_condition_expression="#running = :running",
+        projection_expression="devices",
+        expression_attribute_names={"#running": "running"},
+        expression_attribute_values={":running": "running"},
+        index_name=os.environ["DYN_RUNNING_SIMULATIONS_INDEX"],
     )
 
+    return {
+        "devices": sum(
+            int(device["amount"])
+            for simulation in running_simulations
+            for device in simulation.get("devices", [])
+        ),
+        "sims": len(running_simulations),
+    }
+
 
 @app.route("/simulation", methods=["POST"], authorizer=authorizer)
 @tracer.capture_method
@@ -267,6 +337,7 @@ def create_simulation() -> Response:
     try:
         json_body = get_current_request().json_body
         json_body.update({"stage": "sleeping", "runs": 0, "last_run": None})
+        json_body.pop("running", None)
         if not json_body["sim_id"]:
             json_body["sim_id"] = str(uuid4())
         simulation = structure(json_body, Simulation)
@@ -290,21 +361,39 @@ def update_simulations() -> Response:
     try:
         json_body = get_current_request().json_body
         update_simulations_request = structure(json_body, UpdateSimulationsRequest)
+
+        # The shared DynamoDB resource isn't thread-safe, so simulations are read and saved one at a time
+        simulations = []
         for sim in update_simulations_request.simulations:
             logger.info("Updating Simulation: %s", sim.name, extra={"simulation": sim})
-            simulation = structure(
-                DynHelpers.get_item(
-                    os.environ["DYN_SIMULATIONS_TABLE"], {"sim_id": sim.sim_id}
-                ),
-                Simulation,
+            simulations.append(
+                structure(
+                    DynHelpers.get_item(
+                        os.environ["DYN_SIMULATIONS_TABLE"], {"sim_id": sim.sim_id}
+                    ),
+                    Simulation,
+                )
             )
 
-            DynHelpers.put_item(
-                os.environ["DYN_SIMULATIONS_TABLE"],
-                unstructure(
-                    act_on_simulation(simulation, update_simulations_request.action)
-                ),
-            )
+        # Resolved before the workers share it
+        get_simulator_state_machine()
+        # Each simulation is its own start or stop call, so those run side by side
+        with ThreadPoolExecutor(max_workers=MAX_UPDATE_WORKERS) as executor:
+            actions = [
+                executor.submit(
+                    act_on_simulation, simulation, update_simulations_request.action
+                )
+                for simulation in simulations
+            ]
+
+        # Every simulation that did start or stop is saved before the first failure is raised
+        updated_simulations = [
+            action.result() for action in actions if action.exception() is None
+        ]
+        for updated_simulation in updated_simulations:
+            save_simulation(updated_simulation, update_simulations_request.action)
+        for action in actions:
+            action.result()
     except ClassValidationError as exc:
         logger.error(
             "Error validating request body",
@@ -313,7 +402,11 @@ def update_simulations() -> Response:
         )
         raise BadRequestError("Invalid request body") from exc
 
-    return success_response(body={})
+    return success_response(
+        body=get_cleanup_response(
+            update_simulations_request.action, updated_simulations
+        )
+    )
 
 
 @app.route("/simulation/{simulation_id}", methods=["GET"], authorizer=authorizer)
@@ -323,12 +416,12 @@ def get_simulation_by_id(simulation_id: str) -> Response:
         os.environ["DYN_SIMULATIONS_TABLE"], {"sim_id": simulation_id}
     )
 
+    device_types = device_type_cache.get_many(
+        os.environ["DYN_DEVICE_TYPES_TABLE"],
+        (device["type_id"] for device in simulation["devices"]),
+    )
     for device in simulation["devices"]:
-        device.update(
-            DynHelpers.get_item(
-                os.environ["DYN_DEVICE_TYPES_TABLE"], {"type_id": device["type_id"]}
-            )
-        )
+        device.update(device_types.get(device["type_id"], {}))
 
     return success_response(body=simulation)
 
@@ -340,9 +433,16 @@ def act_on_simulation(simulation: Simulation, action: str) -> Simulation:
 
     # start
     if action == "start":
+        if is_cleanup_running(simulation):
+            # The running cleanup would delete the devices this run provisions
+            raise BadRequestError(
+                f"Cleanup of simulation {simulation.sim_id} is still in progress"
+            )
+
         simulation_dict.update(
             {
                 "stage": "running",
+                "running": "running",
                 "last_run": arrow.utcnow().isoformat(),
                 "runs": simulation.runs + 1,  # type: ignore
             }
@@ -350,8 +450,7 @@ def act_on_simulation(simulation: Simulation, action: str) -> Simulation:
 
         sf_input = {"simulation": simulation_dict}
 
-        state_machine = StepFunctionsStateMachine()
-        state_machine.find(os.environ["SIMULATOR_STATE_MACHINE_NAME"])
+        state_machine = get_simulator_state_machine()
         logger.info("Starting simulation", extra={"input": sf_input})
 
         simulation_dict["current_run_arn"] = state_machine.start_run(
@@ -363,10 +462,9 @@ def act_on_simulation(simulation: Simulation, action: str) -> Simulation:
     # stop
     if action == "stop":
         simulation_dict["stage"] = "sleeping"
-        updated_simulation = structure(simulation_dict, Simulation)
+        simulation_dict.pop("running", None)
 
-        state_machine = StepFunctionsStateMachine()
-        state_machine.find(os.environ["SIMULATOR_STATE_MACHINE_NAME"])
+        state_machine = get_simulator_state_machine()
         logger.info(
             "Stopping simulation", extra={"simulation": unstructure(simulation)}
         )
@@ -376,11 +474,41 @@ def act_on_simulation(simulation: Simulation, action: str) -> Simulation:
         logger.info(
             "Cleaning up provisioned resources for simulation: %s", simulation.sim_id
         )
-        IotCoreCleanup().cleanup(simulation.sim_id)
+        simulation_dict["cleanup"] = IotCoreCleanup().create_job(
+            publish_only=bool(simulation.publish_only)
+        )
+        simulation_dict["cleanup"]["updated_datetime"] = arrow.utcnow().isoformat()
+        updated_simulation = structure(simulation_dict, Simulation)
 
     return updated_simulation
 
 
+def save_simulation(simulation: Simulation, action: str) -> None:
+    DynHelpers.put_item(os.environ["DYN_SIMULATIONS_TABLE"], unstructure(simulation))
+    if action == "stop" and simulation.cleanup is not None:
+        # Started only once its job is saved, so this put can't overwrite the progress the cleanup lambda records
+        IotCoreCleanup().start(simulation.sim_id, simulation.cleanup)
+
+
+def is_cleanup_running(simulation: Simulation) -> bool:
+    if not simulation.cleanup or simulation.cleanup.get("status") != "running":
+        return False
+
+    # A cleanup that stopped reporting progress has died, so it no longer blocks the simulation
+    last_update = arrow.get(simulation.cleanup["updated_datetime"])
+    return bool(last_update.shift(seconds=CLEANUP_JOB_TIMEOUT_SECONDS) > arrow.utcnow())
+
+
+def get_cleanup_response(action: str, simulations: List[Simulation]) -> Dict[str, Any]:
+    # Stopping returns straight away, the cleanup job ids let the caller follow teardown progress
+    if action != "stop":
+        return {}
+
+    return {
+        "cleanup": {simulation.sim_id: simulation.cleanup for simulation in simulations}
+    }
+
+
 @app.route("/simulation/{simulation_id}", methods=["PUT"], authorizer=authorizer)
 @tracer.capture_method
 def update_simulation_by_id(simulation_id: str) -> Response:
@@ -394,10 +522,8 @@ def update_simulation_by_id(simulation_id: str) -> Response:
             Simulation,
         )
 
-        DynHelpers.put_item(
-            os.environ["DYN_SIMULATIONS_TABLE"],
-            unstructure(act_on_simulation(simulation, json_body["action"])),
-        )
+        updated_simulation = act_on_simulation(simulation, json_body["action"])
+        save_simulation(updated_simulation, json_body["action"])
     except ClassValidationError as exc:
         logger.error(
             "Error validating request body",
@@ -406,7 +532,9 @@ def update_simulation_by_id(simulation_id: str) -> Response:
         )
         raise BadRequestError("Invalid request body") from exc
 
-    return success_response(body={})
+    return success_response(
+        body=get_cleanup_response(json_body["action"], [updated_simulation])
+    )
 
 
 @app.route("/simulation/{simulation_id}", methods=["DELETE"], authorizer=authorizer)
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# Standard Library
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# AWS Libraries
+from aws_lambda_powertools import Logger
+
+# CMS Common Library
+from cms_common.boto3_wrappers.dynamo_crud import DynHelpers
+
+logger = Logger()
+
+# Most keys a single BatchGetItem request accepts
+MAX_KEYS_PER_BATCH_GET = 100
+# Only what tells whether a cached device type is still current
+VERSION_PROJECTION = {
+    "ProjectionExpression": "type_id, updated_datetime, #timestamp",
+    "ExpressionAttributeNames": {"#timestamp": "timestamp"},
+}
+
+
+def get_version(device_type: Dict[str, Any]) -> Optional[str]:
+    # Device types written before updated_datetime was stamped still carry the put_item timestamp
+    version = device_type.get("updated_datetime") or device_type.get("timestamp")
+    return str(version) if version is not None else None
+
+
+# Per-container LRU of device types, checked against their stored version on every read
+class DeviceTypeCache:
+    def __init__(self, maxsize: int = 256) -> None:
+        self.maxsize = maxsize
+        self._device_types: "OrderedDict[str, Tuple[Optional[str], Dict[str, Any]]]" = (
+            OrderedDict()
+        )
+
+    # Missing device types are left out
+    def get_many(
+        self, table_name: str, type_ids: Iterable[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        unique_type_ids = list(dict.fromkeys(type_ids))
+        if not unique_type_ids:
+            return {}
+
+        versions = {
+            item["type_id"]: get_version(item)
+            for item in batch_get(table_name, unique_type_ids, VERSION_PROJECTION)
+        }
+        stale_type_ids = [
+            type_id
+            for type_id, version in versions.items()
+            if type_id not in self._device_types
+            or self._device_types[type_id][0] != version
+        ]
+        for item in batch_get(table_name, stale_type_ids):
+            self._put(item["type_id"], get_version(item), item)
+        logger.info(
+            "Hydrated device types",
+            extra={"requested": len(unique_type_ids), "fetched": len(stale_type_ids)},
+        )
+
+        device_types = {}
+        for type_id in versions:
+            cached = self._device_types.get(type_id)
+            if cached is not None:
+                self._device_types.move_to_end(type_id)
+                device_types[type_id] = cached[1]
+        return device_types
+
+    def invalidate(self, type_id: str) -> None:
+        self._device_types.pop(type_id, None)
+
+    def clear(self) -> None:
+        self._device_types.clear()
+
+    def _put(
+        self, type_id: str, version: Optional[str], device_type: Dict[str, Any]
+    ) -> None:
+        self._device_types[type_id] = (version, device_type)
+        self._device_types.move_to_end(type_id)
+        if len(self._device_types) > self.maxsize:
+            self._device_types.popitem(last=False)
+
+
+def batch_get(
+    table_name: str,
+    type_ids: List[str],
+    request_options: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    items: List[Dict[str, Any]] = []
+    for start in range(0, len(type_ids), MAX_KEYS_PER_BATCH_GET):
+        keys = [
+            {"type_id": type_id}
+            for type_id in type_ids[start : start + MAX_KEYS_PER_BATCH_GET]
+        ]
+        items += DynHelpers.dyn_batch_get(
+            {table_name: {"Keys": keys, **(request_options or {})}}
+        )[table_name]
+    return items
+
+
+device_type_cache = DeviceTypeCache()
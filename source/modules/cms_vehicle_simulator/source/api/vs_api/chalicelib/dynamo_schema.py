@@ -4,13 +4,18 @@
 
 # Standard Library
 from abc import ABCMeta
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional
 
 # Third Party Libraries
 from attrs import define, field
-from attrs.validators import deep_iterable, instance_of, matches_re, optional
-from cattrs import global_converter, override, register_unstructure_hook
-from cattrs.gen import make_dict_unstructure_fn
+from attrs.validators import deep_iterable, in_, instance_of, matches_re, optional
+from cattrs import (
+    global_converter,
+    override,
+    register_structure_hook,
+    register_unstructure_hook,
+)
+from cattrs.gen import make_dict_structure_fn, make_dict_unstructure_fn
 
 
 @define
@@ -48,6 +53,17 @@ class DeviceTypeAttribute(IDynamoDBItem):
     arr: Optional[List[str]] = field(
         default=None, validator=[optional(deep_iterable(instance_of(str)))]  # type: ignore[arg-type]
     )
+    routes: Optional[List[str]] = field(
+        default=None, validator=[optional(deep_iterable(instance_of(str)))]  # type: ignore[arg-type]
+    )
+    speed: Optional[float] = field(
+        default=None, validator=[optional(instance_of(float))]
+    )
+    # Seconds between samples of the signal, and the change it must make to be published again
+    period: Optional[int] = field(default=None, validator=[optional(instance_of(int))])
+    threshold: Optional[float] = field(
+        default=None, validator=[optional(instance_of(float))]
+    )
     object: "Optional[DeviceTypeAttribute]" = field(default=None)
     payload: "Optional[List[DeviceTypeAttribute]]" = field(default=None)
 
@@ -61,6 +77,10 @@ register_unstructure_hook(
         b=override(omit_if_default=False),
     ),
 )
+# Structure functions are generated when the module loads instead of by the first request that needs them
+register_structure_hook(
+    DeviceTypeAttribute, make_dict_structure_fn(DeviceTypeAttribute, global_converter)
+)
 
 
 @define(frozen=True, auto_attribs=True)
@@ -85,6 +105,9 @@ register_unstructure_hook(
         _cattrs_omit_if_default=True,
     ),
 )
+register_structure_hook(
+    DeviceTypeTemplate, make_dict_structure_fn(DeviceTypeTemplate, global_converter)
+)
 
 
 @define(frozen=True, auto_attribs=True)
@@ -111,6 +134,9 @@ register_unstructure_hook(
         _cattrs_omit_if_default=True,
     ),
 )
+register_structure_hook(
+    DeviceType, make_dict_structure_fn(DeviceType, global_converter)
+)
 
 
 @define(frozen=True, auto_attribs=True)
@@ -144,6 +170,29 @@ class Simulation(IDynamoDBItem):
     checked: Optional[bool] = field(
         default=None, validator=[optional(instance_of(bool))]
     )
+    # Publish only simulations send data through the simulator's own role and provision no per-device identities
+    publish_only: Optional[bool] = field(
+        default=None, validator=[optional(instance_of(bool))]
+    )
+    # Topic pattern and amount of the devices of a publish only simulation by device type name, recorded by
+    # the provisioning lambda
+    publish_only_devices: Optional[Dict[str, Dict[str, Any]]] = field(
+        default=None, validator=[optional(instance_of(dict))]
+    )
+    # Seconds between full payloads of every signal when device types sample signals at their own rates
+    snapshot_interval: Optional[int] = field(
+        default=None, validator=[optional(instance_of(int))]
+    )
+    # Devices publish JSON by default, or CBOR with integer field ids that the connect store expands back to JSON
+    payload_encoding: Optional[str] = field(
+        default=None, validator=[optional(in_(["json", "cbor"]))]
+    )
+    # Latest teardown job of the simulation's devices, with its status and progress counters
+    cleanup: Optional[Dict[str, Any]] = field(
+        default=None, validator=[optional(instance_of(dict))]
+    )
+    # Only set while the simulation runs, which keeps it in the sparse running simulations index
+    running: Optional[str] = field(default=None, validator=[optional(instance_of(str))])
 
 
 register_unstructure_hook(
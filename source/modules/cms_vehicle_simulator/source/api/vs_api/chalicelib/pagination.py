@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# Standard Library
+import base64
+import binascii
+import json
+from typing import Any, Dict, List, Optional
+
+# AWS Libraries
+from chalice.app import BadRequestError
+
+# CMS Common Library
+from cms_common.boto3_wrappers.dynamo_crud import DynHelpers
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+# Query value of "view" that returns whole items instead of their summary attributes
+FULL_VIEW = "full"
+
+
+def encode_cursor(last_evaluated_key: Optional[Dict[str, Any]]) -> Optional[str]:
+    if not last_evaluated_key:
+        return None
+    return base64.urlsafe_b64encode(
+        json.dumps(last_evaluated_key, separators=(",", ":")).encode("utf-8")
+    ).decode("ascii")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Dict[str, Any]]:
+    if not cursor:
+        return None
+    try:
+        exclusive_start_key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeError, ValueError) as err:
+        raise BadRequestError("Invalid cursor") from err
+    if not isinstance(exclusive_start_key, dict) or not all(
+        isinstance(value, str) for value in exclusive_start_key.values()
+    ):
+        raise BadRequestError("Invalid cursor")
+    return exclusive_start_key
+
+
+def get_page_size(limit: Optional[str]) -> int:
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    try:
+        page_size = int(limit)
+    except ValueError as err:
+        raise BadRequestError("limit must be an integer") from err
+    if not 1 <= page_size <= MAX_PAGE_SIZE:
+        raise BadRequestError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    return page_size
+
+
+def get_projection(attributes: List[str]) -> Dict[str, Any]:
+    # Placeholders for every attribute, so names like "name" and "interval" never clash with reserved words
+    names = {f"#a{index}": attribute for index, attribute in enumerate(attributes)}
+    return {
+        "ProjectionExpression": ", ".join(names),
+        "ExpressionAttributeNames": names,
+    }
+
+
+# Reads one page from the limit, cursor and view query parameters of a list endpoint
+def get_page(
+    table_name: str,
+    query_params: Optional[Dict[str, str]],
+    summary_attributes: List[str],
+) -> Dict[str, Any]:
+    query_params = query_params or {}
+    projection = (
+        {}
+        if query_params.get("view") == FULL_VIEW
+        else get_projection(summary_attributes)
+    )
+    items, last_evaluated_key = DynHelpers.dyn_scan_page(
+        table_name,
+        get_page_size(query_params.get("limit")),
+        decode_cursor(query_params.get("cursor")),
+        **projection,
+    )
+    return {"items": items, "cursor": encode_cursor(last_evaluated_key)}
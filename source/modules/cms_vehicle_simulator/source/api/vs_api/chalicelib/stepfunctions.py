@@ -18,6 +18,9 @@ from aws_lambda_powertools import Logger, Tracer
 from botocore.config import Config
 from botocore.exceptions import ClientError
 
+# CMS Common Library
+from cms_common.serialization import dumps
+
 tracer = Tracer()
 logger = Logger()
 
@@ -186,7 +189,7 @@ class StepFunctionsStateMachine:
         try:
             kwargs = {"stateMachineArn": self.state_machine_arn, "name": run_name}
             if run_input is not None:
-                kwargs["input"] = json.dumps(run_input, default=str)
+                kwargs["input"] = dumps(run_input, default=str)
             response = self.stepfunctions_client.start_execution(**kwargs)
             run_arn = response["executionArn"]
             logger.info("Started run %s. ARN is %s.", run_name, run_arn)
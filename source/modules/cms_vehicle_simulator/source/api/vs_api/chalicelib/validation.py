@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# Standard Library
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple, Type, TypeVar
+
+# Third Party Libraries
+import attrs
+from cattrs import structure, unstructure
+from cattrs.errors import BaseValidationError
+
+# AWS Libraries
+from aws_lambda_powertools import Logger, Tracer
+
+# Connected Mobility Solution on AWS
+from .dynamo_schema import DeviceType, DeviceTypeAttribute, DeviceTypeTemplate
+
+tracer = Tracer()
+logger = Logger()
+
+TemplateItem = TypeVar("TemplateItem", DeviceType, DeviceTypeTemplate)
+CachedAttribute = Tuple[DeviceTypeAttribute, Dict[str, Any]]
+
+
+def get_attribute_key(attribute: Any) -> str:
+    # Sorted keys give an attribute the same key whatever order the console sent its fields in
+    return hashlib.sha256(
+        json.dumps(attribute, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    ).hexdigest()
+
+
+# Per-container LRU of the template attributes that already passed validation, keyed by a hash of their JSON
+class ValidationCache:
+    def __init__(self, maxsize: int = 4096) -> None:
+        self.maxsize = maxsize
+        self._attributes: "OrderedDict[str, CachedAttribute]" = OrderedDict()
+
+    # Returns the same as structure() and unstructure(), validating only the attributes it hasn't seen
+    @tracer.capture_method
+    def structure(
+        self, json_body: Dict[str, Any], cls: Type[TemplateItem]
+    ) -> Tuple[TemplateItem, Dict[str, Any]]:
+        try:
+            attributes, misses = self._get_attributes(json_body["payload"])
+            item = structure({**json_body, "payload": []}, cls)
+        except (BaseValidationError, AttributeError, KeyError, TypeError, ValueError):
+            # Validating the whole body again raises the same errors as an uncached structure()
+            item = structure(json_body, cls)
+            return item, unstructure(item)
+
+        tracer.put_metadata(
+            key="validation_cache",
+            value={"attributes": len(attributes), "misses": misses},
+        )
+        logger.debug(
+            "Validated template attributes",
+            extra={"attributes": len(attributes), "misses": misses},
+        )
+        unstructured: Dict[str, Any] = unstructure(item)
+        unstructured["payload"] = [attribute[1] for attribute in attributes]
+        return (
+            attrs.evolve(item, payload=[attribute[0] for attribute in attributes]),
+            unstructured,
+        )
+
+    def _get_attributes(
+        self, payload: List[Dict[str, Any]]
+    ) -> Tuple[List[CachedAttribute], int]:
+        attributes = []
+        misses = 0
+        for raw_attribute in payload:
+            key = get_attribute_key(raw_attribute)
+            cached = self._attributes.get(key)
+            if cached is None:
+                attribute = structure(raw_attribute, DeviceTypeAttribute)
+                cached = self._attributes[key] = (attribute, unstructure(attribute))
+                misses += 1
+                if len(self._attributes) > self.maxsize:
+                    self._attributes.popitem(last=False)
+            else:
+                self._attributes.move_to_end(key)
+            attributes.append(cached)
+        return attributes, misses
+
+    def clear(self) -> None:
+        self._attributes.clear()
+
+
+validation_cache = ValidationCache()
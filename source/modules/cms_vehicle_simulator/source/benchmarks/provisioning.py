@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# Standard Library
+import argparse
+import json
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List
+from uuid import uuid4
+
+# AWS Libraries
+from botocore.exceptions import ClientError
+
+# Connected Mobility Solution on AWS
+from ..handlers.stepfunction.function.provision import DeviceProvisioner
+
+
+class StubClient:
+    def __init__(self, latency: float, requests_per_second: float) -> None:
+        self.latency = latency
+        self.requests_per_second = requests_per_second
+        self.calls: Deque[float] = deque()
+        self.throttles = 0
+        self._lock = threading.Lock()
+
+    def _call(self, operation: str) -> None:
+        with self._lock:
+            now = time.monotonic()
+            while self.calls and now - self.calls[0] > 1:
+                self.calls.popleft()
+            if len(self.calls) >= self.requests_per_second:
+                self.throttles += 1
+                raise ClientError(
+                    {
+                        "Error": {
+                            "Code": "ThrottlingException",
+                            "Message": "Rate exceeded",
+                        }
+                    },
+                    operation,
+                )
+            self.calls.append(now)
+        time.sleep(self.latency)
+
+    def _not_found(self, operation: str) -> None:
+        self._call(operation)
+        raise ClientError(
+            {"Error": {"Code": "ResourceNotFoundException", "Message": "Not found"}},
+            operation,
+        )
+
+
+class StubIotClient(StubClient):
+    def create_keys_and_certificate(self) -> Dict[str, Any]:
+        self._call("CreateKeysAndCertificate")
+        certificate_id = uuid4().hex
+        return {
+            "certificateArn": f"arn:aws:iot:us-east-1:123456789012:cert/{certificate_id}",
+            "certificateId": certificate_id,
+        }
+
+    def create_policy(self, policyName: str, **_: Any) -> Dict[str, Any]:
+        self._call("CreatePolicy")
+        return {"policyName": policyName}
+
+    def get_paginator(self, operation: str) -> Any:
+        return self
+
+    def paginate(self, **_: Any) -> List[Dict[str, Any]]:
+        self._call("ListThings")
+        return [{"things": []}]
+
+    def __getattr__(self, operation: str) -> Any:
+        return lambda **_: self._call(operation)
+
+
+class StubSecretsManagerClient(StubClient):
+    def get_secret_value(self, **_: Any) -> Dict[str, Any]:
+        self._not_found("GetSecretValue")
+        return {}
+
+    def __getattr__(self, operation: str) -> Any:
+        return lambda **_: self._call(operation)
+
+
+class StubbedDeviceProvisioner(DeviceProvisioner):
+    def __init__(self, latency: float, iot_tps: float, secrets_tps: float) -> None:
+        super().__init__("123456789012", "us-east-1", "benchmark", "benchmark")
+        self.stub_iot_client = StubIotClient(latency, iot_tps)
+        self.stub_secrets_manager_client = StubSecretsManagerClient(
+            latency, secrets_tps
+        )
+
+    def iot_client(self) -> Any:  # type: ignore[override]
+        return self.stub_iot_client
+
+    def secret_manager_client(self) -> Any:  # type: ignore[override]
+        return self.stub_secrets_manager_client
+
+
+def run_serial(provisioner: DeviceProvisioner, device_names: List[str]) -> float:
+    start = time.perf_counter()
+    for device_name in device_names:
+        # The serial path has no throttling handling of its own, so pace it the way a Map iteration would retry
+        while True:
+            try:
+                secrets = provisioner.create_device_secrets(device_name)
+                provisioner.create_thing(device_name, secrets["keys"]["certificateArn"])
+                break
+            except ClientError:
+                time.sleep(0.1)
+    return len(device_names) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmarks devices/sec of serial and bulk rate limited provisioning against stubbed, throttling clients"
+    )
+    parser.add_argument("--devices", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--iot-tps", type=float, default=100)
+    parser.add_argument("--secrets-tps", type=float, default=50)
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args()
+
+    device_names = [f"benchmark-{index}" for index in range(args.devices)]
+    latency = args.latency_ms / 1000
+
+    serial_provisioner = StubbedDeviceProvisioner(
+        latency, args.iot_tps, args.secrets_tps
+    )
+    serial = run_serial(serial_provisioner, device_names)
+
+    bulk_provisioner = StubbedDeviceProvisioner(latency, args.iot_tps, args.secrets_tps)
+    report = bulk_provisioner.provision_devices(
+        device_names,
+        max_workers=args.workers,
+        iot_requests_per_second=args.iot_tps,
+        secrets_manager_requests_per_second=args.secrets_tps,
+    )
+
+    print(
+        json.dumps(
+            {
+                "devices": args.devices,
+                "serial_devices_per_second": round(serial, 2),
+                "serial_policies_created": args.devices,
+                "bulk_devices_per_second": report["devices_per_second"],
+                "bulk_policies_created": 1,
+                "bulk_throttles": report["throttles"],
+                "speedup": round(report["devices_per_second"] / serial, 2),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
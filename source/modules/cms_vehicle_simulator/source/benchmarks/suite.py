@@ -0,0 +1,458 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# Standard Library
+import argparse
+import json
+import logging
+import platform
+import statistics
+import sys
+import time
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+from unittest.mock import patch
+
+# AWS Libraries
+from boto3.dynamodb.types import TypeSerializer
+
+# CMS Common Library
+from cms_common.serialization import (
+    JsonSerializer,
+    OrjsonSerializer,
+    StdlibJsonSerializer,
+)
+
+# Connected Mobility Solution on AWS
+from ..handlers.stepfunction.function import handlers
+from ..handlers.stepfunction.function.random_sim import GenericSim
+from ..handlers.stepfunction.function.template_compiler import CompiledTemplate
+from .provisioning import StubbedDeviceProvisioner, StubClient, StubIotClient
+from .template_compiler import load_vss_template
+
+# Representative limits for every generator but route, which reads its waypoints from S3
+GENERATOR_LIMITS: Dict[str, Dict[str, Any]] = {
+    "id": {},
+    "bool": {},
+    "decay": {"min": 0, "max": 100},
+    "float": {"precision": 2},
+    "int": {"min": 0, "max": 100},
+    "location": {"lat": 47.6, "long": -122.3},
+    "string": {"min": 5, "max": 20},
+    "sinusoidal": {"min": -1, "max": 1},
+    "timestamp": {},
+    "pickOne": {"arr": ["P", "R", "N", "D"]},
+    "object": {
+        "payload": [
+            {"name": "speed", "type": "int", "min": 0, "max": 120},
+            {"name": "gear", "type": "pickOne", "arr": ["P", "R", "N", "D"]},
+        ]
+    },
+}
+# Field types synthetic templates cycle through, so every size has the same mix
+SYNTHETIC_FIELD_TYPES = ["int", "float", "bool", "sinusoidal", "decay", "string"]
+
+
+class SuiteConfig(NamedTuple):
+    template_sizes: Sequence[int] = (10, 100, 1000)
+    generator_calls: int = 20000
+    devices: int = 50
+    ticks: int = 20
+    encoded_payloads: int = 200
+    provisioned_devices: int = 200
+    # Stub AWS API behaviour, and the rate the provisioner's limiters start at
+    latency_ms: float = 5.0
+    requests_per_second: float = 1000.0
+    workers: int = 16
+    repeats: int = 3
+
+
+class StubIotDataClient:
+    def publish(self, **_: Any) -> Dict[str, Any]:
+        return {}
+
+
+class StubTaggingClient(StubClient):
+    def __init__(
+        self, latency: float, requests_per_second: float, secret_arns: List[str]
+    ) -> None:
+        super().__init__(latency, requests_per_second)
+        self.secret_arns = secret_arns
+
+    def get_paginator(self, operation: str) -> Any:
+        return self
+
+    def paginate(self, **_: Any) -> List[Dict[str, Any]]:
+        self._call("GetResources")
+        return [
+            {
+                "ResourceTagMappingList": [
+                    {"ResourceARN": arn} for arn in self.secret_arns
+                ]
+            }
+        ]
+
+
+class StubCleanupIotClient(StubIotClient):
+    def __init__(
+        self, latency: float, requests_per_second: float, thing_names: List[str]
+    ) -> None:
+        super().__init__(latency, requests_per_second)
+        self.thing_names = thing_names
+
+    def paginate(self, **_: Any) -> List[Dict[str, Any]]:
+        self._call("ListThings")
+        return [{"things": [{"thingName": name} for name in self.thing_names]}]
+
+    def list_thing_principals(self, thingName: str, **_: Any) -> Dict[str, Any]:
+        self._call("ListThingPrincipals")
+        return {"principals": [f"arn:aws:iot:us-east-1:123456789012:cert/{thingName}"]}
+
+    def list_principal_policies(self, **_: Any) -> Dict[str, Any]:
+        self._call("ListPrincipalPolicies")
+        return {"policies": [{"policyName": "benchmark"}]}
+
+
+class StubbedCleanupProvisioner(StubbedDeviceProvisioner):
+    def __init__(
+        self, latency: float, requests_per_second: float, device_names: List[str]
+    ) -> None:
+        super().__init__(latency, requests_per_second, requests_per_second)
+        self.stub_iot_client = StubCleanupIotClient(
+            latency, requests_per_second, device_names
+        )
+        self.stub_tagging_client = StubTaggingClient(
+            latency,
+            requests_per_second,
+            [
+                f"arn:aws:secretsmanager:us-east-1:123456789012:secret:{name}"
+                for name in device_names
+            ],
+        )
+
+    def tagging_client(self) -> Any:  # type: ignore[override]
+        return self.stub_tagging_client
+
+
+class BenchmarkContext:
+    function_name = "benchmark"
+    memory_limit_in_mb = 1024
+    invoked_function_arn = "arn:aws:lambda:us-east-1:123456789012:function:benchmark"
+    aws_request_id = "benchmark"
+    log_stream_name = "benchmark"
+
+    @staticmethod
+    def get_remaining_time_in_millis() -> int:
+        return 900000
+
+
+def get_synthetic_template(size: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "name": f"signal_{index}",
+            "type": SYNTHETIC_FIELD_TYPES[index % len(SYNTHETIC_FIELD_TYPES)],
+            "min": 0,
+            "max": 100,
+        }
+        for index in range(size)
+    ]
+
+
+def get_templates(config: SuiteConfig) -> Dict[str, List[Dict[str, Any]]]:
+    templates = {"vss_default_template": load_vss_template()}
+    for size in config.template_sizes:
+        templates[f"synthetic_{size}"] = get_synthetic_template(size)
+    return templates
+
+
+# Returns the median units/sec of repeats runs of operation, which returns its unit count
+def measure_rate(operation: Callable[[], float], repeats: int) -> float:
+    rates = []
+    for _ in range(max(1, repeats)):
+        start = time.perf_counter()
+        units = operation()
+        rates.append(units / (time.perf_counter() - start))
+    return statistics.median(rates)
+
+
+def get_record(
+    name: str, params: Dict[str, Any], metric: str, value: float
+) -> Dict[str, Any]:
+    return {"name": name, "params": params, "metric": metric, "value": round(value, 2)}
+
+
+def benchmark_generic_sim(config: SuiteConfig) -> List[Dict[str, Any]]:
+    records = []
+    for field_type, limits in GENERATOR_LIMITS.items():
+        generator = getattr(GenericSim, f"generic_sim_{field_type}")
+
+        def run(
+            generator: Callable[..., Any] = generator,
+            limits: Dict[str, Any] = limits,
+        ) -> float:
+            for counter in range(config.generator_calls):
+                generator(limits, counter=counter)
+            return config.generator_calls
+
+        records.append(
+            get_record(
+                "generic_sim",
+                {"type": field_type},
+                "calls_per_second",
+                measure_rate(run, config.repeats),
+            )
+        )
+    return records
+
+
+def benchmark_payload_assembly(
+    config: SuiteConfig, templates: Dict[str, List[Dict[str, Any]]]
+) -> List[Dict[str, Any]]:
+    records = []
+    context = BenchmarkContext()
+    for template_name, fields in templates.items():
+        # Serialized the same way the state machine hands a device type payload to the simulator lambda
+        event = {
+            "simulation": {"interval": 1, "duration": config.ticks},
+            "type_id": template_name,
+            "info": {
+                "payload": TypeSerializer().serialize(
+                    json.loads(json.dumps(fields), parse_float=Decimal)
+                ),
+                "version": {"S": "benchmark"},
+                "name": {"S": "benchmark-device"},
+            },
+            "batch": {"start_index": 0, "size": config.devices},
+        }
+
+        def run(event: Dict[str, Any] = event) -> float:
+            event["options"] = {}
+            for _ in range(config.ticks):
+                event["options"] = handlers.data_sim_handler(event, context)
+            return config.devices * config.ticks
+
+        with patch.object(
+            handlers, "get_iot_data_client", return_value=StubIotDataClient()
+        ):
+            rate = measure_rate(run, config.repeats)
+        records.append(
+            get_record(
+                "payload_assembly",
+                {
+                    "template": template_name,
+                    "fields": len(fields),
+                    "devices": config.devices,
+                },
+                "device_ticks_per_second",
+                rate,
+            )
+        )
+    return records
+
+
+def get_serializers() -> List[JsonSerializer]:
+    serializers: List[JsonSerializer] = [StdlibJsonSerializer()]
+    try:
+        serializers.append(OrjsonSerializer())
+    except ImportError:
+        pass
+    return serializers
+
+
+def benchmark_json_encoding(
+    config: SuiteConfig, templates: Dict[str, List[Dict[str, Any]]]
+) -> List[Dict[str, Any]]:
+    records = []
+    for template_name, fields in templates.items():
+        template = CompiledTemplate(fields)
+        payloads = [
+            template.generate(counter, device_index=counter)
+            for counter in range(config.encoded_payloads)
+        ]
+        encoded_bytes = sum(len(json.dumps(payload)) for payload in payloads)
+
+        for serializer in get_serializers():
+
+            def run(
+                payloads: List[Dict[str, Any]] = payloads,
+                serializer: JsonSerializer = serializer,
+            ) -> float:
+                for payload in payloads:
+                    serializer.dumps(payload)
+                return len(payloads)
+
+            rate = measure_rate(run, config.repeats)
+            params = {
+                "template": template_name,
+                "fields": len(fields),
+                "serializer": serializer.name,
+            }
+            records.append(
+                get_record("json_encoding", params, "payloads_per_second", rate)
+            )
+            records.append(
+                get_record(
+                    "json_encoding",
+                    params,
+                    "megabytes_per_second",
+                    rate * encoded_bytes / len(payloads) / 1_000_000,
+                )
+            )
+
+        def run_encode(template: CompiledTemplate = template) -> float:
+            for counter in range(config.encoded_payloads):
+                template.encode(counter, device_index=counter)
+            return config.encoded_payloads
+
+        # Generating and encoding together, with the constant fields spliced in pre-encoded
+        records.append(
+            get_record(
+                "template_encoding",
+                {"template": template_name, "fields": len(fields)},
+                "payloads_per_second",
+                measure_rate(run_encode, config.repeats),
+            )
+        )
+    return records
+
+
+def benchmark_provisioning(config: SuiteConfig) -> List[Dict[str, Any]]:
+    latency = config.latency_ms / 1000
+
+    device_names = [f"benchmark-{index}" for index in range(config.provisioned_devices)]
+
+    def run() -> float:
+        report = StubbedDeviceProvisioner(
+            latency, config.requests_per_second, config.requests_per_second
+        ).provision_devices(
+            device_names,
+            max_workers=config.workers,
+            iot_requests_per_second=config.requests_per_second,
+            secrets_manager_requests_per_second=config.requests_per_second,
+        )
+        return float(report["provisioned"])
+
+    return [
+        get_record(
+            "provisioning",
+            {"devices": config.provisioned_devices, "latency_ms": config.latency_ms},
+            "devices_per_second",
+            measure_rate(run, config.repeats),
+        )
+    ]
+
+
+def benchmark_teardown(config: SuiteConfig) -> List[Dict[str, Any]]:
+    latency = config.latency_ms / 1000
+    device_names = [f"benchmark-{index}" for index in range(config.provisioned_devices)]
+
+    def run() -> float:
+        progress = StubbedCleanupProvisioner(
+            latency, config.requests_per_second, device_names
+        ).cleanup_devices(
+            max_workers=config.workers,
+            iot_requests_per_second=config.requests_per_second,
+            secrets_manager_requests_per_second=config.requests_per_second,
+        )
+        return float(progress["deleted_things"])
+
+    return [
+        get_record(
+            "teardown",
+            {"devices": config.provisioned_devices, "latency_ms": config.latency_ms},
+            "devices_per_second",
+            measure_rate(run, config.repeats),
+        )
+    ]
+
+
+def run_suite(config: SuiteConfig) -> Dict[str, Any]:
+    templates = get_templates(config)
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": config._asdict(),
+        "results": [
+            *benchmark_generic_sim(config),
+            *benchmark_payload_assembly(config, templates),
+            *benchmark_json_encoding(config, templates),
+            *benchmark_provisioning(config),
+            *benchmark_teardown(config),
+        ],
+    }
+
+
+def get_result_key(record: Dict[str, Any]) -> str:
+    return json.dumps([record["name"], record["params"], record["metric"]])
+
+
+# Returns the metrics that dropped by more than tolerance, a fraction, against the baseline
+def compare_results(
+    baseline: Dict[str, Any], results: Dict[str, Any], tolerance: float
+) -> List[Dict[str, Any]]:
+    baseline_values = {
+        get_result_key(record): record["value"] for record in baseline["results"]
+    }
+    regressions = []
+    for record in results["results"]:
+        baseline_value = baseline_values.get(get_result_key(record))
+        if baseline_value and record["value"] < baseline_value * (1 - tolerance):
+            regressions.append(
+                {
+                    **record,
+                    "baseline": baseline_value,
+                    "change": round(record["value"] / baseline_value - 1, 4),
+                }
+            )
+    return regressions
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Runs the simulator's throughput benchmarks and writes their results as JSON"
+    )
+    parser.add_argument("--output", help="File to write the results to")
+    parser.add_argument("--baseline", help="Results of an earlier run to compare to")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    parser.add_argument(
+        "--template-sizes", type=int, nargs="+", default=[10, 100, 1000]
+    )
+    parser.add_argument("--devices", type=int, default=50)
+    parser.add_argument("--ticks", type=int, default=20)
+    parser.add_argument("--provisioned-devices", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    # Per-tick and per-device info logs would otherwise be timed as well and flood the output
+    logging.getLogger(handlers.logger.service).setLevel(logging.WARNING)
+
+    results = run_suite(
+        SuiteConfig(
+            template_sizes=args.template_sizes,
+            devices=args.devices,
+            ticks=args.ticks,
+            provisioned_devices=args.provisioned_devices,
+            latency_ms=args.latency_ms,
+            repeats=args.repeats,
+        )
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(results, output_file, indent=2)
+
+    report: Dict[str, Any] = {"results": results["results"]}
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as baseline_file:
+            report["regressions"] = compare_results(
+                json.load(baseline_file), results, args.tolerance
+            )
+    print(json.dumps(report, indent=2))
+
+    return 1 if report.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
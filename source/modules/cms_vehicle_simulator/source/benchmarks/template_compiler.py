@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# Standard Library
+import argparse
+import json
+import os
+import time
+from decimal import Decimal
+from typing import Any, Callable, Dict, List
+
+# AWS Libraries
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+# Connected Mobility Solution on AWS
+from ..handlers.stepfunction.function.random_sim import GenericSim
+from ..handlers.stepfunction.function.template_compiler import compiled_templates
+
+VSS_TEMPLATE_PATH = os.path.join(
+    os.path.dirname(__file__),
+    os.pardir,
+    "infrastructure",
+    "assets",
+    "templates",
+    "vss_default_template.json",
+)
+
+
+def load_vss_template() -> List[Dict[str, Any]]:
+    with open(VSS_TEMPLATE_PATH, "r", encoding="utf-8") as template_file:
+        fields: List[Dict[str, Any]] = json.load(template_file)["payload"]
+    return fields
+
+
+def interpreted_tick(serialized_payload: Dict[str, Any], counter: int) -> None:
+    sim_fields = TypeDeserializer().deserialize(serialized_payload)
+    data = {}
+    for field in sim_fields:
+        data[field["name"]] = getattr(GenericSim, f"generic_sim_{field['type']}")(
+            field, counter=counter
+        )
+
+
+def compiled_tick(serialized_payload: Dict[str, Any], counter: int) -> None:
+    compiled_templates.get(
+        "vss", "benchmark", lambda: TypeDeserializer().deserialize(serialized_payload)
+    ).generate(counter)
+
+
+def measure_ticks_per_second(
+    tick: Callable[[Dict[str, Any], int], None],
+    serialized_payload: Dict[str, Any],
+    ticks: int,
+) -> float:
+    start = time.perf_counter()
+    for counter in range(ticks):
+        tick(serialized_payload, counter)
+    return ticks / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmarks ticks/sec of the interpreted payload path against the compiled template"
+    )
+    parser.add_argument("--ticks", type=int, default=200)
+    args = parser.parse_args()
+
+    # Serialized the same way the state machine hands the device type payload to the simulator lambda
+    serialized_payload = TypeSerializer().serialize(
+        json.loads(json.dumps(load_vss_template()), parse_float=Decimal)
+    )
+
+    interpreted = measure_ticks_per_second(
+        interpreted_tick, serialized_payload, args.ticks
+    )
+    compiled = measure_ticks_per_second(compiled_tick, serialized_payload, args.ticks)
+
+    print(
+        json.dumps(
+            {
+                "template": "vss_default_template",
+                "ticks": args.ticks,
+                "interpreted_ticks_per_second": round(interpreted, 2),
+                "compiled_ticks_per_second": round(compiled, 2),
+                "speedup": round(compiled / interpreted, 2),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
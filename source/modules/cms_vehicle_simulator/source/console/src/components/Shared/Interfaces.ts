@@ -27,6 +27,8 @@ export interface IAttribute {
   long?: number;
   radius?: number;
   arr?: string[] | string;
+  period?: number;
+  threshold?: number;
   object?: IAttribute;
   payload?: IAttribute[];
 }
@@ -58,6 +60,14 @@ export interface ISimulation {
   created_datetime?: string;
   updated_datetime?: string;
   checked?: boolean;
+  publish_only?: boolean;
+  snapshot_interval?: number;
+  payload_encoding?: string;
+}
+
+export interface IListResponse<T> {
+  items: T[];
+  cursor: string | null;
 }
 
 export type IErrors<T> = {
@@ -79,6 +89,8 @@ export const AttributeTypeMap = {
   long: "number",
   radius: "number",
   arr: "object",
+  period: "number",
+  threshold: "number",
   object: "object",
   payload: "object",
 };
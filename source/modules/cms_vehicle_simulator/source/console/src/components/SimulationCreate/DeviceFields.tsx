@@ -3,8 +3,7 @@
 
 import { I18n, Logger } from "@aws-amplify/core";
 import { useState, useEffect } from "react";
-import { API } from "@aws-amplify/api";
-import { API_NAME, validateField } from "../../util/Utils";
+import { listAll, validateField } from "../../util/Utils";
 import {
   ISimulation,
   IDeviceType,
@@ -40,10 +39,8 @@ export default function DeviceFields(props: IProps): React.JSX.Element {
    */
   const loadDeviceTypes = async () => {
     try {
-      const results = await API.get(API_NAME, "/device/type", {
-        queryStringParameters: { op: "list" },
-      });
-      setDeviceTypes([...results]);
+      const results = await listAll<IDeviceType>("/device/type");
+      setDeviceTypes(results);
     } catch (err) {
       logger.error(I18n.get("device.types.get.error"), err);
       throw err;
@@ -22,7 +22,7 @@ const mockDeviceTypes: IDeviceType[] = [
 ];
 
 const mockAPI = {
-  get: async () => mockDeviceTypes,
+  get: async () => ({ items: mockDeviceTypes, cursor: null }),
 };
 jest.mock("@aws-amplify/api");
 API.get = mockAPI.get;
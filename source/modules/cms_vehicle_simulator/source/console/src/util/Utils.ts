@@ -1,6 +1,7 @@
 // Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 // SPDX-License-Identifier: Apache-2.0
 
+import { API } from "@aws-amplify/api";
 import { Auth } from "@aws-amplify/auth";
 import { I18n, Logger } from "@aws-amplify/core";
 import {
@@ -8,6 +9,7 @@ import {
   IDeviceType,
   IErrors,
   AttributeTypeMap,
+  IListResponse,
 } from "../components/Shared/Interfaces";
 
 // Logger for Utils
@@ -76,6 +78,24 @@ const getErrors = (field: string, error: string) => {
   return ERRORS[field][error];
 };
 
+/**
+ * Reads every page of a list endpoint, following its cursor
+ * @param path
+ * @returns all items of the list
+ */
+export async function listAll<T>(path: string): Promise<T[]> {
+  const items: T[] = [];
+  let cursor: string | null = null;
+  do {
+    const page: IListResponse<T> = await API.get(API_NAME, path, {
+      queryStringParameters: cursor ? { cursor: cursor } : {},
+    });
+    items.push(...page.items);
+    cursor = page.cursor;
+  } while (cursor);
+  return items;
+}
+
 /**
  * Signs out the user.
  */
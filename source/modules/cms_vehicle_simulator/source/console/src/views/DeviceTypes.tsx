@@ -15,21 +15,35 @@ import Card from "react-bootstrap/Card";
 import Table from "react-bootstrap/Table";
 import Button from "react-bootstrap/Button";
 import Alert from "react-bootstrap/Alert";
-import { IDeviceType, IPageProps } from "../components/Shared/Interfaces";
+import {
+  IDeviceType,
+  IListResponse,
+  IPageProps,
+} from "../components/Shared/Interfaces";
 
 export default function DeviceTypes(props: IPageProps): JSX.Element {
   const logger = new Logger("Device Types");
   const [deviceTypes, setDeviceTypes] = useState<IDeviceType[]>([]);
   const [showAlert, setShowAlert] = useState(false);
   const [deleteModalIndex, setDeleteModalIndex] = useState<number | null>(null);
+  const [cursor, setCursor] = useState<string | null>(null);
 
   /**
-   * retrieves device types and sets to state
+   * retrieves a page of device types and sets to state,
+   * appending it to the loaded device types when given a cursor
+   * @param pageCursor
    */
-  const loadDeviceTypes = async () => {
+  const loadDeviceTypes = async (pageCursor?: string) => {
     try {
-      const results = await API.get(API_NAME, "/device/type", {});
-      setDeviceTypes([...results]);
+      const results: IListResponse<IDeviceType> = await API.get(
+        API_NAME,
+        "/device/type",
+        { queryStringParameters: pageCursor ? { cursor: pageCursor } : {} },
+      );
+      setDeviceTypes(
+        pageCursor ? [...deviceTypes, ...results.items] : [...results.items],
+      );
+      setCursor(results.cursor);
     } catch (err) {
       logger.error(I18n.get("device.type.get.error"), err);
       throw err;
@@ -166,6 +180,19 @@ export default function DeviceTypes(props: IPageProps): JSX.Element {
                 </thead>
                 <tbody>{displayDeviceTypes()}</tbody>
               </Table>
+              {cursor ? (
+                <Button
+                  className="button-theme"
+                  size="sm"
+                  onClick={() => {
+                    loadDeviceTypes(cursor);
+                  }}
+                >
+                  {I18n.get("load.more")}
+                </Button>
+              ) : (
+                ""
+              )}
               {emptyDeviceTypeAlert()}
             </Card.Body>
           </Card>
@@ -14,23 +14,39 @@ import Button from "react-bootstrap/Button";
 import Table from "react-bootstrap/Table";
 import Form from "react-bootstrap/Form";
 import Alert from "react-bootstrap/Alert";
-import { ISimulation, IPageProps } from "../components/Shared/Interfaces";
+import {
+  IListResponse,
+  ISimulation,
+  IPageProps,
+} from "../components/Shared/Interfaces";
 import TableData from "../components/Simulations/TableData";
 
 export default function Simulations(props: IPageProps): React.JSX.Element {
   const logger = new Logger("Simulations");
   const [simulations, setSimulations] = useState<ISimulation[]>([]);
   const [showAlert, setShowAlert] = useState(false);
+  const [cursor, setCursor] = useState<string | null>(null);
 
   /**
-   * get simulations from ddb
+   * get a page of simulations from ddb,
+   * appending it to the loaded simulations when given a cursor
+   * @param pageCursor
    */
-  const loadSimulations = async () => {
+  const loadSimulations = async (pageCursor?: string) => {
     try {
-      const results = await API.get(API_NAME, "/simulation", {
-        queryStringParameters: { op: "list" },
-      });
-      setSimulations([...results]);
+      const results: IListResponse<ISimulation> = await API.get(
+        API_NAME,
+        "/simulation",
+        {
+          queryStringParameters: pageCursor
+            ? { op: "list", cursor: pageCursor }
+            : { op: "list" },
+        },
+      );
+      setSimulations(
+        pageCursor ? [...simulations, ...results.items] : [...results.items],
+      );
+      setCursor(results.cursor);
     } catch (err) {
       logger.error(I18n.get("simulations.get.error"), err);
       throw err;
@@ -249,6 +265,19 @@ export default function Simulations(props: IPageProps): React.JSX.Element {
                   ""
                 )}
               </Table>
+              {cursor ? (
+                <Button
+                  className="button-theme"
+                  size="sm"
+                  onClick={() => {
+                    loadSimulations(cursor);
+                  }}
+                >
+                  {I18n.get("load.more")}
+                </Button>
+              ) : (
+                ""
+              )}
               {emptySimAlert()}
             </Card.Body>
           </Card>
@@ -41,7 +41,7 @@ jest.mock("react-router-dom", () => ({
 }));
 
 const mockAPI = {
-  get: async () => mockDeviceTypes,
+  get: async () => ({ items: mockDeviceTypes, cursor: null }),
   del: jest.fn(),
 };
 jest.mock("@aws-amplify/api");
@@ -44,7 +44,7 @@ beforeAll(() => {
   ];
 
   const mockAPI = {
-    get: async () => mockDeviceTypes,
+    get: async () => ({ items: mockDeviceTypes, cursor: null }),
     post: jest.fn(),
   };
   jest.mock("@aws-amplify/api");
@@ -26,7 +26,7 @@ const mockSimulations: ISimulation[] = [
 ];
 
 const mockAPI = {
-  get: async () => mockSimulations,
+  get: async () => ({ items: mockSimulations, cursor: null }),
   post: jest.fn(),
   del: jest.fn(),
 };
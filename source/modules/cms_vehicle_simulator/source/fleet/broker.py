@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# In-process MQTT 3.1.1 broker standing in for AWS IoT Core in local runs and tests
+
+# Standard Library
+import asyncio
+import struct
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+# Connected Mobility Solution on AWS
+from .mqtt import (
+    CONNACK,
+    CONNECT,
+    DISCONNECT,
+    PINGREQ,
+    PINGRESP,
+    PUBACK,
+    PUBLISH,
+    SUBACK,
+    SUBSCRIBE,
+    MqttError,
+    decode_publish,
+    decode_string,
+    encode_packet,
+    encode_publish,
+    read_packet,
+    topic_matches,
+)
+
+CONNECTION_REFUSED_NOT_AUTHORIZED = 5
+
+
+class LocalBroker:  # pylint: disable=too-many-instance-attributes
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        ack_delay: float = 0.0,
+        authorize: Optional[Callable[[str], bool]] = None,
+    ) -> None:
+        self.host = host
+        self.port = port
+        # Simulated round trip added before each PUBACK
+        self.ack_delay = ack_delay
+        # Called with each connecting client id, refusing the connection when it returns False
+        self.authorize = authorize
+        self.connections = 0
+        self.peak_connections = 0
+        self.publishes = 0
+        self.received: Dict[str, int] = {}
+
+        self._server: Optional[asyncio.Server] = None
+        self._clients: Dict[str, asyncio.StreamWriter] = {}
+        self._subscriptions: Dict[asyncio.StreamWriter, Set[str]] = {}
+        self._handlers: Set["asyncio.Task[None]"] = set()
+
+    async def start(self) -> int:
+        self._server = await asyncio.start_server(
+            self._track_client, self.host, self.port, backlog=4096
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for writer in list(self._clients.values()):
+            writer.close()
+        for handler in list(self._handlers):
+            handler.cancel()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+
+    async def __aenter__(self) -> "LocalBroker":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_: object) -> None:
+        await self.stop()
+
+    def _route(self, topic: str, payload: bytes) -> None:
+        self.publishes += 1
+        self.received[topic] = self.received.get(topic, 0) + 1
+        for writer, topic_filters in self._subscriptions.items():
+            if any(
+                topic_matches(topic_filter, topic) for topic_filter in topic_filters
+            ):
+                # Subscribers always get QoS 0 deliveries, so the broker keeps no per message state
+                writer.write(encode_publish(topic, payload))
+
+    async def _track_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        handler = asyncio.current_task()
+        assert handler is not None  # nosec
+        self._handlers.add(handler)
+        try:
+            await self._serve_client(reader, writer)
+        finally:
+            self._handlers.discard(handler)
+
+    async def _serve_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        client_id = ""
+        try:
+            packet_type, _, body = await asyncio.wait_for(read_packet(reader), 10)
+            if packet_type != CONNECT:
+                return
+            client_id, keep_alive = self._parse_connect(body)
+            if self.authorize is not None and not self.authorize(client_id):
+                writer.write(
+                    encode_packet(
+                        CONNACK, 0, bytes([0, CONNECTION_REFUSED_NOT_AUTHORIZED])
+                    )
+                )
+                return
+
+            previous = self._clients.pop(client_id, None)
+            if previous is not None:
+                # IoT Core also disconnects the older connection of a duplicate client id
+                previous.close()
+            self._clients[client_id] = writer
+            self._subscriptions[writer] = set()
+            self.connections += 1
+            self.peak_connections = max(self.peak_connections, len(self._clients))
+            writer.write(encode_packet(CONNACK, 0, bytes([0, 0])))
+
+            await self._serve_packets(reader, writer, keep_alive)
+        except (
+            asyncio.IncompleteReadError,
+            asyncio.TimeoutError,
+            ConnectionError,
+            MqttError,
+        ):
+            pass
+        finally:
+            if self._clients.get(client_id) is writer:
+                del self._clients[client_id]
+            self._subscriptions.pop(writer, None)
+            writer.close()
+
+    @staticmethod
+    def _parse_connect(body: bytes) -> Tuple[str, int]:
+        protocol, offset = decode_string(body)
+        if protocol != "MQTT":
+            raise MqttError(f"Unsupported protocol {protocol}")
+        (keep_alive,) = struct.unpack_from("!H", body, offset + 2)
+        client_id, _ = decode_string(body, offset + 4)
+        return client_id, keep_alive
+
+    async def _serve_packets(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        keep_alive: int,
+    ) -> None:
+        # A client silent for one and a half keep-alive periods is considered gone
+        timeout = keep_alive * 1.5 if keep_alive else None
+        pending_acks: List["asyncio.Task[None]"] = []
+        while True:
+            packet_type, flags, body = await asyncio.wait_for(
+                read_packet(reader), timeout
+            )
+            if packet_type == PUBLISH:
+                topic, qos, packet_id, payload = decode_publish(flags, body)
+                self._route(topic, payload)
+                if qos:
+                    pending_acks.append(
+                        asyncio.create_task(
+                            self._ack(writer, PUBACK, struct.pack("!H", packet_id))
+                        )
+                    )
+            elif packet_type == SUBSCRIBE:
+                (packet_id,) = struct.unpack_from("!H", body)
+                topic_filter, offset = decode_string(body, 2)
+                self._subscriptions[writer].add(topic_filter)
+                granted = min(body[offset], 1)
+                writer.write(
+                    encode_packet(SUBACK, 0, struct.pack("!HB", packet_id, granted))
+                )
+            elif packet_type == PINGREQ:
+                writer.write(encode_packet(PINGRESP, 0))
+            elif packet_type == DISCONNECT:
+                await asyncio.gather(*pending_acks, return_exceptions=True)
+                return
+            pending_acks = [ack for ack in pending_acks if not ack.done()]
+
+    async def _ack(
+        self, writer: asyncio.StreamWriter, packet_type: int, body: bytes
+    ) -> None:
+        if self.ack_delay:
+            await asyncio.sleep(self.ack_delay)
+        if not writer.is_closing():
+            writer.write(encode_packet(packet_type, 0, body))
@@ -0,0 +1,415 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# Standard Library
+import argparse
+import asyncio
+import json
+import os
+import ssl
+import tempfile
+import time
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from uuid import uuid4
+
+# AWS Libraries
+import boto3
+
+# CMS Common Library
+from cms_common.serialization import decimal_default, dumps
+
+# Connected Mobility Solution on AWS
+from ..handlers.stepfunction.function.handlers import get_percentile
+from ..handlers.stepfunction.function.template_compiler import (
+    CompiledTemplate,
+    PublishedValues,
+)
+from .broker import LocalBroker
+from .mqtt import MqttClient, MqttError
+
+DEFAULT_TOPIC_PREFIX = "cms/data/simulated"
+# Offered by IoT Core on port 443 to tell MQTT apart from HTTPS
+IOT_CORE_MQTT_ALPN = "x-amzn-mqtt-ca"
+
+
+class DeviceCredentials(NamedTuple):
+    certificate_pem: str
+    private_key: str
+
+
+class FleetConfig(NamedTuple):
+    host: str
+    port: int = 8883
+    topic_prefix: str = DEFAULT_TOPIC_PREFIX
+    # Seconds between publishes of a device, and how long each device publishes for
+    interval: float = 1.0
+    duration: float = 60.0
+    qos: int = 1
+    connects_per_second: float = 50.0
+    keep_alive: int = 30
+    use_tls: bool = True
+    ca_file: Optional[str] = None
+    # Fleet provisioning template the devices register through when connecting with a claim certificate
+    provisioning_template: Optional[str] = None
+
+
+@lru_cache(maxsize=128)
+def get_secretsmanager_client() -> Any:
+    return boto3.client("secretsmanager")
+
+
+@lru_cache(maxsize=128)
+def get_iot_client() -> Any:
+    return boto3.client("iot")
+
+
+# Reads the keys and certificate the simulator's provisioning step stored for a device
+def load_device_credentials(device_name: str) -> DeviceCredentials:
+    secret = json.loads(
+        get_secretsmanager_client().get_secret_value(
+            SecretId=f"vs-device/{device_name}-secret"
+        )["SecretString"]
+    )
+    return DeviceCredentials(secret["certificatePem"], secret["keyPair"]["PrivateKey"])
+
+
+def get_ssl_context(
+    credentials: DeviceCredentials, ca_file: Optional[str], port: int
+) -> ssl.SSLContext:
+    context = ssl.create_default_context(cafile=ca_file)
+    # load_cert_chain only reads files, so the PEMs only touch disk while they are loaded
+    with tempfile.TemporaryDirectory() as credentials_dir:
+        certificate_path = os.path.join(credentials_dir, "certificate.pem")
+        private_key_path = os.path.join(credentials_dir, "private.key")
+        with open(certificate_path, "w", encoding="utf-8") as certificate_file:
+            certificate_file.write(credentials.certificate_pem)
+        with open(private_key_path, "w", encoding="utf-8") as private_key_file:
+            private_key_file.write(credentials.private_key)
+        context.load_cert_chain(certificate_path, private_key_path)
+    if port == 443:
+        context.set_alpn_protocols([IOT_CORE_MQTT_ALPN])
+    return context
+
+
+# Returns the thing name registered by claim and its new credentials
+async def provision_by_claim(
+    client: MqttClient, provisioning_template: str, parameters: Dict[str, str]
+) -> Tuple[str, DeviceCredentials]:
+    create_topic = "$aws/certificates/create/json"
+    provision_topic = (
+        f"$aws/provisioning-templates/{provisioning_template}/provision/json"
+    )
+    for topic in (create_topic, provision_topic):
+        await client.subscribe(f"{topic}/+")
+
+    await client.publish(create_topic, "{}", qos=1)
+    topic, payload = await client.wait_for_message(f"{create_topic}/+")
+    certificate = json.loads(payload)
+    if topic.endswith("/rejected"):
+        raise MqttError(f"CreateKeysAndCertificate rejected: {certificate}")
+
+    await client.publish(
+        provision_topic,
+        json.dumps(
+            {
+                "certificateOwnershipToken": certificate["certificateOwnershipToken"],
+                "parameters": parameters,
+            }
+        ),
+        qos=1,
+    )
+    topic, payload = await client.wait_for_message(f"{provision_topic}/+")
+    registration = json.loads(payload)
+    if topic.endswith("/rejected"):
+        raise MqttError(f"RegisterThing rejected: {registration}")
+
+    return registration["thingName"], DeviceCredentials(
+        certificate["certificatePem"], certificate["privateKey"]
+    )
+
+
+class FleetStats:
+    def __init__(self) -> None:
+        self.connect_latencies: List[float] = []
+        self.connect_failures = 0
+        self.device_failures = 0
+        self.messages = 0
+        self.ack_latencies: List[float] = []
+        self.connect_started = 0.0
+        self.connect_finished = 0.0
+        self.publish_started = 0.0
+        self.publish_finished = 0.0
+
+    def report(self, devices: int) -> Dict[str, Any]:
+        connect_seconds = self.connect_finished - self.connect_started
+        publish_seconds = self.publish_finished - self.publish_started
+        ack_latencies = sorted(self.ack_latencies)
+        connect_latencies = sorted(self.connect_latencies)
+
+        return {
+            "devices": devices,
+            "connected": len(connect_latencies),
+            "connect_failures": self.connect_failures,
+            "device_failures": self.device_failures,
+            "connects_per_second": (
+                round(len(connect_latencies) / connect_seconds, 2)
+                if connect_seconds
+                else 0.0
+            ),
+            "connect_latency_ms": {
+                f"p{percentile}": round(
+                    get_percentile(connect_latencies, percentile) * 1000, 3
+                )
+                for percentile in (50, 90, 99)
+            },
+            "messages": self.messages,
+            "messages_per_second": (
+                round(self.messages / publish_seconds, 2) if publish_seconds else 0.0
+            ),
+            "ack_latency_ms": {
+                f"p{percentile}": round(
+                    get_percentile(ack_latencies, percentile) * 1000, 3
+                )
+                for percentile in (50, 90, 99)
+            },
+        }
+
+
+# Every device is a coroutine that connects, publishes each interval for the duration, then disconnects
+class FleetEngine:
+    def __init__(
+        self,
+        template: CompiledTemplate,
+        device_names: List[str],
+        config: FleetConfig,
+        credentials_loader: Callable[
+            [str], DeviceCredentials
+        ] = load_device_credentials,
+        claim_credentials: Optional[DeviceCredentials] = None,
+    ) -> None:
+        self.template = template
+        self.device_names = device_names
+        self.config = config
+        self.credentials_loader = credentials_loader
+        self.claim_credentials = claim_credentials
+        self.stats = FleetStats()
+        self._next_connect = 0.0
+        self._connect_lock = asyncio.Lock()
+
+    async def run(self) -> Dict[str, Any]:
+        self.stats = FleetStats()
+        self.stats.connect_started = self._next_connect = time.monotonic()
+        results = await asyncio.gather(
+            *(
+                self.run_device(device_index, device_name)
+                for device_index, device_name in enumerate(self.device_names)
+            ),
+            return_exceptions=True,
+        )
+        self.stats.device_failures = sum(
+            isinstance(result, BaseException) for result in results
+        )
+        return self.stats.report(len(self.device_names))
+
+    async def _wait_for_connect_slot(self) -> None:
+        # Spacing connects out keeps the fleet under the account's connect rate instead of bursting every device
+        async with self._connect_lock:
+            delay = self._next_connect - time.monotonic()
+            self._next_connect = max(self._next_connect, time.monotonic()) + (
+                1 / self.config.connects_per_second
+            )
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _get_ssl_context(
+        self, credentials: Optional[DeviceCredentials]
+    ) -> Optional[ssl.SSLContext]:
+        if not self.config.use_tls or credentials is None:
+            return None
+        return get_ssl_context(credentials, self.config.ca_file, self.config.port)
+
+    async def connect_device(self, device_name: str) -> MqttClient:
+        credentials: Optional[DeviceCredentials] = None
+        if self.config.provisioning_template:
+            claim_client = MqttClient(
+                str(uuid4()),
+                self.config.host,
+                self.config.port,
+                self._get_ssl_context(self.claim_credentials),
+                self.config.keep_alive,
+            )
+            await claim_client.connect()
+            try:
+                device_name, credentials = await provision_by_claim(
+                    claim_client,
+                    self.config.provisioning_template,
+                    {"vin": device_name},
+                )
+            finally:
+                await claim_client.disconnect()
+        elif self.config.use_tls:
+            credentials = await asyncio.to_thread(self.credentials_loader, device_name)
+
+        # IoT Core policies tie the client id to the thing name
+        client = MqttClient(
+            device_name,
+            self.config.host,
+            self.config.port,
+            self._get_ssl_context(credentials),
+            self.config.keep_alive,
+        )
+        await client.connect()
+        return client
+
+    async def run_device(self, device_index: int, device_name: str) -> None:
+        await self._wait_for_connect_slot()
+        start = time.monotonic()
+        try:
+            client = await self.connect_device(device_name)
+        except (MqttError, OSError, asyncio.TimeoutError):
+            self.stats.connect_failures += 1
+            raise
+        connected = time.monotonic()
+        self.stats.connect_latencies.append(connected - start)
+        self.stats.connect_finished = max(self.stats.connect_finished, connected)
+        if not self.stats.publish_started:
+            self.stats.publish_started = connected
+
+        # Devices provisioned by claim publish as the thing they were registered as
+        topic = f"{self.config.topic_prefix}/{client.client_id}"
+        ticks = max(1, int(self.config.duration / self.config.interval))
+        published_values: PublishedValues = {}
+        try:
+            for counter in range(ticks):
+                runtime = counter * self.config.interval
+                if self.template.is_multi_rate:
+                    payload = dumps(
+                        self.template.generate_due(
+                            counter,
+                            self.config.interval,
+                            published_values,
+                            device_index=device_index,
+                            runtime=runtime,
+                        ),
+                        default=decimal_default,
+                    )
+                else:
+                    payload = self.template.encode(
+                        counter, device_index=device_index, runtime=runtime
+                    )
+
+                if payload != "{}":
+                    ack_latency = await client.publish(
+                        topic, payload, qos=self.config.qos
+                    )
+                    self.stats.messages += 1
+                    if ack_latency is not None:
+                        self.stats.ack_latencies.append(ack_latency)
+
+                # Devices keep to their schedule from the moment they connected rather than drifting with latency
+                await asyncio.sleep(
+                    max(
+                        0.0,
+                        connected + runtime + self.config.interval - time.monotonic(),
+                    )
+                )
+        finally:
+            self.stats.publish_finished = max(
+                self.stats.publish_finished, time.monotonic()
+            )
+            await client.disconnect()
+
+
+def get_iot_endpoint() -> str:
+    endpoint: str = get_iot_client().describe_endpoint(endpointType="iot:Data-ATS")[
+        "endpointAddress"
+    ]
+    return endpoint
+
+
+def load_claim_credentials(secret_id: str) -> DeviceCredentials:
+    secret = json.loads(
+        get_secretsmanager_client().get_secret_value(SecretId=secret_id)["SecretString"]
+    )
+    return DeviceCredentials(secret["certificatePem"], secret["keyPair"]["PrivateKey"])
+
+
+async def run_local(engine: FleetEngine) -> Dict[str, Any]:
+    async with LocalBroker(port=engine.config.port) as broker:
+        engine.config = engine.config._replace(
+            host=broker.host, port=broker.port, use_tls=False
+        )
+        report = await engine.run()
+        report["broker_peak_connections"] = broker.peak_connections
+        report["broker_publishes"] = broker.publishes
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Drives a fleet of long lived MQTT connections from one process with a device type template"
+    )
+    parser.add_argument(
+        "--device-type",
+        required=True,
+        help="JSON file of a simulator device type or template, with its payload attributes",
+    )
+    parser.add_argument("--device-prefix", default="fleet-device")
+    parser.add_argument("--devices", type=int, default=100)
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--duration", type=float, default=60.0)
+    parser.add_argument("--qos", type=int, choices=(0, 1), default=1)
+    parser.add_argument("--connect-rate", type=float, default=50.0)
+    parser.add_argument("--keep-alive", type=int, default=30)
+    parser.add_argument("--topic-prefix", default=DEFAULT_TOPIC_PREFIX)
+    parser.add_argument(
+        "--endpoint", help="Defaults to the account's IoT Core endpoint"
+    )
+    parser.add_argument("--port", type=int, default=8883)
+    parser.add_argument("--ca-file", help="Root CA, e.g. AmazonRootCA1.pem")
+    parser.add_argument(
+        "--claim-secret",
+        help="Secrets Manager id of a claim certificate; devices then provision by claim",
+    )
+    parser.add_argument("--provisioning-template")
+    parser.add_argument(
+        "--local", action="store_true", help="Run against an in-process broker"
+    )
+    args = parser.parse_args()
+    if args.provisioning_template and not (args.claim_secret or args.local):
+        parser.error("--provisioning-template needs the --claim-secret to connect with")
+
+    with open(args.device_type, "r", encoding="utf-8") as device_type_file:
+        template = CompiledTemplate(json.load(device_type_file)["payload"])
+
+    claim_credentials = (
+        load_claim_credentials(args.claim_secret)
+        if args.claim_secret and not args.local
+        else None
+    )
+    engine = FleetEngine(
+        template,
+        [f"{args.device_prefix}-{index}" for index in range(args.devices)],
+        FleetConfig(
+            host="" if args.local else args.endpoint or get_iot_endpoint(),
+            port=0 if args.local else args.port,
+            topic_prefix=args.topic_prefix,
+            interval=args.interval,
+            duration=args.duration,
+            qos=args.qos,
+            connects_per_second=args.connect_rate,
+            keep_alive=args.keep_alive,
+            ca_file=args.ca_file,
+            provisioning_template=None if args.local else args.provisioning_template,
+        ),
+        claim_credentials=claim_credentials,
+    )
+
+    report = asyncio.run(run_local(engine) if args.local else engine.run())
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
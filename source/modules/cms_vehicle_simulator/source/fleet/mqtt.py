@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# Minimal asyncio MQTT 3.1.1 client, a pair of coroutines per connection instead of a thread
+
+# Standard Library
+import asyncio
+import ssl
+import struct
+import time
+from typing import Dict, Optional, Tuple, Union
+
+CONNECT = 1
+CONNACK = 2
+PUBLISH = 3
+PUBACK = 4
+SUBSCRIBE = 8
+SUBACK = 9
+PINGREQ = 12
+PINGRESP = 13
+DISCONNECT = 14
+
+PROTOCOL_LEVEL = 4
+CLEAN_SESSION = 0x02
+PASSWORD_FLAG = 0x40
+USERNAME_FLAG = 0x80
+
+Message = Tuple[str, bytes]
+
+
+class MqttError(Exception):
+    pass
+
+
+def encode_string(value: str) -> bytes:
+    encoded = value.encode("utf-8")
+    return struct.pack("!H", len(encoded)) + encoded
+
+
+def decode_string(data: bytes, offset: int = 0) -> Tuple[str, int]:
+    (length,) = struct.unpack_from("!H", data, offset)
+    start = offset + 2
+    return data[start : start + length].decode("utf-8"), start + length
+
+
+def encode_packet(packet_type: int, flags: int, body: bytes = b"") -> bytes:
+    header = bytearray([(packet_type << 4) | flags])
+    remaining = len(body)
+    while True:
+        digit = remaining % 128
+        remaining //= 128
+        header.append(digit | 0x80 if remaining else digit)
+        if not remaining:
+            return bytes(header) + body
+
+
+# Returns the (packet type, flags, body) of the next packet
+async def read_packet(reader: asyncio.StreamReader) -> Tuple[int, int, bytes]:
+    first_byte = (await reader.readexactly(1))[0]
+    remaining = 0
+    for shift in range(0, 28, 7):
+        digit = (await reader.readexactly(1))[0]
+        remaining |= (digit & 0x7F) << shift
+        if not digit & 0x80:
+            break
+    else:
+        raise MqttError("Malformed remaining length")
+
+    body = await reader.readexactly(remaining) if remaining else b""
+    return first_byte >> 4, first_byte & 0x0F, body
+
+
+def encode_connect(
+    client_id: str,
+    keep_alive: int,
+    clean_session: bool = True,
+    username: Optional[str] = None,
+    password: Optional[str] = None,
+) -> bytes:
+    flags = CLEAN_SESSION if clean_session else 0
+    payload = encode_string(client_id)
+    if username is not None:
+        flags |= USERNAME_FLAG
+        payload += encode_string(username)
+    if password is not None:
+        flags |= PASSWORD_FLAG
+        payload += encode_string(password)
+
+    body = (
+        encode_string("MQTT")
+        + bytes([PROTOCOL_LEVEL, flags])
+        + struct.pack("!H", keep_alive)
+    )
+    return encode_packet(CONNECT, 0, body + payload)
+
+
+def encode_publish(
+    topic: str, payload: bytes, qos: int = 0, packet_id: Optional[int] = None
+) -> bytes:
+    body = encode_string(topic)
+    if qos:
+        body += struct.pack("!H", packet_id)
+    return encode_packet(PUBLISH, qos << 1, body + payload)
+
+
+# Returns the (topic, qos, packet id, payload) of a PUBLISH body
+def decode_publish(flags: int, body: bytes) -> Tuple[str, int, Optional[int], bytes]:
+    topic, offset = decode_string(body)
+    qos = (flags >> 1) & 0x03
+    packet_id = None
+    if qos:
+        (packet_id,) = struct.unpack_from("!H", body, offset)
+        offset += 2
+    return topic, qos, packet_id, body[offset:]
+
+
+def topic_matches(topic_filter: str, topic: str) -> bool:
+    filter_levels = topic_filter.split("/")
+    topic_levels = topic.split("/")
+    for index, level in enumerate(filter_levels):
+        if level == "#":
+            return True
+        if index >= len(topic_levels) or level not in ("+", topic_levels[index]):
+            return False
+    return len(filter_levels) == len(topic_levels)
+
+
+# One device connection
+class MqttClient:  # pylint: disable=too-many-instance-attributes
+    def __init__(
+        self,
+        client_id: str,
+        host: str,
+        port: int,
+        ssl_context: Optional[ssl.SSLContext] = None,
+        keep_alive: int = 30,
+    ) -> None:
+        self.client_id = client_id
+        self.host = host
+        self.port = port
+        self.ssl_context = ssl_context
+        self.keep_alive = keep_alive
+        self.messages: "asyncio.Queue[Message]" = asyncio.Queue()
+        self.connected = False
+
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._pending: Dict[int, "asyncio.Future[bytes]"] = {}
+        self._next_packet_id = 0
+        self._last_sent = 0.0
+        self._tasks: Tuple["asyncio.Task[None]", ...] = ()
+
+    async def connect(
+        self,
+        timeout: float = 10.0,
+        clean_session: bool = True,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+    ) -> None:
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, ssl=self.ssl_context),
+            timeout,
+        )
+        self._write(
+            encode_connect(
+                self.client_id, self.keep_alive, clean_session, username, password
+            )
+        )
+
+        packet_type, _, body = await asyncio.wait_for(
+            read_packet(self._reader), timeout
+        )
+        if packet_type != CONNACK or len(body) != 2:
+            await self._close()
+            raise MqttError(f"Expected CONNACK, got packet type {packet_type}")
+        if body[1]:
+            await self._close()
+            raise MqttError(f"Connection refused with return code {body[1]}")
+
+        self.connected = True
+        self._tasks = (
+            asyncio.create_task(self._read_loop()),
+            asyncio.create_task(self._keep_alive_loop()),
+        )
+
+    # A QoS 1 publish waits for its PUBACK and returns the ack latency in seconds
+    async def publish(
+        self, topic: str, payload: Union[bytes, str], qos: int = 0
+    ) -> Optional[float]:
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        if not qos:
+            self._write(encode_publish(topic, payload))
+            return None
+
+        start = time.perf_counter()
+        packet_id, acked = self._new_pending()
+        self._write(encode_publish(topic, payload, qos, packet_id))
+        await acked
+        return time.perf_counter() - start
+
+    # Returns the granted QoS
+    async def subscribe(self, topic_filter: str, qos: int = 1) -> int:
+        packet_id, acked = self._new_pending()
+        self._write(
+            encode_packet(
+                SUBSCRIBE,
+                0x02,
+                struct.pack("!H", packet_id)
+                + encode_string(topic_filter)
+                + bytes([qos]),
+            )
+        )
+        granted = (await acked)[0]
+        if granted == 0x80:
+            raise MqttError(f"Subscription to {topic_filter} was refused")
+        return granted
+
+    # Drops messages on topics that don't match topic_filter
+    async def wait_for_message(
+        self, topic_filter: str = "#", timeout: float = 10.0
+    ) -> Message:
+        deadline = time.monotonic() + timeout
+        while True:
+            topic, payload = await asyncio.wait_for(
+                self.messages.get(), max(0.0, deadline - time.monotonic())
+            )
+            if topic_matches(topic_filter, topic):
+                return topic, payload
+
+    async def disconnect(self) -> None:
+        if self.connected:
+            self._write(encode_packet(DISCONNECT, 0))
+        await self._close()
+
+    def _new_pending(self) -> Tuple[int, "asyncio.Future[bytes]"]:
+        if not self.connected:
+            raise MqttError("Not connected")
+        self._next_packet_id = self._next_packet_id % 0xFFFF + 1
+        future: "asyncio.Future[bytes]" = asyncio.get_running_loop().create_future()
+        self._pending[self._next_packet_id] = future
+        return self._next_packet_id, future
+
+    def _write(self, packet: bytes) -> None:
+        if self._writer is None:
+            raise MqttError("Not connected")
+        self._writer.write(packet)
+        self._last_sent = time.monotonic()
+
+    async def _read_loop(self) -> None:
+        assert self._reader is not None  # nosec
+        try:
+            while True:
+                packet_type, flags, body = await read_packet(self._reader)
+                if packet_type in (PUBACK, SUBACK):
+                    (packet_id,) = struct.unpack_from("!H", body)
+                    future = self._pending.pop(packet_id, None)
+                    if future is not None and not future.done():
+                        future.set_result(body[2:])
+                elif packet_type == PUBLISH:
+                    topic, qos, packet_id, payload = decode_publish(flags, body)
+                    if qos:
+                        self._write(
+                            encode_packet(PUBACK, 0, struct.pack("!H", packet_id))
+                        )
+                    self.messages.put_nowait((topic, payload))
+        except (asyncio.IncompleteReadError, ConnectionError, MqttError) as err:
+            self._fail_pending(MqttError(f"Connection lost: {err!r}"))
+        finally:
+            self.connected = False
+
+    async def _keep_alive_loop(self) -> None:
+        # Ping at half the keep-alive so the broker never sees a silent connection
+        while self.connected and self.keep_alive:
+            idle = time.monotonic() - self._last_sent
+            if idle >= self.keep_alive / 2:
+                self._write(encode_packet(PINGREQ, 0))
+                idle = 0.0
+            await asyncio.sleep(self.keep_alive / 2 - idle)
+
+    def _fail_pending(self, error: Exception) -> None:
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
+
+    async def _close(self) -> None:
+        self.connected = False
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._fail_pending(MqttError("Disconnected"))
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except (ConnectionError, ssl.SSLError):
+                pass
+            self._writer = None
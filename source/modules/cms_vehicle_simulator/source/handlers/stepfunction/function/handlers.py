@@ -3,49 +3,113 @@
 # SPDX-License-Identifier: Apache-2.0
 
 # Standard Library
-import json
+import math
 import os
-from typing import Any, Dict
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# Third Party Libraries
+import arrow
 
 # AWS Libraries
 import boto3
-from aws_lambda_powertools import Logger, Tracer
+from aws_lambda_powertools import Logger, Metrics, Tracer
 from aws_lambda_powertools.utilities.typing import LambdaContext
 from boto3.dynamodb.types import TypeDeserializer
 from botocore.config import Config
 
+# CMS Common Library
+from cms_common.boto3_wrappers.dynamo_crud import DynHelpers
+from cms_common.boto3_wrappers.instrumentation import PowertoolsMetricsSink
+from cms_common.serialization import (
+    COMPACT_ENCODING,
+    decimal_default,
+    dumps,
+    encode_compact,
+)
+
 # Connected Mobility Solution on AWS
-from .provision import DeviceProvisioner
-from .random_sim import GenericSim
+from .provision import (
+    IOT_REQUESTS_PER_SECOND,
+    SECRETS_MANAGER_REQUESTS_PER_SECOND,
+    DeviceProvisioner,
+)
+from .template_compiler import CompiledTemplate, compiled_templates, is_due
 
 tracer = Tracer()
 logger = Logger()
+metrics = Metrics(namespace="cms/vehicle-simulator")
 
+# The DynamoDB calls of every handler below are flushed as they happen, with their table as a dimension,
+# so the handlers aren't wrapped in log_metrics, which would warn on every invocation that it had nothing to flush
+DynHelpers.metrics_sink = PowertoolsMetricsSink(metrics)
 
-@logger.inject_lambda_context
-@tracer.capture_lambda_handler
-def provision_handler(event: Dict[str, Any], context: LambdaContext) -> None:
-    region, account_id = context.invoked_function_arn.split(":", 5)[2:4]
-    provisioner = DeviceProvisioner(
-        account_id,
-        region,
-        event["simulation"]["sim_id"],
-        user_agent_string=os.environ["USER_AGENT_STRING"],
+# Upper bound on concurrent publishes from a single batch invocation, also used to size the client's connection pool
+MAX_PUBLISH_WORKERS = 32
+# Time left for in flight deletions to finish before a cleanup invocation hands over to the next one
+CLEANUP_TIME_BUFFER_MS = 10000
+# Time left for the devices in flight to finish before a provisioning invocation hands the rest to the next one
+PROVISIONING_TIME_BUFFER_MS = 120000
+
+
+@lru_cache(maxsize=1)
+def get_iot_data_client() -> Any:
+    return boto3.client(
+        "iot-data",
+        config=Config(
+            user_agent_extra=os.environ["USER_AGENT_STRING"],
+            max_pool_connections=MAX_PUBLISH_WORKERS,
+        ),
     )
 
-    device_name = f"{event['info']['name']['S']}-{event['index']}"
 
-    secrets = provisioner.create_device_secrets(device_name)
-    provisioner.create_thing(device_name, secrets["keys"]["certificateArn"])
+@lru_cache(maxsize=1)
+def get_lambda_client() -> Any:
+    return boto3.client(
+        "lambda", config=Config(user_agent_extra=os.environ["USER_AGENT_STRING"])
+    )
 
 
-@logger.inject_lambda_context
-@tracer.capture_lambda_handler
-def data_sim_handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
-    simulation = event["simulation"]
-    options: Dict[str, Any] = event.get("options", {"restart": False})
-    options["context"] = context
+def get_device_topic(device_name: str) -> str:
+    # default topic prefix for tests
+    return f"{os.environ.get('TOPIC_PREFIX', 'cms/data/simulated')}/{device_name}"
+
+
+def get_device_indexes(event: Dict[str, Any]) -> range:
+    if "batch" not in event:
+        return range(int(event["index"]), int(event["index"]) + 1)
+
+    start_index = int(event["batch"]["start_index"])
+    end_index = start_index + int(event["batch"]["size"])
+    # The last slice of a device type stops at its amount of devices
+    return range(
+        start_index, min(end_index, int(event["batch"].get("amount", end_index)))
+    )
+
+
+# Every batch of the simulation provisions at the same time, so they split the account's API quotas
+def get_concurrent_batches(event: Dict[str, Any]) -> int:
+    batch_size = int(event["batch"]["size"])
+    return max(
+        1,
+        sum(
+            math.ceil(int(device["amount"]) / batch_size)
+            for device in event["simulation"].get("devices", [])
+        ),
+    )
+
+
+def get_device_names(event: Dict[str, Any]) -> List[str]:
+    return [
+        f"{event['info']['name']['S']}-{index}" for index in get_device_indexes(event)
+    ]
 
+
+def advance_options(
+    simulation: Dict[str, Any], options: Dict[str, Any]
+) -> Dict[str, Any]:
     try:
         options["counter"] += 1
     except KeyError:
@@ -59,51 +123,291 @@ def data_sim_handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str,
         # something is wrong with interval
         options["runtime"] = int(simulation["duration"])
 
-    # handle device stage
-    sim_fields = TypeDeserializer().deserialize(event["info"]["payload"])
-    logger.info("sim fields", extra={"simfields": sim_fields})
-    data = {}
-    for field in sim_fields:
-        if field.get("static"):
-            data[field["name"]] = (
-                field.get("default")
-                or event.get("devices", {}).get(field["name"])
-                or getattr(GenericSim, f"generic_sim_{field['type']}")(
-                    field, counter=options["counter"]
-                )
+    return options
+
+
+def get_device_type_fields(type_id: str) -> List[Dict[str, Any]]:
+    device_type = DynHelpers.get_item(
+        os.environ["DEVICE_TYPES_TABLE"], {"type_id": type_id}
+    )
+    sim_fields: List[Dict[str, Any]] = device_type["payload"]
+    return sim_fields
+
+
+# The template is read the first time a container sees its version, then its compiled form is reused
+def get_compiled_template(event: Dict[str, Any]) -> CompiledTemplate:
+    type_id = event.get("type_id")
+    version = event["info"].get("version", {}).get("S")
+
+    def load_fields() -> List[Dict[str, Any]]:
+        if "payload" in event["info"]:
+            # Runs started before templates were passed by reference still carry the whole template
+            sim_fields: List[Dict[str, Any]] = TypeDeserializer().deserialize(
+                event["info"]["payload"]
             )
         else:
-            data[field["name"]] = getattr(GenericSim, f"generic_sim_{field['type']}")(
-                field, counter=options["counter"]
-            )
+            sim_fields = get_device_type_fields(event["type_id"])
+        logger.info(
+            "compiling sim fields", extra={"type_id": type_id, "version": version}
+        )
+        return sim_fields
 
-    iot_endpoint = boto3.client(
-        "iot-data", config=Config(user_agent_extra=os.environ["USER_AGENT_STRING"])
-    )
-    iot_endpoint.publish(
-        topic=f"{os.environ.get('TOPIC_PREFIX', 'cms/data/simulated')}/{event['info']['name']['S']}-{event['index']}",  # default topic prefix for tests
-        payload=json.dumps(data),
+    return compiled_templates.get(type_id, version, load_fields)
+
+
+# Returns None when the device has nothing to publish this tick
+def encode_payload(
+    template: CompiledTemplate,
+    event: Dict[str, Any],
+    options: Dict[str, Any],
+    device_index: int,
+) -> Optional[Union[str, bytes]]:
+    simulation = event["simulation"]
+    compact = simulation.get("payload_encoding") == COMPACT_ENCODING
+    if not template.is_multi_rate and not compact:
+        payload = template.encode(
+            options["counter"],
+            event.get("devices", {}),
+            device_index=device_index,
+            runtime=options["runtime"],
+        )
+        # Devices with no signal due or changed this tick have nothing to publish
+        return None if payload == "{}" else payload
+
+    if not template.is_multi_rate:
+        data = template.generate(
+            options["counter"],
+            event.get("devices", {}),
+            device_index=device_index,
+            runtime=options["runtime"],
+        )
+    else:
+        interval = float(simulation["interval"])
+        snapshot_interval = simulation.get("snapshot_interval")
+        # The next tick can run in another container, so the values the thresholds compare against travel
+        # in the state machine payload, and only for devices with a thresholded signal
+        published_values = options.setdefault("published_values", {})
+        device_values = published_values.get(str(device_index), {})
+        data = template.generate_due(
+            options["counter"],
+            interval,
+            device_values,
+            event.get("devices", {}),
+            device_index=device_index,
+            runtime=options["runtime"],
+            snapshot=bool(snapshot_interval)
+            and is_due(float(snapshot_interval), options["runtime"], interval),
+        )
+        if device_values:
+            published_values[str(device_index)] = device_values
+
+    if not data:
+        return None
+    return encode_compact(data) if compact else dumps(data, default=decimal_default)
+
+
+def publish_payload(device_name: str, payload: Union[str, bytes]) -> float:
+    start = time.perf_counter()
+    get_iot_data_client().publish(
+        topic=get_device_topic(device_name),
+        payload=payload,
         qos=0,
     )
+    return time.perf_counter() - start
 
-    del options["context"]
 
-    return options
+def get_percentile(sorted_values: List[float], percentile: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(
+        len(sorted_values) - 1, int(round(percentile / 100 * (len(sorted_values) - 1)))
+    )
+    return sorted_values[index]
+
+
+def publish_batch(payloads: List[Tuple[str, Union[str, bytes]]]) -> Dict[str, Any]:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(MAX_PUBLISH_WORKERS, len(payloads)))
+    ) as executor:
+        latencies = sorted(
+            executor.map(lambda payload: publish_payload(*payload), payloads)
+        )
+    elapsed = time.perf_counter() - start
+
+    return {
+        "messages": len(latencies),
+        "elapsed_seconds": round(elapsed, 6),
+        "messages_per_second": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "publish_latency_ms": {
+            f"p{percentile}": round(get_percentile(latencies, percentile) * 1000, 3)
+            for percentile in (50, 90, 99)
+        },
+    }
+
+
+def register_publish_only_devices(
+    simulation_id: str, device_type_name: str, amount: int
+) -> None:
+    # Publish only devices have no thing, so the simulation item keeps how to find them for each device type.
+    # Device i publishes to the topic with {index} replaced by i, for every i below amount.
+    DynHelpers.update_item(
+        os.environ["SIM_TABLE"],
+        {"sim_id": simulation_id},
+        "SET publish_only_devices = if_not_exists(publish_only_devices, :devices)",
+        {":devices": {}},
+    )
+    DynHelpers.update_item(
+        os.environ["SIM_TABLE"],
+        {"sim_id": simulation_id},
+        "SET publish_only_devices.#device_type = :devices",
+        {
+            ":devices": {
+                "topic": get_device_topic(f"{device_type_name}-{{index}}"),
+                "amount": amount,
+            }
+        },
+        expression_attribute_names={"#device_type": device_type_name},
+    )
 
 
 @logger.inject_lambda_context
 @tracer.capture_lambda_handler
-def cleanup_handler(event: Dict[str, Any], context: LambdaContext) -> None:
+def provision_handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
+    device_names = get_device_names(event)
+
+    if event["simulation"].get("publish_only"):
+        # data_sim_handler publishes with the lambda's own role, so a device only needs its name and topic
+        # Every batch of a device type records the same entry, so retried batches and later runs overwrite it
+        register_publish_only_devices(
+            event["simulation"]["sim_id"],
+            event["info"]["name"]["S"],
+            int(event["batch"]["amount"]),
+        )
+        logger.info("registered publish only devices: %s", device_names)
+        return {"complete": True}
+
     region, account_id = context.invoked_function_arn.split(":", 5)[2:4]
-    device_provisioner = DeviceProvisioner(
+    provisioner = DeviceProvisioner(
         account_id,
         region,
         event["simulation"]["sim_id"],
         user_agent_string=os.environ["USER_AGENT_STRING"],
     )
 
-    for secret_arn in device_provisioner.get_simulated_secrets():
-        device_provisioner.delete_secretsmanager_secret(secret_arn)
+    if "batch" in event:
+        concurrent_batches = get_concurrent_batches(event)
+        # The state machine invokes the batch again with the devices an earlier invocation had no time for
+        report = provisioner.provision_devices(
+            event.get("provisioning", {}).get("pending_devices", device_names),
+            lambda: context.get_remaining_time_in_millis()
+            > PROVISIONING_TIME_BUFFER_MS,
+            iot_requests_per_second=IOT_REQUESTS_PER_SECOND / concurrent_batches,
+            secrets_manager_requests_per_second=SECRETS_MANAGER_REQUESTS_PER_SECOND
+            / concurrent_batches,
+        )
+        if report["failed"]:
+            raise RuntimeError(f"Failed to provision devices: {report['failed']}")
+        return {"complete": not report["pending"], "pending_devices": report["pending"]}
+
+    secrets = provisioner.create_device_secrets(device_names[0])
+    provisioner.create_thing(device_names[0], secrets["keys"]["certificateArn"])
+    return {"complete": True}
+
+
+@logger.inject_lambda_context
+@tracer.capture_lambda_handler
+def data_sim_handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
+    simulation = event["simulation"]
+    options: Dict[str, Any] = event.get("options", {"restart": False})
+    options["context"] = context
+    advance_options(simulation, options)
+
+    # handle device stage
+    template = get_compiled_template(event)
+
+    if "batch" in event:
+        # A batch invocation owns a contiguous slice of the device map. The devices in a slice are
+        # ticked in lock-step, so the slice shares a single counter/runtime just like a lone device.
+        device_payloads = (
+            (
+                f"{event['info']['name']['S']}-{index}",
+                encode_payload(template, event, options, index),
+            )
+            for index in get_device_indexes(event)
+        )
+        payloads = [
+            (device_name, payload)
+            for device_name, payload in device_payloads
+            if payload is not None
+        ]
+        options["stats"] = publish_batch(payloads)
+        logger.info("published batch", extra={"stats": options["stats"]})
+    else:
+        payload = encode_payload(template, event, options, int(event["index"]))
+        if payload is not None:
+            publish_payload(f"{event['info']['name']['S']}-{event['index']}", payload)
+
+    del options["context"]
+
+    return options
+
+
+def update_cleanup_job(simulation_id: str, cleanup_job: Dict[str, Any]) -> None:
+    cleanup_job["updated_datetime"] = arrow.utcnow().isoformat()
+    DynHelpers.update_item(
+        os.environ["SIM_TABLE"],
+        {"sim_id": simulation_id},
+        "SET cleanup = :cleanup",
+        {":cleanup": cleanup_job},
+    )
+
+
+@logger.inject_lambda_context
+@tracer.capture_lambda_handler
+def cleanup_handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
+    # Present when the API started the cleanup, which then reads its progress from the simulation item
+    cleanup_job: Optional[Dict[str, Any]] = event.get("cleanup_job")
+    progress: Dict[str, Any] = {
+        "deleted_secrets": 0,
+        "deleted_things": 0,
+        "failed": 0,
+        "complete": True,
+    }
+
+    if event["simulation"].get("publish_only"):
+        logger.info(
+            "nothing to clean up for publish only simulation: %s",
+            event["simulation"]["sim_id"],
+        )
+    else:
+        region, account_id = context.invoked_function_arn.split(":", 5)[2:4]
+        device_provisioner = DeviceProvisioner(
+            account_id,
+            region,
+            event["simulation"]["sim_id"],
+            user_agent_string=os.environ["USER_AGENT_STRING"],
+        )
+        progress = device_provisioner.cleanup_devices(
+            lambda: context.get_remaining_time_in_millis() > CLEANUP_TIME_BUFFER_MS
+        )
+
+    if cleanup_job is not None:
+        for counter in ("deleted_secrets", "deleted_things", "failed"):
+            cleanup_job[counter] = int(cleanup_job.get(counter, 0)) + progress[counter]
+        if not progress["complete"]:
+            cleanup_job["status"] = "running"
+        else:
+            cleanup_job["status"] = "failed" if cleanup_job["failed"] else "complete"
+        update_cleanup_job(event["simulation"]["sim_id"], cleanup_job)
+
+    if not progress["complete"]:
+        # Out of time with devices left, so hand the rest of the teardown to a fresh invocation
+        logger.info("continuing cleanup", extra={"progress": progress})
+        get_lambda_client().invoke(
+            FunctionName=context.function_name,
+            InvocationType="Event",
+            Payload=dumps({**event, "cleanup_job": cleanup_job}, default=str),
+        )
 
-    for thing in device_provisioner.get_simulated_things():
-        device_provisioner.delete_iot_thing(thing["thingName"])
+    return cleanup_job if cleanup_job is not None else progress
@@ -4,9 +4,24 @@
 
 # Standard Library
 import json
+import math
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
-from typing import TYPE_CHECKING, Any, Dict, Generator
+from threading import Lock
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    TypeVar,
+)
 
 # AWS Libraries
 import boto3
@@ -14,6 +29,9 @@ from aws_lambda_powertools import Logger
 from botocore.config import Config
 from botocore.exceptions import ClientError
 
+# CMS Common Library
+from cms_common.boto3_wrappers.rate_limiter import AdaptiveTokenBucket
+
 if TYPE_CHECKING:
     # Third Party Libraries
     from mypy_boto3_iot.client import IoTClient
@@ -29,6 +47,28 @@ else:
 
 logger = Logger()
 
+T = TypeVar("T")
+
+# Upper bound on devices provisioned at once by the bulk path, also used to size the clients' connection pools
+MAX_PROVISIONING_WORKERS = 16
+# Default per-API request rates, kept under the IoT Core control plane and Secrets Manager write quotas
+IOT_REQUESTS_PER_SECOND = 10.0
+SECRETS_MANAGER_REQUESTS_PER_SECOND = 40.0
+
+
+def call_limited(
+    limiter: Optional[AdaptiveTokenBucket], function: Callable[..., T], **kwargs: Any
+) -> T:
+    # The single device methods are also called without a limiter
+    if limiter is None:
+        return function(**kwargs)
+    return limiter.call(function, **kwargs)
+
+
+# Bounds the workers by the rate, so the calls in flight when should_continue turns false finish in a few seconds
+def get_max_workers(max_workers: int, requests_per_second: float) -> int:
+    return max(1, min(max_workers, math.ceil(requests_per_second)))
+
 
 class DeviceProvisioner:
     def __init__(
@@ -42,17 +82,26 @@ class DeviceProvisioner:
         self.aws_region = aws_region
         self.simulation_id = simulation_id
         self.user_agent_string = user_agent_string
+        self.shared_policy_name = f"vs-simulation-{simulation_id}-policy"
 
     @lru_cache(128)
     def iot_client(self) -> IoTClient:
         return boto3.client(
-            "iot", config=Config(user_agent_extra=self.user_agent_string)
+            "iot",
+            config=Config(
+                user_agent_extra=self.user_agent_string,
+                max_pool_connections=MAX_PROVISIONING_WORKERS,
+            ),
         )
 
     @lru_cache(128)
     def secret_manager_client(self) -> SecretsManagerClient:
         return boto3.client(
-            "secretsmanager", config=Config(user_agent_extra=self.user_agent_string)
+            "secretsmanager",
+            config=Config(
+                user_agent_extra=self.user_agent_string,
+                max_pool_connections=MAX_PROVISIONING_WORKERS,
+            ),
         )
 
     @lru_cache(128)
@@ -150,6 +199,165 @@ class DeviceProvisioner:
 
         return thing_info
 
+    def create_shared_policy(self) -> None:
+        # One policy for every device of the simulation, scoped to each device's own topic by its thing name
+        try:
+            self.iot_client().create_policy(
+                policyName=self.shared_policy_name,
+                policyDocument=json.dumps(
+                    {
+                        "Version": "2012-10-17",
+                        "Statement": [
+                            {
+                                "Effect": "Allow",
+                                "Action": "iot:Connect",
+                                "Resource": f"arn:aws:iot:{self.aws_region}:{self.aws_account_id}:client/${{iot:Connection.Thing.ThingName}}",
+                            },
+                            {
+                                "Effect": "Allow",
+                                "Action": "iot:Publish",
+                                "Resource": f"arn:aws:iot:{self.aws_region}:{self.aws_account_id}:topic/{os.environ.get('TOPIC_PREFIX', 'cms/data/simulated')}/${{iot:Connection.Thing.ThingName}}",
+                            },
+                        ],
+                    }
+                ),
+            )
+            logger.info("created shared policy: %s", self.shared_policy_name)
+
+        except ClientError as err:
+            if err.response["Error"]["Code"] != "ResourceAlreadyExistsException":
+                logger.error(
+                    "Error creating shared policy %s. Here's why: %s: %s",
+                    self.shared_policy_name,
+                    err.response["Error"]["Code"],
+                    err.response["Error"]["Message"],
+                    exc_info=True,
+                )
+                raise
+
+    def get_or_create_device_keys(
+        self,
+        device_name: str,
+        iot_limiter: AdaptiveTokenBucket,
+        secrets_limiter: AdaptiveTokenBucket,
+    ) -> Dict[str, Any]:
+        secret_name = f"vs-device/{device_name}-secret"
+        try:
+            secret = secrets_limiter.call(
+                self.secret_manager_client().get_secret_value, SecretId=secret_name
+            )
+            # Resuming a device whose secret was stored by an earlier attempt, so keep using its certificate
+            keys_and_cert: Dict[str, Any] = json.loads(secret["SecretString"])
+            return keys_and_cert
+        except ClientError as err:
+            if err.response["Error"]["Code"] != "ResourceNotFoundException":
+                raise
+
+        keys_and_cert = dict(
+            iot_limiter.call(self.iot_client().create_keys_and_certificate)
+        )
+        secrets_limiter.call(
+            self.secret_manager_client().create_secret,
+            Name=secret_name,
+            Description=f"Keys and certificate for device {device_name} connecting to iot-core",
+            SecretString=json.dumps(keys_and_cert),
+            Tags=[{"Key": "cms-simulated-vehicle", "Value": self.simulation_id}],
+        )
+
+        return keys_and_cert
+
+    def provision_device(
+        self,
+        device_name: str,
+        iot_limiter: AdaptiveTokenBucket,
+        secrets_limiter: AdaptiveTokenBucket,
+    ) -> None:
+        keys_and_cert = self.get_or_create_device_keys(
+            device_name, iot_limiter, secrets_limiter
+        )
+        certificate_arn = keys_and_cert["certificateArn"]
+
+        iot_limiter.call(
+            self.iot_client().attach_policy,
+            policyName=self.shared_policy_name,
+            target=certificate_arn,
+        )
+        iot_limiter.call(
+            self.iot_client().create_thing,
+            thingName=device_name,
+            attributePayload={"attributes": {"simulation_id": self.simulation_id}},
+        )
+        iot_limiter.call(
+            self.iot_client().add_thing_to_thing_group,
+            thingName=device_name,
+            thingGroupName=os.environ.get("SIMULATOR_THING_GROUP_NAME", ""),
+        )
+        iot_limiter.call(
+            self.iot_client().attach_thing_principal,
+            thingName=device_name,
+            principal=certificate_arn,
+        )
+
+    # The workers share one rate limiter per service. Every step of a device is idempotent, and its
+    # certificate is reused from the stored secret, so a device left pending is simply run again.
+    def provision_devices(
+        self,
+        device_names: List[str],
+        should_continue: Callable[[], bool] = lambda: True,
+        max_workers: int = MAX_PROVISIONING_WORKERS,
+        iot_requests_per_second: float = IOT_REQUESTS_PER_SECOND,
+        secrets_manager_requests_per_second: float = SECRETS_MANAGER_REQUESTS_PER_SECOND,
+    ) -> Dict[str, Any]:
+        start = time.perf_counter()
+        iot_limiter = AdaptiveTokenBucket(iot_requests_per_second)
+        secrets_limiter = AdaptiveTokenBucket(secrets_manager_requests_per_second)
+
+        iot_limiter.call(self.create_shared_policy)
+        started: Set[str] = set()
+        failed: List[str] = []
+        started_lock = Lock()
+
+        def provision(device_name: str) -> None:
+            if not should_continue():
+                return
+            with started_lock:
+                started.add(device_name)
+            try:
+                self.provision_device(device_name, iot_limiter, secrets_limiter)
+            except ClientError as err:
+                logger.error(
+                    "Error provisioning device %s. Here's why: %s: %s",
+                    device_name,
+                    err.response["Error"]["Code"],
+                    err.response["Error"]["Message"],
+                    exc_info=True,
+                )
+                with started_lock:
+                    failed.append(device_name)
+
+        with ThreadPoolExecutor(
+            max_workers=min(
+                get_max_workers(max_workers, iot_requests_per_second),
+                max(1, len(device_names)),
+            )
+        ) as executor:
+            list(executor.map(provision, device_names))
+
+        elapsed = time.perf_counter() - start
+        created = len(started) - len(failed)
+        report = {
+            "provisioned": created,
+            "failed": failed,
+            # Devices not started before should_continue turned false, in their original order
+            "pending": [name for name in device_names if name not in started],
+            "throttles": iot_limiter.throttles + secrets_limiter.throttles,
+            "elapsed_seconds": round(elapsed, 6),
+            "devices_per_second": round(created / elapsed, 2) if elapsed else 0.0,
+        }
+        logger.info("provisioned devices", extra={"report": report})
+
+        return report
+
     def get_simulated_secrets(self) -> Generator[str, None, None]:
         get_resources_iterator = (
             self.tagging_client()
@@ -180,7 +388,6 @@ class DeviceProvisioner:
             .paginate(
                 attributeName="simulation_id",
                 attributeValue=self.simulation_id,
-                usePrefixAttributeValue=True,
             )
         )
 
@@ -188,16 +395,27 @@ class DeviceProvisioner:
             for thing in page["things"]:
                 yield dict(thing)
 
-    def delete_iot_thing(self, thing_name: str) -> None:
+    def delete_iot_thing(
+        self, thing_name: str, iot_limiter: Optional[AdaptiveTokenBucket] = None
+    ) -> None:
         try:
-            principals = self.iot_client().list_thing_principals(thingName=thing_name)
+            principals = call_limited(
+                iot_limiter,
+                self.iot_client().list_thing_principals,
+                thingName=thing_name,
+            )
             for principal in principals["principals"]:
-                self.iot_client().detach_thing_principal(
-                    principal=principal, thingName=thing_name
+                call_limited(
+                    iot_limiter,
+                    self.iot_client().detach_thing_principal,
+                    principal=principal,
+                    thingName=thing_name,
                 )
-                self.delete_iot_principal(principal)
+                self.delete_iot_principal(principal, iot_limiter)
 
-            self.iot_client().delete_thing(thingName=thing_name)
+            call_limited(
+                iot_limiter, self.iot_client().delete_thing, thingName=thing_name
+            )
 
             logger.info(
                 "deleted provisioned thing: %s",
@@ -214,17 +432,30 @@ class DeviceProvisioner:
             )
             raise
 
-    def delete_iot_principal(self, principal: str) -> None:
+    def delete_iot_principal(
+        self, principal: str, iot_limiter: Optional[AdaptiveTokenBucket] = None
+    ) -> None:
         try:
             certificate_id = principal.split("/")[-1]
-            policies = self.iot_client().list_principal_policies(principal=principal)
+            policies = call_limited(
+                iot_limiter,
+                self.iot_client().list_principal_policies,
+                principal=principal,
+            )
             for policy in policies["policies"]:
-                self.iot_client().detach_policy(
-                    policyName=policy["policyName"], target=principal
+                call_limited(
+                    iot_limiter,
+                    self.iot_client().detach_policy,
+                    policyName=policy["policyName"],
+                    target=principal,
                 )
-                self.delete_iot_policy(policy["policyName"])
+                self.delete_iot_policy(policy["policyName"], iot_limiter)
 
-            self.iot_client().delete_certificate(certificateId=certificate_id)
+            call_limited(
+                iot_limiter,
+                self.iot_client().delete_certificate,
+                certificateId=certificate_id,
+            )
 
             logger.info(
                 "deleted principal: %s",
@@ -241,9 +472,13 @@ class DeviceProvisioner:
             )
             raise
 
-    def delete_iot_policy(self, policy_name: str) -> None:
+    def delete_iot_policy(
+        self, policy_name: str, iot_limiter: Optional[AdaptiveTokenBucket] = None
+    ) -> None:
         try:
-            self.iot_client().delete_policy(policyName=policy_name)
+            call_limited(
+                iot_limiter, self.iot_client().delete_policy, policyName=policy_name
+            )
 
             logger.info(
                 "deleted policy: %s",
@@ -251,6 +486,14 @@ class DeviceProvisioner:
             )
 
         except ClientError as err:
+            if err.response["Error"]["Code"] in (
+                "DeleteConflictException",
+                "ResourceNotFoundException",
+            ):
+                # The shared policy stays attached to other certificates until the last of them is cleaned up
+                logger.info("skipped deleting policy still in use: %s", policy_name)
+                return
+
             logger.error(
                 "Error deleting policy %s. Here's why: %s: %s",
                 policy_name,
@@ -260,10 +503,15 @@ class DeviceProvisioner:
             )
             raise
 
-    def delete_secretsmanager_secret(self, secret_arn: str) -> None:
+    def delete_secretsmanager_secret(
+        self, secret_arn: str, secrets_limiter: Optional[AdaptiveTokenBucket] = None
+    ) -> None:
         try:
-            self.secret_manager_client().delete_secret(
-                SecretId=secret_arn, ForceDeleteWithoutRecovery=True
+            call_limited(
+                secrets_limiter,
+                self.secret_manager_client().delete_secret,
+                SecretId=secret_arn,
+                ForceDeleteWithoutRecovery=True,
             )
 
             logger.info("deleted provisioned secret: %s", secret_arn)
@@ -277,3 +525,55 @@ class DeviceProvisioner:
                 exc_info=True,
             )
             raise
+
+    # Deletes the secrets and things concurrently, one rate limited token per API call
+    def cleanup_devices(
+        self,
+        should_continue: Callable[[], bool] = lambda: True,
+        max_workers: int = MAX_PROVISIONING_WORKERS,
+        iot_requests_per_second: float = IOT_REQUESTS_PER_SECOND,
+        secrets_manager_requests_per_second: float = SECRETS_MANAGER_REQUESTS_PER_SECOND,
+    ) -> Dict[str, Any]:
+        progress = {"deleted_secrets": 0, "deleted_things": 0, "failed": 0}
+        progress_lock = Lock()
+        iot_limiter = AdaptiveTokenBucket(iot_requests_per_second)
+        secrets_limiter = AdaptiveTokenBucket(secrets_manager_requests_per_second)
+
+        def delete_all(
+            resources: Iterable[str],
+            delete: Callable[[str, AdaptiveTokenBucket], None],
+            limiter: AdaptiveTokenBucket,
+            counter: str,
+        ) -> None:
+            def delete_resource(resource: str) -> None:
+                if not should_continue():
+                    return
+                try:
+                    delete(resource, limiter)
+                except ClientError:
+                    # Already logged by the delete method, the next cleanup run retries it
+                    with progress_lock:
+                        progress["failed"] += 1
+                    return
+                with progress_lock:
+                    progress[counter] += 1
+
+            with ThreadPoolExecutor(
+                max_workers=get_max_workers(max_workers, limiter.max_rate)
+            ) as executor:
+                list(executor.map(delete_resource, resources))
+
+        delete_all(
+            self.get_simulated_secrets(),
+            self.delete_secretsmanager_secret,
+            secrets_limiter,
+            "deleted_secrets",
+        )
+        delete_all(
+            (thing["thingName"] for thing in self.get_simulated_things()),
+            self.delete_iot_thing,
+            iot_limiter,
+            "deleted_things",
+        )
+
+        return {**progress, "complete": should_continue()}
@@ -6,12 +6,15 @@
 import math
 import random
 import string
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Optional, Tuple
 from uuid import uuid4
 
 # Third Party Libraries
 import arrow
 
+# Connected Mobility Solution on AWS
+from .routes import get_route_position
+
 
 class GenericSim:
     @staticmethod
@@ -77,10 +80,21 @@ class GenericSim:
         for field in limits["payload"]:
             sim_object[field["name"]] = getattr(
                 GenericSim, f"generic_sim_{field['type']}"
-            )(field)
+            )(field, counter=counter)
 
         return sim_object
 
+    @staticmethod
+    def generic_sim_route(
+        limits: Dict[str, Any],
+        counter: int = 0,
+        device_index: int = 0,
+        runtime: Optional[float] = None,
+    ) -> Dict[str, float]:
+        return get_route_position(
+            limits, device_index, counter if runtime is None else runtime
+        )
+
     @staticmethod
     def generic_sim_string(limits: Dict[str, Any], counter: int = 0) -> str:
         if limits.get("static"):
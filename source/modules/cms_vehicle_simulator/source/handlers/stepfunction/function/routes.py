@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# Standard Library
+import json
+import os
+from array import array
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+# AWS Libraries
+import boto3
+from botocore.config import Config
+
+ROUTES_PREFIX = "routes"
+
+# Average speed in km/h a device drives its route at, keyed by the route's profile
+PROFILE_SPEEDS_KPH = {
+    "aggressive": 50.0,
+    "normal": 35.0,
+}
+DEFAULT_SPEED_KPH = PROFILE_SPEEDS_KPH["normal"]
+
+
+@lru_cache(maxsize=128)
+def get_s3_client() -> Any:
+    return boto3.client(
+        "s3", config=Config(user_agent_extra=os.environ["USER_AGENT_STRING"])
+    )
+
+
+# Waypoints and the cumulative km to each, so a position is a binary search and an interpolation
+class Route:
+    def __init__(self, route: Dict[str, Any]) -> None:
+        self.route_id: str = route["route_id"]
+        self.profile: str = route.get("profile", "normal")
+        self.speed_kph = PROFILE_SPEEDS_KPH.get(self.profile, DEFAULT_SPEED_KPH)
+
+        self.longitudes = array("d")
+        self.latitudes = array("d")
+        self.cumulative_km = array("d")
+
+        stages = sorted(route["stages"], key=lambda stage: int(stage["stage"]))
+        distance = 0.0
+        for stage in stages:
+            self._append_waypoint(stage["start"], distance)
+            distance += float(stage["km"])
+        if stages:
+            self._append_waypoint(stages[-1]["end"], distance)
+        else:
+            self._append_waypoint(route["start"], distance)
+
+        self.km = distance
+
+    def _append_waypoint(self, coordinates: List[Any], distance: float) -> None:
+        # Route files store coordinates as [longitude, latitude]
+        self.longitudes.append(float(coordinates[0]))
+        self.latitudes.append(float(coordinates[1]))
+        self.cumulative_km.append(distance)
+
+    # Loops back to the start of the route
+    def position_at(self, km: float) -> Tuple[float, float]:
+        if self.km <= 0:
+            return self.latitudes[0], self.longitudes[0]
+
+        km %= self.km
+        index = min(bisect_right(self.cumulative_km, km), len(self.cumulative_km) - 1)
+        start_km = self.cumulative_km[index - 1]
+        stage_km = self.cumulative_km[index] - start_km
+        fraction = (km - start_km) / stage_km if stage_km else 0.0
+
+        return (
+            self.latitudes[index - 1]
+            + (self.latitudes[index] - self.latitudes[index - 1]) * fraction,
+            self.longitudes[index - 1]
+            + (self.longitudes[index] - self.longitudes[index - 1]) * fraction,
+        )
+
+
+def get_route_object(key: str) -> Dict[str, Any]:
+    response = get_s3_client().get_object(Bucket=os.environ["ROUTE_BUCKET"], Key=key)
+    route_object: Dict[str, Any] = json.loads(response["Body"].read())
+    return route_object
+
+
+# Routes are immutable once published, so each container parses a route once and every device on it shares the copy
+@lru_cache(maxsize=64)
+def get_route(route_id: str) -> Route:
+    return Route(get_route_object(f"{ROUTES_PREFIX}/{route_id}.json"))
+
+
+@lru_cache(maxsize=1)
+def get_route_ids() -> Tuple[str, ...]:
+    manifest = get_route_object(f"{ROUTES_PREFIX}/manifest.json")
+    return tuple(route["id"] for route in manifest["routes"])
+
+
+def get_device_route(limits: Dict[str, Any], device_index: int) -> Route:
+    route_ids = limits.get("routes") or get_route_ids()
+    return get_route(route_ids[device_index % len(route_ids)])
+
+
+def get_route_position(
+    limits: Dict[str, Any], device_index: int, elapsed_seconds: float
+) -> Dict[str, float]:
+    route = get_device_route(limits, device_index)
+    speed_kph: Optional[float] = limits.get("speed")
+    latitude, longitude = route.position_at(
+        float(speed_kph or route.speed_kph) * elapsed_seconds / 3600
+    )
+    return {"latitude": latitude, "longitude": longitude}
@@ -0,0 +1,407 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# Standard Library
+import math
+import random
+import string
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+# Third Party Libraries
+import arrow
+
+# CMS Common Library
+from cms_common.serialization import decimal_default, dumps
+
+# Connected Mobility Solution on AWS
+from .random_sim import GenericSim
+from .routes import get_route_position
+
+
+class Tick(NamedTuple):
+    counter: int
+    device_index: int
+    # Seconds since the simulation started
+    runtime: float
+    # Epoch seconds the tick simulates, the wall clock when unset
+    timestamp: Optional[float] = None
+
+
+class SignalRate(NamedTuple):
+    # Seconds between samples of the signal, every tick when unset
+    period: Optional[float] = None
+    # Smallest change since the last published value that is worth publishing again
+    threshold: Optional[float] = None
+
+
+FieldGenerator = Callable[[Tick], Any]
+# (parent slot, field name, generator). A generator of None marks an object field, which opens the next slot.
+PlanStep = Tuple[int, str, Optional[FieldGenerator]]
+# Last value a device published for each plan step with a change threshold, keyed by the step's index as a
+# string, so callers can carry it between invocations as JSON
+PublishedValues = Dict[str, Any]
+
+_BOOLS = (True, False)
+
+
+def _compile_bool(field: Dict[str, Any]) -> FieldGenerator:
+    return lambda tick: random.choice(_BOOLS)  # nosec  # NOSONAR
+
+
+def _compile_decay(field: Dict[str, Any]) -> FieldGenerator:
+    maximum = int(field.get("max", 100))
+    spread = maximum - int(field.get("min", 0))
+    return lambda tick: maximum - (spread * (1 - math.exp(-0.05 * tick.counter)))
+
+
+def _compile_float(field: Dict[str, Any]) -> FieldGenerator:
+    precision = int(field.get("precision", 4))
+    return lambda tick: round(random.random(), precision)  # nosec  # NOSONAR
+
+
+def _compile_id(field: Dict[str, Any]) -> FieldGenerator:
+    # Drawn from the random module, so a seeded generator also reproduces its ids
+    return lambda tick: str(
+        UUID(int=random.getrandbits(128), version=4)  # nosec  # NOSONAR
+    )
+
+
+def _compile_int(field: Dict[str, Any]) -> FieldGenerator:
+    minimum = int(field.get("min", 0))
+    maximum = int(field.get("max", 100000))
+    return lambda tick: random.randint(minimum, maximum)  # nosec  # NOSONAR
+
+
+def _compile_pick_one(field: Dict[str, Any]) -> FieldGenerator:
+    choices = tuple(field.get("arr", [1, 2, 3, 4, 5]))
+    return lambda tick: random.choice(choices)  # nosec  # NOSONAR
+
+
+def _compile_sinusoidal(field: Dict[str, Any]) -> FieldGenerator:
+    step = 0.087266527777778
+    offset = int(field.get("min", -1)) + 1
+    scale = int(field.get("max", 1)) / 2
+    return lambda tick: (math.sin(step * tick.counter) + offset) * scale
+
+
+def _compile_string(field: Dict[str, Any]) -> FieldGenerator:
+    if field.get("static"):
+        value = str(field.get("default", "static"))
+        return lambda tick: value
+
+    minimum = int(field.get("min", 0))
+    maximum = int(field.get("max", 20))
+    # This field is to generate random data, there is no security implication
+    return lambda tick: "".join(
+        random.choices(  # nosec # NOSONAR
+            string.ascii_letters,
+            k=random.randint(minimum, maximum),  # nosec # NOSONAR
+        )
+    )
+
+
+def _compile_route(field: Dict[str, Any]) -> FieldGenerator:
+    return lambda tick: get_route_position(field, tick.device_index, tick.runtime)
+
+
+def _compile_timestamp(field: Dict[str, Any]) -> FieldGenerator:
+    return lambda tick: (
+        arrow.utcnow() if tick.timestamp is None else arrow.get(tick.timestamp)
+    ).isoformat()
+
+
+# Types without a specialized compiler fall back to the matching GenericSim generator bound to its field.
+FIELD_COMPILERS: Dict[str, Callable[[Dict[str, Any]], FieldGenerator]] = {
+    "bool": _compile_bool,
+    "decay": _compile_decay,
+    "float": _compile_float,
+    "id": _compile_id,
+    "int": _compile_int,
+    "pickOne": _compile_pick_one,
+    "route": _compile_route,
+    "sinusoidal": _compile_sinusoidal,
+    "string": _compile_string,
+    "timestamp": _compile_timestamp,
+}
+
+
+def compile_field(field: Dict[str, Any]) -> FieldGenerator:
+    field_compiler = FIELD_COMPILERS.get(field["type"])
+    if field_compiler:
+        return field_compiler(field)
+
+    generic_generator = getattr(GenericSim, f"generic_sim_{field['type']}")
+    return lambda tick: generic_generator(field, counter=tick.counter)
+
+
+def get_signal_rate(field: Dict[str, Any], inherited: SignalRate) -> SignalRate:
+    # Signals nested in an object sample at the object's rate unless they set their own
+    period = field.get("period")
+    threshold = field.get("threshold")
+    return SignalRate(
+        float(period) if period is not None else inherited.period,
+        float(threshold) if threshold is not None else inherited.threshold,
+    )
+
+
+# A signal is due on the first tick and on every tick that crosses a multiple of its period
+def is_due(period: Optional[float], runtime: float, interval: float) -> bool:
+    if not period or runtime <= 0:
+        return True
+    return runtime // period != (runtime - interval) // period
+
+
+def get_change(value: Any, last_value: Any) -> float:
+    if isinstance(value, (int, float)) and isinstance(last_value, (int, float)):
+        return float(abs(value - last_value))
+    if (
+        isinstance(value, dict)
+        and isinstance(last_value, dict)
+        and value.keys() == last_value.keys()
+    ):
+        # Compound signals such as a location move by as much as their most changed part
+        return max(
+            (get_change(value[key], last_value[key]) for key in value), default=0.0
+        )
+    return 0.0 if value == last_value else math.inf
+
+
+def run_steps(steps: List[PlanStep], tick: Tick, data: Dict[str, Any]) -> None:
+    slots = [data]
+    for parent_slot, name, generator in steps:
+        if generator is None:
+            nested: Dict[str, Any] = {}
+            slots[parent_slot][name] = nested
+            slots.append(nested)
+        else:
+            slots[parent_slot][name] = generator(tick)
+
+
+# A device type payload flattened into a list of generator steps
+class CompiledTemplate:
+    def __init__(self, fields: List[Dict[str, Any]]) -> None:
+        self.steps: List[PlanStep] = []
+        self.rates: List[SignalRate] = []
+        # Static top level fields may be overridden per device, so they are resolved after the plan runs
+        self.static_steps: List[Tuple[str, FieldGenerator]] = []
+        self.static_rates: List[SignalRate] = []
+        self.top_level_names = [field["name"] for field in fields]
+        # (parent slot, field name) of the object field that opens each slot
+        self.slot_parents: List[Tuple[int, str]] = [(0, "")]
+        # Top level fields with the same value on every tick, which encode() leaves out of its plan
+        self.constant_values: Dict[str, Any] = {}
+        # (static values, encoded constant fields, static steps without a value) of the last encoded device
+        self._static_fragment: Optional[
+            Tuple[Dict[str, Any], str, List[Tuple[str, FieldGenerator]]]
+        ] = None
+
+        for field in fields:
+            rate = get_signal_rate(field, SignalRate())
+            if field.get("static") and field.get("default"):
+                default = field["default"]
+                self.steps.append((0, field["name"], lambda tick, value=default: value))  # type: ignore[misc]
+                self.rates.append(rate)
+                self.constant_values[field["name"]] = default
+            elif field.get("static"):
+                self.static_steps.append((field["name"], compile_field(field)))
+                self.static_rates.append(rate)
+            else:
+                self._compile_into(0, field, rate)
+
+        self.is_multi_rate = any(
+            rate != SignalRate() for rate in self.rates + self.static_rates
+        )
+        static_names = {name for name, _ in self.static_steps}
+        self.dynamic_steps = [
+            step
+            for step in self.steps
+            if step[0] != 0 or step[1] not in self.constant_values
+        ]
+        self.dynamic_names = [
+            name
+            for name in self.top_level_names
+            if name not in self.constant_values and name not in static_names
+        ]
+
+    @property
+    def slot_count(self) -> int:
+        return len(self.slot_parents)
+
+    def _compile_into(
+        self, parent_slot: int, field: Dict[str, Any], rate: SignalRate
+    ) -> None:
+        if field["type"] != "object":
+            self.steps.append((parent_slot, field["name"], compile_field(field)))
+            self.rates.append(rate)
+            return
+
+        slot = self.slot_count
+        self.slot_parents.append((parent_slot, field["name"]))
+        self.steps.append((parent_slot, field["name"], None))
+        self.rates.append(rate)
+        for nested_field in field["payload"]:
+            self._compile_into(slot, nested_field, get_signal_rate(nested_field, rate))
+
+    def generate(
+        self,
+        counter: int,
+        static_values: Optional[Dict[str, Any]] = None,
+        device_index: int = 0,
+        runtime: Optional[float] = None,
+        timestamp: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        tick = Tick(
+            counter, device_index, counter if runtime is None else runtime, timestamp
+        )
+        data: Dict[str, Any] = dict.fromkeys(self.top_level_names)
+        run_steps(self.steps, tick, data)
+
+        static_values = static_values or {}
+        for name, generator in self.static_steps:
+            data[name] = static_values.get(name) or generator(tick)
+
+        return data
+
+    # Fields that never change are encoded once and spliced into each tick's encoding of the others
+    def encode(
+        self,
+        counter: int,
+        static_values: Optional[Dict[str, Any]] = None,
+        device_index: int = 0,
+        runtime: Optional[float] = None,
+        timestamp: Optional[float] = None,
+    ) -> str:
+        tick = Tick(
+            counter, device_index, counter if runtime is None else runtime, timestamp
+        )
+        fragment, static_generators = self.get_static_fragment(static_values or {})
+        data: Dict[str, Any] = dict.fromkeys(self.dynamic_names)
+        run_steps(self.dynamic_steps, tick, data)
+        for name, generator in static_generators:
+            data[name] = generator(tick)
+
+        encoded = dumps(data, default=decimal_default)
+        if not fragment:
+            return encoded
+        if not data:
+            return f"{{{fragment}}}"
+        return f"{encoded[:-1]},{fragment}}}"
+
+    # Returns the encoded constant fields, without braces, and the static fields left to generate
+    def get_static_fragment(
+        self, static_values: Dict[str, Any]
+    ) -> Tuple[str, List[Tuple[str, FieldGenerator]]]:
+        if self._static_fragment is None or self._static_fragment[0] != static_values:
+            constant_values = dict(self.constant_values)
+            static_generators = []
+            for name, generator in self.static_steps:
+                if static_values.get(name):
+                    constant_values[name] = static_values[name]
+                else:
+                    static_generators.append((name, generator))
+            self._static_fragment = (
+                dict(static_values),
+                dumps(constant_values, default=decimal_default)[1:-1],
+                static_generators,
+            )
+        return self._static_fragment[1], self._static_fragment[2]
+
+    # Only the due signals that moved past their change threshold since the device last published them,
+    # as recorded in published_values, which is updated with the values published this tick
+    def generate_due(  # pylint: disable=too-many-arguments,too-many-locals
+        self,
+        counter: int,
+        interval: float,
+        published_values: PublishedValues,
+        static_values: Optional[Dict[str, Any]] = None,
+        device_index: int = 0,
+        runtime: Optional[float] = None,
+        snapshot: bool = False,
+        timestamp: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        tick = Tick(
+            counter, device_index, counter if runtime is None else runtime, timestamp
+        )
+        data: Dict[str, Any] = {}
+        slots: List[Optional[Dict[str, Any]]] = [data] + [None] * (self.slot_count - 1)
+
+        def get_slot(slot: int) -> Dict[str, Any]:
+            slot_data = slots[slot]
+            if slot_data is None:
+                parent_slot, name = self.slot_parents[slot]
+                slot_data = slots[slot] = get_slot(parent_slot)[name] = {}
+            return slot_data
+
+        def should_publish(step: int, rate: SignalRate, value: Any) -> bool:
+            if rate.threshold is None:
+                return True
+            key = str(step)
+            if not snapshot and key in published_values:
+                if get_change(value, published_values[key]) <= rate.threshold:
+                    return False
+            published_values[key] = value
+            return True
+
+        for step, ((parent_slot, name, generator), rate) in enumerate(
+            zip(self.steps, self.rates)
+        ):
+            if generator is None or not (
+                snapshot or is_due(rate.period, tick.runtime, interval)
+            ):
+                continue
+            value = generator(tick)
+            if should_publish(step, rate, value):
+                get_slot(parent_slot)[name] = value
+
+        static_values = static_values or {}
+        for static_step, ((name, generator), rate) in enumerate(
+            zip(self.static_steps, self.static_rates), start=len(self.steps)
+        ):
+            if not (snapshot or is_due(rate.period, tick.runtime, interval)):
+                continue
+            value = static_values.get(name) or generator(tick)
+            if should_publish(static_step, rate, value):
+                data[name] = value
+
+        return data
+
+
+# Process-local LRU of compiled templates keyed by template id and version
+class CompiledTemplateCache:
+    def __init__(self, maxsize: int = 128) -> None:
+        self.maxsize = maxsize
+        self._templates: "OrderedDict[Tuple[str, str], CompiledTemplate]" = (
+            OrderedDict()
+        )
+
+    def get(
+        self,
+        template_id: Optional[str],
+        version: Optional[str],
+        load_fields: Callable[[], List[Dict[str, Any]]],
+    ) -> CompiledTemplate:
+        if template_id is None or version is None:
+            # Without a version there is no way to know when the template changes, so don't cache it
+            return CompiledTemplate(load_fields())
+
+        key = (template_id, version)
+        compiled = self._templates.get(key)
+        if compiled is not None:
+            self._templates.move_to_end(key)
+            return compiled
+
+        compiled = CompiledTemplate(load_fields())
+        self._templates[key] = compiled
+        if len(self._templates) > self.maxsize:
+            self._templates.popitem(last=False)
+
+        return compiled
+
+    def clear(self) -> None:
+        self._templates.clear()
+
+
+compiled_templates = CompiledTemplateCache()
@@ -38,6 +38,9 @@ from cms_common.policy_generators.ec2_vpc import generate_ec2_vpc_policy
 from .. import generate_lambda_cloudwatch_logs_policy_document, generate_physical_name
 from .storage import StorageConstruct
 
+# Devices provisioned and ticked together by one lambda invocation of the device map
+DEVICES_PER_BATCH = 200
+
 
 def function_singleton(function: Any) -> Callable[[SimulatorConstruct], Any]:
     def wrapper(self: SimulatorConstruct) -> Any:
@@ -152,7 +155,10 @@ class SimulatorConstruct(Construct):  # pylint: disable=too-many-instance-attrib
                         aws_iam.PolicyStatement(
                             effect=aws_iam.Effect.ALLOW,
                             actions=["dynamodb:GetItem"],
-                            resources=[self.simulations_table_arn],
+                            resources=[
+                                self.simulations_table_arn,
+                                self.devices_types_table_arn,
+                            ],
                         )
                     ]
                 ),
@@ -197,6 +203,8 @@ class SimulatorConstruct(Construct):  # pylint: disable=too-many-instance-attrib
                             actions=[
                                 "iot:CreateKeysAndCertificate",
                                 "iot:AttachThingPrincipal",
+                                "iot:ListThings",
+                                "iot:ListThingPrincipals",
                             ],
                             resources=["*"],
                         ),
@@ -262,6 +270,7 @@ class SimulatorConstruct(Construct):  # pylint: disable=too-many-instance-attrib
                             effect=aws_iam.Effect.ALLOW,
                             actions=[
                                 "secretsmanager:CreateSecret",
+                                "secretsmanager:GetSecretValue",
                                 "secretsmanager:TagResource",
                             ],
                             resources=[
@@ -275,6 +284,15 @@ class SimulatorConstruct(Construct):  # pylint: disable=too-many-instance-attrib
                         )
                     ]
                 ),
+                "dynamodb-policy": aws_iam.PolicyDocument(
+                    statements=[
+                        aws_iam.PolicyStatement(
+                            effect=aws_iam.Effect.ALLOW,
+                            actions=["dynamodb:UpdateItem"],
+                            resources=[self.simulations_table_arn],
+                        )
+                    ]
+                ),
                 "cloudwatch-logs-policy": generate_lambda_cloudwatch_logs_policy_document(
                     self, provisioning_lambda_name
                 ),
@@ -343,6 +361,31 @@ class SimulatorConstruct(Construct):  # pylint: disable=too-many-instance-attrib
                         ),
                     ]
                 ),
+                "dynamodb-policy": aws_iam.PolicyDocument(
+                    statements=[
+                        aws_iam.PolicyStatement(
+                            effect=aws_iam.Effect.ALLOW,
+                            actions=["dynamodb:UpdateItem"],
+                            resources=[self.simulations_table_arn],
+                        )
+                    ]
+                ),
+                "lambda-policy": aws_iam.PolicyDocument(
+                    statements=[
+                        aws_iam.PolicyStatement(
+                            effect=aws_iam.Effect.ALLOW,
+                            actions=["lambda:InvokeFunction"],
+                            resources=[
+                                Stack.of(self).format_arn(
+                                    service="lambda",
+                                    resource="function",
+                                    resource_name=cleanup_lambda_name,
+                                    arn_format=ArnFormat.COLON_RESOURCE_NAME,
+                                )
+                            ],
+                        )
+                    ]
+                ),
                 "secrets-manager-policy": aws_iam.PolicyDocument(
                     statements=[
                         aws_iam.PolicyStatement(
@@ -416,12 +459,14 @@ class SimulatorConstruct(Construct):  # pylint: disable=too-many-instance-attrib
                 "SIMULATOR_THING_GROUP_NAME": simulator_thing_group_custom_resource.get_att(
                     "THING_GROUP_NAME"
                 ).to_string(),
+                "SIM_TABLE": self.simulations_table_name,
                 "TOPIC_PREFIX": iot_topic_prefix,
                 "USER_AGENT_STRING": solution_config_inputs.get_user_agent_string(),
             },
             handler="function.handlers.provision_handler",
             runtime=aws_lambda.Runtime.PYTHON_3_12,
-            timeout=Duration.minutes(1),
+            # A batch takes several calls per device under the IoT quota, the state machine reinvokes it until done
+            timeout=Duration.minutes(15),
             role=provisioning_lambda_role,
             layers=[dependency_layer],
             vpc=vpc_construct.vpc,
@@ -449,6 +494,7 @@ class SimulatorConstruct(Construct):  # pylint: disable=too-many-instance-attrib
                 "VERSION": solution_config_inputs.solution_version,
                 "ROUTE_BUCKET": routes_bucket.bucket_name,
                 "SIM_TABLE": self.simulations_table_name,
+                "DEVICE_TYPES_TABLE": self.devices_types_table_name,
                 "TOPIC_PREFIX": iot_topic_prefix,
                 "USER_AGENT_STRING": solution_config_inputs.get_user_agent_string(),
             },
@@ -483,6 +529,7 @@ class SimulatorConstruct(Construct):  # pylint: disable=too-many-instance-attrib
                 "SIMULATOR_THING_GROUP_NAME": simulator_thing_group_custom_resource.get_att(
                     "THING_GROUP_NAME"
                 ).to_string(),
+                "SIM_TABLE": self.simulations_table_name,
                 "USER_AGENT_STRING": solution_config_inputs.get_user_agent_string(),
             },
             handler="function.handlers.cleanup_handler",
@@ -517,40 +564,52 @@ class SimulatorConstruct(Construct):  # pylint: disable=too-many-instance-attrib
                             self.provisioning_invoke()
                             .add_catch(self.done)
                             .next(
-                                self.simulator_invoke()
-                                .add_catch(
-                                    self.update_sim_table(), result_path="$.error"
+                                aws_stepfunctions.Choice(
+                                    self,
+                                    "provisioning-choice",
                                 )
-                                .next(
-                                    aws_stepfunctions.Choice(
-                                        self,
-                                        "engine-choice",
-                                    )
-                                    .when(
-                                        aws_stepfunctions.Condition.number_greater_than_json_path(
-                                            "$.simulation.duration",
-                                            "$.options.runtime",
-                                        ),
-                                        aws_stepfunctions.Wait(
-                                            self,
-                                            "engine-wait",
-                                            time=aws_stepfunctions.WaitTime.seconds_path(
-                                                "$.simulation.interval"
-                                            ),
-                                        ).next(self.simulator_invoke()),
+                                .when(
+                                    aws_stepfunctions.Condition.boolean_equals(
+                                        "$.provisioning.complete", False
+                                    ),
+                                    self.provisioning_invoke(),
+                                )
+                                .otherwise(
+                                    self.simulator_invoke()
+                                    .add_catch(
+                                        self.update_sim_table(), result_path="$.error"
                                     )
-                                    .otherwise(
+                                    .next(
                                         aws_stepfunctions.Choice(
-                                            self, "devicesRunning?"
+                                            self,
+                                            "engine-choice",
                                         )
                                         .when(
-                                            aws_stepfunctions.Condition.boolean_equals(
-                                                "$.options.restart", True
+                                            aws_stepfunctions.Condition.number_greater_than_json_path(
+                                                "$.simulation.duration",
+                                                "$.options.runtime",
                                             ),
-                                            self.simulator_invoke(),
+                                            aws_stepfunctions.Wait(
+                                                self,
+                                                "engine-wait",
+                                                time=aws_stepfunctions.WaitTime.seconds_path(
+                                                    "$.simulation.interval"
+                                                ),
+                                            ).next(self.simulator_invoke()),
                                         )
                                         .otherwise(
-                                            self.update_sim_table().next(self.done)
+                                            aws_stepfunctions.Choice(
+                                                self, "devicesRunning?"
+                                            )
+                                            .when(
+                                                aws_stepfunctions.Condition.boolean_equals(
+                                                    "$.options.restart", True
+                                                ),
+                                                self.simulator_invoke(),
+                                            )
+                                            .otherwise(
+                                                self.update_sim_table().next(self.done)
+                                            )
                                         )
                                     )
                                 )
@@ -720,7 +779,7 @@ class SimulatorConstruct(Construct):  # pylint: disable=too-many-instance-attrib
             "provisioning-invoke",
             lambda_function=self.provisioning_lambda_function,
             retry_on_service_exceptions=True,
-            result_path=aws_stepfunctions.JsonPath.DISCARD,
+            result_path="$.provisioning",
             payload_response_only=True,
         )
 
@@ -758,7 +817,8 @@ class SimulatorConstruct(Construct):  # pylint: disable=too-many-instance-attrib
                     aws_stepfunctions.JsonPath.string_at("$.simulation.sim_id")
                 )
             },
-            update_expression="SET stage = :stage, updatedAt = :time",
+            # Dropping the running attribute takes the simulation out of the running simulations index
+            update_expression="SET stage = :stage, updatedAt = :time REMOVE running",
             expression_attribute_values={
                 ":stage": aws_stepfunctions_tasks.DynamoAttributeValue.from_string(
                     "sleeping"
@@ -780,11 +840,16 @@ class SimulatorConstruct(Construct):  # pylint: disable=too-many-instance-attrib
         return aws_stepfunctions.Map(
             self,
             "device-map",
-            items_path="$.amount_range",
+            items_path="$.batch_start_indexes",
             parameters={
                 "simulation.$": "$.simulation",
+                "type_id.$": "$.type_id",
                 "info.$": "$.info",
-                "index.$": "$$.Map.Item.Index",
+                "batch": {
+                    "start_index.$": "$$.Map.Item.Value",
+                    "size": DEVICES_PER_BATCH,
+                    "amount.$": "$.amount",
+                },
             },
             max_concurrency=0,
             result_path=aws_stepfunctions.JsonPath.DISCARD,
@@ -795,7 +860,9 @@ class SimulatorConstruct(Construct):  # pylint: disable=too-many-instance-attrib
             self,
             "device-pass",
             parameters={
-                "amount_range.$": "States.ArrayRange(1,$.amount,1)",
+                "batch_start_indexes.$": f"States.ArrayRange(0,States.MathAdd($.amount,-1),{DEVICES_PER_BATCH})",
+                "amount.$": "$.amount",
+                "type_id.$": "$.type_id",
                 "info.$": "$.info",
                 "simulation.$": "$.simulation",
             },
@@ -813,10 +880,25 @@ class SimulatorConstruct(Construct):  # pylint: disable=too-many-instance-attrib
                     aws_stepfunctions.JsonPath.string_at("$.type_id")
                 )
             },
+            # The template stays out of the state, the simulator lambda loads and caches it by id and version
+            projection_expression=[
+                aws_stepfunctions_tasks.DynamoProjectionExpression().with_attribute(
+                    "#name"
+                ),
+                aws_stepfunctions_tasks.DynamoProjectionExpression().with_attribute(
+                    "topic"
+                ),
+                aws_stepfunctions_tasks.DynamoProjectionExpression().with_attribute(
+                    "#timestamp"
+                ),
+            ],
+            # name and timestamp are DynamoDB reserved words
+            expression_attribute_names={"#name": "name", "#timestamp": "timestamp"},
             result_selector={
                 "name.$": "$.Item.name",
                 "topic.$": "$.Item.topic",
-                "payload.$": "$.Item.payload",
+                # put_item stamps every write, including device types saved before updated_datetime existed
+                "version.$": "$.Item.timestamp",
                 "simulation": "$.simulation",
                 "amount": "$.amount",
             },
@@ -21,6 +21,18 @@ class StorageConstruct(Construct):
             partition_key={"name": "sim_id", "type": aws_dynamodb.AttributeType.STRING},
             point_in_time_recovery=True,
         )
+        # Sparse index of the simulations that are running. Only running simulations carry the key attribute, so
+        # reading the running stats costs the same however many simulations were ever created.
+        self.running_simulations_index_name = "running-simulations-index"
+        self.simulations_table.add_global_secondary_index(
+            index_name=self.running_simulations_index_name,
+            partition_key={
+                "name": "running",
+                "type": aws_dynamodb.AttributeType.STRING,
+            },
+            projection_type=aws_dynamodb.ProjectionType.INCLUDE,
+            non_key_attributes=["devices"],
+        )
 
         self.devices_types_table = aws_dynamodb.Table(
             self,
@@ -78,6 +78,7 @@ class VSApiConstruct(Construct):
                             effect=aws_iam.Effect.ALLOW,
                             actions=[
                                 "dynamodb:GetItem",
+                                "dynamodb:BatchGetItem",
                                 "dynamodb:Scan",
                                 "dynamodb:PutItem",
                                 "dynamodb:DeleteItem",
@@ -88,7 +89,14 @@ class VSApiConstruct(Construct):
                                 storage_construct.simulations_table.table_arn,
                                 storage_construct.templates_table.table_arn,
                             ],
-                        )
+                        ),
+                        aws_iam.PolicyStatement(
+                            effect=aws_iam.Effect.ALLOW,
+                            actions=["dynamodb:Query"],
+                            resources=[
+                                f"{storage_construct.simulations_table.table_arn}/index/{storage_construct.running_simulations_index_name}",
+                            ],
+                        ),
                     ]
                 ),
                 "state-machine-policy": aws_iam.PolicyDocument(
@@ -122,84 +130,13 @@ class VSApiConstruct(Construct):
                         ),
                     ]
                 ),
-                "iot-policy": aws_iam.PolicyDocument(
+                "lambda-policy": aws_iam.PolicyDocument(
                     statements=[
                         aws_iam.PolicyStatement(
                             effect=aws_iam.Effect.ALLOW,
-                            actions=["iot:DeleteThing"],
-                            resources=[
-                                Stack.of(self).format_arn(
-                                    service="iot",
-                                    resource="thing",
-                                    resource_name="*",
-                                    arn_format=ArnFormat.SLASH_RESOURCE_NAME,
-                                ),
-                            ],
-                        ),
-                        aws_iam.PolicyStatement(
-                            effect=aws_iam.Effect.ALLOW,
-                            actions=["iot:DeletePolicy"],
+                            actions=["lambda:InvokeFunction"],
                             resources=[
-                                Stack.of(self).format_arn(
-                                    service="iot",
-                                    resource="policy",
-                                    resource_name="*",
-                                    arn_format=ArnFormat.SLASH_RESOURCE_NAME,
-                                ),
-                            ],
-                        ),
-                        aws_iam.PolicyStatement(
-                            effect=aws_iam.Effect.ALLOW,
-                            actions=[
-                                "iot:DetachThingPrincipal",
-                                "iot:ListThings",
-                                "iot:ListThingPrincipals",
-                                "iot:ListAttachedPolicies",
-                            ],
-                            resources=["*"],
-                        ),
-                        aws_iam.PolicyStatement(
-                            effect=aws_iam.Effect.ALLOW,
-                            actions=[
-                                "iot:DetachPolicy",
-                                "iot:DeleteCertificate",
-                            ],
-                            resources=[
-                                Stack.of(self).format_arn(
-                                    service="iot",
-                                    resource="cert",
-                                    resource_name="*",
-                                    arn_format=ArnFormat.SLASH_RESOURCE_NAME,
-                                ),
-                            ],
-                        ),
-                    ]
-                ),
-                "tags-policy": aws_iam.PolicyDocument(
-                    statements=[
-                        aws_iam.PolicyStatement(
-                            effect=aws_iam.Effect.ALLOW,
-                            actions=[
-                                "tag:GetResources",
-                            ],
-                            resources=["*"],
-                        )
-                    ]
-                ),
-                "secrets-manager-policy": aws_iam.PolicyDocument(
-                    statements=[
-                        aws_iam.PolicyStatement(
-                            effect=aws_iam.Effect.ALLOW,
-                            actions=[
-                                "secretsmanager:DeleteSecret",
-                            ],
-                            resources=[
-                                Stack.of(self).format_arn(
-                                    service="secretsmanager",
-                                    resource="secret",
-                                    resource_name="*",
-                                    arn_format=ArnFormat.COLON_RESOURCE_NAME,
-                                ),
+                                simulator_construct.cleanup_lambda_function.function_arn
                             ],
                         )
                     ]
@@ -230,7 +167,10 @@ class VSApiConstruct(Construct):
                     "DYN_DEVICE_TYPES_TABLE": storage_construct.devices_types_table.table_name,
                     "DYN_TEMPLATES_TABLE": storage_construct.templates_table.table_name,
                     "DYN_SIMULATIONS_TABLE": storage_construct.simulations_table.table_name,
+                    "DYN_RUNNING_SIMULATIONS_INDEX": storage_construct.running_simulations_index_name,
                     "SIMULATOR_STATE_MACHINE_NAME": simulator_construct.simulator_state_machine.state_machine_name,
+                    "SIMULATOR_STATE_MACHINE_ARN": simulator_construct.simulator_state_machine.state_machine_arn,
+                    "CLEANUP_LAMBDA_NAME": simulator_construct.cleanup_lambda_function.function_name,
                     "CROSS_ORIGIN_DOMAIN": cross_origin_domain,
                     "USER_POOL_ARN": user_pool_arn,
                     "USER_AGENT_STRING": solution_config_inputs.get_user_agent_string(),
@@ -239,6 +179,8 @@ class VSApiConstruct(Construct):
                 "iam_role_arn": self.vs_api_lambda_role.role_arn,
                 "api_gateway_stage": api_gateway_stage,
                 "api_gateway_endpoint_type": "REGIONAL",
+                # API Gateway gzips responses at least this large for clients that accept it
+                "minimum_compression_size": 1024,
                 "subnet_ids": vpc_construct.vpc.select_subnets(
                     vpc_construct.private_subnet_selection
                 ).get("subnetIds"),
@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# Standard Library
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+# Third Party Libraries
+import arrow
+
+# Connected Mobility Solution on AWS
+from ..handlers.stepfunction.function.template_compiler import (
+    CompiledTemplate,
+    PublishedValues,
+    is_due,
+)
+
+DEFAULT_TOPIC_PREFIX = "cms/data/simulated"
+# Root of the Firehose delivery stream's dynamic partitions in the connect store bucket
+PARQUET_ROOT = "Parquet"
+# The Firehose stream partitions on the vin under this object, so each device keeps a stable one
+VIN_OBJECT = "vehicleidentification"
+# Device ranges handed to each worker process at a time, so faster workers pick up more of the fleet
+CHUNKS_PER_WORKER = 4
+
+
+class OfflineConfig(NamedTuple):
+    output: str
+    file_format: str = "ndjson"
+    device_prefix: str = "offline-device"
+    topic_prefix: str = DEFAULT_TOPIC_PREFIX
+    # Epoch seconds of the first message
+    start: float = 0.0
+    interval: float = 1.0
+    duration: float = 3600.0
+    snapshot_interval: Optional[float] = None
+    seed: Optional[int] = None
+
+
+# Streams the messages of one device and hour to a NDJSON file
+class NdjsonPartitionWriter:
+    def __init__(self, path: str, _columns: List[str]) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        # Held open across writes and closed by close()
+        self._file = open(  # pylint: disable=consider-using-with
+            path, "w", encoding="utf-8"
+        )
+
+    def write(self, data: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(data))
+        self._file.write("\n")
+
+    def close(self) -> int:
+        self._file.close()
+        return os.path.getsize(self.path)
+
+
+# Writes the messages of one device and hour as a single Parquet file once complete
+class ParquetPartitionWriter:
+    def __init__(self, path: str, columns: List[str]) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._columns = columns
+        self._rows: List[Dict[str, Any]] = []
+
+    def write(self, data: Dict[str, Any]) -> None:
+        self._rows.append(data)
+
+    def close(self) -> int:
+        # pyarrow is only needed for Parquet output
+        # pylint: disable=import-outside-toplevel
+        # Third Party Libraries
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        # Multi-rate fields are missing from most rows, and from_pylist only keeps the first row's keys,
+        # so every top-level field gets a column typed from the rows that have it
+        names = list(self._columns)
+        for row in self._rows:
+            names.extend(name for name in row if name not in names)
+        schema = pa.schema(
+            [
+                pa.field(
+                    name,
+                    pa.array(
+                        [row[name] for row in self._rows if row.get(name) is not None]
+                    ).type,
+                )
+                for name in names
+            ]
+        )
+        pq.write_table(pa.Table.from_pylist(self._rows, schema=schema), self.path)
+        self._rows = []
+        return os.path.getsize(self.path)
+
+
+PartitionWriter = Union[NdjsonPartitionWriter, ParquetPartitionWriter]
+PARTITION_WRITERS: Dict[str, Callable[[str, List[str]], PartitionWriter]] = {
+    "ndjson": NdjsonPartitionWriter,
+    "parquet": ParquetPartitionWriter,
+}
+
+
+def get_partition_path(
+    config: OfflineConfig, device_name: str, timestamp: float
+) -> str:
+    epoch_ms = int(timestamp * 1000)
+    if config.file_format == "parquet":
+        moment = time.gmtime(timestamp)
+        return os.path.join(
+            config.output,
+            PARQUET_ROOT,
+            device_name,
+            f"{moment.tm_yday:03d}_{moment.tm_year}",
+            f"{moment.tm_hour:02d}",
+            f"{device_name}-{epoch_ms}.parquet",
+        )
+
+    return os.path.join(
+        config.output,
+        *config.topic_prefix.split("/"),
+        device_name,
+        f"{epoch_ms}.ndjson",
+    )
+
+
+# Yields the (timestamp, payload) of each message a device would publish, ticking like the simulator lambda
+def iter_device_messages(
+    template: CompiledTemplate, config: OfflineConfig, device_index: int
+) -> Iterator[Tuple[float, Dict[str, Any]]]:
+    device_name = f"{config.device_prefix}-{device_index}"
+    pin_vin = VIN_OBJECT in template.top_level_names
+    ticks = max(1, int(config.duration / config.interval))
+    published_values: PublishedValues = {}
+    for counter in range(ticks):
+        runtime = counter * config.interval
+        timestamp = config.start + runtime
+        if template.is_multi_rate:
+            data = template.generate_due(
+                counter,
+                config.interval,
+                published_values,
+                device_index=device_index,
+                runtime=runtime,
+                snapshot=bool(config.snapshot_interval)
+                and is_due(config.snapshot_interval, runtime, config.interval),
+                timestamp=timestamp,
+            )
+        else:
+            data = template.generate(
+                counter,
+                device_index=device_index,
+                runtime=runtime,
+                timestamp=timestamp,
+            )
+
+        if not data:
+            continue
+        if pin_vin:
+            data.setdefault(VIN_OBJECT, {})["vin"] = device_name
+        yield timestamp, data
+
+
+# Writes a range of devices, one partition at a time
+def generate_devices(
+    fields: List[Dict[str, Any]], config: OfflineConfig, device_indexes: range
+) -> Dict[str, int]:
+    template = CompiledTemplate(fields)
+    writer_class = PARTITION_WRITERS[config.file_format]
+    stats = {"rows": 0, "files": 0, "bytes": 0}
+
+    for device_index in device_indexes:
+        if config.seed is not None:
+            # Seeded per device, so a device's messages don't depend on how the fleet is split between workers
+            random.seed(f"{config.seed}-{device_index}")
+        device_name = f"{config.device_prefix}-{device_index}"
+        writer: Optional[PartitionWriter] = None
+        hour = None
+        for timestamp, data in iter_device_messages(template, config, device_index):
+            if writer is None or timestamp // 3600 != hour:
+                if writer is not None:
+                    stats["bytes"] += writer.close()
+                hour = timestamp // 3600
+                writer = writer_class(
+                    get_partition_path(config, device_name, timestamp),
+                    template.top_level_names,
+                )
+                stats["files"] += 1
+            writer.write(data)
+            stats["rows"] += 1
+        if writer is not None:
+            stats["bytes"] += writer.close()
+
+    return stats
+
+
+def get_device_ranges(devices: int, chunks: int) -> List[range]:
+    chunk_size = max(1, -(-devices // chunks))
+    return [
+        range(start, min(start + chunk_size, devices))
+        for start in range(0, devices, chunk_size)
+    ]
+
+
+def generate(
+    fields: List[Dict[str, Any]], config: OfflineConfig, devices: int, workers: int
+) -> Dict[str, Any]:
+    if config.file_format not in PARTITION_WRITERS:
+        raise ValueError(f"Unsupported format {config.file_format}")
+
+    start = time.perf_counter()
+    totals = {"rows": 0, "files": 0, "bytes": 0}
+    if workers <= 1:
+        results = [generate_devices(fields, config, range(devices))]
+    else:
+        # Spawned rather than forked, so workers never inherit locks held by the parent's threads
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            device_ranges = get_device_ranges(devices, workers * CHUNKS_PER_WORKER)
+            results = list(
+                executor.map(
+                    generate_devices,
+                    [fields] * len(device_ranges),
+                    [config] * len(device_ranges),
+                    device_ranges,
+                )
+            )
+    for result in results:
+        for name, value in result.items():
+            totals[name] += value
+    seconds = time.perf_counter() - start
+
+    return {
+        "devices": devices,
+        "workers": max(1, workers),
+        "format": config.file_format,
+        **totals,
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(totals["rows"] / seconds, 2) if seconds else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Writes a simulation straight to files instead of publishing it"
+    )
+    parser.add_argument(
+        "--device-type",
+        required=True,
+        help="JSON file of a simulator device type or template, with its payload attributes",
+    )
+    parser.add_argument("--output", required=True, help="Directory to write to")
+    parser.add_argument("--format", choices=list(PARTITION_WRITERS), default="ndjson")
+    parser.add_argument("--device-prefix", default="offline-device")
+    parser.add_argument("--devices", type=int, default=100)
+    parser.add_argument(
+        "--start",
+        help="ISO 8601 time of the first message, by default duration seconds before now",
+    )
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--duration", type=float, default=3600.0)
+    parser.add_argument("--snapshot-interval", type=float)
+    parser.add_argument("--topic-prefix", default=DEFAULT_TOPIC_PREFIX)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    with open(args.device_type, "r", encoding="utf-8") as device_type_file:
+        fields = json.load(device_type_file)["payload"]
+
+    config = OfflineConfig(
+        output=args.output,
+        file_format=args.format,
+        device_prefix=args.device_prefix,
+        topic_prefix=args.topic_prefix,
+        start=(
+            arrow.get(args.start).timestamp()
+            if args.start
+            else time.time() - args.duration
+        ),
+        interval=args.interval,
+        duration=args.duration,
+        snapshot_interval=args.snapshot_interval,
+        seed=args.seed,
+    )
+    report = generate(fields, config, args.devices, args.workers)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
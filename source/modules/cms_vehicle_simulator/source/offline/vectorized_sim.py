@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# Standard Library
+import string
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+# Third Party Libraries
+import numpy as np
+
+# Connected Mobility Solution on AWS
+from ..handlers.stepfunction.function.routes import get_device_route
+
+Block = Dict[str, Any]
+
+_ASCII_LETTERS = np.frombuffer(string.ascii_letters.encode("ascii"), dtype=np.uint8)
+_SINUSOIDAL_STEP = 0.087266527777778
+
+
+# Generates an (N devices x T ticks) block for every field of a device type payload in one call
+class VectorizedSim:
+    def __init__(self, fields: List[Dict[str, Any]], seed: Optional[int] = None):
+        self.fields = fields
+        self.rng = np.random.default_rng(seed)
+        self._generators: Dict[str, Callable[..., Any]] = {
+            "bool": self._generate_bool,
+            "decay": self._generate_decay,
+            "float": self._generate_float,
+            "id": self._generate_id,
+            "int": self._generate_int,
+            "location": self._generate_location,
+            "object": self._generate_object,
+            "pickOne": self._generate_pick_one,
+            "route": self._generate_route,
+            "sinusoidal": self._generate_sinusoidal,
+            "string": self._generate_string,
+            "timestamp": self._generate_timestamp,
+        }
+
+    # Returns an ndarray of shape (devices, ticks) per field, or a nested block for object and location fields
+    def generate_block(
+        self,
+        devices: int,
+        ticks: int,
+        start_counter: int = 0,
+        start_time: Optional[datetime] = None,
+        interval: float = 1,
+        start_device: int = 0,
+    ) -> Block:
+        counters = np.arange(start_counter, start_counter + ticks, dtype=np.float64)
+        start_time = start_time or datetime.now(timezone.utc)
+        timestamps = [
+            (start_time + timedelta(seconds=interval * tick)).isoformat()
+            for tick in range(ticks)
+        ]
+        return self._generate_fields(
+            self.fields,
+            (devices, ticks),
+            counters=counters,
+            timestamps=timestamps,
+            # The simulator lambda's runtime moves forward by one interval per counter
+            runtimes=counters * interval,
+            device_indexes=range(start_device, start_device + devices),
+        )
+
+    def _generate_fields(
+        self, fields: List[Dict[str, Any]], shape: Tuple[int, int], **context: Any
+    ) -> Block:
+        block: Block = {}
+        for field in fields:
+            if field.get("static") and field.get("default"):
+                block[field["name"]] = np.full(shape, field["default"], dtype=object)
+                continue
+
+            block[field["name"]] = self._generators[field["type"]](
+                field, shape, **context
+            )
+
+        return block
+
+    def _generate_bool(
+        self, field: Dict[str, Any], shape: Tuple[int, int], **_: Any
+    ) -> np.ndarray:
+        return self.rng.integers(0, 2, size=shape).astype(bool)
+
+    @staticmethod
+    def _generate_decay(
+        field: Dict[str, Any], shape: Tuple[int, int], counters: np.ndarray, **_: Any
+    ) -> np.ndarray:
+        maximum = int(field.get("max", 100))
+        minimum = int(field.get("min", 0))
+        values = maximum - ((maximum - minimum) * (1 - np.exp(-0.05 * counters)))
+        return np.broadcast_to(values, shape)
+
+    def _generate_float(
+        self, field: Dict[str, Any], shape: Tuple[int, int], **_: Any
+    ) -> np.ndarray:
+        return np.round(self.rng.random(size=shape), int(field.get("precision", 4)))
+
+    def _generate_id(
+        self, field: Dict[str, Any], shape: Tuple[int, int], **_: Any
+    ) -> np.ndarray:
+        # Version 4 UUIDs built from the seeded generator instead of os.urandom
+        uuid_bytes = self.rng.integers(
+            0, 256, size=(shape[0] * shape[1], 16), dtype=np.uint8
+        )
+        uuid_bytes[:, 6] = (uuid_bytes[:, 6] & 0x0F) | 0x40
+        uuid_bytes[:, 8] = (uuid_bytes[:, 8] & 0x3F) | 0x80
+        return np.array(
+            [str(UUID(bytes=row.tobytes())) for row in uuid_bytes], dtype=object
+        ).reshape(shape)
+
+    def _generate_int(
+        self, field: Dict[str, Any], shape: Tuple[int, int], **_: Any
+    ) -> np.ndarray:
+        return self.rng.integers(
+            int(field.get("min", 0)),
+            int(field.get("max", 100000)),
+            size=shape,
+            endpoint=True,
+        )
+
+    def _generate_location(
+        self, field: Dict[str, Any], shape: Tuple[int, int], **_: Any
+    ) -> Block:
+        if not field["lat"] or not field["long"]:
+            correction_factor = 180.0 / np.pi
+            latitude = np.round(
+                np.arcsin(2 * self.rng.random(size=shape) - 1.0) * correction_factor, 5
+            )
+            longitude = np.round(
+                (2 * self.rng.random(size=shape) - 1) * np.pi * correction_factor, 5
+            )
+        else:
+            latitude = np.full(shape, field["lat"], dtype=np.float64)
+            longitude = np.full(shape, field["long"], dtype=np.float64)
+
+        return {
+            "latitude": latitude + self.rng.random(size=shape) / 100,
+            "longitude": longitude + self.rng.random(size=shape) / 100,
+        }
+
+    def _generate_object(
+        self, field: Dict[str, Any], shape: Tuple[int, int], **context: Any
+    ) -> Block:
+        return self._generate_fields(field["payload"], shape, **context)
+
+    def _generate_pick_one(
+        self, field: Dict[str, Any], shape: Tuple[int, int], **_: Any
+    ) -> np.ndarray:
+        choices = np.array(field.get("arr", [1, 2, 3, 4, 5]), dtype=object)
+        return choices[self.rng.integers(0, len(choices), size=shape)]
+
+    @staticmethod
+    def _generate_route(
+        field: Dict[str, Any],
+        shape: Tuple[int, int],
+        runtimes: np.ndarray,
+        device_indexes: range,
+        **_: Any,
+    ) -> Block:
+        latitude = np.empty(shape)
+        longitude = np.empty(shape)
+        for row, device_index in enumerate(device_indexes):
+            route = get_device_route(field, device_index)
+            km = float(field.get("speed") or route.speed_kph) * runtimes / 3600
+            if route.km > 0:
+                # Devices loop back to the start once they reach the end of their route
+                km %= route.km
+            latitude[row] = np.interp(km, route.cumulative_km, route.latitudes)
+            longitude[row] = np.interp(km, route.cumulative_km, route.longitudes)
+
+        return {"latitude": latitude, "longitude": longitude}
+
+    @staticmethod
+    def _generate_sinusoidal(
+        field: Dict[str, Any], shape: Tuple[int, int], counters: np.ndarray, **_: Any
+    ) -> np.ndarray:
+        values = (
+            np.sin(_SINUSOIDAL_STEP * counters) + int(field.get("min", -1)) + 1
+        ) * (int(field.get("max", 1)) / 2)
+        return np.broadcast_to(values, shape)
+
+    def _generate_string(
+        self, field: Dict[str, Any], shape: Tuple[int, int], **_: Any
+    ) -> np.ndarray:
+        if field.get("static"):
+            return np.full(shape, str(field.get("default", "static")), dtype=object)
+
+        minimum = int(field.get("min", 0))
+        maximum = int(field.get("max", 20))
+        if maximum <= 0:
+            return np.full(shape, "", dtype=object)
+
+        lengths = self.rng.integers(minimum, maximum, size=shape, endpoint=True)
+        characters = _ASCII_LETTERS[
+            self.rng.integers(0, len(_ASCII_LETTERS), size=(*shape, maximum))
+        ]
+        # Null bytes past each string's length are dropped when viewed as a fixed width bytes array
+        characters[np.arange(maximum) >= lengths[..., np.newaxis]] = 0
+        return (
+            np.ascontiguousarray(characters)
+            .view(f"S{maximum}")
+            .reshape(shape)
+            .astype(str)
+            .astype(object)
+        )
+
+    @staticmethod
+    def _generate_timestamp(
+        field: Dict[str, Any],
+        shape: Tuple[int, int],
+        timestamps: List[str],
+        **_: Any,
+    ) -> np.ndarray:
+        return np.broadcast_to(np.array(timestamps, dtype=object), shape)
+
+
+# Yields (device, tick, payload) for every cell of a block, shaped like the simulator lambda's payloads
+def iter_payloads(block: Block) -> Iterator[Tuple[int, int, Dict[str, Any]]]:
+    columns = _to_lists(block)
+    devices, ticks = _get_shape(block)
+    for device in range(devices):
+        for tick in range(ticks):
+            yield device, tick, _select(columns, device, tick)
+
+
+def _get_shape(block: Block) -> Tuple[int, int]:
+    for value in block.values():
+        shape = _get_shape(value) if isinstance(value, dict) else value.shape
+        if shape != (0, 0):
+            return shape  # type: ignore[no-any-return]
+    return (0, 0)
+
+
+def _to_lists(block: Block) -> Dict[str, Any]:
+    return {
+        name: _to_lists(value) if isinstance(value, dict) else value.tolist()
+        for name, value in block.items()
+    }
+
+
+def _select(columns: Dict[str, Any], device: int, tick: int) -> Dict[str, Any]:
+    return {
+        name: _select(value, device, tick)
+        if isinstance(value, dict)
+        else value[device][tick]
+        for name, value in columns.items()
+    }
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+# Standard Library
+# mypy: disable-error-code=misc
+from typing import Any, Generator
+from unittest.mock import MagicMock
+
+# Third Party Libraries
+import pytest
+from moto import mock_aws
+
+# AWS Libraries
+import boto3
+
+# CMS Common Library
+from cms_common.boto3_wrappers.dynamo_crud import DynHelpers
+
+# Connected Mobility Solution on AWS
+from ....api.vs_api.chalicelib.device_types import DeviceTypeCache
+
+TABLE_NAME = "test_device_types"
+
+
+@pytest.fixture(name="device_types_table")
+def fixture_device_types_table() -> Generator[Any, None, None]:
+    with mock_aws():
+        table = boto3.resource("dynamodb").create_table(
+            AttributeDefinitions=[{"AttributeName": "type_id", "AttributeType": "S"}],
+            TableName=TABLE_NAME,
+            KeySchema=[{"AttributeName": "type_id", "KeyType": "HASH"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        for index in range(150):
+            table.put_item(
+                Item={
+                    "type_id": f"type-{index}",
+                    "name": f"device type {index}",
+                    "payload": [{"name": "speed", "type": "int"}],
+                    "updated_datetime": "2024-01-01T00:00:00+00:00",
+                }
+            )
+        yield table
+
+
+def test_get_many_dedupes_and_chunks(
+    device_types_table: Any, mocker: MagicMock
+) -> None:
+    batch_get = mocker.spy(DynHelpers, "dyn_batch_get")
+    type_ids = [f"type-{index}" for index in range(150)] + ["type-0", "missing"]
+
+    device_types = DeviceTypeCache().get_many(TABLE_NAME, type_ids)
+
+    assert len(device_types) == 150
+    assert device_types["type-1"]["name"] == "device type 1"
+    assert "missing" not in device_types
+    # Versions and whole items, each in two chunks of at most 100 keys
+    assert [
+        len(call.args[0][TABLE_NAME]["Keys"]) for call in batch_get.call_args_list
+    ] == [100, 51, 100, 50]
+
+
+def test_get_many_serves_current_versions_from_cache(
+    device_types_table: Any, mocker: MagicMock
+) -> None:
+    cache = DeviceTypeCache()
+    cache.get_many(TABLE_NAME, ["type-0", "type-1"])
+    batch_get = mocker.spy(DynHelpers, "dyn_batch_get")
+
+    device_types = cache.get_many(TABLE_NAME, ["type-0", "type-1"])
+
+    assert device_types["type-0"]["name"] == "device type 0"
+    # Only the version check goes to the table
+    batch_get.assert_called_once()
+    assert "ProjectionExpression" in batch_get.call_args.args[0][TABLE_NAME]
+
+    device_types_table.put_item(
+        Item={
+            "type_id": "type-1",
+            "name": "renamed",
+            "updated_datetime": "2024-01-02T00:00:00+00:00",
+        }
+    )
+    batch_get.reset_mock()
+
+    device_types = cache.get_many(TABLE_NAME, ["type-0", "type-1"])
+
+    assert device_types["type-1"]["name"] == "renamed"
+    assert batch_get.call_count == 2
+    assert batch_get.call_args.args[0][TABLE_NAME]["Keys"] == [{"type_id": "type-1"}]
+
+
+def test_get_many_evicts_least_recently_used(
+    device_types_table: Any, mocker: MagicMock
+) -> None:
+    cache = DeviceTypeCache(maxsize=2)
+    cache.get_many(TABLE_NAME, ["type-0", "type-1"])
+    cache.get_many(TABLE_NAME, ["type-0"])
+    cache.get_many(TABLE_NAME, ["type-2"])
+    batch_get = mocker.spy(DynHelpers, "dyn_batch_get")
+
+    cache.get_many(TABLE_NAME, ["type-0", "type-2"])
+    assert batch_get.call_count == 1
+
+    # type-1 was the least recently used, and an invalidated type is fetched again too
+    cache.invalidate("type-0")
+    cache.get_many(TABLE_NAME, ["type-0", "type-1"])
+    assert batch_get.call_args.args[0][TABLE_NAME]["Keys"] == [
+        {"type_id": "type-0"},
+        {"type_id": "type-1"},
+    ]
+
+
+def test_get_many_empty() -> None:
+    assert not DeviceTypeCache().get_many(TABLE_NAME, [])
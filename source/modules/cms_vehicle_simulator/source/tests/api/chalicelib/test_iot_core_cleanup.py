@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+# Standard Library
+# mypy: disable-error-code=misc
+import json
+from unittest.mock import MagicMock
+
+# Connected Mobility Solution on AWS
+from ....api.vs_api.chalicelib.iot_core_cleanup import IotCoreCleanup
+
+
+def test_cleanup(mocker: MagicMock) -> None:
+    mocked_api_call: MagicMock = mocker.patch(
+        "botocore.client.BaseClient._make_api_call"
+    )
+
+    cleanup_job = IotCoreCleanup().create_job()
+    IotCoreCleanup().start("test_simulation_id", cleanup_job)
+
+    assert cleanup_job["status"] == "running"
+    assert cleanup_job["deleted_things"] == 0
+    operation, kwargs = mocked_api_call.call_args.args
+    assert operation == "Invoke"
+    assert kwargs["FunctionName"] == "test"
+    assert kwargs["InvocationType"] == "Event"
+    assert json.loads(kwargs["Payload"]) == {
+        "simulation": {"sim_id": "test_simulation_id"},
+        "cleanup_job": cleanup_job,
+    }
+
+
+def test_cleanup_publish_only(mocker: MagicMock) -> None:
+    mocked_api_call: MagicMock = mocker.patch(
+        "botocore.client.BaseClient._make_api_call"
+    )
+
+    cleanup_job = IotCoreCleanup().create_job(publish_only=True)
+    IotCoreCleanup().start("test_simulation_id", cleanup_job)
+
+    assert cleanup_job["status"] == "complete"
+    mocked_api_call.assert_not_called()
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+# Standard Library
+# mypy: disable-error-code=misc
+import base64
+from typing import Any, Generator
+
+# Third Party Libraries
+import pytest
+from moto import mock_aws
+
+# AWS Libraries
+import boto3
+from chalice.app import BadRequestError
+
+# Connected Mobility Solution on AWS
+from ....api.vs_api.chalicelib.pagination import (
+    MAX_PAGE_SIZE,
+    decode_cursor,
+    encode_cursor,
+    get_page,
+    get_page_size,
+)
+
+TABLE_NAME = "test_simulations"
+
+
+@pytest.fixture(name="simulations_table")
+def fixture_simulations_table() -> Generator[Any, None, None]:
+    with mock_aws():
+        table = boto3.resource("dynamodb").create_table(
+            TableName=TABLE_NAME,
+            AttributeDefinitions=[{"AttributeName": "sim_id", "AttributeType": "S"}],
+            KeySchema=[{"AttributeName": "sim_id", "KeyType": "HASH"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        for index in range(5):
+            table.put_item(
+                Item={
+                    "sim_id": f"sim-{index}",
+                    "name": f"simulation {index}",
+                    "cleanup": {"status": "SUCCEEDED"},
+                }
+            )
+        yield table
+
+
+def test_cursor_round_trip() -> None:
+    cursor = encode_cursor({"sim_id": "sim-1"})
+    assert cursor and "sim-1" not in cursor
+    assert decode_cursor(cursor) == {"sim_id": "sim-1"}
+    assert encode_cursor(None) is None
+    assert decode_cursor(None) is None
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not a cursor",
+        base64.urlsafe_b64encode(b"[1, 2]").decode(),
+        base64.urlsafe_b64encode(b'{"sim_id": 1}').decode(),
+    ],
+)
+def test_decode_cursor_invalid(cursor: str) -> None:
+    with pytest.raises(BadRequestError, match="Invalid cursor"):
+        decode_cursor(cursor)
+
+
+def test_get_page_size() -> None:
+    assert get_page_size(None) == 50
+    assert get_page_size("10") == 10
+    for limit in ["0", str(MAX_PAGE_SIZE + 1), "ten"]:
+        with pytest.raises(BadRequestError, match="limit must be"):
+            get_page_size(limit)
+
+
+def test_get_page(simulations_table: Any) -> None:
+    seen = []
+    query_params = {"limit": "2"}
+    while True:
+        page = get_page(simulations_table.name, query_params, ["sim_id", "name"])
+        assert len(page["items"]) <= 2
+        # Only the summary attributes are read
+        assert all(set(item) == {"sim_id", "name"} for item in page["items"])
+        seen += [item["sim_id"] for item in page["items"]]
+        if not page["cursor"]:
+            break
+        query_params = {"limit": "2", "cursor": page["cursor"]}
+
+    assert sorted(seen) == [f"sim-{index}" for index in range(5)]
+
+
+def test_get_page_full_view(simulations_table: Any) -> None:
+    page = get_page(
+        simulations_table.name, {"view": "full", "limit": "5"}, ["sim_id", "name"]
+    )
+    assert all("cleanup" in item for item in page["items"])
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+# Standard Library
+# mypy: disable-error-code=misc
+from typing import Any, Dict
+from unittest.mock import MagicMock
+
+# Third Party Libraries
+import pytest
+from cattrs import ClassValidationError, structure, unstructure
+
+# Connected Mobility Solution on AWS
+from ....api.vs_api.chalicelib import validation
+from ....api.vs_api.chalicelib.dynamo_schema import DeviceType, DeviceTypeTemplate
+from ....api.vs_api.chalicelib.validation import ValidationCache
+
+DEVICE_TYPE = {
+    "type_id": "test_type_id",
+    "name": "test device type",
+    "topic": "cms/data/test",
+    "payload": [
+        {"name": "vin", "type": "id", "static": True},
+        {"name": "speed", "type": "float", "min": 0.0, "max": 100.0},
+        {
+            "name": "location",
+            "type": "object",
+            "payload": [{"name": "latitude", "type": "float"}],
+        },
+    ],
+}
+
+
+@pytest.mark.parametrize(
+    "json_body, cls",
+    [
+        (DEVICE_TYPE, DeviceType),
+        (
+            {"template_id": "test", "payload": DEVICE_TYPE["payload"]},
+            DeviceTypeTemplate,
+        ),
+    ],
+)
+def test_structure_matches_cattrs(json_body: Dict[str, Any], cls: Any) -> None:
+    cache = ValidationCache()
+    for _ in range(2):
+        item, unstructured = cache.structure(json_body, cls)
+        assert item == structure(json_body, cls)
+        assert unstructured == unstructure(structure(json_body, cls))
+
+
+def test_structure_validates_changed_attributes(mocker: MagicMock) -> None:
+    cache = ValidationCache()
+    spy = mocker.spy(validation, "structure")
+    cache.structure(DEVICE_TYPE, DeviceType)
+    # Every attribute, then the device type without them
+    assert spy.call_count == 4
+
+    spy.reset_mock()
+    cache.structure({**DEVICE_TYPE, "name": "renamed"}, DeviceType)
+    assert spy.call_count == 1
+
+    spy.reset_mock()
+    edited = {
+        **DEVICE_TYPE,
+        "payload": [
+            *DEVICE_TYPE["payload"][:2],
+            {"name": "location", "type": "object", "payload": []},
+        ],
+    }
+    cache.structure(edited, DeviceType)
+    assert spy.call_count == 2
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        [{"name": "speed", "type": "float", "min": "low"}],
+        [{"name": "vin$", "type": "id"}],
+        ["vin"],
+        None,
+    ],
+)
+def test_structure_invalid(payload: Any) -> None:
+    cache = ValidationCache()
+    with pytest.raises(ClassValidationError):
+        cache.structure({**DEVICE_TYPE, "payload": payload}, DeviceType)
+
+
+def test_structure_evicts_least_recently_used() -> None:
+    cache = ValidationCache(maxsize=2)
+    cache.structure(DEVICE_TYPE, DeviceType)
+    assert len(cache._attributes) == 2  # pylint: disable=protected-access
+    cache.clear()
+    assert not cache._attributes  # pylint: disable=protected-access
@@ -6,14 +6,19 @@
 # Standard Library
 # mypy: disable-error-code=misc
 import json
+import os
+import threading
+from typing import Dict, List, Optional
 from unittest import mock
 
 # Third Party Libraries
+import arrow
+import pytest
 from moto import mock_aws
 
 # AWS Libraries
 import boto3
-from chalice.app import Request
+from chalice.app import BadRequestError, ChaliceViewError, Request
 
 # CMS Common Library
 from cms_common.boto3_wrappers.dynamo_crud import DynHelpers
@@ -22,6 +27,23 @@ from cms_common.boto3_wrappers.dynamo_crud import DynHelpers
 from ...api.vs_api import app
 
 
+def get_list_request(query_params: Optional[Dict[str, List[str]]] = None) -> Request:
+    return Request(
+        event_dict={
+            "multiValueQueryStringParameters": query_params,
+            "headers": {},
+            "pathParameters": None,
+            "isBase64Encoded": False,
+            "body": None,
+            "requestContext": {
+                "resourcePath": "",
+                "httpMethod": "GET",
+            },
+            "stageVariables": None,
+        }
+    )
+
+
 ### Template Tests ###
 def test_create_template(
     vsapi_create_template_event: Request, mocker: mock.MagicMock
@@ -55,34 +77,57 @@ def test_get_template_by_template_id(mocker: mock.MagicMock) -> None:
 
 
 def test_get_all_template_names(mocker: mock.MagicMock) -> None:
-    mocked_response = "template1"
-    mocked_dyn_scan: mock.MagicMock = mocker.patch.object(
+    mocker.patch.object(app, "get_current_request", return_value=get_list_request())
+    mocked_dyn_scan_page: mock.MagicMock = mocker.patch.object(
         DynHelpers,
-        "dyn_scan",
-        return_value=iter([mocked_response]),
+        "dyn_scan_page",
+        return_value=([{"template_id": "template1"}], None),
     )
     response = app.get_all_template_names()
-    assert response.body == mocked_response
-    mocked_dyn_scan.assert_called_once()
+    assert response.body == {"items": [{"template_id": "template1"}], "cursor": None}
+    assert mocked_dyn_scan_page.call_args.args == (
+        os.environ["DYN_TEMPLATES_TABLE"],
+        50,
+        None,
+    )
+    assert mocked_dyn_scan_page.call_args.kwargs["ExpressionAttributeNames"] == {
+        "#a0": "template_id",
+        "#a1": "created_datetime",
+        "#a2": "updated_datetime",
+    }
 
 
+@mock_aws
 def test_update_template(
     vsapi_create_template_event: Request, mocker: mock.MagicMock
 ) -> None:
+    table = boto3.resource("dynamodb").create_table(
+        AttributeDefinitions=[{"AttributeName": "template_id", "AttributeType": "S"}],
+        TableName=os.environ["DYN_TEMPLATES_TABLE"],
+        KeySchema=[{"AttributeName": "template_id", "KeyType": "HASH"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    table.put_item(
+        Item={
+            "template_id": "test_id",
+            "payload": [{"name": "old_name", "type": "id"}],
+            "timestamp": "1",
+        }
+    )
     mocked_app_req: mock.MagicMock = mocker.patch.object(
         app,
         "get_current_request",
         return_value=vsapi_create_template_event,
     )
-    mocked_put_item: mock.MagicMock = mocker.patch.object(
-        DynHelpers,
-        "update_item",
-        return_value=None,
-    )
+
     response = app.update_template()
+
     assert response.body == {}
     mocked_app_req.assert_called_once()
-    mocked_put_item.assert_called_once()
+    template = table.get_item(Key={"template_id": "test_id"})["Item"]
+    assert template["payload"] == [{"name": "test_name", "type": "id"}]
+    assert template["updated_datetime"]
+    assert template["timestamp"] != "1"
 
 
 def test_delete_template(mocker: mock.MagicMock) -> None:
@@ -113,6 +158,8 @@ def test_create_device_type(
     response = app.create_device_type()
     assert response.body == {}
     mocked_put_item.assert_called_once()
+    device_type = mocked_put_item.call_args.args[1]
+    assert device_type["updated_datetime"] == device_type["created_datetime"]
     mocked_app_req.assert_called_once()
 
 
@@ -129,27 +176,29 @@ def test_get_device_type_by_id(mocker: mock.MagicMock) -> None:
 
 
 def test_get_device_types(mocker: mock.MagicMock) -> None:
-    mocked_response = "test"
-    mocked_dyn_scan: mock.MagicMock = mocker.patch.object(
+    mocker.patch.object(app, "get_current_request", return_value=get_list_request())
+    mocked_dyn_scan_page: mock.MagicMock = mocker.patch.object(
         DynHelpers,
-        "dyn_scan",
-        return_value=iter([mocked_response]),
+        "dyn_scan_page",
+        return_value=([{"type_id": "test"}], {"type_id": "test"}),
     )
     response = app.get_device_types()
-    assert response.body == mocked_response
-    mocked_dyn_scan.assert_called_once()
+    assert response.body["items"] == [{"type_id": "test"}]
+    assert response.body["cursor"]
+    mocked_dyn_scan_page.assert_called_once()
 
 
 def test_get_devices(mocker: mock.MagicMock) -> None:
-    mocked_response = "test"
-    mocked_dyn_scan: mock.MagicMock = mocker.patch.object(
+    mocker.patch.object(app, "get_current_request", return_value=get_list_request())
+    mocked_dyn_scan_page: mock.MagicMock = mocker.patch.object(
         DynHelpers,
-        "dyn_scan",
-        return_value=iter([mocked_response]),
+        "dyn_scan_page",
+        return_value=([{"type_id": "test"}], {"type_id": "test"}),
     )
     response = app.get_devices()
-    assert response.body == mocked_response
-    mocked_dyn_scan.assert_called_once()
+    assert response.body["items"] == [{"type_id": "test"}]
+    assert response.body["cursor"]
+    mocked_dyn_scan_page.assert_called_once()
 
 
 def test_update_device_type_by_id(
@@ -162,13 +211,14 @@ def test_update_device_type_by_id(
     )
     mocked_put_item: mock.MagicMock = mocker.patch.object(
         DynHelpers,
-        "update_item",
+        "put_item",
         return_value=None,
     )
     response = app.update_device_type_by_id()
     assert response.body == {}
     mocked_app_req.assert_called_once()
     mocked_put_item.assert_called_once()
+    assert mocked_put_item.call_args.args[1]["updated_datetime"]
 
 
 def test_delete_device_type_by_id(mocker: mock.MagicMock) -> None:
@@ -203,47 +253,78 @@ def test_create_simulation(
 
 
 def test_get_simulation_by_id(mocker: mock.MagicMock) -> None:
-    mocked_response = {"devices": [{"type_id": "test", "test": "test"}]}
+    mocked_response = {
+        "devices": [
+            {"type_id": "test", "test": "test"},
+            {"type_id": "test", "test": "test_2"},
+            {"type_id": "missing", "test": "test_3"},
+        ]
+    }
     mocked_dyn_scan: mock.MagicMock = mocker.patch.object(
         DynHelpers,
         "get_item",
         return_value=mocked_response,
     )
+    mocked_get_many: mock.MagicMock = mocker.patch.object(
+        app.device_type_cache,
+        "get_many",
+        return_value={"test": {"type_id": "test", "name": "test_type"}},
+    )
     response = app.get_simulation_by_id("test")
-    assert response.body == mocked_response
-    mocked_dyn_scan.assert_called()
+    assert response.body == {
+        "devices": [
+            {"type_id": "test", "test": "test", "name": "test_type"},
+            {"type_id": "test", "test": "test_2", "name": "test_type"},
+            {"type_id": "missing", "test": "test_3"},
+        ]
+    }
+    mocked_dyn_scan.assert_called_once()
+    # Every device type is hydrated in one call, however many devices share it
+    mocked_get_many.assert_called_once()
 
 
 def test_get_simulations(mocker: mock.MagicMock) -> None:
-    mocked_response = "test"
-    mocked_req = Request(
-        event_dict={
-            "multiValueQueryStringParameters": {},
-            "headers": {},
-            "pathParameters": None,
-            "isBase64Encoded": False,
-            "body": None,
-            "requestContext": {
-                "resourcePath": "",
-                "httpMethod": "GET",
-            },
-            "stageVariables": None,
-        }
-    )
     mocked_app_req: mock.MagicMock = mocker.patch.object(
-        app, "get_current_request", return_value=mocked_req
+        app, "get_current_request", return_value=get_list_request()
     )
-    mocked_dyn_scan: mock.MagicMock = mocker.patch.object(
+    mocked_dyn_scan_page: mock.MagicMock = mocker.patch.object(
         DynHelpers,
-        "dyn_scan",
-        return_value=iter([mocked_response]),
+        "dyn_scan_page",
+        return_value=([{"sim_id": "test"}], None),
     )
     response = app.get_simulations()
-    assert response.body == mocked_response
-    mocked_dyn_scan.assert_called_once()
+    assert response.body == {"items": [{"sim_id": "test"}], "cursor": None}
+    assert "#a0" in mocked_dyn_scan_page.call_args.kwargs["ProjectionExpression"]
     mocked_app_req.assert_called_once()
 
 
+def test_get_simulations_pages(mocker: mock.MagicMock) -> None:
+    mocked_dyn_scan_page: mock.MagicMock = mocker.patch.object(
+        DynHelpers,
+        "dyn_scan_page",
+        return_value=([{"sim_id": "test-1"}], {"sim_id": "test-1"}),
+    )
+    mocker.patch.object(app, "get_current_request", return_value=get_list_request())
+    cursor = app.get_simulations().body["cursor"]
+
+    mocker.patch.object(
+        app,
+        "get_current_request",
+        return_value=get_list_request(
+            {"limit": ["10"], "cursor": [cursor], "view": ["full"]}
+        ),
+    )
+    app.get_simulations()
+
+    # The cursor resumes the scan where the previous page stopped
+    assert mocked_dyn_scan_page.call_args.args == (
+        os.environ["DYN_SIMULATIONS_TABLE"],
+        10,
+        {"sim_id": "test-1"},
+    )
+    assert mocked_dyn_scan_page.call_args.kwargs == {}
+
+
 def test_get_simulations_stats(mocker: mock.MagicMock) -> None:
     mocked_req = Request(
         event_dict={
@@ -264,17 +345,37 @@ def test_get_simulations_stats(mocker: mock.MagicMock) -> None:
     mocked_app_req: mock.MagicMock = mocker.patch.object(
         app, "get_current_request", return_value=mocked_req
     )
-    mocked_dyn_scan: mock.MagicMock = mocker.patch.object(
+    mocked_dyn_query: mock.MagicMock = mocker.patch.object(
         DynHelpers,
-        "get_all",
-        return_value=None,
+        "dyn_query",
+        return_value=[],
     )
     response = app.get_simulations()
     assert response.body == {"devices": 0, "sims": 0}
-    mocked_dyn_scan.assert_called_once()
+    mocked_dyn_query.assert_called_once()
     mocked_app_req.assert_called_once()
 
 
+def test_get_running_stats(mocker: mock.MagicMock) -> None:
+    mocked_dyn_query: mock.MagicMock = mocker.patch.object(
+        DynHelpers,
+        "dyn_query",
+        return_value=[
+            {
+                "devices": [
+                    {"type_id": "test_id", "name": "test_name", "amount": "10"},
+                    {"type_id": "test_id_2", "name": "test_name_2", "amount": "5"},
+                ]
+            },
+            {"devices": [{"type_id": "test_id", "name": "test_name", "amount": "1"}]},
+        ],
+    )
+
+    assert app.get_running_stats() == {"devices": 16, "sims": 2}
+    # Only the running simulations index is read, never the whole table
+    assert mocked_dyn_query.call_args.kwargs["index_name"] == "test"
+
+
 @mock_aws
 def test_update_simulation(
     vsapi_update_simulations_event: Request, mocker: mock.MagicMock
@@ -367,9 +468,212 @@ def test_update_simulation_by_id(
     assert response.body == {}
     mocked_app_req.assert_called_once()
     mocked_get_req.assert_called_once()
+    saved_simulation = mocked_update_req.call_args.args[1]
+    assert saved_simulation["stage"] == "running"
+    assert saved_simulation["running"] == "running"
     mocked_update_req.assert_called_once()
 
 
+def test_update_simulation_by_id_stop(
+    vsapi_update_simulation_by_id_event: Request, mocker: mock.MagicMock
+) -> None:
+    vsapi_update_simulation_by_id_event.json_body["action"] = "stop"
+    mocker.patch.object(
+        app, "get_current_request", return_value=vsapi_update_simulation_by_id_event
+    )
+    mocker.patch.object(
+        DynHelpers,
+        "get_item",
+        return_value={
+            "sim_id": "test_id",
+            "name": "test_name",
+            "stage": "running",
+            "running": "running",
+            "duration": 10,
+            "interval": 1,
+            "devices": [{"type_id": "test_id", "name": "test_name", "amount": "1"}],
+            "current_run_arn": "test_arn",
+        },
+    )
+    mocked_put_req: mock.MagicMock = mocker.patch.object(DynHelpers, "put_item")
+    mocker.patch.object(app, "StepFunctionsStateMachine")
+    mocked_start: mock.MagicMock = mocker.patch.object(app.IotCoreCleanup, "start")
+    # The cleanup lambda only starts once the simulation with its cleanup job is saved
+    mocked_start.side_effect = lambda *_: mocked_put_req.assert_called_once()
+
+    response = app.update_simulation_by_id("test_id")
+
+    saved_simulation = mocked_put_req.call_args.args[1]
+    assert response.body["cleanup"]["test_id"] == saved_simulation["cleanup"]
+    assert saved_simulation["stage"] == "sleeping"
+    assert "running" not in saved_simulation
+    assert saved_simulation["cleanup"]["status"] == "running"
+    mocked_start.assert_called_once_with("test_id", saved_simulation["cleanup"])
+
+
+def test_update_simulation_by_id_start_during_cleanup(
+    vsapi_update_simulation_by_id_event: Request, mocker: mock.MagicMock
+) -> None:
+    mocker.patch.object(
+        app, "get_current_request", return_value=vsapi_update_simulation_by_id_event
+    )
+    mocker.patch.object(
+        DynHelpers,
+        "get_item",
+        return_value={
+            "sim_id": "test_id",
+            "name": "test_name",
+            "stage": "sleeping",
+            "duration": 10,
+            "interval": 1,
+            "devices": [{"type_id": "test_id", "name": "test_name", "amount": "1"}],
+            "cleanup": {
+                "job_id": "test_job_id",
+                "status": "running",
+                "updated_datetime": arrow.utcnow().isoformat(),
+            },
+        },
+    )
+    mocked_put_req: mock.MagicMock = mocker.patch.object(DynHelpers, "put_item")
+
+    with pytest.raises(BadRequestError):
+        app.update_simulation_by_id("test_id")
+    mocked_put_req.assert_not_called()
+
+
+def test_get_simulator_state_machine_injected_arn(mocker: mock.MagicMock) -> None:
+    mocker.patch.dict(
+        os.environ,
+        {
+            "SIMULATOR_STATE_MACHINE_ARN": "arn:aws:states:us-east-1:123456789012:stateMachine:test"
+        },
+    )
+    mocked_find: mock.MagicMock = mocker.patch.object(
+        app.StepFunctionsStateMachine, "find"
+    )
+
+    state_machine = app.get_simulator_state_machine()
+
+    assert state_machine.state_machine_arn == os.environ["SIMULATOR_STATE_MACHINE_ARN"]
+    assert app.get_simulator_state_machine() is state_machine
+    mocked_find.assert_not_called()
+
+
+@mock_aws
+def test_get_simulator_state_machine_lookup() -> None:
+    stepfunctions_client = boto3.client("stepfunctions")
+    state_machine_arn = stepfunctions_client.create_state_machine(
+        name="test",
+        definition=json.dumps({"test": "test"}),
+        roleArn="arn:aws:iam::123456789012:role/test_role",
+    )["stateMachineArn"]
+
+    state_machine = app.get_simulator_state_machine()
+
+    assert state_machine.state_machine_arn == state_machine_arn
+    assert app.get_simulator_state_machine() is state_machine
+
+
+@mock_aws
+def test_get_simulator_state_machine_not_found() -> None:
+    with pytest.raises(ChaliceViewError):
+        app.get_simulator_state_machine()
+    assert app.get_simulator_state_machine.cache_info().currsize == 0
+
+
+def test_update_simulations_stop_many(
+    vsapi_update_simulations_event: Request, mocker: mock.MagicMock
+) -> None:
+    body = vsapi_update_simulations_event.json_body
+    body["action"] = "stop"
+    body["simulations"] = [
+        dict(body["simulations"][0], sim_id=f"test_id_{index}") for index in range(5)
+    ]
+    mocker.patch.object(
+        app, "get_current_request", return_value=vsapi_update_simulations_event
+    )
+    mocker.patch.object(
+        DynHelpers,
+        "get_item",
+        side_effect=lambda _, key: {
+            "sim_id": key["sim_id"],
+            "name": "test_name",
+            "stage": "running",
+            "duration": 10,
+            "interval": 1,
+            "devices": [{"type_id": "test_id", "name": "test_name", "amount": "1"}],
+            "current_run_arn": f"{key['sim_id']}_arn",
+        },
+    )
+    mocked_put_req: mock.MagicMock = mocker.patch.object(DynHelpers, "put_item")
+    mocked_state_machine: mock.MagicMock = mocker.patch.object(
+        app, "StepFunctionsStateMachine"
+    )
+    mocked_start: mock.MagicMock = mocker.patch.object(app.IotCoreCleanup, "start")
+
+    response = app.update_simulations()
+
+    assert list(response.body["cleanup"]) == [f"test_id_{index}" for index in range(5)]
+    assert mocked_put_req.call_count == 5
+    mocked_state_machine.assert_called_once()
+    assert mocked_state_machine.return_value.stop_run.call_count == 5
+    assert mocked_start.call_count == 5
+
+
+def test_update_simulations_saves_serially(
+    vsapi_update_simulations_event: Request, mocker: mock.MagicMock
+) -> None:
+    body = vsapi_update_simulations_event.json_body
+    body["action"] = "stop"
+    body["simulations"] = [
+        dict(body["simulations"][0], sim_id=f"test_id_{index}") for index in range(5)
+    ]
+    mocker.patch.object(
+        app, "get_current_request", return_value=vsapi_update_simulations_event
+    )
+    dynamo_threads = set()
+
+    def get_item(_: str, key: Dict[str, str]) -> Dict[str, object]:
+        dynamo_threads.add(threading.current_thread())
+        return {
+            "sim_id": key["sim_id"],
+            "name": "test_name",
+            "stage": "running",
+            "duration": 10,
+            "interval": 1,
+            "devices": [{"type_id": "test_id", "name": "test_name", "amount": "1"}],
+            "current_run_arn": f"{key['sim_id']}_arn",
+        }
+
+    def stop_run(run_arn: str, _: str) -> None:
+        if run_arn == "test_id_2_arn":
+            raise ChaliceViewError("test stop failure")
+
+    mocker.patch.object(DynHelpers, "get_item", side_effect=get_item)
+    mocked_put_req: mock.MagicMock = mocker.patch.object(
+        DynHelpers,
+        "put_item",
+        side_effect=lambda *_: dynamo_threads.add(threading.current_thread()),
+    )
+    mocked_state_machine: mock.MagicMock = mocker.patch.object(
+        app, "StepFunctionsStateMachine"
+    )
+    mocked_state_machine.return_value.stop_run.side_effect = stop_run
+    mocker.patch.object(app.IotCoreCleanup, "start")
+
+    with pytest.raises(ChaliceViewError):
+        app.update_simulations()
+
+    # The simulations that did stop are still saved, all from the request's own thread
+    assert [call.args[1]["sim_id"] for call in mocked_put_req.call_args_list] == [
+        "test_id_0",
+        "test_id_1",
+        "test_id_3",
+        "test_id_4",
+    ]
+    assert dynamo_threads == {threading.current_thread()}
+
+
 def test_delete_simulation_by_id(mocker: mock.MagicMock) -> None:
     mocked_get_req: mock.MagicMock = mocker.patch.object(
         DynHelpers,
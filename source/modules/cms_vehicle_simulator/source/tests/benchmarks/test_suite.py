@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+# Standard Library
+# mypy: disable-error-code=misc
+import json
+from pathlib import Path
+
+# Connected Mobility Solution on AWS
+from ...benchmarks.suite import (
+    GENERATOR_LIMITS,
+    SuiteConfig,
+    compare_results,
+    main,
+    run_suite,
+)
+
+SMALL_CONFIG = SuiteConfig(
+    template_sizes=(10,),
+    generator_calls=10,
+    devices=2,
+    ticks=2,
+    encoded_payloads=5,
+    provisioned_devices=5,
+    latency_ms=0,
+    repeats=1,
+)
+
+
+def test_run_suite() -> None:
+    results = run_suite(SMALL_CONFIG)
+
+    records = {
+        (record["name"], record["params"].get("template"), record["metric"]): record
+        for record in results["results"]
+    }
+    assert records[
+        ("payload_assembly", "vss_default_template", "device_ticks_per_second")
+    ]["value"]
+    assert records[("json_encoding", "synthetic_10", "megabytes_per_second")]["value"]
+    assert records[("provisioning", None, "devices_per_second")]["value"]
+    assert records[("teardown", None, "devices_per_second")]["value"]
+    assert [
+        record["params"]["type"]
+        for record in results["results"]
+        if record["name"] == "generic_sim"
+    ] == list(GENERATOR_LIMITS)
+    assert results["config"]["devices"] == 2
+
+
+def test_compare_results() -> None:
+    record = {
+        "name": "teardown",
+        "params": {"devices": 5},
+        "metric": "devices_per_second",
+    }
+    baseline = {"results": [{**record, "value": 100.0}]}
+
+    assert not compare_results(baseline, {"results": [{**record, "value": 95.0}]}, 0.1)
+    assert compare_results(baseline, {"results": [{**record, "value": 80.0}]}, 0.1) == [
+        {**record, "value": 80.0, "baseline": 100.0, "change": -0.2}
+    ]
+    # Benchmarks the baseline did not run are not regressions
+    assert not compare_results(
+        {"results": []}, {"results": [{**record, "value": 1.0}]}, 0.1
+    )
+
+
+def test_main_writes_results(tmp_path: Path) -> None:
+    output = tmp_path / "results.json"
+    arguments = [
+        "--template-sizes",
+        "10",
+        "--devices",
+        "2",
+        "--ticks",
+        "1",
+        "--provisioned-devices",
+        "2",
+        "--latency-ms",
+        "0",
+        "--repeats",
+        "1",
+        "--output",
+        str(output),
+    ]
+
+    assert main(arguments) == 0
+    results = json.loads(output.read_text(encoding="utf-8"))
+    for record in results["results"]:
+        record["value"] *= 10
+
+    # Every metric of the next run is far below the inflated baseline
+    (tmp_path / "baseline.json").write_text(json.dumps(results), encoding="utf-8")
+    assert main([*arguments, "--baseline", str(tmp_path / "baseline.json")]) == 1
@@ -11,6 +11,7 @@ from .fixtures.fixture_shared import (
     fixture_mock_module_env_vars,
 )
 from .handlers.fixtures.fixture_api import (
+    fixture_clear_simulator_state_machine,
     fixture_create_device_type_event,
     fixture_create_event,
     fixture_create_simulation_event,
@@ -38,9 +39,12 @@ from .handlers.fixtures.fixture_provision import (
     fixture_provisioned_policy,
     fixture_provisioned_secrets,
     fixture_provisioned_thing,
+    fixture_simulations_table,
 )
 from .handlers.fixtures.fixture_simulate import (
     fixture_limits,
+    fixture_routes_bucket,
+    fixture_simulate_batch_data_event,
     fixture_simulate_data_event,
 )
 from .infrastructure.fixtures.fixture_stack_templates import (
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+# Standard Library
+# mypy: disable-error-code=misc
+import asyncio
+import json
+from typing import Dict
+
+# Third Party Libraries
+from moto import mock_aws
+
+# AWS Libraries
+import boto3
+
+# Connected Mobility Solution on AWS
+from ...fleet.broker import LocalBroker
+from ...fleet.engine import (
+    DeviceCredentials,
+    FleetConfig,
+    FleetEngine,
+    load_device_credentials,
+    run_local,
+)
+from ...fleet.mqtt import MqttClient
+from ...handlers.stepfunction.function.template_compiler import CompiledTemplate
+
+TEMPLATE = CompiledTemplate(
+    [
+        {"name": "vin", "type": "id", "static": True},
+        {"name": "speed", "type": "int", "min": 0, "max": 120},
+    ]
+)
+
+
+def test_fleet_engine_local_broker() -> None:
+    device_names = [f"test-device-{index}" for index in range(200)]
+    engine = FleetEngine(
+        TEMPLATE,
+        device_names,
+        FleetConfig(
+            host="",
+            port=0,
+            interval=0.05,
+            duration=0.2,
+            connects_per_second=2000,
+        ),
+    )
+
+    report = asyncio.run(run_local(engine))
+
+    assert report["connected"] == 200
+    assert report["connect_failures"] == 0
+    assert report["device_failures"] == 0
+    assert report["messages"] == 800
+    assert report["broker_publishes"] == 800
+    assert report["broker_peak_connections"] > 1
+    assert report["connects_per_second"] > 0
+    assert report["messages_per_second"] > 0
+    assert set(report["ack_latency_ms"]) == {"p50", "p90", "p99"}
+
+
+def test_fleet_engine_provision_by_claim() -> None:
+    async def answer_provisioning_requests(responder: MqttClient) -> None:
+        await responder.subscribe("$aws/certificates/create/json")
+        await responder.subscribe(
+            "$aws/provisioning-templates/test-template/provision/json"
+        )
+        tokens: Dict[str, str] = {}
+        while True:
+            topic, payload = await responder.wait_for_message(timeout=5)
+            if topic == "$aws/certificates/create/json":
+                token = f"token-{len(tokens)}"
+                tokens[token] = ""
+                await responder.publish(
+                    f"{topic}/accepted",
+                    json.dumps(
+                        {
+                            "certificateId": token,
+                            "certificatePem": "test-certificate",
+                            "privateKey": "test-key",
+                            "certificateOwnershipToken": token,
+                        }
+                    ),
+                )
+            else:
+                request = json.loads(payload)
+                await responder.publish(
+                    f"{topic}/accepted",
+                    json.dumps(
+                        {"thingName": f"Vehicle_{request['parameters']['vin']}"}
+                    ),
+                )
+
+    async def run() -> Dict[str, int]:
+        async with LocalBroker() as broker:
+            responder = MqttClient("responder", broker.host, broker.port)
+            await responder.connect()
+            responding = asyncio.create_task(answer_provisioning_requests(responder))
+            engine = FleetEngine(
+                TEMPLATE,
+                ["vin-0", "vin-1"],
+                FleetConfig(
+                    host=broker.host,
+                    port=broker.port,
+                    interval=0.05,
+                    duration=0.1,
+                    # The broker broadcasts the replies IoT Core only sends to
+                    # the requester, so provisioning exchanges must not overlap
+                    connects_per_second=5,
+                    use_tls=False,
+                    provisioning_template="test-template",
+                ),
+            )
+            report = await engine.run()
+            responding.cancel()
+            await responder.disconnect()
+            assert report["connected"] == 2
+            return broker.received
+
+    received = asyncio.run(run())
+
+    # Devices publish as the thing the provisioning template registered them as
+    assert received["cms/data/simulated/Vehicle_vin-0"] == 2
+    assert received["cms/data/simulated/Vehicle_vin-1"] == 2
+
+
+def test_fleet_engine_connect_failures() -> None:
+    async def run() -> dict:
+        async with LocalBroker(
+            authorize=lambda client_id: client_id != "blocked"
+        ) as broker:
+            engine = FleetEngine(
+                TEMPLATE,
+                ["allowed", "blocked"],
+                FleetConfig(
+                    host=broker.host,
+                    port=broker.port,
+                    interval=0.05,
+                    duration=0.05,
+                    use_tls=False,
+                ),
+            )
+            return await engine.run()
+
+    report = asyncio.run(run())
+
+    assert report["connected"] == 1
+    assert report["connect_failures"] == 1
+    assert report["device_failures"] == 1
+    assert report["messages"] == 1
+
+
+@mock_aws
+def test_load_device_credentials() -> None:
+    boto3.client("secretsmanager").create_secret(
+        Name="vs-device/test-device-secret",
+        SecretString=json.dumps(
+            {
+                "certificatePem": "test-certificate",
+                "keyPair": {"PrivateKey": "test-key"},
+            }
+        ),
+    )
+
+    assert load_device_credentials("test-device") == DeviceCredentials(
+        "test-certificate", "test-key"
+    )
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+# Standard Library
+# mypy: disable-error-code=misc
+import asyncio
+
+# Third Party Libraries
+import pytest
+
+# Connected Mobility Solution on AWS
+from ...fleet.broker import LocalBroker
+from ...fleet.mqtt import (
+    MqttClient,
+    MqttError,
+    decode_publish,
+    encode_packet,
+    encode_publish,
+    read_packet,
+    topic_matches,
+)
+
+
+def test_encode_packet_remaining_length() -> None:
+    assert encode_packet(12, 0) == b"\xc0\x00"
+    assert encode_packet(3, 0, b"x" * 127)[:2] == b"\x30\x7f"
+    assert encode_packet(3, 0, b"x" * 128)[:3] == b"\x30\x80\x01"
+    assert encode_packet(3, 0, b"x" * 16384)[:4] == b"\x30\x80\x80\x01"
+
+
+def test_publish_round_trip() -> None:
+    async def read_back(packet: bytes) -> object:
+        reader = asyncio.StreamReader()
+        reader.feed_data(packet)
+        packet_type, flags, body = await read_packet(reader)
+        return packet_type, decode_publish(flags, body)
+
+    packet = encode_publish("cms/data/test", b"payload" * 100, qos=1, packet_id=7)
+    assert asyncio.run(read_back(packet)) == (
+        3,
+        ("cms/data/test", 1, 7, b"payload" * 100),
+    )
+
+
+def test_topic_matches() -> None:
+    assert topic_matches("cms/data/+", "cms/data/device")
+    assert topic_matches("cms/#", "cms/data/device")
+    assert topic_matches(
+        "$aws/certificates/create/json/+", "$aws/certificates/create/json/accepted"
+    )
+    assert not topic_matches("cms/data/+", "cms/data/device/extra")
+    assert not topic_matches("cms/data/device", "cms/data")
+
+
+def test_client_publish_subscribe_and_keep_alive() -> None:
+    async def run() -> None:
+        async with LocalBroker() as broker:
+            subscriber = MqttClient("subscriber", broker.host, broker.port)
+            publisher = MqttClient("publisher", broker.host, broker.port, keep_alive=1)
+            await subscriber.connect()
+            await publisher.connect()
+
+            assert await subscriber.subscribe("cms/data/+") == 1
+            assert await publisher.publish("cms/data/device", "{}", qos=0) is None
+            ack_latency = await publisher.publish("cms/data/device", "{}", qos=1)
+            assert ack_latency is not None and ack_latency > 0
+            assert await subscriber.wait_for_message("cms/data/+", timeout=1) == (
+                "cms/data/device",
+                b"{}",
+            )
+
+            # Pings keep an otherwise idle connection alive past its keep-alive
+            await asyncio.sleep(2)
+            assert publisher.connected
+            await publisher.publish("cms/data/device", "{}", qos=1)
+
+            await subscriber.disconnect()
+            await publisher.disconnect()
+            assert broker.publishes == 3
+            assert broker.peak_connections == 2
+
+    asyncio.run(run())
+
+
+def test_client_connection_refused() -> None:
+    async def run() -> None:
+        async with LocalBroker(authorize=lambda client_id: False) as broker:
+            client = MqttClient("test", broker.host, broker.port)
+            with pytest.raises(MqttError, match="return code 5"):
+                await client.connect()
+            assert not client.connected
+
+    asyncio.run(run())
@@ -14,22 +14,35 @@ import pytest
 # AWS Libraries
 from chalice.app import Request
 
+# Connected Mobility Solution on AWS
+from ....api.vs_api import app
+
 
 @pytest.fixture(autouse=True, scope="session")
 def fixture_env_vars() -> Generator[None, None, None]:
     env_vars = {
         "DYN_DEVICE_TYPES_TABLE": "test",
         "DYN_SIMULATIONS_TABLE": "test",
+        "DYN_RUNNING_SIMULATIONS_INDEX": "test",
         "DYN_TEMPLATES_TABLE": "test",
         "CROSS_ORIGIN_DOMAIN": "test",
         "USER_POOL_ARN": "test",
         "SIMULATOR_STATE_MACHINE_NAME": "test",
+        "CLEANUP_LAMBDA_NAME": "test",
+        "SIM_TABLE": "test",
         "USER_AGENT_STRING": "test",
     }
     with mock.patch.dict(os.environ, env_vars):
         yield
 
 
+@pytest.fixture(autouse=True)
+def fixture_clear_simulator_state_machine() -> Generator[None, None, None]:
+    # Each test mocks its own state machine, so none may reuse another test's cached ARN or client
+    yield
+    app.get_simulator_state_machine.cache_clear()
+
+
 @pytest.fixture(name="vsapi_basic_event")
 def fixture_create_event() -> Dict[str, Any]:
     return {
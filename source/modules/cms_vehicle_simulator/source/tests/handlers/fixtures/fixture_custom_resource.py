@@ -71,4 +71,8 @@ def fixture_context() -> LambdaContext:
             self.aws_request_id = "52fdfc07-2182-154f-163f-5f0f9a621d72"
             self.log_stream_name = "TestLogSteam"
 
+        @staticmethod
+        def get_remaining_time_in_millis() -> int:
+            return 60000
+
     return cast(LambdaContext, MockLambdaContext())
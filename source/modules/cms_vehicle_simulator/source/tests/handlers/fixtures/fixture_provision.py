@@ -36,6 +36,18 @@ def fixture_device_provisioner() -> Generator[DeviceProvisioner, None, None]:
         yield device_provisioner
 
 
+@pytest.fixture(name="simulations_table")
+def fixture_simulations_table() -> Generator[str, None, None]:
+    with mock_aws():
+        boto3.resource("dynamodb").create_table(
+            AttributeDefinitions=[{"AttributeName": "sim_id", "AttributeType": "S"}],
+            TableName=os.environ["SIM_TABLE"],
+            KeySchema=[{"AttributeName": "sim_id", "KeyType": "HASH"}],
+            BillingMode="PAY_PER_REQUEST",
+        ).put_item(Item={"sim_id": "test_simulation_id"})
+        yield os.environ["SIM_TABLE"]
+
+
 @pytest.fixture(name="provision_event")
 def fixture_provision_event() -> Dict[str, Any]:
     return {
@@ -3,10 +3,22 @@
 # SPDX-License-Identifier: Apache-2.0
 
 # Standard Library
-from typing import Any, Dict
+import os
+from typing import Any, Dict, Generator
 
 # Third Party Libraries
 import pytest
+from moto import mock_aws
+
+# AWS Libraries
+import boto3
+
+# Connected Mobility Solution on AWS
+from ....handlers.stepfunction.function.routes import get_route, get_route_ids
+
+ROUTES_PATH = os.path.join(
+    os.path.dirname(__file__), os.pardir, os.pardir, os.pardir, "resources", "routes"
+)
 
 
 @pytest.fixture(name="simulate_data_event")
@@ -28,6 +40,15 @@ def fixture_simulate_data_event() -> Dict[str, Any]:
     }
 
 
+@pytest.fixture(name="simulate_batch_data_event")
+def fixture_simulate_batch_data_event(
+    simulate_data_event: Dict[str, Any]
+) -> Dict[str, Any]:
+    simulate_data_event.pop("index")
+    simulate_data_event["batch"] = {"start_index": 0, "size": 5}
+    return simulate_data_event
+
+
 @pytest.fixture(name="limits")
 def fixture_limits() -> Dict[str, Any]:
     return {
@@ -48,3 +69,22 @@ def fixture_limits() -> Dict[str, Any]:
         ],
         "arr": [1, 2, 3],
     }
+
+
+@pytest.fixture(name="routes_bucket")
+def fixture_routes_bucket() -> Generator[str, None, None]:
+    with mock_aws():
+        os.environ["ROUTE_BUCKET"] = "test-routes-bucket"
+        s3_client = boto3.client("s3")
+        s3_client.create_bucket(Bucket=os.environ["ROUTE_BUCKET"])
+        for file_name in os.listdir(ROUTES_PATH):
+            s3_client.upload_file(
+                os.path.join(ROUTES_PATH, file_name),
+                os.environ["ROUTE_BUCKET"],
+                f"routes/{file_name}",
+            )
+        get_route.cache_clear()
+        get_route_ids.cache_clear()
+        yield os.environ["ROUTE_BUCKET"]
+        get_route.cache_clear()
+        get_route_ids.cache_clear()
@@ -4,6 +4,7 @@
 
 # Standard Library
 # mypy: disable-error-code=misc
+import json
 import re
 from typing import Any, Dict
 from unittest.mock import MagicMock
@@ -14,7 +15,12 @@ import pytest
 # AWS Libraries
 from aws_lambda_powertools.utilities.typing import LambdaContext
 
+# CMS Common Library
+from cms_common.boto3_wrappers.dynamo_crud import DynHelpers
+from cms_common.boto3_wrappers.rate_limiter import AdaptiveTokenBucket
+
 # Connected Mobility Solution on AWS
+from ....handlers.stepfunction.function import handlers
 from ....handlers.stepfunction.function.handlers import (
     cleanup_handler,
     provision_handler,
@@ -27,7 +33,7 @@ def test_provision_handler(
     context: LambdaContext,
     device_provisioner: DeviceProvisioner,
 ) -> None:
-    provision_handler(provision_event, context)
+    assert provision_handler(provision_event, context) == {"complete": True}
 
     device_name = f"{provision_event['info']['name']['S']}-{provision_event['index']}"
     thing = device_provisioner.iot_client().describe_thing(thingName=device_name)
@@ -39,6 +45,92 @@ def test_provision_handler(
     assert isinstance(secret, dict)
 
 
+def test_provision_handler_publish_only(
+    provision_event: Dict[str, Any],
+    context: LambdaContext,
+    simulations_table: str,
+    mocker: MagicMock,
+) -> None:
+    mocked_provisioner: MagicMock = mocker.patch.object(handlers, "DeviceProvisioner")
+    provision_event["simulation"]["publish_only"] = True
+    provision_event.pop("index")
+
+    for start_index in (0, 2):
+        provision_event["batch"] = {"start_index": start_index, "size": 2, "amount": 3}
+        provision_handler(provision_event, context)
+
+    mocked_provisioner.assert_not_called()
+    simulation = DynHelpers.get_item(
+        simulations_table, {"sim_id": "test_simulation_id"}
+    )
+    assert simulation["publish_only_devices"] == {
+        "test_device": {"topic": "test-topic-prefix/test_device-{index}", "amount": 3}
+    }
+
+
+def test_provision_handler_publish_only_fleet(
+    provision_event: Dict[str, Any],
+    context: LambdaContext,
+    simulations_table: str,
+) -> None:
+    provision_event["simulation"]["publish_only"] = True
+    provision_event.pop("index")
+
+    # A 10k vehicle fleet of two device types, registered batch by batch like the device map does
+    for device_type_name, amount in (("test_car", 8000), ("test_truck", 2000)):
+        provision_event["info"]["name"]["S"] = device_type_name
+        for start_index in range(0, amount, 200):
+            provision_event["batch"] = {
+                "start_index": start_index,
+                "size": 200,
+                "amount": amount,
+            }
+            provision_handler(provision_event, context)
+
+    simulation = DynHelpers.get_item(
+        simulations_table, {"sim_id": "test_simulation_id"}
+    )
+    assert simulation["publish_only_devices"] == {
+        "test_car": {"topic": "test-topic-prefix/test_car-{index}", "amount": 8000},
+        "test_truck": {
+            "topic": "test-topic-prefix/test_truck-{index}",
+            "amount": 2000,
+        },
+    }
+    # Far below the 400KB item limit, whatever the number of devices
+    assert len(json.dumps(simulation, default=str)) < 1000
+
+
+def test_provision_handler_metrics(
+    provision_event: Dict[str, Any],
+    context: LambdaContext,
+    simulations_table: str,
+    mocker: MagicMock,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    mocker.patch.object(handlers, "DeviceProvisioner")
+    provision_event["simulation"]["publish_only"] = True
+    provision_event.pop("index")
+    provision_event["batch"] = {"start_index": 0, "size": 2, "amount": 2}
+
+    provision_handler(provision_event, context)
+
+    records = [
+        json.loads(line)
+        for line in capsys.readouterr().out.splitlines()
+        if '"_aws"' in line
+    ]
+    # Registering publish-only devices takes two updates of the simulation item, each flushed as it happens
+    assert len(records) == 2
+    for record in records:
+        directive = record["_aws"]["CloudWatchMetrics"][0]
+        assert directive["Namespace"] == "cms/vehicle-simulator"
+        assert "TableName" in directive["Dimensions"][0]
+        assert record["TableName"] == simulations_table
+        assert record["DynamoDBUpdateItemRequests"] == [1.0]
+        assert record["DynamoDBUpdateItemErrors"] == [0.0]
+
+
 def test_cleanup_handler(
     cleanup_event: Dict[str, Any],
     context: LambdaContext,
@@ -70,6 +162,121 @@ def test_cleanup_handler(
     mocked_delete_iot_thing.assert_called_once()
 
 
+def test_cleanup_handler_publish_only(
+    cleanup_event: Dict[str, Any], context: LambdaContext, mocker: MagicMock
+) -> None:
+    mocked_api_call: MagicMock = mocker.patch(
+        "botocore.client.BaseClient._make_api_call"
+    )
+    cleanup_event["simulation"]["publish_only"] = True
+
+    cleanup_handler(cleanup_event, context)
+
+    mocked_api_call.assert_not_called()
+
+
+def test_cleanup_handler_cleanup_job(
+    cleanup_event: Dict[str, Any],
+    context: LambdaContext,
+    device_provisioner: DeviceProvisioner,
+    mocker: MagicMock,
+) -> None:
+    mocker.patch.object(
+        DeviceProvisioner,
+        "get_simulated_things",
+        return_value=[{"thingName": "test_thing_1"}, {"thingName": "test_thing_2"}],
+    )
+    mocker.patch.object(DeviceProvisioner, "get_simulated_secrets", return_value=[])
+    mocker.patch.object(DeviceProvisioner, "delete_iot_thing")
+    mocked_update_item: MagicMock = mocker.patch.object(DynHelpers, "update_item")
+    cleanup_event["cleanup_job"] = {
+        "job_id": "test_job_id",
+        "status": "running",
+        "deleted_secrets": 1,
+        "deleted_things": 3,
+        "failed": 0,
+    }
+
+    cleanup_job = cleanup_handler(cleanup_event, context)
+
+    assert cleanup_job["status"] == "complete"
+    assert cleanup_job["deleted_secrets"] == 1
+    assert cleanup_job["deleted_things"] == 5
+    mocked_update_item.assert_called_once()
+    assert mocked_update_item.call_args.args[3] == {":cleanup": cleanup_job}
+
+
+def test_cleanup_handler_continues_when_out_of_time(
+    cleanup_event: Dict[str, Any],
+    context: LambdaContext,
+    device_provisioner: DeviceProvisioner,
+    mocker: MagicMock,
+) -> None:
+    mocker.patch.object(
+        DeviceProvisioner,
+        "get_simulated_things",
+        return_value=[{"thingName": "test_thing"}],
+    )
+    mocker.patch.object(DeviceProvisioner, "get_simulated_secrets", return_value=[])
+    mocked_delete_iot_thing: MagicMock = mocker.patch.object(
+        DeviceProvisioner, "delete_iot_thing"
+    )
+    mocker.patch.object(context, "get_remaining_time_in_millis", return_value=1000)
+    mocked_lambda_client: MagicMock = mocker.patch.object(handlers, "get_lambda_client")
+
+    progress = cleanup_handler(cleanup_event, context)
+
+    assert progress["complete"] is False
+    mocked_delete_iot_thing.assert_not_called()
+    invoke_kwargs = mocked_lambda_client.return_value.invoke.call_args.kwargs
+    assert invoke_kwargs["FunctionName"] == context.function_name
+    assert invoke_kwargs["InvocationType"] == "Event"
+
+
+def test_cleanup_devices(device_provisioner: DeviceProvisioner) -> None:
+    device_names = [f"test-device-{index}" for index in range(3)]
+    device_provisioner.provision_devices(device_names)
+
+    progress = device_provisioner.cleanup_devices(max_workers=2)
+
+    assert progress == {
+        "deleted_secrets": 3,
+        "deleted_things": 3,
+        "failed": 0,
+        "complete": True,
+    }
+    assert list(device_provisioner.get_simulated_things()) == []
+    with pytest.raises(
+        device_provisioner.iot_client().exceptions.ResourceNotFoundException
+    ):
+        device_provisioner.iot_client().get_policy(
+            policyName=device_provisioner.shared_policy_name
+        )
+
+
+def test_cleanup_devices_rate_limits_every_call(
+    device_provisioner: DeviceProvisioner, mocker: MagicMock
+) -> None:
+    device_provisioner.provision_devices(["test-device-0", "test-device-1"])
+    iot_calls = mocker.spy(device_provisioner.iot_client(), "_make_api_call")
+    secrets_calls = mocker.spy(
+        device_provisioner.secret_manager_client(), "_make_api_call"
+    )
+    acquire = mocker.spy(AdaptiveTokenBucket, "acquire")
+
+    device_provisioner.cleanup_devices()
+
+    # Listing the things is paged by the paginator, every other call takes its own token
+    limited_calls = [
+        call.args[0]
+        for call in iot_calls.call_args_list + secrets_calls.call_args_list
+        if call.args[0] != "ListThings"
+    ]
+    assert limited_calls.count("DeleteThing") == 2
+    assert limited_calls.count("DeleteSecret") == 2
+    assert acquire.call_count == len(limited_calls)
+
+
 def test_create_device_secrets(device_provisioner: DeviceProvisioner) -> None:
     device_name = "test-device"
     secrets = device_provisioner.create_device_secrets(device_name)
@@ -169,3 +376,166 @@ def test_delete_secretsmanager_secret(
         device_provisioner.secret_manager_client().exceptions.ResourceNotFoundException
     ):
         device_provisioner.secret_manager_client().describe_secret(SecretId=secret_arn)
+
+
+def test_provision_devices(device_provisioner: DeviceProvisioner) -> None:
+    device_names = [f"test-device-{index}" for index in range(3)]
+
+    report = device_provisioner.provision_devices(device_names, max_workers=2)
+
+    assert report["provisioned"] == 3
+    assert report["failed"] == []
+    assert report["pending"] == []
+    assert report["devices_per_second"] > 0
+
+    iot_client = device_provisioner.iot_client()
+    for device_name in device_names:
+        principals = iot_client.list_thing_principals(thingName=device_name)
+        assert len(principals["principals"]) == 1
+        policies = iot_client.list_attached_policies(target=principals["principals"][0])
+        assert [policy["policyName"] for policy in policies["policies"]] == [
+            device_provisioner.shared_policy_name
+        ]
+    assert (
+        "${iot:Connection.Thing.ThingName}"
+        in iot_client.get_policy(policyName=device_provisioner.shared_policy_name)[
+            "policyDocument"
+        ]
+    )
+
+
+def test_provision_devices_resumes(
+    device_provisioner: DeviceProvisioner, mocker: MagicMock
+) -> None:
+    device_provisioner.provision_devices(["test-device-0"])
+    # A device interrupted after its secret was stored reuses the stored certificate
+    secrets = device_provisioner.create_device_secrets("test-device-1")
+    create_keys_and_certificate = mocker.spy(
+        device_provisioner.iot_client(), "create_keys_and_certificate"
+    )
+
+    report = device_provisioner.provision_devices(
+        ["test-device-0", "test-device-1", "test-device-2"]
+    )
+
+    assert report["provisioned"] == 3
+    assert report["failed"] == []
+    assert create_keys_and_certificate.call_count == 1
+    for device_name in ("test-device-0", "test-device-1"):
+        principals = device_provisioner.iot_client().list_thing_principals(
+            thingName=device_name
+        )
+        assert len(principals["principals"]) == 1
+    principals = device_provisioner.iot_client().list_thing_principals(
+        thingName="test-device-1"
+    )
+    assert principals["principals"] == [secrets["keys"]["certificateArn"]]
+
+
+def test_provision_devices_out_of_time(device_provisioner: DeviceProvisioner) -> None:
+    device_names = [f"test-device-{index}" for index in range(3)]
+    checks = iter([True, False, False])
+
+    report = device_provisioner.provision_devices(
+        device_names, lambda: next(checks), max_workers=1
+    )
+
+    assert report["provisioned"] == 1
+    assert report["pending"] == ["test-device-1", "test-device-2"]
+    device_provisioner.iot_client().describe_thing(thingName="test-device-0")
+    with pytest.raises(
+        device_provisioner.iot_client().exceptions.ResourceNotFoundException
+    ):
+        device_provisioner.iot_client().describe_thing(thingName="test-device-1")
+
+
+def test_provision_handler_batch(
+    provision_event: Dict[str, Any],
+    context: LambdaContext,
+    device_provisioner: DeviceProvisioner,
+    mocker: MagicMock,
+) -> None:
+    mocker.patch.object(context, "get_remaining_time_in_millis", return_value=900000)
+    provision_event.pop("index")
+    provision_event["batch"] = {"start_index": 2, "size": 2}
+
+    progress = provision_handler(provision_event, context)
+
+    assert progress == {"complete": True, "pending_devices": []}
+    device_provisioner.iot_client().describe_thing(thingName="test_device-3")
+
+
+def test_provision_handler_batch_splits_quotas(
+    provision_event: Dict[str, Any],
+    context: LambdaContext,
+    mocker: MagicMock,
+) -> None:
+    mocked_provisioner: MagicMock = mocker.patch.object(handlers, "DeviceProvisioner")
+    mocked_provisioner.return_value.provision_devices.return_value = {
+        "failed": [],
+        "pending": [],
+    }
+    provision_event.pop("index")
+    provision_event["batch"] = {"start_index": 0, "size": 200}
+    provision_event["simulation"]["devices"] = [
+        {"type_id": "test_type_1", "amount": "401"},
+        {"type_id": "test_type_2", "amount": "200"},
+    ]
+
+    provision_handler(provision_event, context)
+
+    # Three batches of the first device type and one of the second
+    kwargs = mocked_provisioner.return_value.provision_devices.call_args.kwargs
+    assert kwargs["iot_requests_per_second"] == pytest.approx(10 / 4)
+    assert kwargs["secrets_manager_requests_per_second"] == pytest.approx(40 / 4)
+
+
+def test_provision_handler_batch_pending(
+    provision_event: Dict[str, Any],
+    context: LambdaContext,
+    device_provisioner: DeviceProvisioner,
+    mocker: MagicMock,
+) -> None:
+    provision_event.pop("index")
+    provision_event["batch"] = {"start_index": 0, "size": 3}
+    provision_event["provisioning"] = {
+        "complete": False,
+        "pending_devices": ["test_device-2"],
+    }
+    mocked_provision_device: MagicMock = mocker.patch.object(
+        DeviceProvisioner, "provision_device"
+    )
+    mocker.patch.object(context, "get_remaining_time_in_millis", return_value=900000)
+
+    progress = provision_handler(provision_event, context)
+
+    assert progress == {"complete": True, "pending_devices": []}
+    assert [call.args[0] for call in mocked_provision_device.call_args_list] == [
+        "test_device-2"
+    ]
+
+    mocker.patch.object(context, "get_remaining_time_in_millis", return_value=1000)
+    del provision_event["provisioning"]
+
+    progress = provision_handler(provision_event, context)
+
+    assert progress == {
+        "complete": False,
+        "pending_devices": [f"test_device-{index}" for index in range(3)],
+    }
+
+
+def test_delete_iot_policy_in_use(
+    device_provisioner: DeviceProvisioner, provisioned_secrets: Dict[str, Any]
+) -> None:
+    device_provisioner.create_shared_policy()
+    device_provisioner.iot_client().attach_policy(
+        policyName=device_provisioner.shared_policy_name,
+        target=provisioned_secrets["keys"]["certificateArn"],
+    )
+
+    device_provisioner.delete_iot_policy(device_provisioner.shared_policy_name)
+
+    device_provisioner.iot_client().get_policy(
+        policyName=device_provisioner.shared_policy_name
+    )
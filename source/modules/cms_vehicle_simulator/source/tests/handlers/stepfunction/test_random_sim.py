@@ -5,7 +5,10 @@
 
 # Standard Library
 # mypy: disable-error-code=misc
+import json
+import os
 import re
+import warnings
 from datetime import datetime
 from typing import Any, Dict
 from unittest.mock import MagicMock
@@ -16,9 +19,17 @@ from moto import mock_aws
 # AWS Libraries
 from aws_lambda_powertools.utilities.typing import LambdaContext
 
+# CMS Common Library
+from cms_common.boto3_wrappers.dynamo_crud import DynHelpers
+from cms_common.serialization import decode_compact, is_compact
+
 # Connected Mobility Solution on AWS
-from ....handlers.stepfunction.function.handlers import data_sim_handler
+from ....handlers.stepfunction.function.handlers import (
+    data_sim_handler,
+    get_percentile,
+)
 from ....handlers.stepfunction.function.random_sim import GenericSim
+from ....handlers.stepfunction.function.template_compiler import compiled_templates
 
 MAX_LAT = 90
 MIN_LAT = -90
@@ -36,6 +47,219 @@ def test_lambda_handler(
     mocked_iot.assert_called()
 
 
+@mock_aws
+def test_lambda_handler_no_empty_metrics_warning(
+    simulate_data_event: Dict[str, Any], context: LambdaContext, mocker: MagicMock
+) -> None:
+    mocker.patch("botocore.client.BaseClient._make_api_call")
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        data_sim_handler(simulate_data_event, context)
+
+
+@mock_aws
+def test_lambda_handler_reuses_compiled_template(
+    simulate_data_event: Dict[str, Any], context: LambdaContext, mocker: MagicMock
+) -> None:
+    mocker.patch("botocore.client.BaseClient._make_api_call")
+    compiled_templates.clear()
+    simulate_data_event["type_id"] = "test_type_id"
+    simulate_data_event["info"]["version"] = {"S": "1"}
+
+    data_sim_handler(simulate_data_event, context)
+    compiled_template = compiled_templates.get(
+        "test_type_id", "1", MagicMock(side_effect=AssertionError)
+    )
+
+    simulate_data_event["options"] = {}
+    data_sim_handler(simulate_data_event, context)
+    assert (
+        compiled_templates.get(
+            "test_type_id", "1", MagicMock(side_effect=AssertionError)
+        )
+        is compiled_template
+    )
+
+
+@mock_aws
+def test_lambda_handler_template_by_reference(
+    simulate_data_event: Dict[str, Any], context: LambdaContext, mocker: MagicMock
+) -> None:
+    mocker.patch("botocore.client.BaseClient._make_api_call")
+    mocker.patch.dict(os.environ, {"DEVICE_TYPES_TABLE": "test"})
+    compiled_templates.clear()
+    mocked_get_item: MagicMock = mocker.patch.object(
+        DynHelpers,
+        "get_item",
+        return_value={
+            "type_id": "test_type_id",
+            "payload": [{"name": "test", "type": "id"}],
+        },
+    )
+    del simulate_data_event["info"]["payload"]
+    simulate_data_event["type_id"] = "test_type_id"
+    simulate_data_event["info"]["version"] = {"S": "1"}
+
+    for _ in range(3):
+        simulate_data_event["options"] = data_sim_handler(simulate_data_event, context)
+    mocked_get_item.assert_called_once_with("test", {"type_id": "test_type_id"})
+
+    # An edited device type gets a new version, which misses the cache and reads the table again
+    simulate_data_event["info"]["version"] = {"S": "2"}
+    data_sim_handler(simulate_data_event, context)
+    assert mocked_get_item.call_count == 2
+
+
+@mock_aws
+def test_lambda_handler_multi_rate(
+    simulate_data_event: Dict[str, Any], context: LambdaContext, mocker: MagicMock
+) -> None:
+    mocked_iot: MagicMock = mocker.patch("botocore.client.BaseClient._make_api_call")
+    compiled_templates.clear()
+    simulate_data_event["simulation"].update(
+        {"sim_id": "test_sim", "duration": 10, "snapshot_interval": 4}
+    )
+    simulate_data_event["type_id"] = "test_type_id"
+    simulate_data_event["info"]["version"] = {"S": "1"}
+    simulate_data_event["info"]["payload"] = {
+        "L": [
+            {"M": {"name": {"S": "vin"}, "type": {"S": "id"}, "period": {"N": "3"}}},
+            {
+                "M": {
+                    "name": {"S": "make"},
+                    "type": {"S": "string"},
+                    "static": {"BOOL": True},
+                    "default": {"S": "Amazon"},
+                    "threshold": {"N": "0"},
+                }
+            },
+        ]
+    }
+
+    published = []
+    for _ in range(6):
+        mocked_iot.reset_mock()
+        simulate_data_event["options"] = data_sim_handler(simulate_data_event, context)
+        published.append(
+            json.loads(mocked_iot.call_args.args[1]["payload"])
+            if mocked_iot.called
+            else None
+        )
+
+    assert [set(data) if data else None for data in published] == [
+        {"vin", "make"},
+        None,
+        None,
+        {"vin"},
+        {"vin", "make"},
+        None,
+    ]
+
+
+@mock_aws
+def test_lambda_handler_multi_rate_thresholds(
+    simulate_batch_data_event: Dict[str, Any],
+    context: LambdaContext,
+    mocker: MagicMock,
+) -> None:
+    mocked_iot: MagicMock = mocker.patch("botocore.client.BaseClient._make_api_call")
+    simulate_batch_data_event["batch"]["size"] = 2
+    simulate_batch_data_event["type_id"] = "test_type_id"
+    simulate_batch_data_event["info"]["version"] = {"S": "1"}
+    simulate_batch_data_event["info"]["payload"] = {
+        "L": [
+            {
+                "M": {
+                    "name": {"S": "wave"},
+                    "type": {"S": "sinusoidal"},
+                    "min": {"N": "-1"},
+                    "max": {"N": "100"},
+                    "threshold": {"N": "10"},
+                }
+            }
+        ]
+    }
+
+    messages = []
+    for _ in range(4):
+        # Every tick runs in a fresh container, with the options passed on through the state machine as JSON
+        compiled_templates.clear()
+        mocked_iot.reset_mock()
+        options = data_sim_handler(simulate_batch_data_event, context)
+        simulate_batch_data_event["options"] = json.loads(json.dumps(options))
+        messages.append(mocked_iot.call_count)
+
+    # The wave climbs about 4.4 per tick at first, so it is only republished every third tick
+    assert messages == [2, 0, 0, 2]
+    assert set(simulate_batch_data_event["options"]["published_values"]) == {"0", "1"}
+
+
+@mock_aws
+def test_lambda_handler_batch(
+    simulate_batch_data_event: Dict[str, Any],
+    context: LambdaContext,
+    mocker: MagicMock,
+) -> None:
+    mocked_iot: MagicMock = mocker.patch("botocore.client.BaseClient._make_api_call")
+
+    options = data_sim_handler(simulate_batch_data_event, context)
+
+    assert mocked_iot.call_count == simulate_batch_data_event["batch"]["size"]
+    published_topics = {call.args[1]["topic"] for call in mocked_iot.call_args_list}
+    assert published_topics == {
+        f"test-topic-prefix/test_device-{index}" for index in range(5)
+    }
+    assert options["counter"] == 0
+    assert options["runtime"] == 0
+    assert options["stats"]["messages"] == 5
+    assert set(options["stats"]["publish_latency_ms"]) == {"p50", "p90", "p99"}
+    assert "context" not in options
+
+
+@mock_aws
+def test_lambda_handler_last_batch(
+    simulate_batch_data_event: Dict[str, Any],
+    context: LambdaContext,
+    mocker: MagicMock,
+) -> None:
+    mocked_iot: MagicMock = mocker.patch("botocore.client.BaseClient._make_api_call")
+    simulate_batch_data_event["batch"] = {"start_index": 5, "size": 5, "amount": 7}
+
+    options = data_sim_handler(simulate_batch_data_event, context)
+
+    published_topics = {call.args[1]["topic"] for call in mocked_iot.call_args_list}
+    assert published_topics == {
+        "test-topic-prefix/test_device-5",
+        "test-topic-prefix/test_device-6",
+    }
+    assert options["stats"]["messages"] == 2
+
+
+@mock_aws
+def test_lambda_handler_compact_encoding(
+    simulate_batch_data_event: Dict[str, Any],
+    context: LambdaContext,
+    mocker: MagicMock,
+) -> None:
+    mocked_iot: MagicMock = mocker.patch("botocore.client.BaseClient._make_api_call")
+    simulate_batch_data_event["simulation"]["payload_encoding"] = "cbor"
+
+    data_sim_handler(simulate_batch_data_event, context)
+
+    payloads = [call.args[1]["payload"] for call in mocked_iot.call_args_list]
+    assert len(payloads) == simulate_batch_data_event["batch"]["size"]
+    assert all(is_compact(payload) for payload in payloads)
+    assert all(isinstance(decode_compact(payload), dict) for payload in payloads)
+
+
+def test_get_percentile() -> None:
+    values = [float(value) for value in range(1, 101)]
+    assert get_percentile(values, 50) == 51.0
+    assert get_percentile(values, 99) == 99.0
+    assert get_percentile([], 50) == 0.0
+
+
 def test_generic_sim_id(limits: Dict[str, Any]) -> None:
     sim_uuid = GenericSim.generic_sim_id(limits)
     re.match("[0-9a-f]{12}4[0-9a-f]{3}[89ab][0-9a-f]{15}$", sim_uuid)
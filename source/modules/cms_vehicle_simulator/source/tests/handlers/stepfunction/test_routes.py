@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+# Standard Library
+# mypy: disable-error-code=misc
+import math
+from typing import Any, Dict
+
+# Third Party Libraries
+import pytest
+
+# Connected Mobility Solution on AWS
+from ....handlers.stepfunction.function.random_sim import GenericSim
+from ....handlers.stepfunction.function.routes import (
+    PROFILE_SPEEDS_KPH,
+    Route,
+    get_route,
+    get_route_ids,
+    get_route_position,
+)
+from ....handlers.stepfunction.function.template_compiler import CompiledTemplate
+
+
+@pytest.fixture(name="route")
+def fixture_route() -> Route:
+    return Route(
+        {
+            "route_id": "route-test",
+            "profile": "aggressive",
+            "start": ["0", "0"],
+            "end": ["2", "1"],
+            "stages": [
+                {"stage": 1, "start": [1.0, 0.0], "end": [2.0, 1.0], "km": 3.0},
+                {"stage": 0, "start": [0.0, 0.0], "end": [1.0, 0.0], "km": 1.0},
+            ],
+            "km": 4.0,
+        }
+    )
+
+
+def test_route_arrays(route: Route) -> None:
+    assert list(route.cumulative_km) == [0.0, 1.0, 4.0]
+    assert list(route.longitudes) == [0.0, 1.0, 2.0]
+    assert list(route.latitudes) == [0.0, 0.0, 1.0]
+    assert route.km == 4.0
+    assert route.speed_kph == PROFILE_SPEEDS_KPH["aggressive"]
+
+
+def test_route_position_at(route: Route) -> None:
+    assert route.position_at(0) == (0.0, 0.0)
+    assert route.position_at(0.5) == (0.0, 0.5)
+    assert route.position_at(1.0) == (0.0, 1.0)
+    assert route.position_at(2.5) == (0.5, 1.5)
+    # Devices loop back to the start once they reach the end of their route
+    assert route.position_at(4.5) == (0.0, 0.5)
+
+
+def test_get_route_caches_parsed_route(routes_bucket: str) -> None:
+    route = get_route("route-a")
+
+    assert get_route("route-a") is route
+    assert get_route.cache_info().misses == 1
+    assert math.isclose(route.cumulative_km[-1], route.km)
+    assert "route-b" in get_route_ids()
+
+
+def test_get_route_position(routes_bucket: str) -> None:
+    limits: Dict[str, Any] = {"routes": ["route-a", "route-b"]}
+
+    start = get_route_position(limits, 0, 0)
+    assert start == {
+        "latitude": get_route("route-a").latitudes[0],
+        "longitude": get_route("route-a").longitudes[0],
+    }
+    assert get_route_position(limits, 1, 0)["latitude"] == (
+        get_route("route-b").latitudes[0]
+    )
+    assert get_route_position(limits, 0, 60) != start
+    assert GenericSim.generic_sim_route(limits, runtime=60) == get_route_position(
+        limits, 0, 60
+    )
+
+    # Speed overrides the route's profile speed
+    route = get_route("route-a")
+    latitude, longitude = route.position_at(1.0)
+    assert get_route_position({**limits, "speed": 3600}, 0, 1) == {
+        "latitude": latitude,
+        "longitude": longitude,
+    }
+
+
+def test_compiled_template_route(routes_bucket: str) -> None:
+    template = CompiledTemplate([{"name": "location", "type": "route"}])
+
+    first = template.generate(counter=0, device_index=0, runtime=0)
+    second = template.generate(counter=0, device_index=1, runtime=0)
+    moved = template.generate(counter=1, device_index=0, runtime=30)
+
+    route_ids = get_route_ids()
+    assert first["location"]["latitude"] == get_route(route_ids[0]).latitudes[0]
+    assert second["location"]["latitude"] == get_route(route_ids[1]).latitudes[0]
+    assert moved["location"] != first["location"]
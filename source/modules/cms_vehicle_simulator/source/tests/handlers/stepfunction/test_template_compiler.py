@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+# Standard Library
+# mypy: disable-error-code=misc
+import json
+import os
+from typing import Any, Dict, List
+from unittest.mock import MagicMock
+
+# Connected Mobility Solution on AWS
+from ....handlers.stepfunction.function.template_compiler import (
+    CompiledTemplate,
+    CompiledTemplateCache,
+)
+
+VSS_TEMPLATE_PATH = os.path.join(
+    os.path.dirname(__file__),
+    os.pardir,
+    os.pardir,
+    os.pardir,
+    "infrastructure",
+    "assets",
+    "templates",
+    "vss_default_template.json",
+)
+
+
+def get_shape(data: Any) -> Any:
+    if isinstance(data, dict):
+        return {key: get_shape(value) for key, value in data.items()}
+    return None
+
+
+def get_template_shape(fields: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        field["name"]: (
+            get_template_shape(field["payload"]) if field["type"] == "object" else None
+        )
+        for field in fields
+    }
+
+
+def test_compiled_template_generates_template_shape(limits: Dict[str, Any]) -> None:
+    fields = [
+        {"name": "vin", "type": "id"},
+        {"name": "speed", "type": "int", "min": 0, "max": 10},
+        {"name": "wave", "type": "sinusoidal", "min": -1, "max": 1},
+        {"name": "location", "type": "location", "lat": 50.0, "long": 50.0},
+        {"name": "nested", "type": "object", "payload": limits["payload"]},
+    ]
+    data = CompiledTemplate(fields).generate(counter=3)
+
+    assert list(data) == ["vin", "speed", "wave", "location", "nested"]
+    assert 0 <= data["speed"] <= 10
+    assert isinstance(data["nested"]["test_bool"], bool)
+    assert set(data["location"]) == {"latitude", "longitude"}
+
+
+def test_compiled_template_static_fields() -> None:
+    fields = [
+        {"name": "make", "type": "string", "static": True, "default": "Amazon"},
+        {"name": "vin", "type": "id", "static": True},
+        {"name": "speed", "type": "int"},
+    ]
+    template = CompiledTemplate(fields)
+
+    overridden = template.generate(counter=0, static_values={"vin": "test-vin"})
+    assert list(overridden) == ["make", "vin", "speed"]
+    assert overridden["make"] == "Amazon"
+    assert overridden["vin"] == "test-vin"
+
+    generated = template.generate(counter=0)
+    assert generated["vin"] != "test-vin"
+
+
+def test_compiled_template_encode_splices_static_fields() -> None:
+    fields = [
+        {"name": "make", "type": "string", "static": True, "default": "Amazon"},
+        {"name": "vin", "type": "id", "static": True},
+        {"name": "speed", "type": "int", "min": 0, "max": 10},
+        {
+            "name": "tires",
+            "type": "object",
+            "payload": [{"name": "front", "type": "int", "min": 0, "max": 10}],
+        },
+    ]
+    template = CompiledTemplate(fields)
+
+    data = json.loads(template.encode(counter=0, static_values={"vin": "test-vin"}))
+    assert data["make"] == "Amazon" and data["vin"] == "test-vin"
+    assert set(data) == {"make", "vin", "speed", "tires"}
+    assert 0 <= data["tires"]["front"] <= 10
+    # The constant fields are encoded once per set of static values
+    assert template.get_static_fragment({"vin": "test-vin"})[0] == (
+        '"make":"Amazon","vin":"test-vin"'
+    )
+
+    generated = json.loads(template.encode(counter=1))
+    assert generated["vin"] != "test-vin" and generated["make"] == "Amazon"
+
+
+def test_compiled_template_encode_edge_cases() -> None:
+    assert CompiledTemplate([]).encode(counter=0) == "{}"
+    only_static = CompiledTemplate(
+        [{"name": "make", "type": "string", "static": True, "default": "Amazon"}]
+    )
+    assert only_static.encode(counter=0) == '{"make":"Amazon"}'
+    no_static = CompiledTemplate([{"name": "speed", "type": "int"}])
+    assert list(json.loads(no_static.encode(counter=0))) == ["speed"]
+
+
+def test_compiled_template_vss_default_template() -> None:
+    with open(VSS_TEMPLATE_PATH, "r", encoding="utf-8") as template_file:
+        fields = json.load(template_file)["payload"]
+
+    template = CompiledTemplate(fields)
+
+    assert get_shape(template.generate(counter=0)) == get_template_shape(fields)
+    assert get_shape(json.loads(template.encode(counter=0))) == get_template_shape(
+        fields
+    )
+
+
+def test_compiled_template_multi_rate_periods() -> None:
+    fields = [
+        {"name": "vin", "type": "id", "static": True, "period": 60},
+        {"name": "speed", "type": "int"},
+        {
+            "name": "tires",
+            "type": "object",
+            "period": 10,
+            "payload": [
+                {"name": "front", "type": "int"},
+                {"name": "rear", "type": "int", "period": 30},
+            ],
+        },
+    ]
+    template = CompiledTemplate(fields)
+    assert template.is_multi_rate
+    assert not CompiledTemplate([{"name": "speed", "type": "int"}]).is_multi_rate
+
+    payloads = [
+        template.generate_due(counter, 5, {}, runtime=counter * 5)
+        for counter in range(13)
+    ]
+
+    assert set(payloads[0]) == {"vin", "speed", "tires"}
+    assert set(payloads[0]["tires"]) == {"front", "rear"}
+    assert set(payloads[1]) == {"speed"}
+    assert set(payloads[2]) == {"speed", "tires"}
+    assert set(payloads[2]["tires"]) == {"front"}
+    assert set(payloads[6]["tires"]) == {"front", "rear"}
+    assert set(payloads[12]) == {"vin", "speed", "tires"}
+
+
+def test_compiled_template_multi_rate_thresholds() -> None:
+    fields = [
+        {"name": "make", "type": "string", "static": True, "default": "Amazon"},
+        {
+            "name": "wave",
+            "type": "sinusoidal",
+            "min": -1,
+            "max": 100,
+            "threshold": 10.0,
+        },
+    ]
+    template = CompiledTemplate(fields)
+
+    published_values: Dict[str, Any] = {}
+    first = template.generate_due(0, 1, published_values, runtime=0)
+    assert first == {"make": "Amazon", "wave": 0.0}
+    # Only the thresholded wave is remembered, under its step index
+    assert published_values == {"1": 0.0}
+    # The wave climbs about 4.4 per tick at first, so it is only republished every few ticks
+    published = [
+        template.generate_due(counter, 1, published_values, runtime=counter)
+        for counter in range(1, 8)
+    ]
+    assert [bool(data.get("wave")) for data in published] == [
+        False,
+        False,
+        True,
+        False,
+        False,
+        True,
+        False,
+    ]
+    assert all(data["make"] == "Amazon" for data in published)
+
+    # Every device tracks its own last published values, and a snapshot ignores thresholds
+    assert "wave" in template.generate_due(1, 1, {}, runtime=1)
+    assert "wave" in template.generate_due(
+        2, 1, published_values, runtime=2, snapshot=True
+    )
+
+
+def test_compiled_template_cache() -> None:
+    cache = CompiledTemplateCache(maxsize=1)
+    load_fields = MagicMock(return_value=[{"name": "test", "type": "id"}])
+
+    first = cache.get("test_type", "1", load_fields)
+    assert cache.get("test_type", "1", load_fields) is first
+    load_fields.assert_called_once()
+
+    assert cache.get("test_type", "2", load_fields) is not first
+    assert cache.get("test_type", "1", load_fields) is not first
+    assert load_fields.call_count == 3
+
+    cache.get(None, None, load_fields)
+    cache.get(None, None, load_fields)
+    assert load_fields.call_count == 5
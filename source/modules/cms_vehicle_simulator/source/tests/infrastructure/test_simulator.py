@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# Standard Library
+import json
+from typing import Any, Dict
+
+# AWS Libraries
+from aws_cdk import assertions
+
+# Connected Mobility Solution on AWS
+from ...infrastructure.cms_vehicle_simulator_stack import CmsVehicleSimulatorStack
+from ...infrastructure.constructs.simulator import DEVICES_PER_BATCH
+
+
+def get_states(stack: CmsVehicleSimulatorStack) -> Dict[str, Any]:
+    template = assertions.Template.from_stack(stack)
+    (state_machine,) = template.find_resources(
+        "AWS::StepFunctions::StateMachine"
+    ).values()
+    # Tokens such as function ARNs only ever appear inside JSON strings, so any placeholder keeps it valid
+    definition = "".join(
+        part if isinstance(part, str) else "token"
+        for part in state_machine["Properties"]["DefinitionString"]["Fn::Join"][1]
+    )
+
+    states: Dict[str, Any] = {}
+
+    def add_states(branch: Dict[str, Any]) -> None:
+        for name, state in branch["States"].items():
+            states[name] = state
+            if "Iterator" in state:
+                add_states(state["Iterator"])
+
+    add_states(json.loads(definition))
+    return states
+
+
+def test_device_type_version(
+    cms_vehicle_simulator_stack: CmsVehicleSimulatorStack,
+) -> None:
+    get_device_type_info = get_states(cms_vehicle_simulator_stack)[
+        "get-device-type-info"
+    ]
+
+    assert get_device_type_info["Parameters"]["ProjectionExpression"] == (
+        "#name,topic,#timestamp"
+    )
+    assert get_device_type_info["Parameters"]["ExpressionAttributeNames"] == {
+        "#name": "name",
+        "#timestamp": "timestamp",
+    }
+    assert get_device_type_info["ResultSelector"]["version.$"] == "$.Item.timestamp"
+
+
+def test_device_map_batches(
+    cms_vehicle_simulator_stack: CmsVehicleSimulatorStack,
+) -> None:
+    states = get_states(cms_vehicle_simulator_stack)
+
+    assert states["device-pass"]["Parameters"]["batch_start_indexes.$"] == (
+        f"States.ArrayRange(0,States.MathAdd($.amount,-1),{DEVICES_PER_BATCH})"
+    )
+    assert states["device-map"]["ItemsPath"] == "$.batch_start_indexes"
+    assert states["device-map"]["Parameters"]["batch"] == {
+        "start_index.$": "$$.Map.Item.Value",
+        "size": DEVICES_PER_BATCH,
+        "amount.$": "$.amount",
+    }
+
+
+def test_provisioning_loop(
+    cms_vehicle_simulator_stack: CmsVehicleSimulatorStack,
+) -> None:
+    states = get_states(cms_vehicle_simulator_stack)
+
+    assert states["provisioning-invoke"]["ResultPath"] == "$.provisioning"
+    assert states["provisioning-invoke"]["Next"] == "provisioning-choice"
+    assert states["provisioning-choice"]["Choices"] == [
+        {
+            "Variable": "$.provisioning.complete",
+            "BooleanEquals": False,
+            "Next": "provisioning-invoke",
+        }
+    ]
+    assert states["provisioning-choice"]["Default"] == "simulator-invoke"
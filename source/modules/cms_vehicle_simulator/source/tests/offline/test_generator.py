@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+# Standard Library
+# mypy: disable-error-code=misc
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Third Party Libraries
+import arrow
+import pyarrow.parquet as pq
+import pytest
+
+# Connected Mobility Solution on AWS
+from ...offline.generator import OfflineConfig, generate, get_device_ranges
+
+FIELDS = [
+    {"name": "speed", "type": "int", "min": 0, "max": 120},
+    {"name": "time", "type": "timestamp"},
+    {
+        "name": "vehicleidentification",
+        "type": "object",
+        "payload": [{"name": "vin", "type": "id"}],
+    },
+]
+# 2024-02-01T23:00:00Z, so two hours of messages span two days
+START = arrow.get("2024-02-01T23:00:00+00:00").timestamp()
+
+
+def list_files(root: Path) -> List[str]:
+    return sorted(
+        os.path.relpath(os.path.join(directory, name), root)
+        for directory, _, names in os.walk(root)
+        for name in names
+    )
+
+
+def test_get_device_ranges() -> None:
+    assert get_device_ranges(10, 4) == [
+        range(0, 3),
+        range(3, 6),
+        range(6, 9),
+        range(9, 10),
+    ]
+    assert get_device_ranges(2, 8) == [range(0, 1), range(1, 2)]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_generate_ndjson(tmp_path: Path, workers: int) -> None:
+    config = OfflineConfig(
+        output=str(tmp_path),
+        device_prefix="test-device",
+        start=START,
+        interval=600,
+        duration=7200,
+    )
+
+    report = generate(FIELDS, config, devices=3, workers=workers)
+
+    assert report["rows"] == 36
+    assert report["files"] == 6
+    assert report["bytes"] > 0
+    assert report["rows_per_second"] > 0
+    # Partitioned under the device topic like the raw JSON topic rule's keys
+    assert list_files(tmp_path)[:2] == [
+        "cms/data/simulated/test-device-0/1706828400000.ndjson",
+        "cms/data/simulated/test-device-0/1706832000000.ndjson",
+    ]
+
+    with open(
+        tmp_path / "cms/data/simulated/test-device-1/1706832000000.ndjson",
+        encoding="utf-8",
+    ) as ndjson_file:
+        messages: List[Dict[str, Any]] = [json.loads(line) for line in ndjson_file]
+    assert len(messages) == 6
+    assert messages[0]["time"] == "2024-02-02T00:00:00+00:00"
+    assert messages[-1]["time"] == "2024-02-02T00:50:00+00:00"
+    assert {message["vehicleidentification"]["vin"] for message in messages} == {
+        "test-device-1"
+    }
+
+
+def test_generate_seed(tmp_path: Path) -> None:
+    fields = [*FIELDS, {"name": "trip_id", "type": "id"}]
+    contents = []
+    for workers in (1, 3):
+        output = tmp_path / str(workers)
+        config = OfflineConfig(
+            output=str(output),
+            device_prefix="test-device",
+            start=START,
+            interval=600,
+            duration=7200,
+            seed=7,
+        )
+        generate(fields, config, devices=5, workers=workers)
+        contents.append(
+            {name: (output / name).read_text("utf-8") for name in list_files(output)}
+        )
+
+    # The same seed writes the same dataset however the devices are split between workers
+    assert contents[0] == contents[1]
+    assert len(contents[0]) == 10
+
+
+def test_generate_parquet(tmp_path: Path) -> None:
+    config = OfflineConfig(
+        output=str(tmp_path),
+        file_format="parquet",
+        device_prefix="test-device",
+        start=START,
+        interval=600,
+        duration=7200,
+    )
+
+    report = generate(FIELDS, config, devices=2, workers=2)
+
+    assert report["rows"] == 24
+    # Partitioned like the connect store's Firehose prefix: vin, day of year and year, hour
+    assert list_files(tmp_path) == [
+        "Parquet/test-device-0/032_2024/23/test-device-0-1706828400000.parquet",
+        "Parquet/test-device-0/033_2024/00/test-device-0-1706832000000.parquet",
+        "Parquet/test-device-1/032_2024/23/test-device-1-1706828400000.parquet",
+        "Parquet/test-device-1/033_2024/00/test-device-1-1706832000000.parquet",
+    ]
+
+    rows = pq.read_table(
+        tmp_path
+        / "Parquet/test-device-1/033_2024/00/test-device-1-1706832000000.parquet"
+    ).to_pylist()
+    assert len(rows) == 6
+    assert rows[0]["vehicleidentification"] == {"vin": "test-device-1"}
+    assert 0 <= rows[0]["speed"] <= 120
+
+
+def test_generate_multi_rate(tmp_path: Path) -> None:
+    fields = [
+        {"name": "speed", "type": "int", "min": 0, "max": 120},
+        {"name": "odometer", "type": "int", "period": 1800},
+    ]
+    config = OfflineConfig(
+        output=str(tmp_path),
+        device_prefix="test-device",
+        start=START,
+        interval=600,
+        duration=3600,
+    )
+
+    generate(fields, config, devices=1, workers=1)
+
+    with open(
+        tmp_path / "cms/data/simulated/test-device-0/1706828400000.ndjson",
+        encoding="utf-8",
+    ) as ndjson_file:
+        messages = [json.loads(line) for line in ndjson_file]
+    assert ["odometer" in message for message in messages] == [
+        True,
+        False,
+        False,
+        True,
+        False,
+        False,
+    ]
+
+
+def test_generate_parquet_multi_rate(tmp_path: Path) -> None:
+    fields = [
+        {"name": "speed", "type": "int", "min": 0, "max": 120},
+        {"name": "odometer", "type": "int", "period": 1500},
+    ]
+    config = OfflineConfig(
+        output=str(tmp_path),
+        file_format="parquet",
+        device_prefix="test-device",
+        start=START,
+        interval=60,
+        duration=7200,
+    )
+
+    generate(fields, config, devices=1, workers=1)
+
+    partitions = list_files(tmp_path)
+    assert len(partitions) == 2
+    for partition in partitions:
+        table = pq.read_table(tmp_path / partition)
+        assert table.column_names == ["speed", "odometer"]
+        assert table.column("speed").null_count == 0
+        assert table.column("odometer").null_count < table.num_rows
+    # The second hour starts without an odometer reading, which must not drop the column
+    assert table.to_pylist()[0]["odometer"] is None
+
+
+def test_generate_unsupported_format(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="Unsupported format csv"):
+        generate(
+            FIELDS,
+            OfflineConfig(output=str(tmp_path), file_format="csv"),
+            devices=1,
+            workers=1,
+        )
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+# Standard Library
+# mypy: disable-error-code=misc
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+# Third Party Libraries
+import numpy as np
+import pytest
+
+# Connected Mobility Solution on AWS
+from ...handlers.stepfunction.function.random_sim import GenericSim
+from ...handlers.stepfunction.function.routes import get_route_position
+from ...offline.vectorized_sim import VectorizedSim, iter_payloads
+
+DEVICES = 4
+TICKS = 6
+
+
+@pytest.fixture(name="vectorized_fields")
+def fixture_vectorized_fields(limits: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [
+        {"name": "id", "type": "id"},
+        {"name": "bool", "type": "bool"},
+        {"name": "int", "type": "int", "min": 1, "max": 100},
+        {"name": "float", "type": "float", "precision": 2},
+        {"name": "string", "type": "string", "min": 1, "max": 8},
+        {"name": "make", "type": "string", "static": True, "default": "Amazon"},
+        {"name": "pick", "type": "pickOne", "arr": ["a", "b", "c"]},
+        {"name": "sin", "type": "sinusoidal", "min": -1, "max": 1},
+        {"name": "decay", "type": "decay", "min": 0, "max": 100},
+        {"name": "timestamp", "type": "timestamp"},
+        {"name": "location", "type": "location", "lat": 50.0, "long": 50.0},
+        {"name": "nested", "type": "object", "payload": limits["payload"]},
+    ]
+
+
+def test_generate_block_shapes(vectorized_fields: List[Dict[str, Any]]) -> None:
+    block = VectorizedSim(vectorized_fields, seed=1).generate_block(DEVICES, TICKS)
+
+    for name in ("id", "bool", "int", "float", "string", "pick", "sin", "decay"):
+        assert block[name].shape == (DEVICES, TICKS)
+    assert block["location"]["latitude"].shape == (DEVICES, TICKS)
+    assert block["nested"]["test_bool"].shape == (DEVICES, TICKS)
+
+
+def test_generate_block_distributions(vectorized_fields: List[Dict[str, Any]]) -> None:
+    block = VectorizedSim(vectorized_fields, seed=1).generate_block(DEVICES, TICKS)
+
+    assert np.all((block["int"] >= 1) & (block["int"] <= 100))
+    assert np.all((block["float"] >= 0) & (block["float"] < 1))
+    assert set(block["pick"].flatten()) <= {"a", "b", "c"}
+    assert np.all(block["make"] == "Amazon")
+    assert all(
+        re.match("^[a-zA-Z]{1,8}$", value) for value in block["string"].flatten()
+    )
+    assert all(
+        re.match("^[0-9a-f]{8}-[0-9a-f]{4}-4[0-9a-f]{3}-[89ab][0-9a-f]{3}-", value)
+        for value in block["id"].flatten()
+    )
+    assert np.all(
+        (block["location"]["latitude"] >= 50.0)
+        & (block["location"]["latitude"] < 50.01)
+    )
+
+
+def test_generate_block_counter_semantics(
+    vectorized_fields: List[Dict[str, Any]]
+) -> None:
+    block = VectorizedSim(vectorized_fields).generate_block(
+        DEVICES, TICKS, start_counter=10
+    )
+
+    for tick in range(TICKS):
+        for field in vectorized_fields:
+            if field["type"] == "sinusoidal":
+                expected = GenericSim.generic_sim_sinusoidal(field, counter=10 + tick)
+            elif field["type"] == "decay":
+                expected = GenericSim.generic_sim_decay(field, counter=10 + tick)
+            else:
+                continue
+            assert np.allclose(block[field["name"]][:, tick], expected)
+
+
+def test_generate_block_seed(vectorized_fields: List[Dict[str, Any]]) -> None:
+    start_time = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    first = VectorizedSim(vectorized_fields, seed=7).generate_block(
+        DEVICES, TICKS, start_time=start_time
+    )
+    second = VectorizedSim(vectorized_fields, seed=7).generate_block(
+        DEVICES, TICKS, start_time=start_time
+    )
+
+    assert list(iter_payloads(first)) == list(iter_payloads(second))
+    assert first["timestamp"][0, 1] == "2024-01-01T00:00:01+00:00"
+
+
+def test_iter_payloads(vectorized_fields: List[Dict[str, Any]]) -> None:
+    block = VectorizedSim(vectorized_fields, seed=1).generate_block(DEVICES, TICKS)
+    payloads = list(iter_payloads(block))
+
+    assert len(payloads) == DEVICES * TICKS
+    device, tick, payload = payloads[-1]
+    assert (device, tick) == (DEVICES - 1, TICKS - 1)
+    assert list(payload) == [field["name"] for field in vectorized_fields]
+    assert isinstance(payload["int"], int)
+    assert isinstance(payload["bool"], bool)
+    assert isinstance(payload["nested"]["test_id"], str)
+
+
+def test_generate_block_route(routes_bucket: str) -> None:
+    field = {"name": "location", "type": "route", "routes": ["route-a", "route-b"]}
+
+    block = VectorizedSim([field]).generate_block(
+        DEVICES, TICKS, start_counter=10, interval=60, start_device=3
+    )
+
+    for row in range(DEVICES):
+        for tick in range(TICKS):
+            position = get_route_position(field, 3 + row, (10 + tick) * 60)
+            assert np.isclose(
+                block["location"]["latitude"][row, tick], position["latitude"]
+            )
+            assert np.isclose(
+                block["location"]["longitude"][row, tick], position["longitude"]
+            )